@@ -16,7 +16,12 @@
 #ifndef MINDQUANTUM_SPARSE_ALGO_H_
 #define MINDQUANTUM_SPARSE_ALGO_H_
 
+#include <algorithm>
 #include <memory>
+#include <stdexcept>
+#include <string>
+#include <unordered_map>
+#include <utility>
 
 #include "core/sparse/csrhdmatrix.hpp"
 #include "core/sparse/paulimat.hpp"
@@ -120,28 +125,93 @@ std::shared_ptr<CsrHdMatrix<T>> Csr_Plus_Csr(std::shared_ptr<CsrHdMatrix<T>> a,
     return c;
 }
 
+/**
+ * Full sparse matrix of hamiltonian.
+ *
+ * Pauli terms are binned by the qubits they flip, so that every bin gives at most one nonzero element of every row,
+ * whose column is the row index flipped by the flip mask of bin. The element of column j is the sum of
+ * coeff * i^num_y * (-1)^popcount(j & mask_yz) over all terms of the bin. The nonzero elements are counted and then
+ * written row by row in parallel, directly into the final CSR arrays.
+ */
 template <typename T>
 std::shared_ptr<CsrHdMatrix<T>> SparseHamiltonian(const VT<PauliTerm<T>> &hams, Index n_qubits) {
-    VT<std::shared_ptr<CsrHdMatrix<T>>> sp_hams(hams.size());
+    struct FlipBin {
+        Index mask_f = 0;
+        VT<Index> mask_yz;
+        VT<CT<T>> coeffs;
+    };
+    VT<FlipBin> bins;
+    std::unordered_map<Index, size_t> bin_idx;
+    for (const auto &[pauli_string, coeff] : hams) {
+        Index mask_f = 0;
+        Index mask_yz = 0;
+        Index num_y = 0;
+        for (const auto &[qubit, pauli] : pauli_string) {
+            if (qubit < 0 || qubit >= n_qubits) {
+                throw std::invalid_argument("Qubit of hamiltonian out of range of " + std::to_string(n_qubits)
+                                            + " qubits.");
+            }
+            auto bit = static_cast<Index>(1) << qubit;
+            mask_f |= pauli == 'Z' ? 0 : bit;
+            mask_yz |= pauli == 'X' ? 0 : bit;
+            num_y += pauli == 'Y';
+        }
+        auto it = bin_idx.find(mask_f);
+        if (it == bin_idx.end()) {
+            it = bin_idx.emplace(mask_f, bins.size()).first;
+            bins.emplace_back();
+            bins.back().mask_f = mask_f;
+        }
+        bins[it->second].mask_yz.push_back(mask_yz);
+        bins[it->second].coeffs.push_back(coeff * CT<T>(POLAR[num_y & 3]));
+    }
+    auto n_bins = static_cast<Index>(bins.size());
+    auto element = [&](const FlipBin &bin, Index col) {
+        CT<T> sum = 0;
+        for (size_t t = 0; t < bin.coeffs.size(); t++) {
+            sum += (CountOne(col & bin.mask_yz[t]) & 1) ? -bin.coeffs[t] : bin.coeffs[t];
+        }
+        return sum;
+    };
 
+    Index dim = static_cast<Index>(1) << n_qubits;
+    auto *indptr = reinterpret_cast<Index *>(malloc(sizeof(Index) * (dim + 1)));
+    indptr[0] = 0;
     THRESHOLD_OMP_FOR(
-        n_qubits, nQubitTh, for (Index i = 0; i < static_cast<Index>(hams.size()); i++) {
-            auto pm = GetPauliMat(hams[i], n_qubits);
-            sp_hams[i] = PauliMatToCsrHdMatrix(pm);
-            pm->Reset();
+        dim, 1UL << nQubitTh, for (Index i = 0; i < dim; i++) {
+            Index count = 0;
+            for (const auto &bin : bins) {
+                count += std::abs(element(bin, i ^ bin.mask_f)) > PRECISION;
+            }
+            indptr[i + 1] = count;
         })
-    Index tot = static_cast<Index>(hams.size());
-    while (tot > 1) {
-        Index half = tot / 2 + tot % 2;
-        THRESHOLD_OMP(
-            MQ_DO_PRAGMA(omp parallel for schedule(static) num_threads(half)), n_qubits, nQubitTh,
-                         for (Index i = half; i < tot; i++) {
-                             sp_hams[i - half] = Csr_Plus_Csr(sp_hams[i - half], sp_hams[i]);
-                             sp_hams[i]->Reset();
-                         })
-        tot = half;
+    for (Index i = 0; i < dim; i++) {
+        indptr[i + 1] += indptr[i];
     }
-    return sp_hams[0];
+    auto nnz = indptr[dim];
+    auto *indices = reinterpret_cast<Index *>(malloc(sizeof(Index) * nnz));
+    auto data = reinterpret_cast<CTP<T>>(malloc(sizeof(CT<T>) * nnz));
+    THRESHOLD_OMP(MQ_DO_PRAGMA(omp parallel), dim, 1UL << nQubitTh, {
+        VT<std::pair<Index, CT<T>>> row;
+        row.reserve(n_bins);
+            MQ_DO_PRAGMA(omp for schedule(static))
+            for (Index i = 0; i < dim; i++) {
+                row.clear();
+                for (const auto &bin : bins) {
+                    auto col = i ^ bin.mask_f;
+                    auto value = element(bin, col);
+                    if (std::abs(value) > PRECISION) {
+                        row.emplace_back(col, value);
+                    }
+                }
+                std::sort(row.begin(), row.end(), [](const auto &a, const auto &b) { return a.first < b.first; });
+                for (Index k = 0, j = indptr[i]; k < static_cast<Index>(row.size()); k++, j++) {
+                    indices[j] = row[k].first;
+                    data[j] = row[k].second;
+                }
+            }
+    })
+    return std::make_shared<CsrHdMatrix<T>>(dim, nnz, indptr, indices, data);
 }
 
 template <typename T, typename T2>
@@ -157,7 +227,7 @@ T2 *Csr_Dot_Vec(std::shared_ptr<CsrHdMatrix<T>> a, T2 *vec) {
         dim, 1UL << nQubitTh, for (Index i = 0; i < dim; i++) {
             CT<T2> sum = {0.0, 0.0};
             for (Index j = indptr[i]; j < indptr[i + 1]; j++) {
-                sum += data[j] * c_vec[indices[j]];
+                sum += CT<T2>(data[j]) * c_vec[indices[j]];
             }
             new_vec[i] = sum;
         })
@@ -181,14 +251,67 @@ T2 *Csr_Dot_Vec(std::shared_ptr<CsrHdMatrix<T>> a, std::shared_ptr<CsrHdMatrix<T
         dim, 1UL << nQubitTh, for (Index i = 0; i < dim; i++) {
             CT<T2> sum = {0.0, 0.0};
             for (Index j = indptr[i]; j < indptr[i + 1]; j++) {
-                sum += data[j] * c_vec[indices[j]];
+                sum += CT<T2>(data[j]) * c_vec[indices[j]];
             }
             for (Index j = indptr_b[i]; j < indptr_b[i + 1]; j++) {
-                sum += data_b[j] * c_vec[indices_b[j]];
+                sum += CT<T2>(data_b[j]) * c_vec[indices_b[j]];
             }
             new_vec[i] = sum;
         })
     return reinterpret_cast<T2 *>(new_vec);
 }
+
+// Calculate <bra|a|ket> row by row without allocating the intermediate vector.
+template <typename T, typename T2>
+CT<T2> Csr_Vdot_Vec(std::shared_ptr<CsrHdMatrix<T>> a, T2 *bra, T2 *ket) {
+    auto dim = a->dim_;
+    auto c_bra = reinterpret_cast<CTP<T2>>(bra);
+    auto c_ket = reinterpret_cast<CTP<T2>>(ket);
+    auto data = a->data_;
+    auto indptr = a->indptr_;
+    auto indices = a->indices_;
+    T2 res_real = 0, res_imag = 0;
+    THRESHOLD_OMP(
+        MQ_DO_PRAGMA(omp parallel for schedule(static) reduction(+ : res_real, res_imag)), dim, 1UL << nQubitTh,
+                     for (Index i = 0; i < dim; i++) {
+                         CT<T2> sum = {0.0, 0.0};
+                         for (Index j = indptr[i]; j < indptr[i + 1]; j++) {
+                             sum += CT<T2>(data[j]) * c_ket[indices[j]];
+                         }
+                         sum = std::conj(c_bra[i]) * sum;
+                         res_real += sum.real();
+                         res_imag += sum.imag();
+                     })
+    return {res_real, res_imag};
+}
+
+template <typename T, typename T2>
+CT<T2> Csr_Vdot_Vec(std::shared_ptr<CsrHdMatrix<T>> a, std::shared_ptr<CsrHdMatrix<T>> b, T2 *bra, T2 *ket) {
+    auto dim = a->dim_;
+    auto c_bra = reinterpret_cast<CTP<T2>>(bra);
+    auto c_ket = reinterpret_cast<CTP<T2>>(ket);
+    auto data = a->data_;
+    auto indptr = a->indptr_;
+    auto indices = a->indices_;
+    auto data_b = b->data_;
+    auto indptr_b = b->indptr_;
+    auto indices_b = b->indices_;
+    T2 res_real = 0, res_imag = 0;
+    THRESHOLD_OMP(
+        MQ_DO_PRAGMA(omp parallel for schedule(static) reduction(+ : res_real, res_imag)), dim, 1UL << nQubitTh,
+                     for (Index i = 0; i < dim; i++) {
+                         CT<T2> sum = {0.0, 0.0};
+                         for (Index j = indptr[i]; j < indptr[i + 1]; j++) {
+                             sum += CT<T2>(data[j]) * c_ket[indices[j]];
+                         }
+                         for (Index j = indptr_b[i]; j < indptr_b[i + 1]; j++) {
+                             sum += CT<T2>(data_b[j]) * c_ket[indices_b[j]];
+                         }
+                         sum = std::conj(c_bra[i]) * sum;
+                         res_real += sum.real();
+                         res_imag += sum.imag();
+                     })
+    return {res_real, res_imag};
+}
 }  // namespace mindquantum::sparse
 #endif  // MINDQUANTUM_SPARSE_ALGO_H_
@@ -0,0 +1,276 @@
+//   Copyright 2022 <Huawei Technologies Co., Ltd>
+//
+//   Licensed under the Apache License, Version 2.0 (the "License");
+//   you may not use this file except in compliance with the License.
+//   You may obtain a copy of the License at
+//
+//       http://www.apache.org/licenses/LICENSE-2.0
+//
+//   Unless required by applicable law or agreed to in writing, software
+//   distributed under the License is distributed on an "AS IS" BASIS,
+//   WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+//   See the License for the specific language governing permissions and
+//   limitations under the License.
+
+#ifndef MINDQUANTUM_GATE_COMPILED_CIRCUIT_HPP_
+#define MINDQUANTUM_GATE_COMPILED_CIRCUIT_HPP_
+
+#include <cstdint>
+#include <iterator>
+#include <limits>
+#include <memory>
+#include <set>
+#include <stdexcept>
+#include <string>
+#include <utility>
+
+#include "core/mq_base_types.hpp"
+#include "core/parameter_resolver.hpp"
+#include "core/utils.hpp"
+#include "ops/basic_gate.hpp"
+#include "ops/gates.hpp"
+
+namespace mindquantum {
+//! Kind of compiled gate, so that gates are dispatched without comparing names.
+enum class GateID : uint8_t {
+    I,
+    X,
+    Y,
+    Z,
+    H,
+    S,
+    Sdag,
+    T,
+    Tdag,
+    SWAP,
+    ISWAP,
+    ISWAPdag,
+    RX,
+    RY,
+    RZ,
+    XX,
+    YY,
+    ZZ,
+    PS,
+    GP,
+    U3,
+    FSim,
+    Custom,
+    Measure,
+    Channel,
+    Unknown,
+};
+
+//! Parameter of compiled gate, as linear combination of the parameter slots of the circuit.
+template <typename T>
+struct CompiledParameter {
+    T const_value = 0;
+    VT<std::pair<size_t, T>> coeffs{};
+    //! Coefficients of parameters that require gradient.
+    VT<std::pair<size_t, T>> grad_coeffs{};
+
+    T Evaluate(const VT<T>& values) const {
+        auto out = const_value;
+        for (const auto& [slot, coeff] : coeffs) {
+            out += coeff * values[slot];
+        }
+        return out;
+    }
+};
+
+template <typename T>
+struct CompiledGate {
+    GateID id_ = GateID::Unknown;
+    VT<Index> obj_qubits_{};
+    VT<Index> ctrl_qubits_{};
+    bool parameterized_ = false;
+    T applied_value_ = 0;
+    //! One parameter for most parameterized gates, theta, phi and lambda for U3, theta and phi for FSim.
+    VT<CompiledParameter<T>> params_{};
+    //! The origin gate, for matrix of custom gate, measurement and noise channel.
+    std::shared_ptr<BasicGate<T>> gate_ = nullptr;
+
+    bool RequiresGrad() const {
+        for (const auto& param : params_) {
+            if (!param.grad_coeffs.empty()) {
+                return true;
+            }
+        }
+        return false;
+    }
+};
+
+/**
+ * Execution plan of a quantum circuit.
+ *
+ * Gates are flattened into records with an integer gate kind, and parameter names are replaced by integer slots, so
+ * that a circuit compiled once can be evaluated many times without string comparison or map lookup for each gate.
+ * Slots are ordered by parameter name, so that a circuit and its hermitian conjugate share the same slots.
+ */
+template <typename T>
+struct CompiledCircuit {
+    static constexpr size_t npos = std::numeric_limits<size_t>::max();
+
+    VS params_name_{};
+    MST<size_t> params_slot_{};
+    VT<CompiledGate<T>> gates_{};
+
+    CompiledCircuit() = default;
+    explicit CompiledCircuit(const VT<std::shared_ptr<BasicGate<T>>>& circ) {
+        std::set<std::string> names;
+        for (const auto& gate : circ) {
+            for (const auto& pr : GateParameters(gate)) {
+                for (const auto& [name, coeff] : pr.data_) {
+                    names.insert(name);
+                }
+            }
+        }
+        for (const auto& name : names) {
+            params_slot_[name] = params_name_.size();
+            params_name_.push_back(name);
+        }
+        for (const auto& gate : circ) {
+            gates_.push_back(CompileGate(gate));
+        }
+    }
+
+    //! Value of every parameter slot.
+    VT<T> ResolveParameters(const ParameterResolver<T>& pr) const {
+        VT<T> values;
+        values.reserve(params_name_.size());
+        for (const auto& name : params_name_) {
+            values.push_back(pr.GetItem(name));
+        }
+        return values;
+    }
+
+    //! Position of every parameter slot in names, npos if the parameter is not in names.
+    VT<size_t> MapParameters(const VS& names) const {
+        VT<size_t> out(params_name_.size(), npos);
+        for (size_t i = 0; i < names.size(); i++) {
+            if (auto it = params_slot_.find(names[i]); it != params_slot_.end()) {
+                out[it->second] = i;
+            }
+        }
+        return out;
+    }
+
+ private:
+    static VT<ParameterResolver<T>> GateParameters(const std::shared_ptr<BasicGate<T>>& gate) {
+        if (!gate->parameterized_) {
+            return {};
+        }
+        if (gate->name_ == gU3 && !gate->is_custom_) {
+            return static_cast<U3<T>*>(gate.get())->prs;
+        }
+        if (gate->name_ == gFSim && !gate->is_custom_) {
+            return static_cast<FSim<T>*>(gate.get())->prs;
+        }
+        return {gate->params_};
+    }
+
+    CompiledParameter<T> CompileParameter(const ParameterResolver<T>& pr) const {
+        CompiledParameter<T> out;
+        out.const_value = pr.const_value;
+        for (const auto& [name, coeff] : pr.data_) {
+            auto slot = params_slot_.at(name);
+            out.coeffs.emplace_back(slot, coeff);
+            if (!pr.NoGradContains(name)) {
+                out.grad_coeffs.emplace_back(slot, coeff);
+            }
+        }
+        return out;
+    }
+
+    static GateID GetGateID(const BasicGate<T>& gate) {
+        if (gate.is_custom_) {
+            return GateID::Custom;
+        }
+        const auto& name = gate.name_;
+        if (name == gI) {
+            return GateID::I;
+        }
+        if (name == gX || name == gCNOT) {
+            return GateID::X;
+        }
+        if (name == gY) {
+            return GateID::Y;
+        }
+        if (name == gZ) {
+            return GateID::Z;
+        }
+        if (name == gH) {
+            return GateID::H;
+        }
+        if (name == gS) {
+            return gate.daggered_ ? GateID::Sdag : GateID::S;
+        }
+        if (name == gT) {
+            return gate.daggered_ ? GateID::Tdag : GateID::T;
+        }
+        if (name == gSWAP) {
+            return GateID::SWAP;
+        }
+        if (name == gISWAP) {
+            return gate.daggered_ ? GateID::ISWAPdag : GateID::ISWAP;
+        }
+        if (name == gRX) {
+            return GateID::RX;
+        }
+        if (name == gRY) {
+            return GateID::RY;
+        }
+        if (name == gRZ) {
+            return GateID::RZ;
+        }
+        if (name == gXX) {
+            return GateID::XX;
+        }
+        if (name == gYY) {
+            return GateID::YY;
+        }
+        if (name == gZZ) {
+            return GateID::ZZ;
+        }
+        if (name == gPS) {
+            return GateID::PS;
+        }
+        if (name == gGP) {
+            return GateID::GP;
+        }
+        if (name == gU3) {
+            return GateID::U3;
+        }
+        if (name == gFSim) {
+            return GateID::FSim;
+        }
+        if (gate.is_measure_) {
+            return GateID::Measure;
+        }
+        if (gate.is_channel_) {
+            return GateID::Channel;
+        }
+        return GateID::Unknown;
+    }
+
+    CompiledGate<T> CompileGate(const std::shared_ptr<BasicGate<T>>& gate) const {
+        CompiledGate<T> out;
+        out.id_ = GetGateID(*gate);
+        out.obj_qubits_ = gate->obj_qubits_;
+        out.ctrl_qubits_ = gate->ctrl_qubits_;
+        if (gate->name_ == gCNOT && !gate->is_custom_) {
+            // The extra object qubits of CNOT are control qubits.
+            std::copy(gate->obj_qubits_.begin() + 1, gate->obj_qubits_.end(), std::back_inserter(out.ctrl_qubits_));
+            out.obj_qubits_.resize(1);
+        }
+        out.parameterized_ = gate->parameterized_;
+        out.applied_value_ = gate->applied_value_;
+        for (const auto& pr : GateParameters(gate)) {
+            out.params_.push_back(CompileParameter(pr));
+        }
+        out.gate_ = gate;
+        return out;
+    }
+};
+}  // namespace mindquantum
+#endif  // MINDQUANTUM_GATE_COMPILED_CIRCUIT_HPP_
@@ -16,7 +16,9 @@
 
 #ifndef MINDQUANTUM_HAMILTONIAN_HAMILTONIAN_H_
 #define MINDQUANTUM_HAMILTONIAN_HAMILTONIAN_H_
+#include <cstdint>
 #include <memory>
+#include <stdexcept>
 
 #include "core/sparse/algo.hpp"
 #include "core/utils.hpp"
@@ -26,6 +28,34 @@ using mindquantum::sparse::CsrHdMatrix;
 using mindquantum::sparse::SparseHamiltonian;
 using mindquantum::sparse::TransposeCsrHdMatrix;
 
+/**
+ * Unpack pauli terms from packed arrays.
+ *
+ * The pauli words of term i are given by qubits and codes in range [offsets[i], offsets[i + 1]), where the code of a
+ * pauli operator is x + 2z of its symplectic bits, which is 1 for X, 2 for Z and 3 for Y.
+ */
+template <typename T>
+VT<PauliTerm<T>> UnpackPauliTerms(const Index *qubits, const uint8_t *codes, size_t n_words, const Index *offsets,
+                                  const T *coeffs, size_t n_terms) {
+    constexpr char kPauli[] = {'I', 'X', 'Z', 'Y'};
+    VT<PauliTerm<T>> terms(n_terms);
+    for (size_t i = 0; i < n_terms; i++) {
+        if (offsets[i] < 0 || offsets[i] > offsets[i + 1] || static_cast<size_t>(offsets[i + 1]) > n_words) {
+            throw std::invalid_argument("Offsets of packed pauli terms out of range.");
+        }
+        auto &words = terms[i].first;
+        words.reserve(offsets[i + 1] - offsets[i]);
+        for (auto j = offsets[i]; j < offsets[i + 1]; j++) {
+            if (codes[j] == 0 || codes[j] > 3) {
+                throw std::invalid_argument("Code of packed pauli operator should be 1, 2 or 3.");
+            }
+            words.emplace_back(qubits[j], kPauli[codes[j]]);
+        }
+        terms[i].second = coeffs[i];
+    }
+    return terms;
+}
+
 template <typename T>
 struct Hamiltonian {
     int64_t how_to_ = 0;
@@ -39,15 +69,10 @@ struct Hamiltonian {
     explicit Hamiltonian(const VT<PauliTerm<T>> &ham) : how_to_(ORIGIN), ham_(ham) {
     }
 
-    Hamiltonian(const VT<PauliTerm<T>> &ham, Index n_qubits) : how_to_(BACKEND), n_qubits_(n_qubits), ham_(ham) {
-        if (n_qubits_ > 16) {
-            std::cout << "Sparsing hamiltonian ..." << std::endl;
-        }
-        ham_sparse_main_ = SparseHamiltonian(ham_, n_qubits_);
-        ham_sparse_second_ = TransposeCsrHdMatrix(ham_sparse_main_);
-        if (n_qubits_ > 16) {
-            std::cout << "Sparsing hamiltonian finished!" << std::endl;
-        }
+    //! The full sparse matrix is stored in ham_sparse_main_. Since a hamiltonian with real coefficients is hermitian,
+    //! no transposed matrix is needed and ham_sparse_second_ is left empty.
+    Hamiltonian(const VT<PauliTerm<T>> &ham, Index n_qubits)
+        : how_to_(BACKEND), n_qubits_(n_qubits), ham_(ham), ham_sparse_main_(SparseHamiltonian(ham_, n_qubits_)) {
     }
 
     Hamiltonian(std::shared_ptr<CsrHdMatrix<T>> csr_mat, Index n_qubits)
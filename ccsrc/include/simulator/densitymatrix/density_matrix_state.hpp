@@ -0,0 +1,172 @@
+//   Copyright 2022 <Huawei Technologies Co., Ltd>
+//
+//   Licensed under the Apache License, Version 2.0 (the "License");
+//   you may not use this file except in compliance with the License.
+//   You may obtain a copy of the License at
+//
+//       http://www.apache.org/licenses/LICENSE-2.0
+//
+//   Unless required by applicable law or agreed to in writing, software
+//   distributed under the License is distributed on an "AS IS" BASIS,
+//   WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+//   See the License for the specific language governing permissions and
+//   limitations under the License.
+
+#ifndef INCLUDE_DENSITYMATRIX_DENSITYMATRIXSTATE_HPP
+#define INCLUDE_DENSITYMATRIX_DENSITYMATRIXSTATE_HPP
+
+#include <map>
+#include <memory>
+#include <random>
+#include <string>
+#include <vector>
+
+#include "core/mq_base_types.hpp"
+#include "core/parameter_resolver.hpp"
+#include "ops/basic_gate.hpp"
+#include "ops/compiled_circuit.hpp"
+#include "ops/hamiltonian.hpp"
+#include "simulator/parameter_shift.hpp"
+#include "simulator/types.hpp"
+#include "simulator/vector/vector_state.hpp"
+
+namespace mindquantum::sim::densitymatrix::detail {
+/**
+ * Density matrix simulator.
+ *
+ * The density matrix is evolved as a vector of 2n qubits by the vector kernels of qs_policy_t. A gate U is applied as U
+ * on the row qubits and conj(U) on the column qubits, and a noise channel is applied exactly as a two qubits super
+ * operator on a row qubit and its column qubit, so the result of a noisy circuit does not depend on random numbers.
+ */
+template <typename qs_policy_t_>
+class DensityMatrixState {
+ public:
+    using qs_policy_t = qs_policy_t_;
+    using derived_t = DensityMatrixState<qs_policy_t>;
+    using vec_t = vector::detail::VectorState<qs_policy_t>;
+    using circuit_t = std::vector<std::shared_ptr<BasicGate<calc_type>>>;
+    using compiled_circuit_t = CompiledCircuit<calc_type>;
+    using qs_data_t = typename qs_policy_t::qs_data_t;
+    using qs_data_p_t = typename qs_policy_t::qs_data_p_t;
+    using py_qs_data_t = typename qs_policy_t::py_qs_data_t;
+    using py_qs_datas_t = typename qs_policy_t::py_qs_datas_t;
+    using matrix_t = VVT<py_qs_data_t>;
+    using RndEngine = std::mt19937;
+
+    //! ctor
+    DensityMatrixState() = default;
+    explicit DensityMatrixState(qbit_t n_qubits, unsigned seed = 42);
+
+    //! Reset the density matrix to quantum zero state
+    void Reset();
+
+    //! Get the density matrix
+    matrix_t GetQS() const;
+
+    //! Probability of every outcome of the given qubits, the i-th bit of outcome index corresponds to qubits[i].
+    VT<typename qs_policy_t::calc_type> GetProbabilities(const qbits_t& qubits) const;
+
+    //! Density matrix of the given qubits with other qubits traced out, the i-th bit of index corresponds to qubits[i].
+    VVT<py_qs_data_t> GetReducedDensityMatrix(const qbits_t& qubits) const;
+
+    //! Set the density matrix to the pure state qs_out
+    void SetQS(const py_qs_datas_t& qs_out);
+
+    //! Set the density matrix
+    void SetDM(const matrix_t& dm);
+
+    //! Get the raw data of density matrix, element (r, c) is at r * dim + c
+    qs_data_p_t GetRawQS() const {
+        return qs_.GetRawQS();
+    }
+
+    //! Get the dimension of Hilbert space
+    index_t GetDim() const {
+        return dim;
+    }
+
+    //! Apply a quantum gate, measurement gate or noise channel on this density matrix
+    index_t ApplyGate(const std::shared_ptr<BasicGate<calc_type>>& gate,
+                      const ParameterResolver<calc_type>& pr = ParameterResolver<calc_type>(), bool diff = false);
+
+    //! Apply a compiled quantum gate, values is the value of every parameter slot of the compiled circuit.
+    index_t ApplyCompiledGate(const CompiledGate<calc_type>& gate, const VT<calc_type>& values);
+
+    //! Apply a quantum circuit on this density matrix
+    std::map<std::string, int> ApplyCircuit(const circuit_t& circ,
+                                            const ParameterResolver<calc_type>& pr = ParameterResolver<calc_type>());
+    std::map<std::string, int> ApplyCircuit(const compiled_circuit_t& circ, const ParameterResolver<calc_type>& pr);
+    std::map<std::string, int> ApplyCircuit(const compiled_circuit_t& circ, const VT<calc_type>& values);
+
+    //! Get expectation of given hamiltonian
+    py_qs_data_t GetExpectation(const Hamiltonian<calc_type>& ham) const;
+
+    //! Get the expectation of hamiltonians and the gradient with respect to the parameter slots of a noisy circuit.
+    //! grad_index is the position of every parameter slot in the gradient, npos for parameters that are not needed.
+    VT<py_qs_datas_t> GetExpectationWithGradOneMulti(const std::vector<std::shared_ptr<Hamiltonian<calc_type>>>& hams,
+                                                     const compiled_circuit_t& circ,
+                                                     const compiled_circuit_t& herm_circ, const VT<calc_type>& values,
+                                                     const VT<size_t>& grad_index, size_t n_grad, int n_thread) const;
+    //! Get the expectation of hamiltonian
+    //! Here multiple hamiltonian and multiple parameters are needed
+    VT<VT<py_qs_datas_t>> GetExpectationWithGradMultiMulti(
+        const std::vector<std::shared_ptr<Hamiltonian<calc_type>>>& hams, const circuit_t& circ,
+        const circuit_t& herm_circ, const VVT<calc_type>& enc_data, const VT<calc_type>& ans_data, const VS& enc_name,
+        const VS& ans_name, size_t batch_threads, size_t mea_threads) const;
+    VT<VT<py_qs_datas_t>> GetExpectationWithGradMultiMulti(
+        const std::vector<std::shared_ptr<Hamiltonian<calc_type>>>& hams, const compiled_circuit_t& circ,
+        const compiled_circuit_t& herm_circ, const VVT<calc_type>& enc_data, const VT<calc_type>& ans_data,
+        const VS& enc_name, const VS& ans_name, size_t batch_threads, size_t mea_threads) const;
+
+    //! Get the expectation of hamiltonians and the gradient by parameter shift rule, or by central finite difference
+    //! with given step. If shots is not zero, the expectations are estimated from shots measurements of every pauli
+    //! term. See GetExpectationWithShiftGradMultiMulti in simulator/parameter_shift.hpp.
+    VT<VT<py_qs_datas_t>> GetExpectationWithShiftGradMultiMulti(
+        const std::vector<std::shared_ptr<Hamiltonian<calc_type>>>& hams, const compiled_circuit_t& circ,
+        const VVT<calc_type>& enc_data, const VT<calc_type>& ans_data, const VS& enc_name, const VS& ans_name,
+        bool finite_difference, calc_type step, size_t shots, unsigned seed, size_t n_thread) const;
+
+    //! Sample the measurement gates of circuit. If all measurements are at the end of circuit, the circuit is only
+    //! evolved once and shots are drawn from the diagonal of density matrix.
+    VT<unsigned> Sampling(const circuit_t& circ, const ParameterResolver<calc_type>& pr, size_t shots,
+                          const MST<size_t>& key_map, unsigned seed) const;
+
+ private:
+    //! Apply a measurement gate, return the collapsed qubit state
+    index_t ApplyMeasure(const std::shared_ptr<BasicGate<calc_type>>& gate);
+
+    //! Dense matrix of hamiltonian in the layout of density matrix.
+    vec_t HamiltonianMatrix(const Hamiltonian<calc_type>& ham) const;
+
+    //! The gate acting on the row qubits.
+    static CompiledGate<calc_type> RowGate(const CompiledGate<calc_type>& gate, qbit_t n_qubits);
+
+    //! Apply gate on the row qubits of state, that is state -> U * state.
+    static void ApplyRowGate(vec_t* state, const CompiledGate<calc_type>& gate, const VT<calc_type>& values,
+                             qbit_t n_qubits);
+
+    //! Apply gate on the column qubits of state, that is state -> state * U^\dagger.
+    static void ApplyColumnGate(vec_t* state, const CompiledGate<calc_type>& gate, const VT<calc_type>& values);
+
+    //! Apply U * state * U^\dagger.
+    static void ApplyUnitary(vec_t* state, const CompiledGate<calc_type>& gate, const VT<calc_type>& values,
+                             qbit_t n_qubits);
+
+    //! Super operator sum_k K_k \otimes conj(K_k) of a single qubit noise channel, where the high bit of the matrix
+    //! index is the row qubit and the low bit is the column qubit.
+    static matrix_t SuperOperator(const std::shared_ptr<BasicGate<calc_type>>& gate);
+
+    //! Apply a super operator of a single qubit channel on obj_qubit.
+    static void ApplySuperOperator(vec_t* state, qbit_t obj_qubit, const matrix_t& m, qbit_t n_qubits);
+
+    vec_t qs_{};
+    qbit_t n_qubits = 0;
+    index_t dim = 0;
+    unsigned seed = 0;
+    RndEngine rnd_eng_;
+};
+}  // namespace mindquantum::sim::densitymatrix::detail
+
+#include "simulator/densitymatrix/density_matrix_state.tpp"  // NOLINT
+
+#endif
@@ -0,0 +1,542 @@
+//   Copyright 2022 <Huawei Technologies Co., Ltd>
+//
+//   Licensed under the Apache License, Version 2.0 (the "License");
+//   you may not use this file except in compliance with the License.
+//   You may obtain a copy of the License at
+//
+//       http://www.apache.org/licenses/LICENSE-2.0
+//
+//   Unless required by applicable law or agreed to in writing, software
+//   distributed under the License is distributed on an "AS IS" BASIS,
+//   WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+//   See the License for the specific language governing permissions and
+//   limitations under the License.
+
+#ifndef INCLUDE_DENSITYMATRIX_DENSITYMATRIXSTATE_TPP
+#define INCLUDE_DENSITYMATRIX_DENSITYMATRIXSTATE_TPP
+
+#include <cmath>
+
+#include <algorithm>
+#include <complex>
+#include <map>
+#include <memory>
+#include <random>
+#include <stdexcept>
+#include <string>
+#include <utility>
+#include <vector>
+
+#include "core/mq_base_types.hpp"
+#include "core/parameter_resolver.hpp"
+#include "ops/basic_gate.hpp"
+#include "ops/gates.hpp"
+#include "ops/hamiltonian.hpp"
+#include "simulator/densitymatrix/density_matrix_state.hpp"
+#include "simulator/thread_pool.hpp"
+#include "simulator/types.hpp"
+
+namespace mindquantum::sim::densitymatrix::detail {
+template <typename qs_policy_t_>
+DensityMatrixState<qs_policy_t_>::DensityMatrixState(qbit_t n_qubits, unsigned seed)
+    : qs_(2 * n_qubits, seed), n_qubits(n_qubits), dim(1UL << n_qubits), seed(seed), rnd_eng_(seed) {
+}
+
+template <typename qs_policy_t_>
+void DensityMatrixState<qs_policy_t_>::Reset() {
+    qs_.Reset();
+}
+
+template <typename qs_policy_t_>
+auto DensityMatrixState<qs_policy_t_>::GetQS() const -> matrix_t {
+    auto qs = GetRawQS();
+    matrix_t out(dim, py_qs_datas_t(dim));
+    for (index_t r = 0; r < dim; r++) {
+        for (index_t c = 0; c < dim; c++) {
+            out[r][c] = qs[r * dim + c];
+        }
+    }
+    return out;
+}
+
+template <typename qs_policy_t_>
+auto DensityMatrixState<qs_policy_t_>::GetProbabilities(const qbits_t& qubits) const
+    -> VT<typename qs_policy_t::calc_type> {
+    CheckSubsystemQubits(qubits, n_qubits);
+    return qs_policy_t::GetMarginalProbs(GetRawQS(), qubits, dim);
+}
+
+template <typename qs_policy_t_>
+auto DensityMatrixState<qs_policy_t_>::GetReducedDensityMatrix(const qbits_t& qubits) const -> matrix_t {
+    CheckSubsystemQubits(qubits, n_qubits);
+    return qs_policy_t::GetReducedDensityMatrix(GetRawQS(), qubits, dim);
+}
+
+template <typename qs_policy_t_>
+void DensityMatrixState<qs_policy_t_>::SetQS(const py_qs_datas_t& qs_out) {
+    if (qs_out.size() != dim) {
+        throw std::invalid_argument("state size not match");
+    }
+    auto qs = GetRawQS();
+    for (index_t r = 0; r < dim; r++) {
+        for (index_t c = 0; c < dim; c++) {
+            qs[r * dim + c] = qs_out[r] * std::conj(qs_out[c]);
+        }
+    }
+}
+
+template <typename qs_policy_t_>
+void DensityMatrixState<qs_policy_t_>::SetDM(const matrix_t& dm) {
+    if (dm.size() != dim) {
+        throw std::invalid_argument("density matrix size not match");
+    }
+    auto qs = GetRawQS();
+    for (index_t r = 0; r < dim; r++) {
+        if (dm[r].size() != dim) {
+            throw std::invalid_argument("density matrix size not match");
+        }
+        for (index_t c = 0; c < dim; c++) {
+            qs[r * dim + c] = dm[r][c];
+        }
+    }
+}
+
+template <typename qs_policy_t_>
+index_t DensityMatrixState<qs_policy_t_>::ApplyGate(const std::shared_ptr<BasicGate<calc_type>>& gate,
+                                                    const ParameterResolver<calc_type>& pr, bool diff) {
+    if (diff) {
+        throw std::invalid_argument("Applying derivative of gate is not supported by density matrix simulator.");
+    }
+    compiled_circuit_t compiled({gate});
+    return ApplyCompiledGate(compiled.gates_[0], compiled.ResolveParameters(pr));
+}
+
+template <typename qs_policy_t_>
+index_t DensityMatrixState<qs_policy_t_>::ApplyCompiledGate(const CompiledGate<calc_type>& gate,
+                                                            const VT<calc_type>& values) {
+    switch (gate.id_) {
+        case GateID::Measure:
+            return ApplyMeasure(gate.gate_);
+        case GateID::Channel:
+            ApplySuperOperator(&qs_, gate.obj_qubits_[0], SuperOperator(gate.gate_), n_qubits);
+            break;
+        default:
+            ApplyUnitary(&qs_, gate, values, n_qubits);
+    }
+    return 2;  // qubit should be 1 or 0, 2 means nothing.
+}
+
+template <typename qs_policy_t_>
+index_t DensityMatrixState<qs_policy_t_>::ApplyMeasure(const std::shared_ptr<BasicGate<calc_type>>& gate) {
+    auto obj = gate->obj_qubits_[0];
+    auto probs = qs_policy_t::GetDiagonal(GetRawQS(), dim);
+    calc_type one_prob = 0;
+    for (index_t i = 0; i < dim; i++) {
+        if ((i >> obj) & 1UL) {
+            one_prob += probs[i];
+        }
+    }
+    std::uniform_real_distribution<double> dist(0., 1.);
+    bool collapse_one = dist(rnd_eng_) < one_prob;
+    // Keep the block where both row qubit and column qubit are in the collapsed state.
+    index_t mask = (1UL << obj) | (1UL << (obj + n_qubits));
+    qs_data_t norm_fact = 1 / (collapse_one ? one_prob : 1 - one_prob);
+    qs_policy_t::ConditionalMul(GetRawQS(), GetRawQS(), mask, collapse_one ? mask : 0, norm_fact, 0.0, dim * dim);
+    return static_cast<index_t>(collapse_one);
+}
+
+template <typename qs_policy_t_>
+std::map<std::string, int> DensityMatrixState<qs_policy_t_>::ApplyCircuit(const circuit_t& circ,
+                                                                          const ParameterResolver<calc_type>& pr) {
+    return ApplyCircuit(compiled_circuit_t(circ), pr);
+}
+
+template <typename qs_policy_t_>
+std::map<std::string, int> DensityMatrixState<qs_policy_t_>::ApplyCircuit(const compiled_circuit_t& circ,
+                                                                          const ParameterResolver<calc_type>& pr) {
+    return ApplyCircuit(circ, circ.ResolveParameters(pr));
+}
+
+template <typename qs_policy_t_>
+std::map<std::string, int> DensityMatrixState<qs_policy_t_>::ApplyCircuit(const compiled_circuit_t& circ,
+                                                                          const VT<calc_type>& values) {
+    std::map<std::string, int> result;
+    for (const auto& g : circ.gates_) {
+        if (g.id_ == GateID::Measure) {
+            result[g.gate_->name_] = ApplyMeasure(g.gate_);
+        } else {
+            ApplyCompiledGate(g, values);
+        }
+    }
+    return result;
+}
+
+template <typename qs_policy_t_>
+auto DensityMatrixState<qs_policy_t_>::GetExpectation(const Hamiltonian<calc_type>& ham) const -> py_qs_data_t {
+    if (ham.how_to_ == FRONTEND) {
+        return qs_policy_t::TraceOfCsr(ham.ham_sparse_main_, GetRawQS(), dim);
+    }
+    return qs_policy_t::TraceOfTerms(GetRawQS(), ham.ham_, dim);
+}
+
+template <typename qs_policy_t_>
+auto DensityMatrixState<qs_policy_t_>::HamiltonianMatrix(const Hamiltonian<calc_type>& ham) const -> vec_t {
+    if (ham.how_to_ == FRONTEND) {
+        return vec_t(qs_policy_t::CsrMatrix(ham.ham_sparse_main_, dim), 2 * n_qubits, seed);
+    }
+    return vec_t(qs_policy_t::HamiltonianMatrix(ham.ham_, dim), 2 * n_qubits, seed);
+}
+
+template <typename qs_policy_t_>
+auto DensityMatrixState<qs_policy_t_>::RowGate(const CompiledGate<calc_type>& gate, qbit_t n_qubits)
+    -> CompiledGate<calc_type> {
+    auto out = gate;
+    for (auto& q : out.obj_qubits_) {
+        q += n_qubits;
+    }
+    for (auto& q : out.ctrl_qubits_) {
+        q += n_qubits;
+    }
+    return out;
+}
+
+template <typename qs_policy_t_>
+void DensityMatrixState<qs_policy_t_>::ApplyRowGate(vec_t* state, const CompiledGate<calc_type>& gate,
+                                                    const VT<calc_type>& values, qbit_t n_qubits) {
+    state->ApplyCompiledGate(RowGate(gate, n_qubits), values);
+}
+
+template <typename qs_policy_t_>
+void DensityMatrixState<qs_policy_t_>::ApplyColumnGate(vec_t* state, const CompiledGate<calc_type>& gate,
+                                                       const VT<calc_type>& values) {
+    // Applying matrix A on the column qubits gives state * A^T, so the conjugate of U is applied. Most gates have a
+    // kernel for their conjugate, the others are applied with the conjugate of their matrix.
+    auto conj_gate = gate;
+    auto negate = [&conj_gate](size_t idx) {
+        auto& param = conj_gate.params_[idx];
+        param.const_value = -param.const_value;
+        for (auto& [slot, coeff] : param.coeffs) {
+            coeff = -coeff;
+        }
+        for (auto& [slot, coeff] : param.grad_coeffs) {
+            coeff = -coeff;
+        }
+    };
+    bool use_matrix = false;
+    switch (gate.id_) {
+        case GateID::I:
+        case GateID::X:
+        case GateID::Z:
+        case GateID::H:
+        case GateID::SWAP:
+        case GateID::RY:
+            break;
+        case GateID::S:
+            conj_gate.id_ = GateID::Sdag;
+            break;
+        case GateID::Sdag:
+            conj_gate.id_ = GateID::S;
+            break;
+        case GateID::T:
+            conj_gate.id_ = GateID::Tdag;
+            break;
+        case GateID::Tdag:
+            conj_gate.id_ = GateID::T;
+            break;
+        case GateID::ISWAP:
+            conj_gate.id_ = GateID::ISWAPdag;
+            break;
+        case GateID::ISWAPdag:
+            conj_gate.id_ = GateID::ISWAP;
+            break;
+        case GateID::RX:
+        case GateID::RZ:
+        case GateID::XX:
+        case GateID::YY:
+        case GateID::ZZ:
+        case GateID::PS:
+        case GateID::GP:
+            conj_gate.applied_value_ = -gate.applied_value_;
+            if (gate.parameterized_) {
+                negate(0);
+            }
+            break;
+        case GateID::U3:
+            use_matrix = !gate.parameterized_;
+            if (gate.parameterized_) {
+                negate(1);
+                negate(2);
+            }
+            break;
+        case GateID::FSim:
+            use_matrix = !gate.parameterized_;
+            if (gate.parameterized_) {
+                negate(0);
+                negate(1);
+            }
+            break;
+        case GateID::Y:
+        case GateID::Custom:
+            use_matrix = true;
+            break;
+        default:
+            throw std::invalid_argument("Apply of gate " + gate.gate_->name_ + " not implement.");
+    }
+    if (!use_matrix) {
+        state->ApplyCompiledGate(conj_gate, values);
+        return;
+    }
+    auto m = gate.parameterized_ ? gate.gate_->numba_param_matrix_(gate.params_[0].Evaluate(values)).matrix_
+                                 : gate.gate_->base_matrix_.matrix_;
+    matrix_t conj_m;
+    for (const auto& row : m) {
+        conj_m.emplace_back();
+        for (const auto& v : row) {
+            conj_m.back().push_back(std::conj(py_qs_data_t(v)));
+        }
+    }
+    qs_policy_t::ApplyMatrixGate(state->GetRawQS(), state->GetRawQS(), gate.obj_qubits_, gate.ctrl_qubits_, conj_m,
+                                 state->GetDim());
+}
+
+template <typename qs_policy_t_>
+void DensityMatrixState<qs_policy_t_>::ApplyUnitary(vec_t* state, const CompiledGate<calc_type>& gate,
+                                                    const VT<calc_type>& values, qbit_t n_qubits) {
+    ApplyRowGate(state, gate, values, n_qubits);
+    ApplyColumnGate(state, gate, values);
+}
+
+template <typename qs_policy_t_>
+auto DensityMatrixState<qs_policy_t_>::SuperOperator(const std::shared_ptr<BasicGate<calc_type>>& gate) -> matrix_t {
+    using kraus_t = VVT<std::complex<calc_type>>;
+    if (!gate->ctrl_qubits_.empty()) {
+        throw std::invalid_argument("Controlled noise channel is not supported by density matrix simulator.");
+    }
+    std::vector<kraus_t> kraus;
+    if (gate->name_ == "PL") {
+        auto px = std::sqrt(gate->probs_[0]);
+        auto py = std::sqrt(gate->probs_[1]);
+        auto pz = std::sqrt(gate->probs_[2]);
+        auto pi = std::sqrt(std::max<calc_type>(gate->probs_[3], 0));
+        kraus.push_back({{pi, 0}, {0, pi}});
+        kraus.push_back({{0, px}, {px, 0}});
+        kraus.push_back({{0, std::complex<calc_type>(0, -py)}, {std::complex<calc_type>(0, py), 0}});
+        kraus.push_back({{pz, 0}, {0, -pz}});
+    } else if (gate->kraus_operator_set_.size() != 0) {
+        kraus = gate->kraus_operator_set_;
+    } else if (gate->name_ == "ADC" || gate->name_ == "PDC") {
+        auto gamma = gate->damping_coeff_;
+        kraus.push_back({{1, 0}, {0, std::sqrt(1 - gamma)}});
+        if (gate->name_ == "ADC") {
+            kraus.push_back({{0, std::sqrt(gamma)}, {0, 0}});
+        } else {
+            kraus.push_back({{0, 0}, {0, std::sqrt(gamma)}});
+        }
+    } else {
+        throw std::runtime_error("This noise channel not implemented.");
+    }
+    matrix_t out(4, py_qs_datas_t(4, 0));
+    for (const auto& k : kraus) {
+        for (index_t i = 0; i < 4; i++) {
+            for (index_t j = 0; j < 4; j++) {
+                out[i][j] += py_qs_data_t(k[i >> 1][j >> 1] * std::conj(k[i & 1][j & 1]));
+            }
+        }
+    }
+    return out;
+}
+
+template <typename qs_policy_t_>
+void DensityMatrixState<qs_policy_t_>::ApplySuperOperator(vec_t* state, qbit_t obj_qubit, const matrix_t& m,
+                                                          qbit_t n_qubits) {
+    qs_policy_t::ApplyTwoQubitsMatrix(state->GetRawQS(), state->GetRawQS(), {obj_qubit, obj_qubit + n_qubits}, {}, m,
+                                      state->GetDim());
+}
+
+template <typename qs_policy_t_>
+auto DensityMatrixState<qs_policy_t_>::GetExpectationWithGradOneMulti(
+    const std::vector<std::shared_ptr<Hamiltonian<calc_type>>>& hams, const compiled_circuit_t& circ,
+    const compiled_circuit_t& herm_circ, const VT<calc_type>& values, const VT<size_t>& grad_index, size_t n_grad,
+    int n_thread) const -> VT<py_qs_datas_t> {
+    if (circ.params_name_ != herm_circ.params_name_ || circ.gates_.size() != herm_circ.gates_.size()) {
+        throw std::invalid_argument("Circuit and its hermitian conjugate should have the same parameters.");
+    }
+    const auto& gates = circ.gates_;
+    auto n_gates = gates.size();
+    size_t first_grad = n_gates;
+    for (size_t k = 0; k < n_gates; k++) {
+        if (gates[k].id_ == GateID::Measure) {
+            throw std::invalid_argument("circuit for variational algorithm cannot have measure gate");
+        }
+        if (first_grad == n_gates && gates[k].RequiresGrad()) {
+            first_grad = k;
+        }
+    }
+    // Forward sweep. A noise channel can not be undone, so the density matrix before every channel that the backward
+    // sweep passes through is kept.
+    vec_t rho = qs_;
+    std::map<size_t, vec_t> checkpoints;
+    for (size_t k = 0; k < n_gates; k++) {
+        if (gates[k].id_ == GateID::Channel) {
+            if (k > first_grad) {
+                checkpoints.emplace(k, rho);
+            }
+            ApplySuperOperator(&rho, gates[k].obj_qubits_[0], SuperOperator(gates[k].gate_), n_qubits);
+        } else {
+            ApplyUnitary(&rho, gates[k], values, n_qubits);
+        }
+    }
+    auto n_hams = hams.size();
+    VT<py_qs_datas_t> f_and_g(n_hams, py_qs_datas_t((1 + n_grad), 0));
+    // Backward sweep, the hamiltonian is evolved in Heisenberg picture, so that the gradient of gate k is
+    // 2 Re Tr(H_k dU_k rho_{k-1} U_k^\dagger), where rho_{k-1} U_k^\dagger = U_k^\dagger rho_k.
+    auto run_ham = [&](size_t j) {
+        auto ham = HamiltonianMatrix(*hams[j]);
+        f_and_g[j][0] = qs_policy_t::Vdot(ham.GetRawQS(), rho.GetRawQS(), rho.GetDim());
+        if (first_grad == n_gates) {
+            return;
+        }
+        vec_t state = rho;
+        for (size_t k = n_gates; k-- > first_grad;) {
+            const auto& g = gates[k];
+            const auto& herm_g = herm_circ.gates_[n_gates - 1 - k];
+            if (g.id_ == GateID::Channel) {
+                auto m = SuperOperator(g.gate_);
+                matrix_t m_dag(4, py_qs_datas_t(4));
+                for (size_t r = 0; r < 4; r++) {
+                    for (size_t c = 0; c < 4; c++) {
+                        m_dag[r][c] = std::conj(m[c][r]);
+                    }
+                }
+                ApplySuperOperator(&ham, g.obj_qubits_[0], m_dag, n_qubits);
+                state = checkpoints.at(k);
+                continue;
+            }
+            ApplyRowGate(&state, herm_g, values, n_qubits);
+            if (g.RequiresGrad()) {
+                auto grad = vec_t::ExpectDiffCompiledGate(ham.GetRawQS(), state.GetRawQS(), RowGate(g, n_qubits),
+                                                          values, state.GetDim());
+                for (size_t p = 0; p < grad.size(); p++) {
+                    for (const auto& [slot, coeff] : g.params_[p].grad_coeffs) {
+                        if (grad_index[slot] != compiled_circuit_t::npos) {
+                            f_and_g[j][1 + grad_index[slot]] += 2 * std::real(grad[p]) * coeff;
+                        }
+                    }
+                }
+            }
+            ApplyColumnGate(&state, herm_g, values);
+            ApplyUnitary(&ham, herm_g, values, n_qubits);
+        }
+    };
+    ThreadPool::GetInstance().ParallelFor(n_hams, std::max(n_thread, 1), run_ham);
+    return f_and_g;
+}
+
+template <typename qs_policy_t_>
+auto DensityMatrixState<qs_policy_t_>::GetExpectationWithGradMultiMulti(
+    const std::vector<std::shared_ptr<Hamiltonian<calc_type>>>& hams, const circuit_t& circ, const circuit_t& herm_circ,
+    const VVT<calc_type>& enc_data, const VT<calc_type>& ans_data, const VS& enc_name, const VS& ans_name,
+    size_t batch_threads, size_t mea_threads) const -> VT<VT<py_qs_datas_t>> {
+    return GetExpectationWithGradMultiMulti(hams, compiled_circuit_t(circ), compiled_circuit_t(herm_circ), enc_data,
+                                            ans_data, enc_name, ans_name, batch_threads, mea_threads);
+}
+
+template <typename qs_policy_t_>
+auto DensityMatrixState<qs_policy_t_>::GetExpectationWithGradMultiMulti(
+    const std::vector<std::shared_ptr<Hamiltonian<calc_type>>>& hams, const compiled_circuit_t& circ,
+    const compiled_circuit_t& herm_circ, const VVT<calc_type>& enc_data, const VT<calc_type>& ans_data,
+    const VS& enc_name, const VS& ans_name, size_t batch_threads, size_t mea_threads) const -> VT<VT<py_qs_datas_t>> {
+    auto n_hams = hams.size();
+    auto n_prs = enc_data.size();
+    auto n_params = enc_name.size() + ans_name.size();
+    VT<VT<py_qs_datas_t>> output(n_prs, VT<py_qs_datas_t>(n_hams, py_qs_datas_t(n_params + 1, 0)));
+    auto names = enc_name;
+    names.insert(names.end(), ans_name.begin(), ans_name.end());
+    auto grad_index = circ.MapParameters(names);
+    for (size_t slot = 0; slot < grad_index.size(); slot++) {
+        if (grad_index[slot] == compiled_circuit_t::npos) {
+            throw std::runtime_error("parameter " + circ.params_name_[slot] + " not in this parameter resolver.");
+        }
+    }
+    auto& pool = ThreadPool::GetInstance();
+    auto partition = pool.Partition(n_prs, n_hams, batch_threads, mea_threads);
+    pool.SetLastPartition(partition);
+    pool.ParallelFor(n_prs, partition.batch_workers, [&](size_t n) {
+        VT<calc_type> values(grad_index.size());
+        for (size_t slot = 0; slot < grad_index.size(); slot++) {
+            auto idx = grad_index[slot];
+            values[slot] = idx < enc_name.size() ? enc_data[n][idx] : ans_data[idx - enc_name.size()];
+        }
+        output[n] = GetExpectationWithGradOneMulti(hams, circ, herm_circ, values, grad_index, n_params,
+                                                   partition.hamiltonian_workers);
+    });
+    return output;
+}
+
+template <typename qs_policy_t_>
+auto DensityMatrixState<qs_policy_t_>::GetExpectationWithShiftGradMultiMulti(
+    const std::vector<std::shared_ptr<Hamiltonian<calc_type>>>& hams, const compiled_circuit_t& circ,
+    const VVT<calc_type>& enc_data, const VT<calc_type>& ans_data, const VS& enc_name, const VS& ans_name,
+    bool finite_difference, calc_type step, size_t shots, unsigned seed, size_t n_thread) const
+    -> VT<VT<py_qs_datas_t>> {
+    return mindquantum::sim::GetExpectationWithShiftGradMultiMulti(
+        *this, hams, circ, enc_data, ans_data, enc_name, ans_name, finite_difference, step, shots, seed, n_thread);
+}
+
+template <typename qs_policy_t_>
+VT<unsigned> DensityMatrixState<qs_policy_t_>::Sampling(const circuit_t& circ, const ParameterResolver<calc_type>& pr,
+                                                        size_t shots, const MST<size_t>& key_map, unsigned seed) const {
+    auto key_size = key_map.size();
+    VT<unsigned> res(shots * key_size);
+    RndEngine rnd_eng = RndEngine(seed);
+    std::uniform_real_distribution<double> dist(0., 1.);
+    compiled_circuit_t compiled(circ);
+    auto values = compiled.ResolveParameters(pr);
+    const auto& gates = compiled.gates_;
+    size_t terminal_start = gates.size();
+    while (terminal_start > 0 && gates[terminal_start - 1].id_ == GateID::Measure) {
+        terminal_start--;
+    }
+    bool mid_measure = std::any_of(gates.begin(), gates.begin() + terminal_start,
+                                   [](const auto& g) { return g.id_ == GateID::Measure; });
+    if (mid_measure) {
+        for (size_t i = 0; i < shots; i++) {
+            auto sim = *this;
+            sim.rnd_eng_.seed(static_cast<unsigned>(rnd_eng()));
+            auto measure_result = sim.ApplyCircuit(compiled, values);
+            for (const auto& [name, val] : key_map) {
+                if (auto it = measure_result.find(name); it != measure_result.end()) {
+                    res[i * key_size + val] = it->second;
+                }
+            }
+        }
+        return res;
+    }
+    // All measurements are at the end, the noisy circuit is evolved only once and every shot is drawn from the
+    // probabilities of computational basis.
+    auto sim = *this;
+    for (size_t k = 0; k < terminal_start; k++) {
+        sim.ApplyCompiledGate(gates[k], values);
+    }
+    auto probs = qs_policy_t::GetDiagonal(sim.GetRawQS(), dim);
+    VT<double> cumulative(dim);
+    double sum = 0;
+    for (index_t i = 0; i < dim; i++) {
+        sum += probs[i];
+        cumulative[i] = sum;
+    }
+    for (size_t i = 0; i < shots; i++) {
+        auto r = dist(rnd_eng) * sum;
+        auto idx = std::min<index_t>(std::upper_bound(cumulative.begin(), cumulative.end(), r) - cumulative.begin(),
+                                     dim - 1);
+        for (size_t k = terminal_start; k < gates.size(); k++) {
+            if (auto it = key_map.find(gates[k].gate_->name_); it != key_map.end()) {
+                res[i * key_size + it->second] = (idx >> gates[k].obj_qubits_[0]) & 1UL;
+            }
+        }
+    }
+    return res;
+}
+}  // namespace mindquantum::sim::densitymatrix::detail
+
+#endif
@@ -0,0 +1,63 @@
+//   Copyright 2022 <Huawei Technologies Co., Ltd>
+//
+//   Licensed under the Apache License, Version 2.0 (the "License");
+//   you may not use this file except in compliance with the License.
+//   You may obtain a copy of the License at
+//
+//       http://www.apache.org/licenses/LICENSE-2.0
+//
+//   Unless required by applicable law or agreed to in writing, software
+//   distributed under the License is distributed on an "AS IS" BASIS,
+//   WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+//   See the License for the specific language governing permissions and
+//   limitations under the License.
+
+#ifndef INCLUDE_DENSITYMATRIX_DETAIL_CPU_DENSITY_MATRIX_POLICY_HPP
+#define INCLUDE_DENSITYMATRIX_DETAIL_CPU_DENSITY_MATRIX_POLICY_HPP
+
+#include <complex>
+#include <memory>
+#include <vector>
+
+#include "core/mq_base_types.hpp"
+#include "core/sparse/csrhdmatrix.hpp"
+#include "simulator/types.hpp"
+#include "simulator/vector/detail/cpu_vector_policy.hpp"
+
+namespace mindquantum::sim::densitymatrix::detail {
+/**
+ * Kernels of density matrix.
+ *
+ * A density matrix of n qubits is stored row major as a vector of 2n qubits, element (r, c) is at r * dim + c, where
+ * dim is the dimension of the Hilbert space. Qubit q of the column index is qubit q of the vector and qubit q of the
+ * row index is qubit q + n, so that all vector kernels can be applied on either side of the density matrix.
+ */
+template <typename calc_type_>
+struct CPUDensityMatrixPolicyBase : public vector::detail::CPUVectorPolicyBase<calc_type_> {
+    using base_t = vector::detail::CPUVectorPolicyBase<calc_type_>;
+    using calc_type = typename base_t::calc_type;
+    using qs_data_t = typename base_t::qs_data_t;
+    using qs_data_p_t = typename base_t::qs_data_p_t;
+    using py_qs_data_t = typename base_t::py_qs_data_t;
+    using py_qs_datas_t = typename base_t::py_qs_datas_t;
+    using base_t::DimTh;
+
+    //! Trace of ham * qs, ham is given by pauli terms.
+    static py_qs_data_t TraceOfTerms(qs_data_p_t qs, const std::vector<PauliTerm<sim::calc_type>>& ham, index_t dim);
+    //! Trace of a * qs, a is a sparse matrix.
+    static py_qs_data_t TraceOfCsr(const std::shared_ptr<sparse::CsrHdMatrix<sim::calc_type>>& a, qs_data_p_t qs,
+                                   index_t dim);
+    //! Dense matrix of hamiltonian given by pauli terms, stored in the same layout as density matrix.
+    static qs_data_p_t HamiltonianMatrix(const std::vector<PauliTerm<sim::calc_type>>& ham, index_t dim);
+    //! Dense matrix of a sparse matrix, stored in the same layout as density matrix.
+    static qs_data_p_t CsrMatrix(const std::shared_ptr<sparse::CsrHdMatrix<sim::calc_type>>& a, index_t dim);
+    //! Diagonal of density matrix, which is the probability of every computational basis.
+    static std::vector<calc_type> GetDiagonal(qs_data_p_t qs, index_t dim);
+    //! Probability of every outcome of the given qubits, the i-th bit of outcome index corresponds to qubits[i].
+    static std::vector<calc_type> GetMarginalProbs(qs_data_p_t qs, const qbits_t& qubits, index_t dim);
+    //! Density matrix of the given qubits with other qubits traced out.
+    static VVT<py_qs_data_t> GetReducedDensityMatrix(qs_data_p_t qs, const qbits_t& qubits, index_t dim);
+};
+}  // namespace mindquantum::sim::densitymatrix::detail
+
+#endif
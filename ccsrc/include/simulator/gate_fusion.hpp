@@ -0,0 +1,68 @@
+//   Copyright 2022 <Huawei Technologies Co., Ltd>
+//
+//   Licensed under the Apache License, Version 2.0 (the "License");
+//   you may not use this file except in compliance with the License.
+//   You may obtain a copy of the License at
+//
+//       http://www.apache.org/licenses/LICENSE-2.0
+//
+//   Unless required by applicable law or agreed to in writing, software
+//   distributed under the License is distributed on an "AS IS" BASIS,
+//   WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+//   See the License for the specific language governing permissions and
+//   limitations under the License.
+
+#ifndef INCLUDE_SIMULATOR_GATE_FUSION_HPP
+#define INCLUDE_SIMULATOR_GATE_FUSION_HPP
+
+#include <complex>
+#include <memory>
+#include <vector>
+
+#include "core/parameter_resolver.hpp"
+#include "ops/basic_gate.hpp"
+#include "simulator/types.hpp"
+
+namespace mindquantum::sim {
+/**
+ * One step of a fused circuit.
+ *
+ * If gate is not null, the gate is applied as it is. This is the case for gates that can not be fused, such as
+ * measurement and channels, and for runs that contain only one gate, so that the specialized kernels are still used.
+ * Otherwise the step is a dense unitary on objs, which are sorted in ascending order, with objs[0] as the lowest bit of
+ * the matrix index.
+ */
+struct FusedGate {
+    std::shared_ptr<BasicGate<calc_type>> gate = nullptr;
+    qbits_t objs{};
+    std::vector<std::vector<std::complex<calc_type>>> matrix{};
+};
+
+/**
+ * Fuse runs of adjacent gates that act on at most two qubits into one dense matrix.
+ *
+ * All parameters are resolved with pr, so the result is only valid for this parameter binding.
+ */
+std::vector<FusedGate> FuseCircuit(const std::vector<std::shared_ptr<BasicGate<calc_type>>>& circ,
+                                   const ParameterResolver<calc_type>& pr);
+
+//! Resolved value of every parameter of the parameterized gates in circuit.
+std::vector<calc_type> ResolveCircuitParameters(const std::vector<std::shared_ptr<BasicGate<calc_type>>>& circ,
+                                                const ParameterResolver<calc_type>& pr);
+
+//! Fused circuit of the last circuit and parameter binding, rebuilt only when any of them changes.
+class FusedCircuitCache {
+ public:
+    using circuit_t = std::vector<std::shared_ptr<BasicGate<calc_type>>>;
+
+    const std::vector<FusedGate>& Get(const circuit_t& circ, const ParameterResolver<calc_type>& pr);
+
+ private:
+    // Holding the gates keeps them alive, so that a new circuit never takes the address of a cached one.
+    circuit_t circ_{};
+    std::vector<calc_type> values_{};
+    std::vector<FusedGate> plan_{};
+    bool valid_ = false;
+};
+}  // namespace mindquantum::sim
+#endif
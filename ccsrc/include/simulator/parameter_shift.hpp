@@ -0,0 +1,206 @@
+//   Copyright 2022 <Huawei Technologies Co., Ltd>
+//
+//   Licensed under the Apache License, Version 2.0 (the "License");
+//   you may not use this file except in compliance with the License.
+//   You may obtain a copy of the License at
+//
+//       http://www.apache.org/licenses/LICENSE-2.0
+//
+//   Unless required by applicable law or agreed to in writing, software
+//   distributed under the License is distributed on an "AS IS" BASIS,
+//   WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+//   See the License for the specific language governing permissions and
+//   limitations under the License.
+
+#ifndef INCLUDE_SIMULATOR_PARAMETER_SHIFT_HPP
+#define INCLUDE_SIMULATOR_PARAMETER_SHIFT_HPP
+
+#include <algorithm>
+#include <complex>
+#include <memory>
+#include <random>
+#include <stdexcept>
+#include <string>
+#include <utility>
+#include <vector>
+
+#include "core/mq_base_types.hpp"
+#include "ops/compiled_circuit.hpp"
+#include "ops/hamiltonian.hpp"
+#include "simulator/thread_pool.hpp"
+#include "simulator/types.hpp"
+
+namespace mindquantum::sim {
+//! One term of a shift rule, the derivative of expectation is the sum of weight * (f(x + shift) - f(x - shift)).
+struct ShiftTerm {
+    calc_type shift = 0;
+    calc_type weight = 0;
+};
+
+/**
+ * Shift rule of the k-th parameter of a compiled gate.
+ *
+ * Rotation gates use the two terms parameter shift rule, or the four terms rule if the spectrum of generator has two
+ * different gaps, such as controlled rotation gates. With finite_difference, or for custom gates whose generator is
+ * unknown, the central finite difference with given step is used.
+ */
+std::vector<ShiftTerm> ShiftRule(const CompiledGate<calc_type>& gate, size_t k, bool finite_difference, calc_type step);
+
+/**
+ * Expectation of hamiltonian estimated from shots measurements of every pauli term.
+ *
+ * terms are the hamiltonians of every single pauli term with coefficient one, and coeffs are the coefficients. The
+ * measurement results of a term are drawn from the binomial distribution given by its exact expectation, and the
+ * constant term is exact.
+ */
+template <typename sim_t, typename rng_t>
+auto ShotsExpectation(sim_t* sim, const VT<Hamiltonian<calc_type>>& terms, const VT<calc_type>& coeffs, size_t shots,
+                      rng_t* rng) {
+    calc_type res = 0;
+    for (size_t t = 0; t < terms.size(); t++) {
+        if (terms[t].ham_[0].first.empty()) {
+            res += coeffs[t];
+            continue;
+        }
+        auto p = (1 + static_cast<calc_type>(std::real(sim->GetExpectation(terms[t])))) / 2;
+        std::binomial_distribution<size_t> dist(shots, std::clamp<calc_type>(p, 0, 1));
+        res += coeffs[t] * (2 * static_cast<calc_type>(dist(*rng)) / shots - 1);
+    }
+    return typename sim_t::py_qs_data_t(res);
+}
+
+/**
+ * Get the expectation of hamiltonians and their gradient by parameter shift rule, for every parameter data.
+ *
+ * All shifted circuits of a parameter data are generated up front and split into contiguous chunks of gate
+ * parameters, which are evaluated in parallel with at most n_thread threads. In every chunk, the state before the
+ * shifted gate is evolved once and shared by all shifts of the chunk. If shots is not zero, every expectation is
+ * estimated from shots measurements of every pauli term, with random numbers that only depend on seed. The output has
+ * the same layout as the adjoint gradient, the expectation is followed by the gradient for every hamiltonian.
+ */
+template <typename sim_t>
+auto GetExpectationWithShiftGradMultiMulti(const sim_t& sim,
+                                           const std::vector<std::shared_ptr<Hamiltonian<calc_type>>>& hams,
+                                           const CompiledCircuit<calc_type>& circ, const VVT<calc_type>& enc_data,
+                                           const VT<calc_type>& ans_data, const VS& enc_name, const VS& ans_name,
+                                           bool finite_difference, calc_type step, size_t shots, unsigned seed,
+                                           size_t n_thread) {
+    using py_qs_datas_t = typename sim_t::py_qs_datas_t;
+    using compiled_circuit_t = CompiledCircuit<calc_type>;
+    auto n_hams = hams.size();
+    auto n_prs = enc_data.size();
+    auto n_params = enc_name.size() + ans_name.size();
+    auto names = enc_name;
+    names.insert(names.end(), ans_name.begin(), ans_name.end());
+    auto grad_index = circ.MapParameters(names);
+    for (size_t slot = 0; slot < grad_index.size(); slot++) {
+        if (grad_index[slot] == compiled_circuit_t::npos) {
+            throw std::runtime_error("parameter " + circ.params_name_[slot] + " not in this parameter resolver.");
+        }
+    }
+    VT<VT<Hamiltonian<calc_type>>> terms(n_hams);
+    VVT<calc_type> coeffs(n_hams);
+    if (shots != 0) {
+        for (size_t h = 0; h < n_hams; h++) {
+            if (hams[h]->how_to_ != ORIGIN) {
+                throw std::invalid_argument("Expectation with shots requires hamiltonian of pauli terms.");
+            }
+            for (const auto& [pauli, coeff] : hams[h]->ham_) {
+                terms[h].emplace_back(VT<PauliTerm<calc_type>>{{pauli, 1}});
+                coeffs[h].push_back(coeff);
+            }
+        }
+    }
+
+    // Every gate parameter that requires gradient, with its shift rule. Evaluation 0 is the unshifted circuit, and
+    // the shifts of parameter d start at evaluation offset[d].
+    struct Direction {
+        size_t gate;
+        size_t param;
+        std::vector<ShiftTerm> rule;
+    };
+    VT<Direction> dirs;
+    VT<size_t> offset;
+    size_t n_evals = 1;
+    for (size_t i = 0; i < circ.gates_.size(); i++) {
+        const auto& g = circ.gates_[i];
+        for (size_t k = 0; k < g.params_.size(); k++) {
+            if (!g.params_[k].grad_coeffs.empty()) {
+                dirs.push_back({i, k, ShiftRule(g, k, finite_difference, step)});
+                offset.push_back(n_evals);
+                n_evals += 2 * dirs.back().rule.size();
+            }
+        }
+    }
+    auto n_dirs = dirs.size();
+    size_t n_chunks = std::max<size_t>(1, std::min(n_dirs, (n_thread + n_prs - 1) / std::max<size_t>(n_prs, 1)));
+
+    VT<VT<py_qs_datas_t>> evals(n_prs, VT<py_qs_datas_t>(n_evals, py_qs_datas_t(n_hams, 0)));
+    VVT<calc_type> values(n_prs, VT<calc_type>(grad_index.size()));
+    for (size_t n = 0; n < n_prs; n++) {
+        for (size_t slot = 0; slot < grad_index.size(); slot++) {
+            auto idx = grad_index[slot];
+            values[n][slot] = idx < enc_name.size() ? enc_data[n][idx] : ans_data[idx - enc_name.size()];
+        }
+    }
+    auto evaluate = [&](sim_t* state, size_t n, size_t e) {
+        std::seed_seq seq{seed, static_cast<unsigned>(n), static_cast<unsigned>(e)};
+        std::mt19937 rng(seq);
+        for (size_t h = 0; h < n_hams; h++) {
+            evals[n][e][h] = shots == 0 ? state->GetExpectation(*hams[h])
+                                        : ShotsExpectation(state, terms[h], coeffs[h], shots, &rng);
+        }
+    };
+    auto run_chunk = [&](size_t task) {
+        auto n = task / n_chunks;
+        auto c = task % n_chunks;
+        auto prefix = sim;
+        size_t done = 0;
+        for (size_t d = c * n_dirs / n_chunks; d < (c + 1) * n_dirs / n_chunks; d++) {
+            const auto& dir = dirs[d];
+            for (; done < dir.gate; done++) {
+                prefix.ApplyCompiledGate(circ.gates_[done], values[n]);
+            }
+            for (size_t t = 0; t < dir.rule.size(); t++) {
+                for (size_t s = 0; s < 2; s++) {
+                    auto gate = circ.gates_[dir.gate];
+                    gate.params_[dir.param].const_value += s == 0 ? dir.rule[t].shift : -dir.rule[t].shift;
+                    auto state = prefix;
+                    state.ApplyCompiledGate(gate, values[n]);
+                    for (size_t i = dir.gate + 1; i < circ.gates_.size(); i++) {
+                        state.ApplyCompiledGate(circ.gates_[i], values[n]);
+                    }
+                    evaluate(&state, n, offset[d] + 2 * t + s);
+                }
+            }
+        }
+        if (c == n_chunks - 1) {
+            for (; done < circ.gates_.size(); done++) {
+                prefix.ApplyCompiledGate(circ.gates_[done], values[n]);
+            }
+            evaluate(&prefix, n, 0);
+        }
+    };
+    ThreadPool::GetInstance().ParallelFor(n_prs * n_chunks, std::max<size_t>(n_thread, 1), run_chunk);
+
+    VT<VT<py_qs_datas_t>> output(n_prs, VT<py_qs_datas_t>(n_hams, py_qs_datas_t(n_params + 1, 0)));
+    for (size_t n = 0; n < n_prs; n++) {
+        for (size_t h = 0; h < n_hams; h++) {
+            output[n][h][0] = evals[n][0][h];
+            for (size_t d = 0; d < n_dirs; d++) {
+                std::complex<calc_type> diff = 0;
+                for (size_t t = 0; t < dirs[d].rule.size(); t++) {
+                    auto e = offset[d] + 2 * t;
+                    diff += dirs[d].rule[t].weight * std::complex<calc_type>(evals[n][e][h] - evals[n][e + 1][h]);
+                }
+                const auto& g = circ.gates_[dirs[d].gate];
+                for (const auto& [slot, coeff] : g.params_[dirs[d].param].grad_coeffs) {
+                    output[n][h][1 + grad_index[slot]] += typename sim_t::py_qs_data_t(diff * coeff);
+                }
+            }
+        }
+    }
+    return output;
+}
+}  // namespace mindquantum::sim
+#endif
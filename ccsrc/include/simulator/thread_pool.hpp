@@ -0,0 +1,77 @@
+//   Copyright 2022 <Huawei Technologies Co., Ltd>
+//
+//   Licensed under the Apache License, Version 2.0 (the "License");
+//   you may not use this file except in compliance with the License.
+//   You may obtain a copy of the License at
+//
+//       http://www.apache.org/licenses/LICENSE-2.0
+//
+//   Unless required by applicable law or agreed to in writing, software
+//   distributed under the License is distributed on an "AS IS" BASIS,
+//   WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+//   See the License for the specific language governing permissions and
+//   limitations under the License.
+
+#ifndef INCLUDE_SIMULATOR_THREAD_POOL_HPP
+#define INCLUDE_SIMULATOR_THREAD_POOL_HPP
+
+#include <condition_variable>
+#include <cstddef>
+#include <deque>
+#include <functional>
+#include <mutex>
+#include <thread>
+#include <vector>
+
+namespace mindquantum::sim {
+//! How the threads are split for the last gradient calculation.
+struct ThreadPartition {
+    size_t batch_workers = 1;
+    size_t hamiltonian_workers = 1;
+    size_t omp_threads = 1;
+};
+
+/**
+ * Process wide thread pool shared by all gradient calculation.
+ *
+ * Tasks of ParallelFor are claimed dynamically by the workers, and the calling thread takes part in the work, so
+ * ParallelFor can be nested without deadlock. The OpenMP threads of the caller are divided among the workers to avoid
+ * oversubscription of the gate kernels.
+ */
+class ThreadPool {
+ public:
+    static ThreadPool& GetInstance();
+
+    ThreadPool(const ThreadPool&) = delete;
+    ThreadPool& operator=(const ThreadPool&) = delete;
+    ~ThreadPool();
+
+    //! Set the number of threads, which is also the OpenMP threads of the calling thread.
+    void SetThreadsNumber(size_t n_threads);
+    size_t GetThreadsNumber() const;
+
+    //! Split the threads for n_batch parameters and n_hams hamiltonians, with given upper bound for each level.
+    ThreadPartition Partition(size_t n_batch, size_t n_hams, size_t max_batch, size_t max_hams) const;
+    void SetLastPartition(const ThreadPartition& partition);
+    ThreadPartition GetLastPartition();
+
+    //! Run fn(i) for i in [0, n_tasks) with at most max_workers threads.
+    void ParallelFor(size_t n_tasks, size_t max_workers, const std::function<void(size_t)>& fn);
+
+ private:
+    ThreadPool();
+    void StartWorkers(size_t n_workers);
+    void StopWorkers();
+    void WorkerLoop();
+
+    size_t n_threads_ = 1;
+    bool stop_ = false;
+    std::vector<std::thread> workers_{};
+    std::deque<std::function<void()>> jobs_{};
+    std::mutex mtx_;
+    std::condition_variable cv_;
+    std::mutex partition_mtx_;
+    ThreadPartition last_partition_{};
+};
+}  // namespace mindquantum::sim
+#endif
@@ -15,7 +15,11 @@
 #ifndef INCLUDE_QUANTUMSTATE_UTILS_HPP
 #define INCLUDE_QUANTUMSTATE_UTILS_HPP
 
+#include <algorithm>
 #include <cassert>
+#include <complex>
+#include <stdexcept>
+#include <string>
 #include <vector>
 
 #include "core/mq_base_types.hpp"
@@ -23,6 +27,52 @@
 namespace mindquantum::sim {
 index_t QIndexToMask(qbits_t objs);
 PauliMask GenPauliMask(const std::vector<PauliWord>& pws);
+
+// Pauli terms that flip the same qubits, so that they can be applied with one sweep of quantum state. For a basis
+// state i, the term t contributes coeffs[t] * (-1)^popcount(i & mask_yz[t]).
+struct PauliTermGroup {
+    index_t mask_f = 0UL;
+    std::vector<index_t> mask_yz{};
+    std::vector<std::complex<calc_type>> coeffs{};
+};
+std::vector<PauliTermGroup> GroupPauliTerms(const std::vector<PauliTerm<calc_type>>& ham);
+// Index mapping of a subsystem of qubits. The b-th bit of an outcome of subsystem is on qubits[b], and the rest index
+// enumerates the computational basis of all other qubits.
+struct SubsystemMask {
+    qbits_t qubits{};
+    qbits_t sorted_qubits{};
+
+    explicit SubsystemMask(const qbits_t& qubits) : qubits(qubits), sorted_qubits(qubits) {
+        std::sort(sorted_qubits.begin(), sorted_qubits.end());
+    }
+    //! Full index of the given outcome of subsystem with all other qubits in zero.
+    index_t OutcomeToFull(index_t o) const {
+        index_t i = 0;
+        for (size_t b = 0; b < qubits.size(); b++) {
+            i |= ((o >> b) & 1UL) << qubits[b];
+        }
+        return i;
+    }
+    //! Full index of the given rest index by inserting zero at the qubits of subsystem.
+    index_t RestToFull(index_t r) const {
+        for (auto q : sorted_qubits) {
+            r = ((r >> q) << (q + 1)) | (r & ((1UL << q) - 1));
+        }
+        return r;
+    }
+};
+//! Check that qubits of a subsystem are different and less than n_qubits.
+inline void CheckSubsystemQubits(const qbits_t& qubits, qbit_t n_qubits) {
+    for (size_t i = 0; i < qubits.size(); i++) {
+        if (qubits[i] >= n_qubits) {
+            throw std::invalid_argument("Qubit " + std::to_string(qubits[i]) + " out of range of "
+                                        + std::to_string(n_qubits) + " qubits.");
+        }
+        if (std::find(qubits.begin(), qubits.begin() + i, qubits[i]) != qubits.begin() + i) {
+            throw std::invalid_argument("Qubit " + std::to_string(qubits[i]) + " is given more than once.");
+        }
+    }
+}
 struct SingleQubitGateMask {
     qbit_t q0 = 0;
     qbits_t ctrl_qubits{};
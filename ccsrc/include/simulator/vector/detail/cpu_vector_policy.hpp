@@ -66,7 +66,10 @@ namespace mindquantum::sim::vector::intrin {
 }  // namespace mindquantum::sim::vector::intrin
 #endif
 namespace mindquantum::sim::vector::detail {
+// calc_type_ is the precision of quantum state, hamiltonian is always given in sim::calc_type precision.
+template <typename calc_type_>
 struct CPUVectorPolicyBase {
+    using calc_type = calc_type_;
     using qs_data_t = std::complex<calc_type>;
     using qs_data_p_t = qs_data_t*;
     using py_qs_data_t = std::complex<calc_type>;
@@ -105,18 +108,32 @@ struct CPUVectorPolicyBase {
     static qs_data_t ConditionalCollect(qs_data_p_t qs, index_t mask, index_t condi, bool abs, index_t dim);
     static py_qs_datas_t GetQS(qs_data_p_t qs, index_t dim);
     static void SetQS(qs_data_p_t qs, const py_qs_datas_t& qs_out, index_t dim);
-    static qs_data_p_t ApplyTerms(qs_data_p_t qs, const std::vector<PauliTerm<calc_type>>& ham, index_t dim);
+    // Probability of every outcome of the given qubits, the i-th bit of outcome index corresponds to qubits[i].
+    static std::vector<calc_type> GetMarginalProbs(qs_data_p_t qs, const qbits_t& qubits, index_t dim);
+    // Amplitudes of the given computational basis.
+    static py_qs_datas_t GetAmplitudes(qs_data_p_t qs, const std::vector<index_t>& indices, index_t dim);
+    // Density matrix of the given qubits with other qubits traced out, the i-th bit of index corresponds to qubits[i].
+    static VVT<py_qs_data_t> GetReducedDensityMatrix(qs_data_p_t qs, const qbits_t& qubits, index_t dim);
+    static qs_data_p_t ApplyTerms(qs_data_p_t qs, const std::vector<PauliTerm<sim::calc_type>>& ham, index_t dim);
+    // Calculate <bra|ham|ket> term by term without allocating a new quantum state.
+    static py_qs_data_t ExpectationOfTerms(qs_data_p_t bra, qs_data_p_t ket,
+                                           const std::vector<PauliTerm<sim::calc_type>>& ham, index_t dim);
     static qs_data_p_t Copy(qs_data_p_t qs, index_t dim);
     template <index_t mask, index_t condi>
     static py_qs_data_t ConditionVdot(qs_data_p_t bra, qs_data_p_t ket, index_t dim);
     static py_qs_data_t OneStateVdot(qs_data_p_t bra, qs_data_p_t ket, qbit_t obj_qubit, index_t dim);
     static py_qs_data_t ZeroStateVdot(qs_data_p_t bra, qs_data_p_t ket, qbit_t obj_qubit, index_t dim);
     static py_qs_data_t Vdot(qs_data_p_t bra, qs_data_p_t ket, index_t dim);
-    static qs_data_p_t CsrDotVec(const std::shared_ptr<sparse::CsrHdMatrix<calc_type>>& a, qs_data_p_t vec,
+    static qs_data_p_t CsrDotVec(const std::shared_ptr<sparse::CsrHdMatrix<sim::calc_type>>& a, qs_data_p_t vec,
                                  index_t dim);
-    static qs_data_p_t CsrDotVec(const std::shared_ptr<sparse::CsrHdMatrix<calc_type>>& a,
-                                 const std::shared_ptr<sparse::CsrHdMatrix<calc_type>>& b, qs_data_p_t vec,
+    static qs_data_p_t CsrDotVec(const std::shared_ptr<sparse::CsrHdMatrix<sim::calc_type>>& a,
+                                 const std::shared_ptr<sparse::CsrHdMatrix<sim::calc_type>>& b, qs_data_p_t vec,
                                  index_t dim);
+    static py_qs_data_t ExpectationOfCsr(const std::shared_ptr<sparse::CsrHdMatrix<sim::calc_type>>& a, qs_data_p_t bra,
+                                         qs_data_p_t ket, index_t dim);
+    static py_qs_data_t ExpectationOfCsr(const std::shared_ptr<sparse::CsrHdMatrix<sim::calc_type>>& a,
+                                         const std::shared_ptr<sparse::CsrHdMatrix<sim::calc_type>>& b, qs_data_p_t bra,
+                                         qs_data_p_t ket, index_t dim);
     // X like operator
     // ========================================================================================================
 
@@ -33,8 +33,11 @@
 #include "core/mq_base_types.hpp"
 #include "core/parameter_resolver.hpp"
 #include "ops/basic_gate.hpp"
+#include "ops/compiled_circuit.hpp"
 #include "ops/gates.hpp"
 #include "ops/hamiltonian.hpp"
+#include "simulator/gate_fusion.hpp"
+#include "simulator/parameter_shift.hpp"
 #include "simulator/timer.h"
 #include "simulator/types.hpp"
 #include "simulator/utils.hpp"
@@ -51,6 +54,7 @@ class VectorState {
     using qs_policy_t = qs_policy_t_;
     using derived_t = VectorState<qs_policy_t>;
     using circuit_t = std::vector<std::shared_ptr<BasicGate<calc_type>>>;
+    using compiled_circuit_t = CompiledCircuit<calc_type>;
     using qs_data_t = typename qs_policy_t::qs_data_t;
     using qs_data_p_t = typename qs_policy_t::qs_data_p_t;
     using py_qs_data_t = typename qs_policy_t::py_qs_data_t;
@@ -71,6 +75,7 @@ class VectorState {
     //! dtor
     ~VectorState() {
         qs_policy_t::FreeState(qs);
+        qs_policy_t::FreeState(scratch_);
     }
 
     //! Reset the quantum state to quantum zero state
@@ -82,9 +87,28 @@ class VectorState {
     //! Get the quantum state value
     py_qs_datas_t GetQS() const;
 
+    //! Probability of every outcome of the given qubits, the i-th bit of outcome index corresponds to qubits[i].
+    VT<typename qs_policy_t::calc_type> GetProbabilities(const qbits_t& qubits) const;
+
+    //! Amplitudes of the given computational basis, without copying the whole quantum state.
+    py_qs_datas_t GetAmplitudes(const VT<index_t>& indices) const;
+
+    //! Density matrix of the given qubits with other qubits traced out, the i-th bit of index corresponds to qubits[i].
+    VVT<py_qs_data_t> GetReducedDensityMatrix(const qbits_t& qubits) const;
+
     //! Set the quantum state value
     void SetQS(const py_qs_datas_t& qs_out);
 
+    //! Get the raw data of quantum state, the data will be reallocated after applying hamiltonian or noise channel
+    qs_data_p_t GetRawQS() const {
+        return qs;
+    }
+
+    //! Get the dimension of quantum state
+    index_t GetDim() const {
+        return dim;
+    }
+
     //! Apply a quantum gate on this quantum state, quantum gate can be normal quantum gate, measurement gate and noise
     //! channel
     index_t ApplyGate(const std::shared_ptr<BasicGate<calc_type>>& gate,
@@ -119,19 +143,40 @@ class VectorState {
                                                 const std::shared_ptr<BasicGate<calc_type>>& gate,
                                                 const ParameterResolver<calc_type>& pr, index_t dim);
     //! Apply a quantum circuit on this quantum state
-    auto ApplyCircuit(const circuit_t& circ, const ParameterResolver<calc_type>& pr = ParameterResolver<calc_type>());
+    std::map<std::string, int> ApplyCircuit(const circuit_t& circ,
+                                            const ParameterResolver<calc_type>& pr = ParameterResolver<calc_type>(),
+                                            bool fuse = false);
+
+    //! Apply a compiled quantum gate, values is the value of every parameter slot of the compiled circuit.
+    index_t ApplyCompiledGate(const CompiledGate<calc_type>& gate, const VT<calc_type>& values);
+
+    //! calculate <bra| \partial_\theta{U} |ket> for every parameter of a compiled gate, zero for the parameters that
+    //! do not require gradient.
+    static py_qs_datas_t ExpectDiffCompiledGate(qs_data_p_t bra, qs_data_p_t ket, const CompiledGate<calc_type>& gate,
+                                                const VT<calc_type>& values, index_t dim);
+
+    //! Apply the derivative of a compiled gate with respect to its k-th parameter on this quantum state.
+    void ApplyDiffCompiledGate(const CompiledGate<calc_type>& gate, const VT<calc_type>& values, size_t k);
+
+    //! Apply a compiled quantum circuit on this quantum state
+    std::map<std::string, int> ApplyCircuit(const compiled_circuit_t& circ, const ParameterResolver<calc_type>& pr);
+    std::map<std::string, int> ApplyCircuit(const compiled_circuit_t& circ, const VT<calc_type>& values);
 
     //! Apply a hamiltonian on this quantum state
     void ApplyHamiltonian(const Hamiltonian<calc_type>& ham);
 
-    //! Get the matrix of quantum circuit.
-    VT<py_qs_datas_t> GetCircuitMatrix(const circuit_t& circ, const ParameterResolver<calc_type>& pr);
+    //! Get the matrix of quantum circuit, element (r, c) is written to out[c * dim + r].
+    void GetCircuitMatrix(const circuit_t& circ, const ParameterResolver<calc_type>& pr, py_qs_data_t* out);
 
     //! Get expectation of given hamiltonian
     py_qs_data_t GetExpectation(const Hamiltonian<calc_type>& ham) {
-        auto ket = *this;
-        ket.ApplyHamiltonian(ham);
-        return qs_policy_t::Vdot(this->qs, ket.qs, dim);
+        if (ham.how_to_ == ORIGIN) {
+            return qs_policy_t::ExpectationOfTerms(qs, qs, ham.ham_, dim);
+        }
+        if (ham.ham_sparse_second_) {
+            return qs_policy_t::ExpectationOfCsr(ham.ham_sparse_main_, ham.ham_sparse_second_, qs, qs, dim);
+        }
+        return qs_policy_t::ExpectationOfCsr(ham.ham_sparse_main_, qs, qs, dim);
     }
 
     //! Get the expectation of hamiltonian
@@ -146,12 +191,55 @@ class VectorState {
                                                      const circuit_t& circ, const circuit_t& herm_circ,
                                                      const ParameterResolver<calc_type>& pr, const MST<size_t>& p_map,
                                                      int n_thread);
+    //! grad_index is the position of every parameter slot in the gradient, npos for parameters that are not needed.
+    //! group_size is the number of hamiltonians evolved together in one sweep, 0 for automatic choice. With checkpoint,
+    //! the state before every gate is recomputed from at most n_checkpoints stored states instead of uncomputed by
+    //! the hermitian conjugate of gate.
+    VT<py_qs_datas_t> GetExpectationWithGradOneMulti(const std::vector<std::shared_ptr<Hamiltonian<calc_type>>>& hams,
+                                                     const compiled_circuit_t& circ,
+                                                     const compiled_circuit_t& herm_circ, const VT<calc_type>& values,
+                                                     const VT<size_t>& grad_index, size_t n_grad, int n_thread,
+                                                     size_t group_size = 0, bool checkpoint = false,
+                                                     size_t n_checkpoints = 0);
     //! Get the expectation of hamiltonian
     //! Here multiple hamiltonian and multiple parameters are needed
     VT<VT<py_qs_datas_t>> GetExpectationWithGradMultiMulti(
         const std::vector<std::shared_ptr<Hamiltonian<calc_type>>>& hams, const circuit_t& circ,
         const circuit_t& herm_circ, const VVT<calc_type>& enc_data, const VT<calc_type>& ans_data, const VS& enc_name,
         const VS& ans_name, size_t batch_threads, size_t mea_threads);
+    VT<VT<py_qs_datas_t>> GetExpectationWithGradMultiMulti(
+        const std::vector<std::shared_ptr<Hamiltonian<calc_type>>>& hams, const compiled_circuit_t& circ,
+        const compiled_circuit_t& herm_circ, const VVT<calc_type>& enc_data, const VT<calc_type>& ans_data,
+        const VS& enc_name, const VS& ans_name, size_t batch_threads, size_t mea_threads, size_t group_size = 0,
+        bool checkpoint = false, size_t n_checkpoints = 0);
+    //! Get the expectation of hamiltonians and the gradient of weighted sum of expectations, sum_k weights[n][k] *
+    //! E_k, for every parameter data n. The adjoint state sum_k weights[n][k] * H_k |psi> is formed once, so that only
+    //! one backward sweep is needed for all hamiltonians, which should have pauli terms. The first n_hams elements of
+    //! every output are the expectations, followed by the gradient. If all weights of a parameter data are zero, the
+    //! backward sweep is skipped.
+    VT<py_qs_datas_t> GetExpectationWithWeightedGradMultiMulti(
+        const std::vector<std::shared_ptr<Hamiltonian<calc_type>>>& hams, const compiled_circuit_t& circ,
+        const compiled_circuit_t& herm_circ, const VVT<calc_type>& enc_data, const VT<calc_type>& ans_data,
+        const VVT<calc_type>& weights, const VS& enc_name, const VS& ans_name, size_t batch_threads);
+
+    /**
+     * Get the quantum fisher information of the state circ|psi>, with |psi> the state of this simulator.
+     *
+     * For every parameter of a gate, the state with the gate replaced by its derivative is evolved together with the
+     * state itself in one sweep, so that only one sweep per parameter is needed. approx can be "full", "block_diag" for
+     * the correlations within every layer of parameterized gates acting on different qubits, or "diagonal". The sweeps
+     * run in parallel with at most n_thread threads. The rows and columns of output are ordered as params_name.
+     */
+    VVT<calc_type> GetQFI(const compiled_circuit_t& circ, const ParameterResolver<calc_type>& pr, const VS& params_name,
+                          const std::string& approx, int n_thread) const;
+
+    //! Get the expectation of hamiltonians and the gradient by parameter shift rule, or by central finite difference
+    //! with given step. If shots is not zero, the expectations are estimated from shots measurements of every pauli
+    //! term. See GetExpectationWithShiftGradMultiMulti in simulator/parameter_shift.hpp.
+    VT<VT<py_qs_datas_t>> GetExpectationWithShiftGradMultiMulti(
+        const std::vector<std::shared_ptr<Hamiltonian<calc_type>>>& hams, const compiled_circuit_t& circ,
+        const VVT<calc_type>& enc_data, const VT<calc_type>& ans_data, const VS& enc_name, const VS& ans_name,
+        bool finite_difference, calc_type step, size_t shots, unsigned seed, size_t n_thread) const;
 
     VT<py_qs_datas_t> GetExpectationNonHermitianWithGradOneMulti(
         const std::vector<std::shared_ptr<Hamiltonian<calc_type>>>& hams,
@@ -175,13 +263,63 @@ class VectorState {
     VT<unsigned> Sampling(const circuit_t& circ, const ParameterResolver<calc_type>& pr, size_t shots,
                           const MST<size_t>& key_map, unsigned seed);
 
+    /**
+     * Get the expectation of every hamiltonian averaged over n_traj Monte-Carlo trajectories of a noisy circuit.
+     *
+     * Trajectories run in parallel with at most n_thread threads, and the result does not depend on the number of
+     * threads. Return the mean expectations and the standard errors of their real parts.
+     */
+    std::pair<py_qs_datas_t, VT<calc_type>> GetNoisyExpectation(
+        const std::vector<std::shared_ptr<Hamiltonian<calc_type>>>& hams, const circuit_t& circ,
+        const ParameterResolver<calc_type>& pr, size_t n_traj, unsigned seed, size_t n_thread);
+
  private:
+    //! Convert a matrix to the precision of quantum state, return the matrix itself if the precision is the same.
+    template <typename T>
+    static decltype(auto) CastMatrix(const VVT<T>& m) {
+        if constexpr (std::is_same_v<T, py_qs_data_t>) {
+            return (m);
+        } else {
+            VVT<py_qs_data_t> out;
+            for (const auto& row : m) {
+                out.emplace_back(row.begin(), row.end());
+            }
+            return out;
+        }
+    }
+
+    //! Buffer with the same size of quantum state, the content is undefined. It is allocated once and reused by noise
+    //! channels.
+    qs_data_p_t GetScratch() {
+        if (scratch_ == nullptr) {
+            scratch_ = qs_policy_t::InitState(dim, false);
+        }
+        return scratch_;
+    }
+
+    //! Run one trajectory of circuit from this quantum state for every seed. Every worker thread evolves one copy of
+    //! this quantum state, which is restored before each trajectory, and fn(i, sim, measure_result) is called after
+    //! trajectory i.
+    template <typename F>
+    void RunTrajectories(const compiled_circuit_t& circ, const VT<calc_type>& values, const VT<unsigned>& seeds,
+                         size_t n_thread, const F& fn) const;
+
+    //! Sample a noiseless circuit from gate start, all shots share the same state until a measurement gate, where the
+    //! shots are split into two branches according to the collapse probability. Only the branch with fewer shots is
+    //! copied, so that at most log2(shots) + 1 quantum states are alive at the same time. The rows of res are grouped
+    //! by branch.
+    void SamplingBranch(const circuit_t& circ, size_t start, size_t terminal_start,
+                        const ParameterResolver<calc_type>& pr, size_t shots, const MST<size_t>& key_map,
+                        VT<unsigned> prefix, VT<unsigned>* res, size_t offset, RndEngine* rnd_eng);
+
     qs_data_p_t qs = nullptr;
+    qs_data_p_t scratch_ = nullptr;
     qbit_t n_qubits = 0;
     index_t dim = 0;
     unsigned seed = 0;
     RndEngine rnd_eng_;
     std::function<double()> rng_;
+    FusedCircuitCache fusion_cache_{};
 };
 }  // namespace mindquantum::sim::vector::detail
 
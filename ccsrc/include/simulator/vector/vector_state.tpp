@@ -26,22 +26,32 @@
 #include <map>
 #include <memory>
 #include <mutex>
+#include <numeric>
 #include <random>
 #include <stdexcept>
 #include <string>
-#include <thread>
 #include <type_traits>
 #include <vector>
 
+#include "config/openmp.hpp"
+
 #include "core/mq_base_types.hpp"
 #include "core/parameter_resolver.hpp"
 #include "ops/basic_gate.hpp"
 #include "ops/gates.hpp"
 #include "ops/hamiltonian.hpp"
+#include "simulator/thread_pool.hpp"
 #include "simulator/types.hpp"
 #include "simulator/vector/vector_state.hpp"
 
 namespace mindquantum::sim::vector::detail {
+// Number of hamiltonians evolved together in one sweep of circuit. Every sweep holds group size + 1 quantum states, so
+// the group size is bounded to keep the memory under control.
+inline int HamiltonianGroupSize(size_t n_hams, int n_thread) {
+    constexpr size_t max_group_size = 15;
+    size_t n_workers = std::max(n_thread, 1);
+    return std::max<size_t>(1, std::min((n_hams + n_workers - 1) / n_workers, max_group_size));
+}
 
 template <typename qs_policy_t_>
 VectorState<qs_policy_t_>::VectorState(qbit_t n_qubits, unsigned seed)
@@ -80,6 +90,8 @@ VectorState<qs_policy_t_>::VectorState(const VectorState<qs_policy_t>& sim) {
 template <typename qs_policy_t_>
 auto VectorState<qs_policy_t_>::operator=(const VectorState<qs_policy_t>& sim) -> derived_t& {
     qs_policy_t::FreeState(this->qs);
+    qs_policy_t::FreeState(this->scratch_);
+    this->scratch_ = nullptr;
     this->qs = qs_policy_t::Copy(sim.qs, sim.dim);
     this->dim = sim.dim;
     this->n_qubits = sim.n_qubits;
@@ -105,6 +117,8 @@ VectorState<qs_policy_t_>::VectorState(VectorState<qs_policy_t>&& sim) {
 template <typename qs_policy_t_>
 auto VectorState<qs_policy_t_>::operator=(VectorState<qs_policy_t>&& sim) -> derived_t& {
     qs_policy_t::FreeState(this->qs);
+    qs_policy_t::FreeState(this->scratch_);
+    this->scratch_ = nullptr;
     this->qs = sim.qs;
     this->dim = sim.dim;
     this->n_qubits = sim.n_qubits;
@@ -131,6 +145,23 @@ auto VectorState<qs_policy_t_>::GetQS() const -> py_qs_datas_t {
     return qs_policy_t::GetQS(qs, dim);
 }
 
+template <typename qs_policy_t_>
+auto VectorState<qs_policy_t_>::GetProbabilities(const qbits_t& qubits) const -> VT<typename qs_policy_t::calc_type> {
+    CheckSubsystemQubits(qubits, n_qubits);
+    return qs_policy_t::GetMarginalProbs(qs, qubits, dim);
+}
+
+template <typename qs_policy_t_>
+auto VectorState<qs_policy_t_>::GetAmplitudes(const VT<index_t>& indices) const -> py_qs_datas_t {
+    return qs_policy_t::GetAmplitudes(qs, indices, dim);
+}
+
+template <typename qs_policy_t_>
+auto VectorState<qs_policy_t_>::GetReducedDensityMatrix(const qbits_t& qubits) const -> VVT<py_qs_data_t> {
+    CheckSubsystemQubits(qubits, n_qubits);
+    return qs_policy_t::GetReducedDensityMatrix(qs, qubits, dim);
+}
+
 template <typename qs_policy_t_>
 void VectorState<qs_policy_t_>::SetQS(const py_qs_datas_t& qs_out) {
     qs_policy_t::SetQS(qs, qs_out, dim);
@@ -152,7 +183,7 @@ index_t VectorState<qs_policy_t_>::ApplyGate(const std::shared_ptr<BasicGate<cal
                 mat = gate->numba_param_diff_matrix_(val);
             }
         }
-        qs_policy_t::ApplyMatrixGate(qs, qs, gate->obj_qubits_, gate->ctrl_qubits_, mat.matrix_, dim);
+        qs_policy_t::ApplyMatrixGate(qs, qs, gate->obj_qubits_, gate->ctrl_qubits_, CastMatrix(mat.matrix_), dim);
     } else if (name == gI) {
     } else if (name == gX) {
         qs_policy_t::ApplyX(qs, gate->obj_qubits_, gate->ctrl_qubits_, dim);
@@ -261,7 +292,8 @@ index_t VectorState<qs_policy_t_>::ApplyGate(const std::shared_ptr<BasicGate<cal
             auto lambda = u3->lambda.Combination(pr).const_value;
             m = U3Matrix<calc_type>(theta, phi, lambda);
         }
-        qs_policy_t::ApplySingleQubitMatrix(qs, qs, gate->obj_qubits_[0], gate->ctrl_qubits_, m.matrix_, dim);
+        qs_policy_t::ApplySingleQubitMatrix(qs, qs, gate->obj_qubits_[0], gate->ctrl_qubits_, CastMatrix(m.matrix_),
+                                            dim);
     } else if (name == gFSim) {
         if (diff) {
             std::runtime_error("Can not apply differential format of FSim gate on quatum states currently.");
@@ -275,7 +307,7 @@ index_t VectorState<qs_policy_t_>::ApplyGate(const std::shared_ptr<BasicGate<cal
             auto phi = fsim->phi.Combination(pr).const_value;
             m = FSimMatrix<calc_type>(theta, phi);
         }
-        qs_policy_t::ApplyTwoQubitsMatrix(qs, qs, gate->obj_qubits_, gate->ctrl_qubits_, m.matrix_, dim);
+        qs_policy_t::ApplyTwoQubitsMatrix(qs, qs, gate->obj_qubits_, gate->ctrl_qubits_, CastMatrix(m.matrix_), dim);
     } else if (gate->is_measure_) {
         return ApplyMeasure(gate);
     } else if (gate->is_channel_) {
@@ -334,22 +366,25 @@ auto VectorState<qs_policy_t_>::ApplyPauliChannel(const std::shared_ptr<BasicGat
 template <typename qs_policy_t_>
 auto VectorState<qs_policy_t_>::ApplyKrausChannel(const std::shared_ptr<BasicGate<calc_type>>& gate) {
     assert(gate->kraus_operator_set_.size() != 0);
-    auto tmp_qs = qs_policy_t::InitState(dim);
-    calc_type prob = 0;
-    for (size_t n_kraus = 0; n_kraus < gate->kraus_operator_set_.size(); n_kraus++) {
+    auto tmp_qs = GetScratch();
+    auto n_kraus = gate->kraus_operator_set_.size();
+    calc_type r = static_cast<calc_type>(rng_());
+    calc_type cumulative_prob = 0;
+    for (size_t k = 0; k < n_kraus; k++) {
+        if (!gate->ctrl_qubits_.empty()) {
+            qs_policy_t::QSMulValue(qs, tmp_qs, 1, dim);
+        }
         qs_policy_t::ApplySingleQubitMatrix(qs, tmp_qs, gate->obj_qubits_[0], gate->ctrl_qubits_,
-                                            gate->kraus_operator_set_[n_kraus], dim);
-        calc_type renormal_factor_square = qs_policy_t::Vdot(tmp_qs, tmp_qs, dim).real();
-        prob = renormal_factor_square / (1 - prob);
-        calc_type renormal_factor = 1 / std::sqrt(renormal_factor_square);
-        if (static_cast<calc_type>(rng_()) <= prob) {
-            qs_policy_t::QSMulValue(tmp_qs, tmp_qs, renormal_factor, dim);
-            qs_policy_t::FreeState(qs);
-            qs = tmp_qs;
-            tmp_qs = nullptr;
+                                            CastMatrix(gate->kraus_operator_set_[k]), dim);
+        calc_type prob = qs_policy_t::Vdot(tmp_qs, tmp_qs, dim).real();
+        cumulative_prob += prob;
+        // The last operator takes the rest probability, so that rounding error never leaves the state unchanged.
+        if ((r <= cumulative_prob || k + 1 == n_kraus) && prob > 0) {
+            qs_policy_t::QSMulValue(tmp_qs, tmp_qs, 1 / std::sqrt(prob), dim);
+            std::swap(qs, scratch_);
+            return;
         }
     }
-    qs_policy_t::FreeState(tmp_qs);
 }
 
 template <typename qs_policy_t_>
@@ -361,16 +396,17 @@ auto VectorState<qs_policy_t_>::ApplyDampingChannel(const std::shared_ptr<BasicG
     }
     calc_type prob = gate->damping_coeff_ * reduced_factor_b_square;
     if (static_cast<calc_type>(rng_()) <= prob) {
-        auto tmp_qs = qs_policy_t::InitState(dim);
+        auto tmp_qs = GetScratch();
         if (gate->name_ == "ADC") {
+            if (!gate->ctrl_qubits_.empty()) {
+                qs_policy_t::QSMulValue(qs, tmp_qs, 1, dim);
+            }
             std::vector<std::vector<py_qs_data_t>> m({{0, 1 / reduced_factor_b}, {0, 0}});
             qs_policy_t::ApplySingleQubitMatrix(qs, tmp_qs, gate->obj_qubits_[0], gate->ctrl_qubits_, m, dim);
         } else {
             qs_policy_t::ConditionalMul(qs, tmp_qs, (1UL << gate->obj_qubits_[0]), 1, 1 / reduced_factor_b, 0, dim);
         }
-        qs = tmp_qs;
-        tmp_qs = nullptr;
-        qs_policy_t::FreeState(tmp_qs);
+        std::swap(qs, scratch_);
     } else {
         calc_type coeff_a = 1 / sqrt(1 - prob);
         calc_type coeff_b = std::sqrt(1 - gate->damping_coeff_) / std::sqrt(1 - prob);
@@ -386,7 +422,8 @@ auto VectorState<qs_policy_t_>::ExpectDiffGate(qs_data_p_t bra, qs_data_p_t ket,
     auto val = gate->params_.Combination(pr).const_value;
     if (gate->is_custom_) {
         std::remove_reference_t<decltype(*gate)>::matrix_t mat = gate->numba_param_diff_matrix_(val);
-        return qs_policy_t::ExpectDiffMatrixGate(bra, ket, gate->obj_qubits_, gate->ctrl_qubits_, mat.matrix_, dim);
+        return qs_policy_t::ExpectDiffMatrixGate(bra, ket, gate->obj_qubits_, gate->ctrl_qubits_,
+                                                 CastMatrix(mat.matrix_), dim);
     }
     if (name == gRX) {
         return qs_policy_t::ExpectDiffRX(bra, ket, gate->obj_qubits_, gate->ctrl_qubits_, val, dim);
@@ -420,7 +457,7 @@ auto VectorState<qs_policy_t_>::ExpectDiffU3(qs_data_p_t bra, qs_data_p_t ket,
                                              const std::shared_ptr<BasicGate<calc_type>>& gate,
                                              const ParameterResolver<calc_type>& pr, index_t dim)
     -> Dim2Matrix<calc_type> {
-    py_qs_datas_t grad = {0, 0, 0};
+    VT<CT<calc_type>> grad = {0, 0, 0};
     auto u3 = static_cast<U3<calc_type>*>(gate.get());
     if (u3->parameterized_) {
         Dim2Matrix<calc_type> m;
@@ -429,18 +466,18 @@ auto VectorState<qs_policy_t_>::ExpectDiffU3(qs_data_p_t bra, qs_data_p_t ket,
         auto lambda = u3->lambda.Combination(pr).const_value;
         if (u3->theta.data_.size() != u3->theta.no_grad_parameters_.size()) {
             m = U3DiffThetaMatrix(theta, phi, lambda);
-            grad[0] = qs_policy_t::ExpectDiffSingleQubitMatrix(bra, ket, u3->obj_qubits_, u3->ctrl_qubits_, m.matrix_,
-                                                               dim);
+            grad[0] = qs_policy_t::ExpectDiffSingleQubitMatrix(bra, ket, u3->obj_qubits_, u3->ctrl_qubits_,
+                                                               CastMatrix(m.matrix_), dim);
         }
         if (u3->phi.data_.size() != u3->phi.no_grad_parameters_.size()) {
             m = U3DiffPhiMatrix(theta, phi, lambda);
-            grad[1] = qs_policy_t::ExpectDiffSingleQubitMatrix(bra, ket, u3->obj_qubits_, u3->ctrl_qubits_, m.matrix_,
-                                                               dim);
+            grad[1] = qs_policy_t::ExpectDiffSingleQubitMatrix(bra, ket, u3->obj_qubits_, u3->ctrl_qubits_,
+                                                               CastMatrix(m.matrix_), dim);
         }
         if (u3->lambda.data_.size() != u3->lambda.no_grad_parameters_.size()) {
             m = U3DiffLambdaMatrix(theta, phi, lambda);
-            grad[2] = qs_policy_t::ExpectDiffSingleQubitMatrix(bra, ket, u3->obj_qubits_, u3->ctrl_qubits_, m.matrix_,
-                                                               dim);
+            grad[2] = qs_policy_t::ExpectDiffSingleQubitMatrix(bra, ket, u3->obj_qubits_, u3->ctrl_qubits_,
+                                                               CastMatrix(m.matrix_), dim);
         }
     }
     return Dim2Matrix<calc_type>({grad});
@@ -451,7 +488,7 @@ auto VectorState<qs_policy_t_>::ExpectDiffFSim(qs_data_p_t bra, qs_data_p_t ket,
                                                const std::shared_ptr<BasicGate<calc_type>>& gate,
                                                const ParameterResolver<calc_type>& pr, index_t dim)
     -> Dim2Matrix<calc_type> {
-    py_qs_datas_t grad = {0, 0};
+    VT<CT<calc_type>> grad = {0, 0};
     auto fsim = static_cast<FSim<calc_type>*>(gate.get());
     if (fsim->parameterized_) {
         Dim2Matrix<calc_type> m;
@@ -459,26 +496,304 @@ auto VectorState<qs_policy_t_>::ExpectDiffFSim(qs_data_p_t bra, qs_data_p_t ket,
         auto phi = fsim->phi.Combination(pr).const_value;
         if (fsim->theta.data_.size() != fsim->theta.no_grad_parameters_.size()) {
             m = FSimDiffThetaMatrix(theta);  // can be optimized.
-            grad[0] = qs_policy_t::ExpectDiffTwoQubitsMatrix(bra, ket, fsim->obj_qubits_, fsim->ctrl_qubits_, m.matrix_,
-                                                             dim);
+            grad[0] = qs_policy_t::ExpectDiffTwoQubitsMatrix(bra, ket, fsim->obj_qubits_, fsim->ctrl_qubits_,
+                                                             CastMatrix(m.matrix_), dim);
         }
         if (fsim->phi.data_.size() != fsim->phi.no_grad_parameters_.size()) {
             m = FSimDiffPhiMatrix(phi);
-            grad[1] = qs_policy_t::ExpectDiffTwoQubitsMatrix(bra, ket, fsim->obj_qubits_, fsim->ctrl_qubits_, m.matrix_,
-                                                             dim);
+            grad[1] = qs_policy_t::ExpectDiffTwoQubitsMatrix(bra, ket, fsim->obj_qubits_, fsim->ctrl_qubits_,
+                                                             CastMatrix(m.matrix_), dim);
         }
     }
     return Dim2Matrix<calc_type>({grad});
 }
 
 template <typename qs_policy_t_>
-auto VectorState<qs_policy_t_>::ApplyCircuit(const circuit_t& circ, const ParameterResolver<calc_type>& pr) {
+std::map<std::string, int> VectorState<qs_policy_t_>::ApplyCircuit(const circuit_t& circ,
+                                                                   const ParameterResolver<calc_type>& pr, bool fuse) {
     std::map<std::string, int> result;
-    for (auto& g : circ) {
-        if (g->is_measure_) {
-            result[g->name_] = ApplyMeasure(g);
+    if (!fuse) {
+        for (auto& g : circ) {
+            if (g->is_measure_) {
+                result[g->name_] = ApplyMeasure(g);
+            } else {
+                ApplyGate(g, pr, false);
+            }
+        }
+        return result;
+    }
+    for (auto& step : fusion_cache_.Get(circ, pr)) {
+        if (step.gate == nullptr) {
+            if (step.objs.size() == 1) {
+                qs_policy_t::ApplySingleQubitMatrix(qs, qs, step.objs[0], {}, CastMatrix(step.matrix), dim);
+            } else {
+                qs_policy_t::ApplyTwoQubitsMatrix(qs, qs, step.objs, {}, CastMatrix(step.matrix), dim);
+            }
+        } else if (step.gate->is_measure_) {
+            result[step.gate->name_] = ApplyMeasure(step.gate);
         } else {
-            ApplyGate(g, pr, false);
+            ApplyGate(step.gate, pr, false);
+        }
+    }
+    return result;
+}
+
+template <typename qs_policy_t_>
+index_t VectorState<qs_policy_t_>::ApplyCompiledGate(const CompiledGate<calc_type>& gate, const VT<calc_type>& values) {
+    const auto& objs = gate.obj_qubits_;
+    const auto& ctrls = gate.ctrl_qubits_;
+    auto value = [&gate, &values]() {
+        return gate.parameterized_ ? gate.params_[0].Evaluate(values) : gate.applied_value_;
+    };
+    switch (gate.id_) {
+        case GateID::I:
+            break;
+        case GateID::X:
+            qs_policy_t::ApplyX(qs, objs, ctrls, dim);
+            break;
+        case GateID::Y:
+            qs_policy_t::ApplyY(qs, objs, ctrls, dim);
+            break;
+        case GateID::Z:
+            qs_policy_t::ApplyZ(qs, objs, ctrls, dim);
+            break;
+        case GateID::H:
+            qs_policy_t::ApplyH(qs, objs, ctrls, dim);
+            break;
+        case GateID::S:
+            qs_policy_t::ApplySGate(qs, objs, ctrls, dim);
+            break;
+        case GateID::Sdag:
+            qs_policy_t::ApplySdag(qs, objs, ctrls, dim);
+            break;
+        case GateID::T:
+            qs_policy_t::ApplyT(qs, objs, ctrls, dim);
+            break;
+        case GateID::Tdag:
+            qs_policy_t::ApplyTdag(qs, objs, ctrls, dim);
+            break;
+        case GateID::SWAP:
+            qs_policy_t::ApplySWAP(qs, objs, ctrls, dim);
+            break;
+        case GateID::ISWAP:
+            qs_policy_t::ApplyISWAP(qs, objs, ctrls, false, dim);
+            break;
+        case GateID::ISWAPdag:
+            qs_policy_t::ApplyISWAP(qs, objs, ctrls, true, dim);
+            break;
+        case GateID::RX:
+            qs_policy_t::ApplyRX(qs, objs, ctrls, value(), dim, false);
+            break;
+        case GateID::RY:
+            qs_policy_t::ApplyRY(qs, objs, ctrls, value(), dim, false);
+            break;
+        case GateID::RZ:
+            qs_policy_t::ApplyRZ(qs, objs, ctrls, value(), dim, false);
+            break;
+        case GateID::XX:
+            qs_policy_t::ApplyXX(qs, objs, ctrls, value(), dim, false);
+            break;
+        case GateID::YY:
+            qs_policy_t::ApplyYY(qs, objs, ctrls, value(), dim, false);
+            break;
+        case GateID::ZZ:
+            qs_policy_t::ApplyZZ(qs, objs, ctrls, value(), dim, false);
+            break;
+        case GateID::PS:
+            qs_policy_t::ApplyPS(qs, objs, ctrls, value(), dim, false);
+            break;
+        case GateID::GP:
+            qs_policy_t::ApplyGP(qs, objs[0], ctrls, value(), dim, false);
+            break;
+        case GateID::U3:
+            if (!gate.parameterized_) {
+                qs_policy_t::ApplySingleQubitMatrix(qs, qs, objs[0], ctrls,
+                                                    CastMatrix(gate.gate_->base_matrix_.matrix_), dim);
+            } else {
+                auto m = U3Matrix<calc_type>(gate.params_[0].Evaluate(values), gate.params_[1].Evaluate(values),
+                                             gate.params_[2].Evaluate(values));
+                qs_policy_t::ApplySingleQubitMatrix(qs, qs, objs[0], ctrls, CastMatrix(m.matrix_), dim);
+            }
+            break;
+        case GateID::FSim:
+            if (!gate.parameterized_) {
+                qs_policy_t::ApplyTwoQubitsMatrix(qs, qs, objs, ctrls, CastMatrix(gate.gate_->base_matrix_.matrix_),
+                                                  dim);
+            } else {
+                auto m = FSimMatrix<calc_type>(gate.params_[0].Evaluate(values), gate.params_[1].Evaluate(values));
+                qs_policy_t::ApplyTwoQubitsMatrix(qs, qs, objs, ctrls, CastMatrix(m.matrix_), dim);
+            }
+            break;
+        case GateID::Custom:
+            if (!gate.parameterized_) {
+                qs_policy_t::ApplyMatrixGate(qs, qs, objs, ctrls, CastMatrix(gate.gate_->base_matrix_.matrix_), dim);
+            } else {
+                auto m = gate.gate_->numba_param_matrix_(value());
+                qs_policy_t::ApplyMatrixGate(qs, qs, objs, ctrls, CastMatrix(m.matrix_), dim);
+            }
+            break;
+        case GateID::Measure:
+            return ApplyMeasure(gate.gate_);
+        case GateID::Channel:
+            ApplyChannel(gate.gate_);
+            break;
+        default:
+            throw std::invalid_argument("Apply of gate " + gate.gate_->name_ + " not implement.");
+    }
+    return 2;  // qubit should be 1 or 0, 2 means nothing.
+}
+
+template <typename qs_policy_t_>
+auto VectorState<qs_policy_t_>::ExpectDiffCompiledGate(qs_data_p_t bra, qs_data_p_t ket,
+                                                       const CompiledGate<calc_type>& gate, const VT<calc_type>& values,
+                                                       index_t dim) -> py_qs_datas_t {
+    const auto& objs = gate.obj_qubits_;
+    const auto& ctrls = gate.ctrl_qubits_;
+    py_qs_datas_t grad(gate.params_.size(), 0);
+    if (gate.id_ == GateID::U3) {
+        auto theta = gate.params_[0].Evaluate(values);
+        auto phi = gate.params_[1].Evaluate(values);
+        auto lambda = gate.params_[2].Evaluate(values);
+        if (!gate.params_[0].grad_coeffs.empty()) {
+            auto m = U3DiffThetaMatrix(theta, phi, lambda);
+            grad[0] = qs_policy_t::ExpectDiffSingleQubitMatrix(bra, ket, objs, ctrls, CastMatrix(m.matrix_), dim);
+        }
+        if (!gate.params_[1].grad_coeffs.empty()) {
+            auto m = U3DiffPhiMatrix(theta, phi, lambda);
+            grad[1] = qs_policy_t::ExpectDiffSingleQubitMatrix(bra, ket, objs, ctrls, CastMatrix(m.matrix_), dim);
+        }
+        if (!gate.params_[2].grad_coeffs.empty()) {
+            auto m = U3DiffLambdaMatrix(theta, phi, lambda);
+            grad[2] = qs_policy_t::ExpectDiffSingleQubitMatrix(bra, ket, objs, ctrls, CastMatrix(m.matrix_), dim);
+        }
+        return grad;
+    }
+    if (gate.id_ == GateID::FSim) {
+        if (!gate.params_[0].grad_coeffs.empty()) {
+            auto m = FSimDiffThetaMatrix(gate.params_[0].Evaluate(values));
+            grad[0] = qs_policy_t::ExpectDiffTwoQubitsMatrix(bra, ket, objs, ctrls, CastMatrix(m.matrix_), dim);
+        }
+        if (!gate.params_[1].grad_coeffs.empty()) {
+            auto m = FSimDiffPhiMatrix(gate.params_[1].Evaluate(values));
+            grad[1] = qs_policy_t::ExpectDiffTwoQubitsMatrix(bra, ket, objs, ctrls, CastMatrix(m.matrix_), dim);
+        }
+        return grad;
+    }
+    auto val = gate.params_[0].Evaluate(values);
+    switch (gate.id_) {
+        case GateID::Custom: {
+            auto m = gate.gate_->numba_param_diff_matrix_(val);
+            grad[0] = qs_policy_t::ExpectDiffMatrixGate(bra, ket, objs, ctrls, CastMatrix(m.matrix_), dim);
+            break;
+        }
+        case GateID::RX:
+            grad[0] = qs_policy_t::ExpectDiffRX(bra, ket, objs, ctrls, val, dim);
+            break;
+        case GateID::RY:
+            grad[0] = qs_policy_t::ExpectDiffRY(bra, ket, objs, ctrls, val, dim);
+            break;
+        case GateID::RZ:
+            grad[0] = qs_policy_t::ExpectDiffRZ(bra, ket, objs, ctrls, val, dim);
+            break;
+        case GateID::XX:
+            grad[0] = qs_policy_t::ExpectDiffXX(bra, ket, objs, ctrls, val, dim);
+            break;
+        case GateID::YY:
+            grad[0] = qs_policy_t::ExpectDiffYY(bra, ket, objs, ctrls, val, dim);
+            break;
+        case GateID::ZZ:
+            grad[0] = qs_policy_t::ExpectDiffZZ(bra, ket, objs, ctrls, val, dim);
+            break;
+        case GateID::PS:
+            grad[0] = qs_policy_t::ExpectDiffPS(bra, ket, objs, ctrls, val, dim);
+            break;
+        case GateID::GP:
+            grad[0] = qs_policy_t::ExpectDiffGP(bra, ket, objs, ctrls, val, dim);
+            break;
+        default:
+            throw std::invalid_argument("Expectation of gate " + gate.gate_->name_ + " not implement.");
+    }
+    return grad;
+}
+
+template <typename qs_policy_t_>
+void VectorState<qs_policy_t_>::ApplyDiffCompiledGate(const CompiledGate<calc_type>& gate, const VT<calc_type>& values,
+                                                      size_t k) {
+    const auto& objs = gate.obj_qubits_;
+    const auto& ctrls = gate.ctrl_qubits_;
+    auto val = gate.params_[k].Evaluate(values);
+    switch (gate.id_) {
+        case GateID::RX:
+            qs_policy_t::ApplyRX(qs, objs, ctrls, val, dim, true);
+            return;
+        case GateID::RY:
+            qs_policy_t::ApplyRY(qs, objs, ctrls, val, dim, true);
+            return;
+        case GateID::RZ:
+            qs_policy_t::ApplyRZ(qs, objs, ctrls, val, dim, true);
+            return;
+        case GateID::XX:
+            qs_policy_t::ApplyXX(qs, objs, ctrls, val, dim, true);
+            return;
+        case GateID::YY:
+            qs_policy_t::ApplyYY(qs, objs, ctrls, val, dim, true);
+            return;
+        case GateID::ZZ:
+            qs_policy_t::ApplyZZ(qs, objs, ctrls, val, dim, true);
+            return;
+        case GateID::PS: {
+            auto e = std::exp(py_qs_data_t(0, val)) * py_qs_data_t(0, 1);
+            qs_policy_t::ApplySingleQubitMatrix(qs, qs, objs[0], ctrls, {{0, 0}, {0, e}}, dim);
+            break;
+        }
+        case GateID::GP: {
+            auto e = std::exp(py_qs_data_t(0, -val)) * py_qs_data_t(0, -1);
+            qs_policy_t::ApplySingleQubitMatrix(qs, qs, objs[0], ctrls, {{e, 0}, {0, e}}, dim);
+            break;
+        }
+        case GateID::U3: {
+            auto theta = gate.params_[0].Evaluate(values);
+            auto phi = gate.params_[1].Evaluate(values);
+            auto lambda = gate.params_[2].Evaluate(values);
+            auto m = k == 0 ? U3DiffThetaMatrix(theta, phi, lambda)
+                            : (k == 1 ? U3DiffPhiMatrix(theta, phi, lambda) : U3DiffLambdaMatrix(theta, phi, lambda));
+            qs_policy_t::ApplySingleQubitMatrix(qs, qs, objs[0], ctrls, CastMatrix(m.matrix_), dim);
+            break;
+        }
+        case GateID::FSim: {
+            auto m = k == 0 ? FSimDiffThetaMatrix(val) : FSimDiffPhiMatrix(val);
+            qs_policy_t::ApplyTwoQubitsMatrix(qs, qs, objs, ctrls, CastMatrix(m.matrix_), dim);
+            break;
+        }
+        case GateID::Custom: {
+            auto m = gate.gate_->numba_param_diff_matrix_(val);
+            qs_policy_t::ApplyMatrixGate(qs, qs, objs, ctrls, CastMatrix(m.matrix_), dim);
+            break;
+        }
+        default:
+            throw std::invalid_argument("Apply differential format of gate " + gate.gate_->name_ + " not implement.");
+    }
+    // The matrix kernels leave the uncontrolled subspace untouched, where the derivative is zero.
+    if (!ctrls.empty()) {
+        qs_policy_t::SetToZeroExcept(qs, GetControlMask(ctrls), dim);
+    }
+}
+
+template <typename qs_policy_t_>
+std::map<std::string, int> VectorState<qs_policy_t_>::ApplyCircuit(const compiled_circuit_t& circ,
+                                                                   const ParameterResolver<calc_type>& pr) {
+    return ApplyCircuit(circ, circ.ResolveParameters(pr));
+}
+
+template <typename qs_policy_t_>
+std::map<std::string, int> VectorState<qs_policy_t_>::ApplyCircuit(const compiled_circuit_t& circ,
+                                                                   const VT<calc_type>& values) {
+    std::map<std::string, int> result;
+    for (const auto& g : circ.gates_) {
+        if (g.id_ == GateID::Measure) {
+            result[g.gate_->name_] = ApplyMeasure(g.gate_);
+        } else {
+            ApplyCompiledGate(g, values);
         }
     }
     return result;
@@ -489,7 +804,7 @@ void VectorState<qs_policy_t_>::ApplyHamiltonian(const Hamiltonian<calc_type>& h
     qs_data_p_t new_qs;
     if (ham.how_to_ == ORIGIN) {
         new_qs = qs_policy_t::ApplyTerms(qs, ham.ham_, dim);
-    } else if (ham.how_to_ == BACKEND) {
+    } else if (ham.ham_sparse_second_) {
         new_qs = qs_policy_t::CsrDotVec(ham.ham_sparse_main_, ham.ham_sparse_second_, qs, dim);
     } else {
         new_qs = qs_policy_t::CsrDotVec(ham.ham_sparse_main_, qs, dim);
@@ -499,15 +814,44 @@ void VectorState<qs_policy_t_>::ApplyHamiltonian(const Hamiltonian<calc_type>& h
 }
 
 template <typename qs_policy_t_>
-auto VectorState<qs_policy_t_>::GetCircuitMatrix(const circuit_t& circ, const ParameterResolver<calc_type>& pr)
-    -> VT<py_qs_datas_t> {
-    VVT<CT<calc_type>> out((1 << n_qubits));
-    for (size_t i = 0; i < (1UL << n_qubits); i++) {
-        auto sim = VectorState<qs_policy_t>(n_qubits, seed);
-        sim.ApplyCircuit(circ, pr);
-        out[i] = sim.GetQS();
+void VectorState<qs_policy_t_>::GetCircuitMatrix(const circuit_t& circ, const ParameterResolver<calc_type>& pr,
+                                                 py_qs_data_t* out) {
+    bool has_channel = std::any_of(circ.begin(), circ.end(), [](const auto& g) { return g->is_channel_; });
+    // Same data type means the quantum state lives in host memory, so that out can be evolved in place.
+    if constexpr (std::is_same_v<qs_data_t, py_qs_data_t>) {
+        if (!has_channel) {
+            // Every column of the matrix is a quantum state of the lower n_qubits, so the whole matrix is evolved as a
+            // quantum state of 2 * n_qubits, with all columns updated by one sweep of each gate.
+            auto n_elements = dim * dim;
+            THRESHOLD_OMP_FOR(
+                n_elements, qs_policy_t::DimTh, for (omp::idx_t i = 0; i < n_elements; i++) { out[i] = 0; })
+            for (index_t i = 0; i < dim; i++) {
+                out[i * dim + i] = 1;
+            }
+            derived_t sim(out, 2 * n_qubits, seed);
+            try {
+                for (auto& g : circ) {
+                    sim.ApplyGate(g, pr, false);
+                }
+            } catch (...) {
+                sim.qs = nullptr;
+                throw;
+            }
+            sim.qs = nullptr;
+            return;
+        }
+    }
+    compiled_circuit_t compiled(circ);
+    auto values = compiled.ResolveParameters(pr);
+    for (index_t i = 0; i < dim; i++) {
+        py_qs_datas_t basis(dim, 0);
+        basis[i] = 1;
+        derived_t sim(n_qubits, seed);
+        sim.SetQS(basis);
+        sim.ApplyCircuit(compiled, values);
+        auto column = sim.GetQS();
+        std::copy(column.begin(), column.end(), out + i * dim);
     }
-    return out;
 }
 
 template <typename qs_policy_t_>
@@ -590,24 +934,12 @@ auto VectorState<qs_policy_t_>::LeftSizeGradOneMulti(const std::vector<std::shar
                                                      int n_thread, const derived_t& simulator_left,
                                                      const derived_t& simulator_right) -> VT<py_qs_datas_t> {
     auto n_hams = hams.size();
-    int max_thread = 15;
-    if (n_thread > max_thread) {
-        n_thread = max_thread;
-    }
-
-    if (n_thread > static_cast<int>(n_hams)) {
-        n_thread = n_hams;
-    }
-
     VT<py_qs_datas_t> f_and_g(n_hams, py_qs_datas_t((1 + p_map.size()), 0));
-
-    int n_group = n_hams / n_thread;
-    if (n_hams % n_thread) {
-        n_group += 1;
-    }
-    for (int i = 0; i < n_group; i++) {
-        int start = i * n_thread;
-        int end = (i + 1) * n_thread;
+    int group_size = HamiltonianGroupSize(n_hams, n_thread);
+    int n_group = (n_hams + group_size - 1) / group_size;
+    auto run_group = [&](size_t i) {
+        int start = i * group_size;
+        int end = (i + 1) * group_size;
         if (end > static_cast<int>(n_hams)) {
             end = n_hams;
         }
@@ -644,7 +976,7 @@ auto VectorState<qs_policy_t_>::LeftSizeGradOneMulti(const std::vector<std::shar
                 }
             } else if (g->params_.data_.size() != g->params_.no_grad_parameters_.size()) {
                 for (int j = start; j < end; j++) {
-                    auto gi = ExpectDiffGate(sim_l.qs, sim_rs[j - start].qs, g, pr, dim);
+                    CT<calc_type> gi = ExpectDiffGate(sim_l.qs, sim_rs[j - start].qs, g, pr, dim);
                     for (auto& it : g->params_.GetRequiresGradParameters()) {
                         f_and_g[j][1 + p_map.at(it)] += gi * g->params_.data_.at(it);
                     }
@@ -654,7 +986,8 @@ auto VectorState<qs_policy_t_>::LeftSizeGradOneMulti(const std::vector<std::shar
                 sim_rs[j - start].ApplyGate(g, pr);
             }
         }
-    }
+    };
+    ThreadPool::GetInstance().ParallelFor(n_group, std::max(n_thread, 1), run_group);
     return f_and_g;
 }
 
@@ -662,71 +995,102 @@ template <typename qs_policy_t_>
 auto VectorState<qs_policy_t_>::GetExpectationWithGradOneMulti(
     const std::vector<std::shared_ptr<Hamiltonian<calc_type>>>& hams, const circuit_t& circ, const circuit_t& herm_circ,
     const ParameterResolver<calc_type>& pr, const MST<size_t>& p_map, int n_thread) -> VT<py_qs_datas_t> {
+    compiled_circuit_t compiled(circ);
+    VT<size_t> grad_index(compiled.params_name_.size(), compiled_circuit_t::npos);
+    for (size_t slot = 0; slot < grad_index.size(); slot++) {
+        if (auto it = p_map.find(compiled.params_name_[slot]); it != p_map.end()) {
+            grad_index[slot] = it->second;
+        }
+    }
+    return GetExpectationWithGradOneMulti(hams, compiled, compiled_circuit_t(herm_circ), compiled.ResolveParameters(pr),
+                                          grad_index, p_map.size(), n_thread);
+}
+
+template <typename qs_policy_t_>
+auto VectorState<qs_policy_t_>::GetExpectationWithGradOneMulti(
+    const std::vector<std::shared_ptr<Hamiltonian<calc_type>>>& hams, const compiled_circuit_t& circ,
+    const compiled_circuit_t& herm_circ, const VT<calc_type>& values, const VT<size_t>& grad_index, size_t n_grad,
+    int n_thread, size_t group_size, bool checkpoint, size_t n_checkpoints) -> VT<py_qs_datas_t> {
+    if (circ.params_name_ != herm_circ.params_name_) {
+        throw std::invalid_argument("Circuit and its hermitian conjugate should have the same parameters.");
+    }
+    auto n_gates = circ.gates_.size();
+    if (checkpoint && herm_circ.gates_.size() != n_gates) {
+        throw std::invalid_argument("Circuit and its hermitian conjugate should have the same number of gates.");
+    }
     auto n_hams = hams.size();
-    int max_thread = 15;
-    if (n_thread > max_thread) {
-        n_thread = max_thread;
+    VT<py_qs_datas_t> f_and_g(n_hams, py_qs_datas_t((1 + n_grad), 0));
+    if (group_size == 0) {
+        group_size = HamiltonianGroupSize(n_hams, n_thread);
     }
-    if (n_thread > static_cast<int>(n_hams)) {
-        n_thread = n_hams;
+    size_t n_group = (n_hams + group_size - 1) / group_size;
+
+    // Without checkpoint, the state before every gate is uncomputed by the hermitian conjugate of the gate. With
+    // checkpoint, it is recomputed from the nearest stored state before it, which also works for non unitary gates.
+    // The initial state is the state of this simulator, so only n_checkpoints states are stored.
+    size_t interval = std::max<size_t>(1, (n_gates + n_checkpoints) / (n_checkpoints + 1));
+    VT<VectorState<qs_policy_t>> checkpoints;
+    VectorState<qs_policy_t> sim;
+    if (!checkpoint) {
+        sim = *this;
+        sim.ApplyCircuit(circ, values);
+    } else {
+        auto state = *this;
+        for (size_t k = 0; k < n_gates; k++) {
+            if (k != 0 && k % interval == 0) {
+                checkpoints.push_back(state);
+            }
+            state.ApplyCompiledGate(circ.gates_[k], values);
+        }
     }
-    VT<py_qs_datas_t> f_and_g(n_hams, py_qs_datas_t((1 + p_map.size()), 0));
-    VectorState<qs_policy_t> sim = *this;
-    sim.ApplyCircuit(circ, pr);
-    int n_group = n_hams / n_thread;
-    if (n_hams % n_thread) {
-        n_group += 1;
-    }
-    for (int i = 0; i < n_group; i++) {
-        int start = i * n_thread;
-        int end = (i + 1) * n_thread;
-        if (end > static_cast<int>(n_hams)) {
-            end = n_hams;
+    auto state_before = [&](size_t k, VectorState<qs_policy_t>* out) {
+        size_t j = std::min(k / interval, checkpoints.size());
+        *out = j == 0 ? *this : checkpoints[j - 1];
+        for (size_t t = j * interval; t < k; t++) {
+            out->ApplyCompiledGate(circ.gates_[t], values);
         }
+    };
+
+    auto run_group = [&](size_t i) {
+        size_t start = i * group_size;
+        size_t end = std::min((i + 1) * group_size, n_hams);
         std::vector<VectorState<qs_policy_t>> sim_rs(end - start);
-        auto sim_l = sim;
-        for (int j = start; j < end; j++) {
+        VectorState<qs_policy_t> sim_l;
+        if (checkpoint) {
+            state_before(n_gates, &sim_l);
+        } else {
+            sim_l = sim;
+        }
+        for (size_t j = start; j < end; j++) {
             sim_rs[j - start] = sim_l;
             sim_rs[j - start].ApplyHamiltonian(*hams[j]);
             f_and_g[j][0] = qs_policy_t::Vdot(sim_l.qs, sim_rs[j - start].qs, dim);
         }
-        for (const auto& g : herm_circ) {
-            sim_l.ApplyGate(g, pr);
-            if (g->name_ == gU3) {
-                auto u3 = static_cast<U3<calc_type>*>(g.get());
-                for (int j = start; j < end; j++) {
-                    if (const auto& [title, jac] = u3->jacobi; title.size() != 0) {
-                        auto intrin_grad = ExpectDiffU3(sim_l.qs, sim_rs[j - start].qs, g, pr, dim);
-                        auto u3_grad = Dim2MatrixMatMul<calc_type>(intrin_grad, jac);
-                        for (const auto& [name, idx] : title) {
-                            f_and_g[j][1 + p_map.at(name)] += 2 * std::real(u3_grad.matrix_[0][idx]);
-                        }
-                    }
-                }
-            } else if (g->name_ == gFSim) {
-                auto fsim = static_cast<FSim<calc_type>*>(g.get());
-                for (int j = start; j < end; j++) {
-                    if (const auto& [title, jac] = fsim->jacobi; title.size() != 0) {
-                        auto intrin_grad = ExpectDiffFSim(sim_l.qs, sim_rs[j - start].qs, g, pr, dim);
-                        auto fsim_grad = Dim2MatrixMatMul<calc_type>(intrin_grad, jac);
-                        for (const auto& [name, idx] : title) {
-                            f_and_g[j][1 + p_map.at(name)] += 2 * std::real(fsim_grad.matrix_[0][idx]);
+        for (size_t n = 0; n < herm_circ.gates_.size(); n++) {
+            const auto& g = herm_circ.gates_[n];
+            if (!checkpoint) {
+                sim_l.ApplyCompiledGate(g, values);
+            } else if (g.RequiresGrad()) {
+                state_before(n_gates - 1 - n, &sim_l);
+            }
+            if (g.RequiresGrad()) {
+                for (size_t j = start; j < end; j++) {
+                    auto grad = ExpectDiffCompiledGate(sim_l.qs, sim_rs[j - start].qs, g, values, dim);
+                    for (size_t k = 0; k < grad.size(); k++) {
+                        for (const auto& [slot, coeff] : g.params_[k].grad_coeffs) {
+                            if (grad_index[slot] != compiled_circuit_t::npos) {
+                                f_and_g[j][1 + grad_index[slot]] += 2 * std::real(grad[k]) * coeff;
+                            }
                         }
                     }
                 }
-            } else if (g->params_.data_.size() != g->params_.no_grad_parameters_.size()) {
-                for (int j = start; j < end; j++) {
-                    auto gi = ExpectDiffGate(sim_l.qs, sim_rs[j - start].qs, g, pr, dim);
-                    for (auto& it : g->params_.GetRequiresGradParameters()) {
-                        f_and_g[j][1 + p_map.at(it)] += 2 * std::real(gi) * g->params_.data_.at(it);
-                    }
-                }
             }
-            for (int j = start; j < end; j++) {
-                sim_rs[j - start].ApplyGate(g, pr);
+            for (size_t j = start; j < end; j++) {
+                sim_rs[j - start].ApplyCompiledGate(g, values);
             }
         }
-    }
+    };
+    ThreadPool::GetInstance().ParallelFor(n_group, std::max(n_thread, 1), run_group);
     return f_and_g;
 }
 
@@ -757,41 +1121,18 @@ auto VectorState<qs_policy_t_>::GetExpectationNonHermitianWithGradMultiMulti(
     for (size_t i = 0; i < ans_name.size(); i++) {
         p_map[ans_name[i]] = i + enc_name.size();
     }
-    if (n_prs == 1) {
+    auto& pool = ThreadPool::GetInstance();
+    auto partition = pool.Partition(n_prs, n_hams, batch_threads, mea_threads);
+    pool.SetLastPartition(partition);
+    pool.ParallelFor(n_prs, partition.batch_workers, [&](size_t n) {
         ParameterResolver<calc_type> pr = ParameterResolver<calc_type>();
-        pr.SetItems(enc_name, enc_data[0]);
+        pr.SetItems(enc_name, enc_data[n]);
         pr.SetItems(ans_name, ans_data);
-        output[0] = GetExpectationNonHermitianWithGradOneMulti(hams, herm_hams, left_circ, herm_left_circ, right_circ,
-                                                               herm_right_circ, pr, p_map, mea_threads, simulator_left);
-    } else {
-        std::vector<std::thread> tasks;
-        tasks.reserve(batch_threads);
-        size_t end = 0;
-        size_t offset = n_prs / batch_threads;
-        size_t left = n_prs % batch_threads;
-        for (size_t i = 0; i < batch_threads; ++i) {
-            size_t start = end;
-            end = start + offset;
-            if (i < left) {
-                end += 1;
-            }
-            auto task = [&, start, end]() {
-                for (size_t n = start; n < end; n++) {
-                    ParameterResolver<calc_type> pr = ParameterResolver<calc_type>();
-                    pr.SetItems(enc_name, enc_data[n]);
-                    pr.SetItems(ans_name, ans_data);
-                    auto f_g = GetExpectationNonHermitianWithGradOneMulti(hams, herm_hams, left_circ, herm_left_circ,
-                                                                          right_circ, herm_right_circ, pr, p_map,
-                                                                          mea_threads, simulator_left);
-                    output[n] = f_g;
-                }
-            };
-            tasks.emplace_back(task);
-        }
-        for (auto& t : tasks) {
-            t.join();
-        }
-    }
+        auto f_g = GetExpectationNonHermitianWithGradOneMulti(hams, herm_hams, left_circ, herm_left_circ, right_circ,
+                                                              herm_right_circ, pr, p_map, partition.hamiltonian_workers,
+                                                              simulator_left);
+        output[n] = f_g;
+    });
     return output;
 }
 
@@ -800,59 +1141,245 @@ auto VectorState<qs_policy_t_>::GetExpectationWithGradMultiMulti(
     const std::vector<std::shared_ptr<Hamiltonian<calc_type>>>& hams, const circuit_t& circ, const circuit_t& herm_circ,
     const VVT<calc_type>& enc_data, const VT<calc_type>& ans_data, const VS& enc_name, const VS& ans_name,
     size_t batch_threads, size_t mea_threads) -> VT<VT<py_qs_datas_t>> {
+    return GetExpectationWithGradMultiMulti(hams, compiled_circuit_t(circ), compiled_circuit_t(herm_circ), enc_data,
+                                            ans_data, enc_name, ans_name, batch_threads, mea_threads, 0, false, 0);
+}
+
+template <typename qs_policy_t_>
+auto VectorState<qs_policy_t_>::GetExpectationWithGradMultiMulti(
+    const std::vector<std::shared_ptr<Hamiltonian<calc_type>>>& hams, const compiled_circuit_t& circ,
+    const compiled_circuit_t& herm_circ, const VVT<calc_type>& enc_data, const VT<calc_type>& ans_data,
+    const VS& enc_name, const VS& ans_name, size_t batch_threads, size_t mea_threads, size_t group_size,
+    bool checkpoint, size_t n_checkpoints) -> VT<VT<py_qs_datas_t>> {
     auto n_hams = hams.size();
     auto n_prs = enc_data.size();
     auto n_params = enc_name.size() + ans_name.size();
-    VT<VT<py_qs_datas_t>> output;
-    for (size_t i = 0; i < n_prs; i++) {
-        output.push_back({});
-        for (size_t j = 0; j < n_hams; j++) {
-            output[i].push_back({});
-            for (size_t k = 0; k < n_params + 1; k++) {
-                output[i][j].push_back({0, 0});
-            }
+    VT<VT<py_qs_datas_t>> output(n_prs, VT<py_qs_datas_t>(n_hams, py_qs_datas_t(n_params + 1, 0)));
+    // Parameters are located by name only once, the gradient of a parameter is at the same position as its data.
+    auto names = enc_name;
+    names.insert(names.end(), ans_name.begin(), ans_name.end());
+    auto grad_index = circ.MapParameters(names);
+    for (size_t slot = 0; slot < grad_index.size(); slot++) {
+        if (grad_index[slot] == compiled_circuit_t::npos) {
+            throw std::runtime_error("parameter " + circ.params_name_[slot] + " not in this parameter resolver.");
         }
     }
-    MST<size_t> p_map;
-    for (size_t i = 0; i < enc_name.size(); i++) {
-        p_map[enc_name[i]] = i;
+    auto& pool = ThreadPool::GetInstance();
+    auto partition = pool.Partition(n_prs, n_hams, batch_threads, mea_threads);
+    pool.SetLastPartition(partition);
+    pool.ParallelFor(n_prs, partition.batch_workers, [&](size_t n) {
+        VT<calc_type> values(grad_index.size());
+        for (size_t slot = 0; slot < grad_index.size(); slot++) {
+            auto idx = grad_index[slot];
+            values[slot] = idx < enc_name.size() ? enc_data[n][idx] : ans_data[idx - enc_name.size()];
+        }
+        output[n] = GetExpectationWithGradOneMulti(hams, circ, herm_circ, values, grad_index, n_params,
+                                                   partition.hamiltonian_workers, group_size, checkpoint,
+                                                   n_checkpoints);
+    });
+    return output;
+}
+
+template <typename qs_policy_t_>
+auto VectorState<qs_policy_t_>::GetExpectationWithWeightedGradMultiMulti(
+    const std::vector<std::shared_ptr<Hamiltonian<calc_type>>>& hams, const compiled_circuit_t& circ,
+    const compiled_circuit_t& herm_circ, const VVT<calc_type>& enc_data, const VT<calc_type>& ans_data,
+    const VVT<calc_type>& weights, const VS& enc_name, const VS& ans_name, size_t batch_threads) -> VT<py_qs_datas_t> {
+    if (circ.params_name_ != herm_circ.params_name_) {
+        throw std::invalid_argument("Circuit and its hermitian conjugate should have the same parameters.");
     }
-    for (size_t i = 0; i < ans_name.size(); i++) {
-        p_map[ans_name[i]] = i + enc_name.size();
+    auto n_hams = hams.size();
+    auto n_prs = enc_data.size();
+    if (weights.size() != n_prs) {
+        throw std::invalid_argument("Weights should have the same batch size as encoder data.");
     }
-    if (n_prs == 1) {
-        ParameterResolver<calc_type> pr = ParameterResolver<calc_type>();
-        pr.SetItems(enc_name, enc_data[0]);
-        pr.SetItems(ans_name, ans_data);
-        output[0] = GetExpectationWithGradOneMulti(hams, circ, herm_circ, pr, p_map, mea_threads);
-    } else {
-        std::vector<std::thread> tasks;
-        tasks.reserve(batch_threads);
-        size_t end = 0;
-        size_t offset = n_prs / batch_threads;
-        size_t left = n_prs % batch_threads;
-        for (size_t i = 0; i < batch_threads; ++i) {
-            size_t start = end;
-            end = start + offset;
-            if (i < left) {
-                end += 1;
+    for (const auto& row : weights) {
+        if (row.size() != n_hams) {
+            throw std::invalid_argument("Every row of weights should have one weight for each hamiltonian.");
+        }
+    }
+    for (const auto& ham : hams) {
+        if (ham->how_to_ == FRONTEND) {
+            throw std::invalid_argument("Weighted gradient requires hamiltonians of pauli terms.");
+        }
+    }
+    auto n_params = enc_name.size() + ans_name.size();
+    VT<py_qs_datas_t> output(n_prs, py_qs_datas_t(n_hams + n_params, 0));
+    auto names = enc_name;
+    names.insert(names.end(), ans_name.begin(), ans_name.end());
+    auto grad_index = circ.MapParameters(names);
+    for (size_t slot = 0; slot < grad_index.size(); slot++) {
+        if (grad_index[slot] == compiled_circuit_t::npos) {
+            throw std::runtime_error("parameter " + circ.params_name_[slot] + " not in this parameter resolver.");
+        }
+    }
+    auto& pool = ThreadPool::GetInstance();
+    auto partition = pool.Partition(n_prs, 1, batch_threads, 1);
+    pool.SetLastPartition(partition);
+    pool.ParallelFor(n_prs, partition.batch_workers, [&](size_t n) {
+        VT<calc_type> values(grad_index.size());
+        for (size_t slot = 0; slot < grad_index.size(); slot++) {
+            auto idx = grad_index[slot];
+            values[slot] = idx < enc_name.size() ? enc_data[n][idx] : ans_data[idx - enc_name.size()];
+        }
+        auto& out = output[n];
+        VectorState<qs_policy_t> sim_l = *this;
+        sim_l.ApplyCircuit(circ, values);
+        VT<PauliTerm<calc_type>> terms;
+        for (size_t k = 0; k < n_hams; k++) {
+            out[k] = sim_l.GetExpectation(*hams[k]);
+            if (weights[n][k] != 0) {
+                for (const auto& [pauli, coeff] : hams[k]->ham_) {
+                    terms.emplace_back(pauli, coeff * weights[n][k]);
+                }
             }
-            auto task = [&, start, end]() {
-                for (size_t n = start; n < end; n++) {
-                    ParameterResolver<calc_type> pr = ParameterResolver<calc_type>();
-                    pr.SetItems(enc_name, enc_data[n]);
-                    pr.SetItems(ans_name, ans_data);
-                    auto f_g = GetExpectationWithGradOneMulti(hams, circ, herm_circ, pr, p_map, mea_threads);
-                    output[n] = f_g;
+        }
+        if (terms.empty()) {
+            return;
+        }
+        VectorState<qs_policy_t> sim_r = sim_l;
+        sim_r.ApplyHamiltonian(Hamiltonian<calc_type>(terms));
+        for (const auto& g : herm_circ.gates_) {
+            sim_l.ApplyCompiledGate(g, values);
+            if (g.RequiresGrad()) {
+                auto grad = ExpectDiffCompiledGate(sim_l.qs, sim_r.qs, g, values, dim);
+                for (size_t k = 0; k < grad.size(); k++) {
+                    for (const auto& [slot, coeff] : g.params_[k].grad_coeffs) {
+                        out[n_hams + grad_index[slot]] += 2 * std::real(grad[k]) * coeff;
+                    }
                 }
-            };
-            tasks.emplace_back(task);
+            }
+            sim_r.ApplyCompiledGate(g, values);
         }
-        for (auto& t : tasks) {
-            t.join();
+    });
+    return output;
+}
+
+template <typename qs_policy_t_>
+auto VectorState<qs_policy_t_>::GetExpectationWithShiftGradMultiMulti(
+    const std::vector<std::shared_ptr<Hamiltonian<calc_type>>>& hams, const compiled_circuit_t& circ,
+    const VVT<calc_type>& enc_data, const VT<calc_type>& ans_data, const VS& enc_name, const VS& ans_name,
+    bool finite_difference, calc_type step, size_t shots, unsigned seed, size_t n_thread) const
+    -> VT<VT<py_qs_datas_t>> {
+    return mindquantum::sim::GetExpectationWithShiftGradMultiMulti(
+        *this, hams, circ, enc_data, ans_data, enc_name, ans_name, finite_difference, step, shots, seed, n_thread);
+}
+
+template <typename qs_policy_t_>
+auto VectorState<qs_policy_t_>::GetQFI(const compiled_circuit_t& circ, const ParameterResolver<calc_type>& pr,
+                                       const VS& params_name, const std::string& approx, int n_thread) const
+    -> VVT<calc_type> {
+    if (approx != "full" && approx != "block_diag" && approx != "diagonal") {
+        throw std::invalid_argument("approx should be 'full', 'block_diag' or 'diagonal', but get " + approx + ".");
+    }
+    // Every parameter of a gate that requires gradient is a derivative direction d, with psi_d the state whose gate is
+    // replaced by its derivative. The block of a direction is the layer of parameterized gates it belongs to, a new
+    // layer starts when a parameterized gate acts on a qubit that is already used by the current layer.
+    VT<std::pair<size_t, size_t>> dirs;
+    VT<size_t> block;
+    VT<size_t> first_dir(circ.gates_.size() + 1, 0);
+    Index used = 0;
+    size_t n_block = 0;
+    for (size_t n = 0; n < circ.gates_.size(); n++) {
+        const auto& g = circ.gates_[n];
+        if (g.id_ == GateID::Measure || g.id_ == GateID::Channel) {
+            throw std::invalid_argument(
+                "Can not calculate quantum fisher information of circuit with measurement or noise channel.");
+        }
+        first_dir[n] = dirs.size();
+        if (!g.RequiresGrad()) {
+            continue;
+        }
+        auto qubits = GetControlMask(g.obj_qubits_) | GetControlMask(g.ctrl_qubits_);
+        if (used & qubits) {
+            n_block++;
+            used = 0;
+        }
+        used |= qubits;
+        for (size_t k = 0; k < g.params_.size(); k++) {
+            if (!g.params_[k].grad_coeffs.empty()) {
+                dirs.emplace_back(n, k);
+                block.push_back(n_block);
+            }
         }
     }
-    return output;
+    first_dir.back() = dirs.size();
+    auto n_dirs = dirs.size();
+    auto values = circ.ResolveParameters(pr);
+    auto grad_index = circ.MapParameters(params_name);
+    auto n_grad = params_name.size();
+
+    // a[d][e] = <psi_d|psi_e> for e >= d and b[d] = <psi_d|psi>. For direction d on gate i, the state mu = dU_i
+    // U_{i-1}...U_0|psi0> is evolved with psi in one sweep, and <psi_d|psi_e> = <mu|dU_j|psi> with both states before
+    // gate j, since the gates after j cancel.
+    VT<py_qs_datas_t> a(n_dirs, py_qs_datas_t(n_dirs, 0));
+    py_qs_datas_t b(n_dirs, 0);
+    auto run_dir = [&](size_t d) {
+        auto [i, k] = dirs[d];
+        VectorState<qs_policy_t> psi = *this;
+        for (size_t n = 0; n < i; n++) {
+            psi.ApplyCompiledGate(circ.gates_[n], values);
+        }
+        auto mu = psi;
+        mu.ApplyDiffCompiledGate(circ.gates_[i], values, k);
+        a[d][d] = qs_policy_t::Vdot(mu.qs, mu.qs, dim);
+        // Other parameters of the same gate, such as phi and lambda of U3.
+        for (size_t e = d + 1; e < first_dir[i + 1]; e++) {
+            auto mu_e = psi;
+            mu_e.ApplyDiffCompiledGate(circ.gates_[i], values, dirs[e].second);
+            a[d][e] = qs_policy_t::Vdot(mu.qs, mu_e.qs, dim);
+        }
+        psi.ApplyCompiledGate(circ.gates_[i], values);
+        b[d] = qs_policy_t::Vdot(mu.qs, psi.qs, dim);
+        if (approx == "diagonal") {
+            return;
+        }
+        for (size_t n = i + 1; n < circ.gates_.size(); n++) {
+            if (first_dir[n] != first_dir[n + 1] && approx == "block_diag" && block[first_dir[n]] != block[d]) {
+                break;
+            }
+            const auto& g = circ.gates_[n];
+            mu.ApplyCompiledGate(g, values);
+            if (first_dir[n] != first_dir[n + 1]) {
+                auto grad = ExpectDiffCompiledGate(mu.qs, psi.qs, g, values, dim);
+                for (size_t e = first_dir[n]; e < first_dir[n + 1]; e++) {
+                    a[d][e] = grad[dirs[e].second];
+                }
+            }
+            psi.ApplyCompiledGate(g, values);
+        }
+    };
+    ThreadPool::GetInstance().ParallelFor(n_dirs, std::max(n_thread, 1), run_dir);
+
+    // QFI_pq = 4 Re(A_pq - B_p conj(B_q)), with the derivative of parameter p being sum_d c_dp psi_d.
+    VVT<calc_type> qfi(n_grad, VT<calc_type>(n_grad, 0));
+    for (size_t d = 0; d < n_dirs; d++) {
+        const auto& cd = circ.gates_[dirs[d].first].params_[dirs[d].second].grad_coeffs;
+        for (size_t e = d; e < n_dirs; e++) {
+            if (approx == "diagonal" && e != d) {
+                break;
+            }
+            if (approx == "block_diag" && block[e] != block[d]) {
+                break;
+            }
+            auto v = a[d][e] - b[d] * std::conj(b[e]);
+            const auto& ce = circ.gates_[dirs[e].first].params_[dirs[e].second].grad_coeffs;
+            for (const auto& [sp, xp] : cd) {
+                for (const auto& [sq, xq] : ce) {
+                    auto p = grad_index[sp];
+                    auto q = grad_index[sq];
+                    if (p == compiled_circuit_t::npos || q == compiled_circuit_t::npos) {
+                        continue;
+                    }
+                    qfi[p][q] += 4 * xp * xq * std::real(v);
+                    if (e != d) {
+                        qfi[q][p] += 4 * xp * xq * std::real(v);
+                    }
+                }
+            }
+        }
+    }
+    return qfi;
 }
 
 template <typename qs_policy_t_>
@@ -863,18 +1390,165 @@ VT<unsigned> VectorState<qs_policy_t_>::Sampling(const circuit_t& circ, const Pa
     RndEngine rnd_eng = RndEngine(seed);
     std::uniform_real_distribution<double> dist(1.0, (1 << 20) * 1.0);
     std::function<double()> rng = std::bind(dist, std::ref(rnd_eng));
+    if (std::any_of(circ.begin(), circ.end(), [](const auto& g) { return g->is_channel_; })) {
+        compiled_circuit_t compiled(circ);
+        VT<unsigned> seeds(shots);
+        std::generate(seeds.begin(), seeds.end(), [&rng]() { return static_cast<unsigned>(rng()); });
+        RunTrajectories(compiled, compiled.ResolveParameters(pr), seeds, ThreadPool::GetInstance().GetThreadsNumber(),
+                        [&](size_t i, const derived_t&, const std::map<std::string, int>& measure_result) {
+                            for (const auto& [name, val] : key_map) {
+                                if (auto it = measure_result.find(name); it != measure_result.end()) {
+                                    res[i * key_size + val] = it->second;
+                                }
+                            }
+                        });
+        return res;
+    }
+    // Noiseless circuit: evolve the state once and only branch at mid-circuit measurements.
+    size_t terminal_start = circ.size();
+    while (terminal_start > 0 && circ[terminal_start - 1]->is_measure_) {
+        terminal_start--;
+    }
+    auto sim = derived_t(n_qubits, seed, qs);
+    sim.SamplingBranch(circ, 0, terminal_start, pr, shots, key_map, VT<unsigned>(key_size, 0), &res, 0, &rnd_eng);
+    // Shots are grouped by branch, shuffle them so that the output order is the same as independent sampling.
+    VT<size_t> order(shots);
+    std::iota(order.begin(), order.end(), 0);
+    std::shuffle(order.begin(), order.end(), rnd_eng);
+    VT<unsigned> out(shots * key_size);
+    for (size_t i = 0; i < shots; i++) {
+        std::copy(res.begin() + order[i] * key_size, res.begin() + (order[i] + 1) * key_size,
+                  out.begin() + i * key_size);
+    }
+    return out;
+}
+
+template <typename qs_policy_t_>
+template <typename F>
+void VectorState<qs_policy_t_>::RunTrajectories(const compiled_circuit_t& circ, const VT<calc_type>& values,
+                                                const VT<unsigned>& seeds, size_t n_thread, const F& fn) const {
+    auto n_traj = seeds.size();
+    auto& pool = ThreadPool::GetInstance();
+    auto n_workers = std::max<size_t>(1, std::min({n_thread, n_traj, pool.GetThreadsNumber()}));
+    // Trajectory i always uses seeds[i], so the result does not depend on how trajectories are shared by workers.
+    pool.ParallelFor(n_workers, n_workers, [&](size_t worker) {
+        derived_t sim = *this;
+        for (size_t i = worker; i < n_traj; i += n_workers) {
+            if (i != worker) {
+                qs_policy_t::QSMulValue(qs, sim.qs, 1, dim);
+            }
+            sim.rnd_eng_.seed(seeds[i]);
+            auto measure_result = sim.ApplyCircuit(circ, values);
+            fn(i, sim, measure_result);
+        }
+    });
+}
+
+template <typename qs_policy_t_>
+auto VectorState<qs_policy_t_>::GetNoisyExpectation(const std::vector<std::shared_ptr<Hamiltonian<calc_type>>>& hams,
+                                                    const circuit_t& circ, const ParameterResolver<calc_type>& pr,
+                                                    size_t n_traj, unsigned seed, size_t n_thread)
+    -> std::pair<py_qs_datas_t, VT<calc_type>> {
+    if (n_traj == 0) {
+        throw std::invalid_argument("Number of trajectories should be greater than 0.");
+    }
+    // A circuit without noise channel and measurement is deterministic, one trajectory is enough.
+    if (std::none_of(circ.begin(), circ.end(), [](const auto& g) { return g->is_channel_ || g->is_measure_; })) {
+        n_traj = 1;
+    }
+    auto n_hams = hams.size();
+    compiled_circuit_t compiled(circ);
+    RndEngine rnd_eng(seed);
+    VT<unsigned> seeds(n_traj);
+    std::generate(seeds.begin(), seeds.end(), [&rnd_eng]() { return static_cast<unsigned>(rnd_eng()); });
+    VT<py_qs_datas_t> samples(n_traj, py_qs_datas_t(n_hams));
+    RunTrajectories(compiled, compiled.ResolveParameters(pr), seeds, n_thread,
+                    [&](size_t i, derived_t& sim, const std::map<std::string, int>&) {
+                        for (size_t j = 0; j < n_hams; j++) {
+                            samples[i][j] = sim.GetExpectation(*hams[j]);
+                        }
+                    });
+    py_qs_datas_t mean(n_hams, 0);
+    VT<calc_type> std_err(n_hams, 0);
+    for (size_t j = 0; j < n_hams; j++) {
+        for (size_t i = 0; i < n_traj; i++) {
+            mean[j] += samples[i][j];
+        }
+        mean[j] /= static_cast<calc_type>(n_traj);
+        if (n_traj > 1) {
+            calc_type var = 0;
+            for (size_t i = 0; i < n_traj; i++) {
+                var += std::pow(std::real(samples[i][j]) - std::real(mean[j]), 2);
+            }
+            std_err[j] = std::sqrt(var / static_cast<calc_type>(n_traj - 1) / static_cast<calc_type>(n_traj));
+        }
+    }
+    return {mean, std_err};
+}
+
+template <typename qs_policy_t_>
+void VectorState<qs_policy_t_>::SamplingBranch(const circuit_t& circ, size_t start, size_t terminal_start,
+                                               const ParameterResolver<calc_type>& pr, size_t shots,
+                                               const MST<size_t>& key_map, VT<unsigned> prefix, VT<unsigned>* res,
+                                               size_t offset, RndEngine* rnd_eng) {
+    auto key_size = key_map.size();
+    for (size_t idx = start; idx < terminal_start; idx++) {
+        const auto& g = circ[idx];
+        if (!g->is_measure_) {
+            ApplyGate(g, pr, false);
+            continue;
+        }
+        index_t one_mask = (1UL << g->obj_qubits_[0]);
+        auto one_amp = qs_policy_t::ConditionalCollect(qs, one_mask, one_mask, true, dim).real();
+        one_amp = std::min(std::max(one_amp, static_cast<decltype(one_amp)>(0)), static_cast<decltype(one_amp)>(1));
+        size_t n_one = std::binomial_distribution<size_t>(shots, one_amp)(*rnd_eng);
+        if (n_one != 0 && n_one != shots) {
+            // Only the branch with fewer shots is copied, while this state goes on with the other one. A nested copy
+            // gets at most half of the shots of its parent, so at most log2(shots) + 1 states are alive at once.
+            bool minor_one = 2 * n_one <= shots;
+            auto n_minor = minor_one ? n_one : shots - n_one;
+            auto minor_amp = minor_one ? one_amp : 1 - one_amp;
+            auto branch = *this;
+            qs_data_t norm_fact = 1 / std::sqrt(minor_amp);
+            qs_policy_t::ConditionalMul(branch.qs, branch.qs, one_mask, minor_one ? one_mask : 0, norm_fact, 0.0, dim);
+            auto branch_prefix = prefix;
+            branch_prefix[key_map.at(g->name_)] = static_cast<unsigned>(minor_one);
+            branch.SamplingBranch(circ, idx + 1, terminal_start, pr, n_minor, key_map, branch_prefix, res,
+                                  offset + shots - n_minor, rnd_eng);
+            shots -= n_minor;
+            n_one = minor_one ? 0 : shots;
+        }
+        index_t collapse_mask = (static_cast<index_t>(n_one != 0) << g->obj_qubits_[0]);
+        qs_data_t norm_fact = (collapse_mask == 0) ? 1 / std::sqrt(1 - one_amp) : 1 / std::sqrt(one_amp);
+        qs_policy_t::ConditionalMul(qs, qs, one_mask, collapse_mask, norm_fact, 0.0, dim);
+        prefix[key_map.at(g->name_)] = static_cast<unsigned>(collapse_mask != 0);
+    }
     for (size_t i = 0; i < shots; i++) {
-        auto sim = derived_t(n_qubits, static_cast<unsigned>(rng()), qs);
-        auto res0 = sim.ApplyCircuit(circ, pr);
-        VT<unsigned> res1(key_map.size());
-        for (const auto& [name, val] : key_map) {
-            res1[val] = res0[name];
+        std::copy(prefix.begin(), prefix.end(), res->begin() + (offset + i) * key_size);
+    }
+    if (terminal_start == circ.size()) {
+        return;
+    }
+    // All the remaining gates are measurement gates, sample them from the marginal distribution directly.
+    qbits_t qubits;
+    for (size_t idx = terminal_start; idx < circ.size(); idx++) {
+        auto q = circ[idx]->obj_qubits_[0];
+        if (std::find(qubits.begin(), qubits.end(), q) == qubits.end()) {
+            qubits.push_back(q);
         }
-        for (size_t j = 0; j < key_size; j++) {
-            res[i * key_size + j] = res1[j];
+    }
+    auto probs = qs_policy_t::GetMarginalProbs(qs, qubits, dim);
+    std::partial_sum(probs.begin(), probs.end(), probs.begin());
+    std::uniform_real_distribution<calc_type> dist(0, probs.back());
+    for (size_t i = 0; i < shots; i++) {
+        auto it = std::upper_bound(probs.begin(), probs.end(), dist(*rnd_eng));
+        index_t outcome = std::min(static_cast<size_t>(std::distance(probs.begin(), it)), probs.size() - 1);
+        for (size_t idx = terminal_start; idx < circ.size(); idx++) {
+            auto pos = std::distance(qubits.begin(),
+                                     std::find(qubits.begin(), qubits.end(), circ[idx]->obj_qubits_[0]));
+            (*res)[(offset + i) * key_size + key_map.at(circ[idx]->name_)] = (outcome >> pos) & 1UL;
         }
     }
-    return res;
 }
 }  // namespace mindquantum::sim::vector::detail
 
@@ -0,0 +1,197 @@
+//   Copyright 2022 <Huawei Technologies Co., Ltd>
+//
+//   Licensed under the Apache License, Version 2.0 (the "License");
+//   you may not use this file except in compliance with the License.
+//   You may obtain a copy of the License at
+//
+//       http://www.apache.org/licenses/LICENSE-2.0
+//
+//   Unless required by applicable law or agreed to in writing, software
+//   distributed under the License is distributed on an "AS IS" BASIS,
+//   WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+//   See the License for the specific language governing permissions and
+//   limitations under the License.
+
+#include "simulator/densitymatrix/detail/cpu_density_matrix_policy.hpp"
+
+#include <complex>
+#include <memory>
+#include <stdexcept>
+#include <vector>
+
+#include "config/openmp.hpp"
+
+#include "core/utils.hpp"
+#include "simulator/types.hpp"
+#include "simulator/utils.hpp"
+
+namespace mindquantum::sim::densitymatrix::detail {
+template <typename calc_type_>
+auto CPUDensityMatrixPolicyBase<calc_type_>::TraceOfTerms(qs_data_p_t qs,
+                                                          const std::vector<PauliTerm<sim::calc_type>>& ham,
+                                                          index_t dim) -> py_qs_data_t {
+    calc_type res_real = 0, res_imag = 0;
+    for (const auto& group : GroupPauliTerms(ham)) {
+        auto mask_f = group.mask_f;
+        const auto& mask_yz = group.mask_yz;
+        std::vector<qs_data_t> coeffs(group.coeffs.begin(), group.coeffs.end());
+        auto n_terms = coeffs.size();
+        // Element (i ^ mask_f, i) of the group times element (i, i ^ mask_f) of density matrix.
+        // clang-format off
+        THRESHOLD_OMP(
+            MQ_DO_PRAGMA(omp parallel for reduction(+:res_real, res_imag) schedule(static)), dim, DimTh,
+                for (omp::idx_t i = 0; i < dim; i++) {
+                    qs_data_t c = 0;
+                    for (size_t t = 0; t < n_terms; t++) {
+                        if (CountOne(static_cast<int64_t>(i & mask_yz[t])) & 1) {
+                            c -= coeffs[t];
+                        } else {
+                            c += coeffs[t];
+                        }
+                    }
+                    auto tmp = c * qs[i * dim + (i ^ mask_f)];
+                    res_real += tmp.real();
+                    res_imag += tmp.imag();
+                })
+        // clang-format on
+    }
+    return {res_real, res_imag};
+}
+
+template <typename calc_type_>
+auto CPUDensityMatrixPolicyBase<calc_type_>::TraceOfCsr(const std::shared_ptr<sparse::CsrHdMatrix<sim::calc_type>>& a,
+                                                        qs_data_p_t qs, index_t dim) -> py_qs_data_t {
+    if (dim != a->dim_) {
+        throw std::runtime_error("Sparse hamiltonian size not match with quantum state size.");
+    }
+    auto data = a->data_;
+    auto indptr = a->indptr_;
+    auto indices = a->indices_;
+    calc_type res_real = 0, res_imag = 0;
+    // clang-format off
+    THRESHOLD_OMP(
+        MQ_DO_PRAGMA(omp parallel for reduction(+:res_real, res_imag) schedule(static)), dim, DimTh,
+            for (omp::idx_t r = 0; r < dim; r++) {
+                qs_data_t sum = 0;
+                for (Index j = indptr[r]; j < indptr[r + 1]; j++) {
+                    sum += qs_data_t(data[j]) * qs[indices[j] * dim + r];
+                }
+                res_real += sum.real();
+                res_imag += sum.imag();
+            })
+    // clang-format on
+    return {res_real, res_imag};
+}
+
+template <typename calc_type_>
+auto CPUDensityMatrixPolicyBase<calc_type_>::HamiltonianMatrix(const std::vector<PauliTerm<sim::calc_type>>& ham,
+                                                               index_t dim) -> qs_data_p_t {
+    auto out = base_t::InitState(dim * dim, false);
+    for (const auto& group : GroupPauliTerms(ham)) {
+        auto mask_f = group.mask_f;
+        const auto& mask_yz = group.mask_yz;
+        std::vector<qs_data_t> coeffs(group.coeffs.begin(), group.coeffs.end());
+        auto n_terms = coeffs.size();
+        // clang-format off
+        THRESHOLD_OMP_FOR(
+            dim, DimTh,
+                for (omp::idx_t i = 0; i < dim; i++) {
+                    qs_data_t c = 0;
+                    for (size_t t = 0; t < n_terms; t++) {
+                        if (CountOne(static_cast<int64_t>(i & mask_yz[t])) & 1) {
+                            c -= coeffs[t];
+                        } else {
+                            c += coeffs[t];
+                        }
+                    }
+                    out[(i ^ mask_f) * dim + i] += c;
+                })
+        // clang-format on
+    }
+    return out;
+}
+
+template <typename calc_type_>
+auto CPUDensityMatrixPolicyBase<calc_type_>::CsrMatrix(const std::shared_ptr<sparse::CsrHdMatrix<sim::calc_type>>& a,
+                                                       index_t dim) -> qs_data_p_t {
+    if (dim != a->dim_) {
+        throw std::runtime_error("Sparse hamiltonian size not match with quantum state size.");
+    }
+    auto out = base_t::InitState(dim * dim, false);
+    auto data = a->data_;
+    auto indptr = a->indptr_;
+    auto indices = a->indices_;
+    // clang-format off
+    THRESHOLD_OMP_FOR(
+        dim, DimTh,
+            for (omp::idx_t r = 0; r < dim; r++) {
+                for (Index j = indptr[r]; j < indptr[r + 1]; j++) {
+                    out[r * dim + indices[j]] += qs_data_t(data[j]);
+                }
+            })
+    // clang-format on
+    return out;
+}
+
+template <typename calc_type_>
+auto CPUDensityMatrixPolicyBase<calc_type_>::GetDiagonal(qs_data_p_t qs, index_t dim) -> std::vector<calc_type> {
+    std::vector<calc_type> out(dim);
+    THRESHOLD_OMP_FOR(
+        dim, DimTh, for (omp::idx_t i = 0; i < dim; i++) { out[i] = qs[i * dim + i].real(); })
+    return out;
+}
+
+template <typename calc_type_>
+auto CPUDensityMatrixPolicyBase<calc_type_>::GetMarginalProbs(qs_data_p_t qs, const qbits_t& qubits, index_t dim)
+    -> std::vector<calc_type> {
+    index_t n_out = 1UL << qubits.size();
+    SubsystemMask mask(qubits);
+    std::vector<calc_type> out(n_out, 0);
+    for (index_t o = 0; o < n_out; o++) {
+        auto condi = mask.OutcomeToFull(o);
+        calc_type res = 0;
+        // clang-format off
+        THRESHOLD_OMP(
+            MQ_DO_PRAGMA(omp parallel for schedule(static) reduction(+: res)), dim / n_out, DimTh,
+                for (omp::idx_t r = 0; r < dim / n_out; r++) {
+                    auto i = mask.RestToFull(r) | condi;
+                    res += qs[i * dim + i].real();
+                })
+        // clang-format on
+        out[o] = res;
+    }
+    return out;
+}
+
+template <typename calc_type_>
+auto CPUDensityMatrixPolicyBase<calc_type_>::GetReducedDensityMatrix(qs_data_p_t qs, const qbits_t& qubits, index_t dim)
+    -> VVT<py_qs_data_t> {
+    index_t n_out = 1UL << qubits.size();
+    SubsystemMask mask(qubits);
+    VVT<py_qs_data_t> out(n_out, py_qs_datas_t(n_out, 0));
+    // Only the lower triangle is calculated, the upper triangle is its conjugate.
+    for (index_t a = 0; a < n_out; a++) {
+        auto condi_a = mask.OutcomeToFull(a);
+        for (index_t b = 0; b <= a; b++) {
+            auto condi_b = mask.OutcomeToFull(b);
+            calc_type res_real = 0, res_imag = 0;
+            // clang-format off
+            THRESHOLD_OMP(
+                MQ_DO_PRAGMA(omp parallel for schedule(static) reduction(+: res_real, res_imag)), dim / n_out, DimTh,
+                    for (omp::idx_t r = 0; r < dim / n_out; r++) {
+                        auto rest = mask.RestToFull(r);
+                        auto v = qs[(rest | condi_a) * dim + (rest | condi_b)];
+                        res_real += v.real();
+                        res_imag += v.imag();
+                    })
+            // clang-format on
+            out[a][b] = py_qs_data_t(res_real, res_imag);
+            out[b][a] = std::conj(out[a][b]);
+        }
+    }
+    return out;
+}
+
+template struct CPUDensityMatrixPolicyBase<float>;
+template struct CPUDensityMatrixPolicyBase<double>;
+}  // namespace mindquantum::sim::densitymatrix::detail
@@ -0,0 +1,205 @@
+//   Copyright 2022 <Huawei Technologies Co., Ltd>
+//
+//   Licensed under the Apache License, Version 2.0 (the "License");
+//   you may not use this file except in compliance with the License.
+//   You may obtain a copy of the License at
+//
+//       http://www.apache.org/licenses/LICENSE-2.0
+//
+//   Unless required by applicable law or agreed to in writing, software
+//   distributed under the License is distributed on an "AS IS" BASIS,
+//   WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+//   See the License for the specific language governing permissions and
+//   limitations under the License.
+
+#include "simulator/gate_fusion.hpp"
+
+#include <algorithm>
+#include <iterator>
+#include <utility>
+
+#include "core/mq_base_types.hpp"
+#include "ops/gates.hpp"
+
+namespace mindquantum::sim {
+namespace {
+using matrix_t = std::vector<std::vector<std::complex<calc_type>>>;
+
+// Get the resolved matrix of gate, the object qubits are sorted in ascending order as the two qubits kernels do. Return
+// false if the gate can not be fused.
+bool GetGateMatrix(const std::shared_ptr<BasicGate<calc_type>>& gate, const ParameterResolver<calc_type>& pr,
+                   matrix_t* mat, qbits_t* objs, qbits_t* ctrls) {
+    if (gate->is_measure_ || gate->is_channel_ || gate->obj_qubits_.empty()) {
+        return false;
+    }
+    objs->assign(gate->obj_qubits_.begin(), gate->obj_qubits_.end());
+    ctrls->assign(gate->ctrl_qubits_.begin(), gate->ctrl_qubits_.end());
+    Dim2Matrix<calc_type> m;
+    if (gate->name_ == gCNOT) {
+        // The extra object qubits of CNOT are control qubits.
+        std::copy(objs->begin() + 1, objs->end(), std::back_inserter(*ctrls));
+        objs->resize(1);
+        m = XGate<calc_type>.base_matrix_;
+    } else if (!gate->parameterized_) {
+        m = gate->base_matrix_;
+    } else if (gate->is_custom_) {
+        m = gate->numba_param_matrix_(gate->params_.Combination(pr).const_value);
+    } else if (gate->name_ == gU3) {
+        auto u3 = static_cast<U3<calc_type>*>(gate.get());
+        m = U3Matrix<calc_type>(u3->theta.Combination(pr).const_value, u3->phi.Combination(pr).const_value,
+                                u3->lambda.Combination(pr).const_value);
+    } else if (gate->name_ == gFSim) {
+        auto fsim = static_cast<FSim<calc_type>*>(gate.get());
+        m = FSimMatrix<calc_type>(fsim->theta.Combination(pr).const_value, fsim->phi.Combination(pr).const_value);
+    } else if (gate->param_matrix_) {
+        m = gate->param_matrix_(gate->params_.Combination(pr).const_value);
+    } else {
+        return false;
+    }
+    if (m.matrix_.size() != (1UL << objs->size())) {
+        return false;
+    }
+    std::sort(objs->begin(), objs->end());
+    *mat = std::move(m.matrix_);
+    return true;
+}
+
+// Expand the matrix of a gate on objs and controlled by ctrls to a matrix on qubits, where both objs and qubits are
+// sorted.
+matrix_t ExpandMatrix(const matrix_t& m, const qbits_t& objs, const qbits_t& ctrls, const qbits_t& qubits) {
+    auto bit_of = [&qubits](qbit_t q) {
+        return static_cast<index_t>(std::find(qubits.begin(), qubits.end(), q) - qubits.begin());
+    };
+    index_t ctrl_mask = 0;
+    for (auto q : ctrls) {
+        ctrl_mask |= (1UL << bit_of(q));
+    }
+    VT<index_t> obj_bits;
+    index_t obj_mask = 0;
+    for (auto q : objs) {
+        obj_bits.push_back(bit_of(q));
+        obj_mask |= (1UL << obj_bits.back());
+    }
+    auto sub_index = [&obj_bits](index_t i) {
+        index_t out = 0;
+        for (size_t k = 0; k < obj_bits.size(); k++) {
+            out |= ((i >> obj_bits[k]) & 1UL) << k;
+        }
+        return out;
+    };
+    index_t dim = (1UL << qubits.size());
+    matrix_t out(dim, std::vector<std::complex<calc_type>>(dim, 0));
+    for (index_t r = 0; r < dim; r++) {
+        for (index_t c = 0; c < dim; c++) {
+            if ((c & ctrl_mask) != ctrl_mask) {
+                out[r][c] = (r == c) ? 1 : 0;
+            } else if ((r & ~obj_mask) == (c & ~obj_mask)) {
+                out[r][c] = m[sub_index(r)][sub_index(c)];
+            }
+        }
+    }
+    return out;
+}
+
+matrix_t MatMul(const matrix_t& a, const matrix_t& b) {
+    auto dim = a.size();
+    matrix_t out(dim, std::vector<std::complex<calc_type>>(dim, 0));
+    for (size_t i = 0; i < dim; i++) {
+        for (size_t k = 0; k < dim; k++) {
+            for (size_t j = 0; j < dim; j++) {
+                out[i][j] += a[i][k] * b[k][j];
+            }
+        }
+    }
+    return out;
+}
+}  // namespace
+
+std::vector<FusedGate> FuseCircuit(const std::vector<std::shared_ptr<BasicGate<calc_type>>>& circ,
+                                   const ParameterResolver<calc_type>& pr) {
+    std::vector<FusedGate> out;
+    std::vector<std::shared_ptr<BasicGate<calc_type>>> block_gates;
+    qbits_t block_qubits;
+    matrix_t block;
+    // A sweep of dense two qubits matrix costs about two sweeps of single qubit gate, so a two qubits block only pays
+    // off when it replaces at least three gates.
+    auto flush = [&]() {
+        if (block_gates.size() == 1 || (block_qubits.size() == 2 && block_gates.size() < 3)) {
+            for (auto& gate : block_gates) {
+                out.push_back({gate, {}, {}});
+            }
+        } else if (block_gates.size() > 1) {
+            out.push_back({nullptr, block_qubits, std::move(block)});
+        }
+        block_gates.clear();
+        block_qubits.clear();
+        block.clear();
+    };
+    for (auto& gate : circ) {
+        matrix_t m;
+        qbits_t objs;
+        qbits_t ctrls;
+        if (!GetGateMatrix(gate, pr, &m, &objs, &ctrls) || objs.size() + ctrls.size() > 2) {
+            flush();
+            out.push_back({gate, {}, {}});
+            continue;
+        }
+        qbits_t qubits = objs;
+        qubits.insert(qubits.end(), ctrls.begin(), ctrls.end());
+        qubits.insert(qubits.end(), block_qubits.begin(), block_qubits.end());
+        std::sort(qubits.begin(), qubits.end());
+        qubits.erase(std::unique(qubits.begin(), qubits.end()), qubits.end());
+        // Single qubit gates on another qubit start a new block, since they are cheaper to fuse separately.
+        if (qubits.size() > 2 || (objs.size() + ctrls.size() == 1 && qubits.size() > block_qubits.size())) {
+            flush();
+            qubits = objs;
+            qubits.insert(qubits.end(), ctrls.begin(), ctrls.end());
+            std::sort(qubits.begin(), qubits.end());
+        }
+        auto expanded = ExpandMatrix(m, objs, ctrls, qubits);
+        if (block_gates.empty()) {
+            block = std::move(expanded);
+        } else {
+            block = MatMul(expanded, ExpandMatrix(block, block_qubits, {}, qubits));
+        }
+        block_qubits = qubits;
+        block_gates.push_back(gate);
+    }
+    flush();
+    return out;
+}
+
+std::vector<calc_type> ResolveCircuitParameters(const std::vector<std::shared_ptr<BasicGate<calc_type>>>& circ,
+                                                const ParameterResolver<calc_type>& pr) {
+    std::vector<calc_type> out;
+    for (auto& gate : circ) {
+        if (!gate->parameterized_) {
+            continue;
+        }
+        if (gate->name_ == gU3) {
+            auto u3 = static_cast<U3<calc_type>*>(gate.get());
+            out.push_back(u3->theta.Combination(pr).const_value);
+            out.push_back(u3->phi.Combination(pr).const_value);
+            out.push_back(u3->lambda.Combination(pr).const_value);
+        } else if (gate->name_ == gFSim) {
+            auto fsim = static_cast<FSim<calc_type>*>(gate.get());
+            out.push_back(fsim->theta.Combination(pr).const_value);
+            out.push_back(fsim->phi.Combination(pr).const_value);
+        } else {
+            out.push_back(gate->params_.Combination(pr).const_value);
+        }
+    }
+    return out;
+}
+
+const std::vector<FusedGate>& FusedCircuitCache::Get(const circuit_t& circ, const ParameterResolver<calc_type>& pr) {
+    auto values = ResolveCircuitParameters(circ, pr);
+    if (!valid_ || circ != circ_ || values != values_) {
+        plan_ = FuseCircuit(circ, pr);
+        circ_ = circ;
+        values_ = std::move(values);
+        valid_ = true;
+    }
+    return plan_;
+}
+}  // namespace mindquantum::sim
@@ -0,0 +1,81 @@
+//   Copyright 2022 <Huawei Technologies Co., Ltd>
+//
+//   Licensed under the Apache License, Version 2.0 (the "License");
+//   you may not use this file except in compliance with the License.
+//   You may obtain a copy of the License at
+//
+//       http://www.apache.org/licenses/LICENSE-2.0
+//
+//   Unless required by applicable law or agreed to in writing, software
+//   distributed under the License is distributed on an "AS IS" BASIS,
+//   WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+//   See the License for the specific language governing permissions and
+//   limitations under the License.
+
+#include "simulator/parameter_shift.hpp"
+
+#include <cmath>
+
+#include <stdexcept>
+#include <string>
+#include <vector>
+
+namespace mindquantum::sim {
+namespace {
+constexpr calc_type kPi = 3.14159265358979323846;
+
+//! Rule for generator with eigenvalues +-omega/2, whose only gap is omega.
+std::vector<ShiftTerm> TwoTermsRule(calc_type omega) {
+    return {{kPi / 2 / omega, omega / 2}};
+}
+
+//! Rule for generator with eigenvalues 0 and +-omega/2, such as controlled rotation gates, whose gaps are omega/2 and
+//! omega.
+std::vector<ShiftTerm> FourTermsRule(calc_type omega) {
+    auto d_1 = (std::sqrt(2.0) + 1) / (4 * std::sqrt(2.0));
+    auto d_2 = (std::sqrt(2.0) - 1) / (4 * std::sqrt(2.0));
+    return {{kPi / 2 / omega, static_cast<calc_type>(omega * d_1)},
+            {3 * kPi / 2 / omega, static_cast<calc_type>(-omega * d_2)}};
+}
+}  // namespace
+
+std::vector<ShiftTerm> ShiftRule(const CompiledGate<calc_type>& gate, size_t k, bool finite_difference,
+                                 calc_type step) {
+    if (finite_difference || gate.id_ == GateID::Custom) {
+        return {{step, 1 / (2 * step)}};
+    }
+    bool controlled = !gate.ctrl_qubits_.empty();
+    switch (gate.id_) {
+        case GateID::RX:
+        case GateID::RY:
+        case GateID::RZ:
+            return controlled ? FourTermsRule(1) : TwoTermsRule(1);
+        case GateID::XX:
+        case GateID::YY:
+        case GateID::ZZ:
+            return controlled ? FourTermsRule(2) : TwoTermsRule(2);
+        case GateID::PS:
+            return TwoTermsRule(1);
+        case GateID::GP:
+            // Global phase without control qubit does not change any expectation.
+            if (!controlled) {
+                return {};
+            }
+            return TwoTermsRule(1);
+        case GateID::U3:
+            // theta is a rotation around Y axis, phi and lambda are phase shifts.
+            if (k == 0 && controlled) {
+                return FourTermsRule(1);
+            }
+            return TwoTermsRule(1);
+        case GateID::FSim:
+            // The generator of theta has eigenvalues 0 and +-1, and phi is a phase shift of state |11>.
+            if (k == 0) {
+                return FourTermsRule(2);
+            }
+            return TwoTermsRule(1);
+        default:
+            throw std::invalid_argument("Parameter shift rule of gate " + gate.gate_->name_ + " not implement.");
+    }
+}
+}  // namespace mindquantum::sim
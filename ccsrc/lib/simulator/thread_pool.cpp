@@ -0,0 +1,198 @@
+//   Copyright 2022 <Huawei Technologies Co., Ltd>
+//
+//   Licensed under the Apache License, Version 2.0 (the "License");
+//   you may not use this file except in compliance with the License.
+//   You may obtain a copy of the License at
+//
+//       http://www.apache.org/licenses/LICENSE-2.0
+//
+//   Unless required by applicable law or agreed to in writing, software
+//   distributed under the License is distributed on an "AS IS" BASIS,
+//   WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+//   See the License for the specific language governing permissions and
+//   limitations under the License.
+
+#include "simulator/thread_pool.hpp"
+
+#include <algorithm>
+#include <atomic>
+#include <exception>
+#include <memory>
+#include <stdexcept>
+#include <utility>
+
+#ifdef _OPENMP
+#    include <omp.h>
+#endif  // _OPENMP
+
+namespace mindquantum::sim {
+namespace {
+size_t GetOmpThreads() {
+#ifdef _OPENMP
+    return static_cast<size_t>(omp_get_max_threads());
+#else
+    return 1;
+#endif  // _OPENMP
+}
+
+void SetOmpThreads(size_t n_threads) {
+#ifdef _OPENMP
+    omp_set_num_threads(static_cast<int>(n_threads));
+#endif  // _OPENMP
+}
+}  // namespace
+
+ThreadPool& ThreadPool::GetInstance() {
+    static ThreadPool instance;
+    return instance;
+}
+
+ThreadPool::ThreadPool() : n_threads_(std::max<size_t>(1, GetOmpThreads())) {
+}
+
+ThreadPool::~ThreadPool() {
+    StopWorkers();
+}
+
+void ThreadPool::SetThreadsNumber(size_t n_threads) {
+    if (n_threads == 0) {
+        throw std::invalid_argument("Number of threads should be greater than 0.");
+    }
+    StopWorkers();
+    std::unique_lock<std::mutex> lock(mtx_);
+    n_threads_ = n_threads;
+    SetOmpThreads(n_threads);
+}
+
+size_t ThreadPool::GetThreadsNumber() const {
+    return n_threads_;
+}
+
+ThreadPartition ThreadPool::Partition(size_t n_batch, size_t n_hams, size_t max_batch, size_t max_hams) const {
+    ThreadPartition partition;
+    partition.batch_workers = std::max<size_t>(1, std::min({n_batch, max_batch, n_threads_}));
+    partition.hamiltonian_workers = std::max<size_t>(
+        1, std::min({n_hams, max_hams, n_threads_ / partition.batch_workers}));
+    partition.omp_threads = std::max<size_t>(1, n_threads_ / (partition.batch_workers * partition.hamiltonian_workers));
+    return partition;
+}
+
+void ThreadPool::SetLastPartition(const ThreadPartition& partition) {
+    std::unique_lock<std::mutex> lock(partition_mtx_);
+    last_partition_ = partition;
+}
+
+ThreadPartition ThreadPool::GetLastPartition() {
+    std::unique_lock<std::mutex> lock(partition_mtx_);
+    return last_partition_;
+}
+
+void ThreadPool::StartWorkers(size_t n_workers) {
+    for (size_t i = 0; i < n_workers; i++) {
+        workers_.emplace_back([this]() { WorkerLoop(); });
+    }
+}
+
+void ThreadPool::StopWorkers() {
+    {
+        std::unique_lock<std::mutex> lock(mtx_);
+        stop_ = true;
+    }
+    cv_.notify_all();
+    for (auto& worker : workers_) {
+        if (worker.joinable()) {
+            worker.join();
+        }
+    }
+    std::unique_lock<std::mutex> lock(mtx_);
+    workers_.clear();
+    jobs_.clear();
+    stop_ = false;
+}
+
+void ThreadPool::WorkerLoop() {
+    while (true) {
+        std::function<void()> job;
+        {
+            std::unique_lock<std::mutex> lock(mtx_);
+            cv_.wait(lock, [this]() { return stop_ || !jobs_.empty(); });
+            if (stop_) {
+                return;
+            }
+            job = std::move(jobs_.front());
+            jobs_.pop_front();
+        }
+        job();
+    }
+}
+
+void ThreadPool::ParallelFor(size_t n_tasks, size_t max_workers, const std::function<void(size_t)>& fn) {
+    auto n_workers = std::min({n_tasks, max_workers, n_threads_});
+    if (n_workers <= 1) {
+        for (size_t i = 0; i < n_tasks; i++) {
+            fn(i);
+        }
+        return;
+    }
+    struct State {
+        std::atomic<size_t> next{0};
+        std::mutex mtx;
+        std::condition_variable cv;
+        size_t active = 0;
+        bool closed = false;
+        std::exception_ptr error = nullptr;
+    };
+    auto state = std::make_shared<State>();
+    auto omp_threads = std::max<size_t>(1, GetOmpThreads() / n_workers);
+    auto run = [state, &fn, n_tasks, omp_threads]() {
+        auto origin_omp_threads = GetOmpThreads();
+        SetOmpThreads(omp_threads);
+        for (auto i = state->next++; i < n_tasks; i = state->next++) {
+            try {
+                fn(i);
+            } catch (...) {
+                std::unique_lock<std::mutex> lock(state->mtx);
+                if (!state->error) {
+                    state->error = std::current_exception();
+                }
+                state->next = n_tasks;
+            }
+        }
+        SetOmpThreads(origin_omp_threads);
+    };
+    // Helpers that start after the caller finished will find the work closed and return immediately, so the caller
+    // never waits for a job that is still queued.
+    auto helper = [state, run]() {
+        {
+            std::unique_lock<std::mutex> lock(state->mtx);
+            if (state->closed) {
+                return;
+            }
+            state->active++;
+        }
+        run();
+        {
+            std::unique_lock<std::mutex> lock(state->mtx);
+            state->active--;
+        }
+        state->cv.notify_all();
+    };
+    {
+        std::unique_lock<std::mutex> lock(mtx_);
+        if (workers_.empty()) {
+            StartWorkers(n_threads_ - 1);
+        }
+        for (size_t i = 1; i < n_workers; i++) {
+            jobs_.emplace_back(helper);
+        }
+    }
+    cv_.notify_all();
+    run();
+    std::unique_lock<std::mutex> lock(state->mtx);
+    state->closed = true;
+    state->cv.wait(lock, [&state]() { return state->active == 0; });
+    if (state->error) {
+        std::rethrow_exception(state->error);
+    }
+}
+}  // namespace mindquantum::sim
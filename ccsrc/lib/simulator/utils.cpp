@@ -16,7 +16,9 @@
 
 #include <cassert>
 #include <numeric>
+#include <unordered_map>
 
+#include "core/utils.hpp"
 #include "simulator/types.hpp"
 
 namespace mindquantum::sim {
@@ -37,6 +39,25 @@ PauliMask GenPauliMask(const std::vector<PauliWord> &pws) {
     return {out[0], out[1], out[2], out[3], out[4], out[5]};
 }
 
+std::vector<PauliTermGroup> GroupPauliTerms(const std::vector<PauliTerm<calc_type>> &ham) {
+    std::vector<PauliTermGroup> groups;
+    std::unordered_map<index_t, size_t> group_idx;
+    for (const auto &[pauli_string, coeff] : ham) {
+        auto mask = GenPauliMask(pauli_string);
+        auto mask_f = mask.mask_x | mask.mask_y;
+        auto it = group_idx.find(mask_f);
+        if (it == group_idx.end()) {
+            it = group_idx.emplace(mask_f, groups.size()).first;
+            groups.emplace_back();
+            groups.back().mask_f = mask_f;
+        }
+        auto &group = groups[it->second];
+        group.mask_yz.push_back(mask.mask_y | mask.mask_z);
+        group.coeffs.push_back(coeff * POLAR[mask.num_y & 3]);
+    }
+    return groups;
+}
+
 SingleQubitGateMask::SingleQubitGateMask(const qbits_t &obj_qubits, const qbits_t &ctrl_qubits) {
     assert(obj_qubits.size() == 1);
     q0 = obj_qubits[0];
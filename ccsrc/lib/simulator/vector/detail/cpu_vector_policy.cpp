@@ -16,6 +16,7 @@
 
 #include <cmath>
 
+#include <algorithm>
 #include <cassert>
 #include <complex>
 #include <cstddef>
@@ -24,6 +25,7 @@
 #include <memory>
 #include <ratio>
 #include <stdexcept>
+#include <string>
 #include <vector>
 
 #include "config/openmp.hpp"
@@ -34,7 +36,8 @@
 #include "simulator/utils.hpp"
 
 namespace mindquantum::sim::vector::detail {
-auto CPUVectorPolicyBase::InitState(index_t dim, bool zero_state) -> qs_data_p_t {
+template <typename calc_type_>
+auto CPUVectorPolicyBase<calc_type_>::InitState(index_t dim, bool zero_state) -> qs_data_p_t {
     auto qs = reinterpret_cast<qs_data_p_t>(calloc(dim, sizeof(qs_data_t)));
     if (zero_state) {
         qs[0] = 1;
@@ -42,19 +45,22 @@ auto CPUVectorPolicyBase::InitState(index_t dim, bool zero_state) -> qs_data_p_t
     return qs;
 }
 
-void CPUVectorPolicyBase::Reset(qs_data_p_t qs, index_t dim) {
+template <typename calc_type_>
+void CPUVectorPolicyBase<calc_type_>::Reset(qs_data_p_t qs, index_t dim) {
     THRESHOLD_OMP_FOR(
         dim, DimTh, for (omp::idx_t i = 0; i < dim; i++) { qs[i] = 0; })
     qs[0] = 1;
 }
 
-void CPUVectorPolicyBase::FreeState(qs_data_p_t qs) {
+template <typename calc_type_>
+void CPUVectorPolicyBase<calc_type_>::FreeState(qs_data_p_t qs) {
     if (qs != nullptr) {
         free(qs);
     }
 }
 
-void CPUVectorPolicyBase::Display(qs_data_p_t qs, qbit_t n_qubits, qbit_t q_limit) {
+template <typename calc_type_>
+void CPUVectorPolicyBase<calc_type_>::Display(qs_data_p_t qs, qbit_t n_qubits, qbit_t q_limit) {
     if (n_qubits > q_limit) {
         n_qubits = q_limit;
     }
@@ -64,7 +70,8 @@ void CPUVectorPolicyBase::Display(qs_data_p_t qs, qbit_t n_qubits, qbit_t q_limi
     }
 }
 
-void CPUVectorPolicyBase::SetToZeroExcept(qs_data_p_t qs, index_t ctrl_mask, index_t dim) {
+template <typename calc_type_>
+void CPUVectorPolicyBase<calc_type_>::SetToZeroExcept(qs_data_p_t qs, index_t ctrl_mask, index_t dim) {
     THRESHOLD_OMP_FOR(
         dim, DimTh, for (omp::idx_t i = 0; i < dim; i++) {
             if ((i & ctrl_mask) != ctrl_mask) {
@@ -73,10 +80,11 @@ void CPUVectorPolicyBase::SetToZeroExcept(qs_data_p_t qs, index_t ctrl_mask, ind
         })
 }
 
+template <typename calc_type_>
 template <class binary_op>
-void CPUVectorPolicyBase::ConditionalBinary(qs_data_p_t src, qs_data_p_t des, index_t mask, index_t condi,
-                                            qs_data_t succ_coeff, qs_data_t fail_coeff, index_t dim,
-                                            const binary_op& op) {
+void CPUVectorPolicyBase<calc_type_>::ConditionalBinary(qs_data_p_t src, qs_data_p_t des, index_t mask, index_t condi,
+                                                        qs_data_t succ_coeff, qs_data_t fail_coeff, index_t dim,
+                                                        const binary_op& op) {
     // if index mask satisfied condition, multiply by succe_coeff, otherwise multiply fail_coeff
     THRESHOLD_OMP_FOR(
         dim, DimTh, for (omp::idx_t i = 0; i < dim; i++) {
@@ -88,9 +96,10 @@ void CPUVectorPolicyBase::ConditionalBinary(qs_data_p_t src, qs_data_p_t des, in
         })
 }
 
+template <typename calc_type_>
 template <index_t mask, index_t condi, class binary_op>
-void CPUVectorPolicyBase::ConditionalBinary(qs_data_p_t src, qs_data_p_t des, qs_data_t succ_coeff,
-                                            qs_data_t fail_coeff, index_t dim, const binary_op& op) {
+void CPUVectorPolicyBase<calc_type_>::ConditionalBinary(qs_data_p_t src, qs_data_p_t des, qs_data_t succ_coeff,
+                                                        qs_data_t fail_coeff, index_t dim, const binary_op& op) {
     // if index mask satisfied condition, multiply by succe_coeff, otherwise multiply fail_coeff
     THRESHOLD_OMP_FOR(
         dim, DimTh, for (omp::idx_t i = 0; i < dim; i++) {
@@ -102,28 +111,34 @@ void CPUVectorPolicyBase::ConditionalBinary(qs_data_p_t src, qs_data_p_t des, qs
         })
 }
 
-void CPUVectorPolicyBase::QSMulValue(qs_data_p_t src, qs_data_p_t des, qs_data_t value, index_t dim) {
+template <typename calc_type_>
+void CPUVectorPolicyBase<calc_type_>::QSMulValue(qs_data_p_t src, qs_data_p_t des, qs_data_t value, index_t dim) {
     ConditionalBinary<0, 0>(src, des, value, 0, dim, std::multiplies<qs_data_t>());
 }
-void CPUVectorPolicyBase::ConditionalAdd(qs_data_p_t src, qs_data_p_t des, index_t mask, index_t condi,
-                                         qs_data_t succ_coeff, qs_data_t fail_coeff, index_t dim) {
+template <typename calc_type_>
+void CPUVectorPolicyBase<calc_type_>::ConditionalAdd(qs_data_p_t src, qs_data_p_t des, index_t mask, index_t condi,
+                                                     qs_data_t succ_coeff, qs_data_t fail_coeff, index_t dim) {
     ConditionalBinary(src, des, mask, condi, succ_coeff, fail_coeff, dim, std::plus<qs_data_t>());
 }
-void CPUVectorPolicyBase::ConditionalMinus(qs_data_p_t src, qs_data_p_t des, index_t mask, index_t condi,
-                                           qs_data_t succ_coeff, qs_data_t fail_coeff, index_t dim) {
+template <typename calc_type_>
+void CPUVectorPolicyBase<calc_type_>::ConditionalMinus(qs_data_p_t src, qs_data_p_t des, index_t mask, index_t condi,
+                                                       qs_data_t succ_coeff, qs_data_t fail_coeff, index_t dim) {
     ConditionalBinary(src, des, mask, condi, succ_coeff, fail_coeff, dim, std::minus<qs_data_t>());
 }
-void CPUVectorPolicyBase::ConditionalMul(qs_data_p_t src, qs_data_p_t des, index_t mask, index_t condi,
-                                         qs_data_t succ_coeff, qs_data_t fail_coeff, index_t dim) {
+template <typename calc_type_>
+void CPUVectorPolicyBase<calc_type_>::ConditionalMul(qs_data_p_t src, qs_data_p_t des, index_t mask, index_t condi,
+                                                     qs_data_t succ_coeff, qs_data_t fail_coeff, index_t dim) {
     ConditionalBinary(src, des, mask, condi, succ_coeff, fail_coeff, dim, std::multiplies<qs_data_t>());
 }
-void CPUVectorPolicyBase::ConditionalDiv(qs_data_p_t src, qs_data_p_t des, index_t mask, index_t condi,
-                                         qs_data_t succ_coeff, qs_data_t fail_coeff, index_t dim) {
+template <typename calc_type_>
+void CPUVectorPolicyBase<calc_type_>::ConditionalDiv(qs_data_p_t src, qs_data_p_t des, index_t mask, index_t condi,
+                                                     qs_data_t succ_coeff, qs_data_t fail_coeff, index_t dim) {
     ConditionalBinary(src, des, mask, condi, succ_coeff, fail_coeff, dim, std::divides<qs_data_t>());
 }
 
-auto CPUVectorPolicyBase::ConditionalCollect(qs_data_p_t qs, index_t mask, index_t condi, bool abs, index_t dim)
-    -> qs_data_t {
+template <typename calc_type_>
+auto CPUVectorPolicyBase<calc_type_>::ConditionalCollect(qs_data_p_t qs, index_t mask, index_t condi, bool abs,
+                                                         index_t dim) -> qs_data_t {
     // collect amplitude with index mask satisfied condition.
     calc_type res_real = 0, res_imag = 0;
     if (abs) {
@@ -147,14 +162,16 @@ auto CPUVectorPolicyBase::ConditionalCollect(qs_data_p_t qs, index_t mask, index
     return qs_data_t(res_real, res_imag);
 }
 
-auto CPUVectorPolicyBase::Copy(qs_data_p_t qs, index_t dim) -> qs_data_p_t {
+template <typename calc_type_>
+auto CPUVectorPolicyBase<calc_type_>::Copy(qs_data_p_t qs, index_t dim) -> qs_data_p_t {
     qs_data_p_t out = CPUVectorPolicyBase::InitState(dim, false);
     THRESHOLD_OMP_FOR(
         dim, DimTh, for (omp::idx_t i = 0; i < dim; i++) { out[i] = qs[i]; })
     return out;
 };
 
-auto CPUVectorPolicyBase::Vdot(qs_data_p_t bra, qs_data_p_t ket, index_t dim) -> py_qs_data_t {
+template <typename calc_type_>
+auto CPUVectorPolicyBase<calc_type_>::Vdot(qs_data_p_t bra, qs_data_p_t ket, index_t dim) -> py_qs_data_t {
     calc_type res_real = 0, res_imag = 0;
     // clang-format off
     THRESHOLD_OMP(
@@ -167,8 +184,9 @@ auto CPUVectorPolicyBase::Vdot(qs_data_p_t bra, qs_data_p_t ket, index_t dim) ->
     return {res_real, res_imag};
 }
 
+template <typename calc_type_>
 template <index_t mask, index_t condi>
-auto CPUVectorPolicyBase::ConditionVdot(qs_data_p_t bra, qs_data_p_t ket, index_t dim) -> py_qs_data_t {
+auto CPUVectorPolicyBase<calc_type_>::ConditionVdot(qs_data_p_t bra, qs_data_p_t ket, index_t dim) -> py_qs_data_t {
     calc_type res_real = 0, res_imag = 0;
     // clang-format off
     THRESHOLD_OMP(
@@ -183,7 +201,8 @@ auto CPUVectorPolicyBase::ConditionVdot(qs_data_p_t bra, qs_data_p_t ket, index_
     return {res_real, res_imag};
 }
 
-auto CPUVectorPolicyBase::OneStateVdot(qs_data_p_t bra, qs_data_p_t ket, qbit_t obj_qubit, index_t dim)
+template <typename calc_type_>
+auto CPUVectorPolicyBase<calc_type_>::OneStateVdot(qs_data_p_t bra, qs_data_p_t ket, qbit_t obj_qubit, index_t dim)
     -> py_qs_data_t {
     SingleQubitGateMask mask({obj_qubit}, {});
     calc_type res_real = 0, res_imag = 0;
@@ -199,7 +218,8 @@ auto CPUVectorPolicyBase::OneStateVdot(qs_data_p_t bra, qs_data_p_t ket, qbit_t
     return {res_real, res_imag};
 }
 
-auto CPUVectorPolicyBase::ZeroStateVdot(qs_data_p_t bra, qs_data_p_t ket, qbit_t obj_qubit, index_t dim)
+template <typename calc_type_>
+auto CPUVectorPolicyBase<calc_type_>::ZeroStateVdot(qs_data_p_t bra, qs_data_p_t ket, qbit_t obj_qubit, index_t dim)
     -> py_qs_data_t {
     SingleQubitGateMask mask({obj_qubit}, {});
     calc_type res_real = 0, res_imag = 0;
@@ -215,14 +235,16 @@ auto CPUVectorPolicyBase::ZeroStateVdot(qs_data_p_t bra, qs_data_p_t ket, qbit_t
     return {res_real, res_imag};
 }
 
-auto CPUVectorPolicyBase::GetQS(qs_data_p_t qs, index_t dim) -> py_qs_datas_t {
+template <typename calc_type_>
+auto CPUVectorPolicyBase<calc_type_>::GetQS(qs_data_p_t qs, index_t dim) -> py_qs_datas_t {
     py_qs_datas_t out(dim);
     THRESHOLD_OMP_FOR(
         dim, DimTh, for (omp::idx_t i = 0; i < dim; i++) { out[i] = qs[i]; })
     return out;
 }
 
-void CPUVectorPolicyBase::SetQS(qs_data_p_t qs, const py_qs_datas_t& qs_out, index_t dim) {
+template <typename calc_type_>
+void CPUVectorPolicyBase<calc_type_>::SetQS(qs_data_p_t qs, const py_qs_datas_t& qs_out, index_t dim) {
     if (qs_out.size() != dim) {
         throw std::invalid_argument("state size not match");
     }
@@ -230,23 +252,128 @@ void CPUVectorPolicyBase::SetQS(qs_data_p_t qs, const py_qs_datas_t& qs_out, ind
         dim, DimTh, for (omp::idx_t i = 0; i < dim; i++) { qs[i] = qs_out[i]; })
 }
 
-auto CPUVectorPolicyBase::ApplyTerms(qs_data_p_t qs, const std::vector<PauliTerm<calc_type>>& ham, index_t dim)
-    -> qs_data_p_t {
+template <typename calc_type_>
+auto CPUVectorPolicyBase<calc_type_>::GetMarginalProbs(qs_data_p_t qs, const qbits_t& qubits, index_t dim)
+    -> std::vector<calc_type> {
+    index_t n_out = 1UL << qubits.size();
+    index_t n_rest = dim / n_out;
+    SubsystemMask mask(qubits);
+    std::vector<calc_type> out(n_out, 0);
+    if (n_out >= n_rest) {
+        THRESHOLD_OMP_FOR(
+            dim, DimTh, for (omp::idx_t o = 0; o < n_out; o++) {
+                auto condi = mask.OutcomeToFull(o);
+                calc_type res = 0;
+                for (index_t r = 0; r < n_rest; r++) {
+                    auto i = mask.RestToFull(r) | condi;
+                    res += qs[i].real() * qs[i].real() + qs[i].imag() * qs[i].imag();
+                }
+                out[o] = res;
+            })
+    } else {
+        for (index_t o = 0; o < n_out; o++) {
+            auto condi = mask.OutcomeToFull(o);
+            calc_type res = 0;
+            // clang-format off
+            THRESHOLD_OMP(
+                MQ_DO_PRAGMA(omp parallel for schedule(static) reduction(+: res)), dim, DimTh,
+                    for (omp::idx_t r = 0; r < n_rest; r++) {
+                        auto i = mask.RestToFull(r) | condi;
+                        res += qs[i].real() * qs[i].real() + qs[i].imag() * qs[i].imag();
+                    })
+            // clang-format on
+            out[o] = res;
+        }
+    }
+    return out;
+}
+
+template <typename calc_type_>
+auto CPUVectorPolicyBase<calc_type_>::GetAmplitudes(qs_data_p_t qs, const std::vector<index_t>& indices, index_t dim)
+    -> py_qs_datas_t {
+    py_qs_datas_t out(indices.size());
+    for (size_t k = 0; k < indices.size(); k++) {
+        if (indices[k] >= dim) {
+            throw std::out_of_range("Index " + std::to_string(indices[k]) + " out of range of quantum state.");
+        }
+        out[k] = qs[indices[k]];
+    }
+    return out;
+}
+
+template <typename calc_type_>
+auto CPUVectorPolicyBase<calc_type_>::GetReducedDensityMatrix(qs_data_p_t qs, const qbits_t& qubits, index_t dim)
+    -> VVT<py_qs_data_t> {
+    index_t n_out = 1UL << qubits.size();
+    index_t n_rest = dim / n_out;
+    SubsystemMask mask(qubits);
+    VVT<py_qs_data_t> out(n_out, py_qs_datas_t(n_out, 0));
+    // Only the lower triangle is calculated, the upper triangle is its conjugate.
+    if (n_out * n_out >= n_rest) {
+        THRESHOLD_OMP(
+            MQ_DO_PRAGMA(omp parallel for schedule(dynamic)), dim, DimTh, for (omp::idx_t a = 0; a < n_out; a++) {
+                auto condi_a = mask.OutcomeToFull(a);
+                for (index_t b = 0; b <= a; b++) {
+                    auto condi_b = mask.OutcomeToFull(b);
+                    py_qs_data_t res = 0;
+                    for (index_t r = 0; r < n_rest; r++) {
+                        auto rest = mask.RestToFull(r);
+                        res += py_qs_data_t(qs[rest | condi_a]) * std::conj(py_qs_data_t(qs[rest | condi_b]));
+                    }
+                    out[a][b] = res;
+                    out[b][a] = std::conj(res);
+                }
+            })
+    } else {
+        for (index_t a = 0; a < n_out; a++) {
+            auto condi_a = mask.OutcomeToFull(a);
+            for (index_t b = 0; b <= a; b++) {
+                auto condi_b = mask.OutcomeToFull(b);
+                calc_type res_real = 0, res_imag = 0;
+                // clang-format off
+                THRESHOLD_OMP(
+                    MQ_DO_PRAGMA(omp parallel for schedule(static) reduction(+: res_real, res_imag)), dim, DimTh,
+                        for (omp::idx_t r = 0; r < n_rest; r++) {
+                            auto rest = mask.RestToFull(r);
+                            auto ket = qs[rest | condi_a];
+                            auto bra = qs[rest | condi_b];
+                            res_real += ket.real() * bra.real() + ket.imag() * bra.imag();
+                            res_imag += ket.imag() * bra.real() - ket.real() * bra.imag();
+                        })
+                // clang-format on
+                out[a][b] = py_qs_data_t(res_real, res_imag);
+                out[b][a] = std::conj(out[a][b]);
+            }
+        }
+    }
+    return out;
+}
+
+template <typename calc_type_>
+auto CPUVectorPolicyBase<calc_type_>::ApplyTerms(qs_data_p_t qs, const std::vector<PauliTerm<sim::calc_type>>& ham,
+                                                 index_t dim) -> qs_data_p_t {
     qs_data_p_t out = CPUVectorPolicyBase::InitState(dim, false);
-    for (const auto& [pauli_string, coeff_] : ham) {
-        auto mask = GenPauliMask(pauli_string);
-        auto mask_f = mask.mask_x | mask.mask_y;
-        auto coeff = coeff_;
+    // Terms with the same flip mask are applied in one sweep, so the memory traffic scales with the number of groups.
+    for (const auto& group : GroupPauliTerms(ham)) {
+        auto mask_f = group.mask_f;
+        const auto& mask_yz = group.mask_yz;
+        std::vector<qs_data_t> coeffs(group.coeffs.begin(), group.coeffs.end());
+        auto n_terms = coeffs.size();
         THRESHOLD_OMP_FOR(
             dim, DimTh, for (omp::idx_t i = 0; i < dim; i++) {
                 auto j = (i ^ mask_f);
                 if (i <= j) {
-                    auto axis2power = CountOne(static_cast<int64_t>(i & mask.mask_z));  // -1
-                    auto axis3power = CountOne(static_cast<int64_t>(i & mask.mask_y));  // -1j
-                    auto c = POLAR[static_cast<char>((mask.num_y + 2 * axis3power + 2 * axis2power) & 3)];
-                    out[j] += qs[i] * coeff * c;
+                    qs_data_t c = 0;
+                    for (size_t t = 0; t < n_terms; t++) {
+                        if (CountOne(static_cast<int64_t>(i & mask_yz[t])) & 1) {
+                            c -= coeffs[t];
+                        } else {
+                            c += coeffs[t];
+                        }
+                    }
+                    out[j] += qs[i] * c;
                     if (i != j) {
-                        out[i] += qs[j] * coeff / c;
+                        out[i] += qs[j] * std::conj(c);
                     }
                 }
             })
@@ -254,7 +381,46 @@ auto CPUVectorPolicyBase::ApplyTerms(qs_data_p_t qs, const std::vector<PauliTerm
     return out;
 };
 
-void CPUVectorPolicyBase::ApplySWAP(qs_data_p_t qs, const qbits_t& objs, const qbits_t& ctrls, index_t dim) {
+template <typename calc_type_>
+auto CPUVectorPolicyBase<calc_type_>::ExpectationOfTerms(qs_data_p_t bra, qs_data_p_t ket,
+                                                         const std::vector<PauliTerm<sim::calc_type>>& ham, index_t dim)
+    -> py_qs_data_t {
+    calc_type res_real = 0, res_imag = 0;
+    for (const auto& group : GroupPauliTerms(ham)) {
+        auto mask_f = group.mask_f;
+        const auto& mask_yz = group.mask_yz;
+        std::vector<qs_data_t> coeffs(group.coeffs.begin(), group.coeffs.end());
+        auto n_terms = coeffs.size();
+        // clang-format off
+        THRESHOLD_OMP(
+            MQ_DO_PRAGMA(omp parallel for reduction(+:res_real, res_imag) schedule(static)), dim, DimTh,
+                for (omp::idx_t i = 0; i < dim; i++) {
+                    auto j = (i ^ mask_f);
+                    if (i <= j) {
+                        qs_data_t c = 0;
+                        for (size_t t = 0; t < n_terms; t++) {
+                            if (CountOne(static_cast<int64_t>(i & mask_yz[t])) & 1) {
+                                c -= coeffs[t];
+                            } else {
+                                c += coeffs[t];
+                            }
+                        }
+                        auto tmp = std::conj(bra[j]) * ket[i] * c;
+                        if (i != j) {
+                            tmp += std::conj(bra[i]) * ket[j] * std::conj(c);
+                        }
+                        res_real += tmp.real();
+                        res_imag += tmp.imag();
+                    }
+                })
+        // clang-format on
+    }
+    return {res_real, res_imag};
+}
+
+template <typename calc_type_>
+void CPUVectorPolicyBase<calc_type_>::ApplySWAP(qs_data_p_t qs, const qbits_t& objs, const qbits_t& ctrls,
+                                                index_t dim) {
     DoubleQubitGateMask mask(objs, ctrls);
     if (!mask.ctrl_mask) {
         THRESHOLD_OMP_FOR(
@@ -285,10 +451,11 @@ void CPUVectorPolicyBase::ApplySWAP(qs_data_p_t qs, const qbits_t& objs, const q
     }
 }
 
-void CPUVectorPolicyBase::ApplyISWAP(qs_data_p_t qs, const qbits_t& objs, const qbits_t& ctrls, bool daggered,
-                                     index_t dim) {
+template <typename calc_type_>
+void CPUVectorPolicyBase<calc_type_>::ApplyISWAP(qs_data_p_t qs, const qbits_t& objs, const qbits_t& ctrls,
+                                                 bool daggered, index_t dim) {
     DoubleQubitGateMask mask(objs, ctrls);
-    double frac = 1.0;
+    calc_type frac = 1.0;
     if (daggered) {
         frac = -1.0;
     }
@@ -317,8 +484,9 @@ void CPUVectorPolicyBase::ApplyISWAP(qs_data_p_t qs, const qbits_t& objs, const
     }
 }
 
-void CPUVectorPolicyBase::ApplyXX(qs_data_p_t qs, const qbits_t& objs, const qbits_t& ctrls, calc_type val, index_t dim,
-                                  bool diff) {
+template <typename calc_type_>
+void CPUVectorPolicyBase<calc_type_>::ApplyXX(qs_data_p_t qs, const qbits_t& objs, const qbits_t& ctrls, calc_type val,
+                                              index_t dim, bool diff) {
     DoubleQubitGateMask mask(objs, ctrls);
     auto c = std::cos(val);
     auto s = std::sin(val) * IMAGE_MI;
@@ -370,8 +538,9 @@ void CPUVectorPolicyBase::ApplyXX(qs_data_p_t qs, const qbits_t& objs, const qbi
     }
 }
 
-void CPUVectorPolicyBase::ApplyYY(qs_data_p_t qs, const qbits_t& objs, const qbits_t& ctrls, calc_type val, index_t dim,
-                                  bool diff) {
+template <typename calc_type_>
+void CPUVectorPolicyBase<calc_type_>::ApplyYY(qs_data_p_t qs, const qbits_t& objs, const qbits_t& ctrls, calc_type val,
+                                              index_t dim, bool diff) {
     DoubleQubitGateMask mask(objs, ctrls);
     auto c = std::cos(val);
     auto s = std::sin(val) * IMAGE_I;
@@ -423,8 +592,9 @@ void CPUVectorPolicyBase::ApplyYY(qs_data_p_t qs, const qbits_t& objs, const qbi
     }
 }
 
-void CPUVectorPolicyBase::ApplyZZ(qs_data_p_t qs, const qbits_t& objs, const qbits_t& ctrls, calc_type val, index_t dim,
-                                  bool diff) {
+template <typename calc_type_>
+void CPUVectorPolicyBase<calc_type_>::ApplyZZ(qs_data_p_t qs, const qbits_t& objs, const qbits_t& ctrls, calc_type val,
+                                              index_t dim, bool diff) {
     DoubleQubitGateMask mask(objs, ctrls);
     auto c = std::cos(val);
     auto s = std::sin(val);
@@ -470,21 +640,44 @@ void CPUVectorPolicyBase::ApplyZZ(qs_data_p_t qs, const qbits_t& objs, const qbi
     }
 }
 
-auto CPUVectorPolicyBase::CsrDotVec(const std::shared_ptr<sparse::CsrHdMatrix<calc_type>>& a, qs_data_p_t vec,
-                                    index_t dim) -> qs_data_p_t {
+template <typename calc_type_>
+auto CPUVectorPolicyBase<calc_type_>::CsrDotVec(const std::shared_ptr<sparse::CsrHdMatrix<sim::calc_type>>& a,
+                                                qs_data_p_t vec, index_t dim) -> qs_data_p_t {
     if (dim != a->dim_) {
         throw std::runtime_error("Sparse hamiltonian size not match with quantum state size.");
     }
-    auto out = sparse::Csr_Dot_Vec<calc_type, calc_type>(a, reinterpret_cast<calc_type*>(vec));
+    auto out = sparse::Csr_Dot_Vec<sim::calc_type, calc_type>(a, reinterpret_cast<calc_type*>(vec));
     return reinterpret_cast<qs_data_p_t>(out);
 }
-auto CPUVectorPolicyBase::CsrDotVec(const std::shared_ptr<sparse::CsrHdMatrix<calc_type>>& a,
-                                    const std::shared_ptr<sparse::CsrHdMatrix<calc_type>>& b, qs_data_p_t vec,
-                                    index_t dim) -> qs_data_p_t {
+template <typename calc_type_>
+auto CPUVectorPolicyBase<calc_type_>::CsrDotVec(const std::shared_ptr<sparse::CsrHdMatrix<sim::calc_type>>& a,
+                                                const std::shared_ptr<sparse::CsrHdMatrix<sim::calc_type>>& b,
+                                                qs_data_p_t vec, index_t dim) -> qs_data_p_t {
     if ((dim != a->dim_) || (dim != b->dim_)) {
         throw std::runtime_error("Sparse hamiltonian size not match with quantum state size.");
     }
-    auto out = sparse::Csr_Dot_Vec<calc_type, calc_type>(a, b, reinterpret_cast<calc_type*>(vec));
+    auto out = sparse::Csr_Dot_Vec<sim::calc_type, calc_type>(a, b, reinterpret_cast<calc_type*>(vec));
     return reinterpret_cast<qs_data_p_t>(out);
 }
+template <typename calc_type_>
+auto CPUVectorPolicyBase<calc_type_>::ExpectationOfCsr(const std::shared_ptr<sparse::CsrHdMatrix<sim::calc_type>>& a,
+                                                       qs_data_p_t bra, qs_data_p_t ket, index_t dim) -> py_qs_data_t {
+    if (dim != a->dim_) {
+        throw std::runtime_error("Sparse hamiltonian size not match with quantum state size.");
+    }
+    return sparse::Csr_Vdot_Vec<sim::calc_type, calc_type>(a, reinterpret_cast<calc_type*>(bra),
+                                                           reinterpret_cast<calc_type*>(ket));
+}
+template <typename calc_type_>
+auto CPUVectorPolicyBase<calc_type_>::ExpectationOfCsr(const std::shared_ptr<sparse::CsrHdMatrix<sim::calc_type>>& a,
+                                                       const std::shared_ptr<sparse::CsrHdMatrix<sim::calc_type>>& b,
+                                                       qs_data_p_t bra, qs_data_p_t ket, index_t dim) -> py_qs_data_t {
+    if ((dim != a->dim_) || (dim != b->dim_)) {
+        throw std::runtime_error("Sparse hamiltonian size not match with quantum state size.");
+    }
+    return sparse::Csr_Vdot_Vec<sim::calc_type, calc_type>(a, b, reinterpret_cast<calc_type*>(bra),
+                                                           reinterpret_cast<calc_type*>(ket));
+}
+template struct CPUVectorPolicyBase<float>;
+template struct CPUVectorPolicyBase<double>;
 }  // namespace mindquantum::sim::vector::detail
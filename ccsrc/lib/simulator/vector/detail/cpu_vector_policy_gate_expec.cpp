@@ -22,6 +22,7 @@
 #include <ratio>
 #include <stdexcept>
 #include <string>
+#include <type_traits>
 #include <vector>
 
 #include "config/openmp.hpp"
@@ -32,9 +33,11 @@
 #include "simulator/vector/detail/cpu_vector_policy.hpp"
 
 namespace mindquantum::sim::vector::detail {
-auto CPUVectorPolicyBase::ExpectDiffTwoQubitsMatrix(qs_data_p_t bra, qs_data_p_t ket, const qbits_t& objs,
-                                                    const qbits_t& ctrls, const std::vector<py_qs_datas_t>& gate,
-                                                    index_t dim) -> qs_data_t {
+template <typename calc_type_>
+auto CPUVectorPolicyBase<calc_type_>::ExpectDiffTwoQubitsMatrix(qs_data_p_t bra, qs_data_p_t ket, const qbits_t& objs,
+                                                                const qbits_t& ctrls,
+                                                                const std::vector<py_qs_datas_t>& gate, index_t dim)
+    -> qs_data_t {
     DoubleQubitGateMask mask(objs, ctrls);
     calc_type res_real = 0, res_imag = 0;
     // clang-format off
@@ -87,70 +90,44 @@ auto CPUVectorPolicyBase::ExpectDiffTwoQubitsMatrix(qs_data_p_t bra, qs_data_p_t
     return {res_real, res_imag};
 };
 
-auto CPUVectorPolicyBase::ExpectDiffSingleQubitMatrix(qs_data_p_t bra, qs_data_p_t ket, const qbits_t& objs,
-                                                      const qbits_t& ctrls, const std::vector<py_qs_datas_t>& m,
-                                                      index_t dim) -> qs_data_t {
+template <typename calc_type_>
+auto CPUVectorPolicyBase<calc_type_>::ExpectDiffSingleQubitMatrix(qs_data_p_t bra, qs_data_p_t ket, const qbits_t& objs,
+                                                                  const qbits_t& ctrls,
+                                                                  const std::vector<py_qs_datas_t>& m, index_t dim)
+    -> qs_data_t {
     SingleQubitGateMask mask(objs, ctrls);
-#ifdef INTRIN
-    gate_matrix_t gate = {{m[0][0], m[0][1]}, {m[1][0], m[1][1]}};
-    __m256d neg = _mm256_setr_pd(1.0, -1.0, 1.0, -1.0);
-    __m256d mm[2];
-    __m256d mmt[2];
-    INTRIN_gene_2d_mm_and_mmt(gate, mm, mmt, neg);
-#endif
     calc_type res_real = 0, res_imag = 0;
-    if (!mask.ctrl_mask) {
-        // clang-format off
-#ifdef INTRIN
-        THRESHOLD_OMP(
-            MQ_DO_PRAGMA(omp parallel for reduction(+:res_real, res_imag) schedule(static)), dim, DimTh,
-                for (omp::idx_t l = 0; l < (dim / 2); l++) {
-                    auto i = ((l & mask.obj_high_mask) << 1) + (l & mask.obj_low_mask);
-                    auto j = i + mask.obj_mask;
-                    __m256d mul_res;
-                    INTRIN_M2_dot_V2(ket, i, j, mm, mmt, mul_res);
-                    __m256d res;
-                    INTRIN_Conj_V2_dot_V2(bra, mul_res, i, j, neg, res);
-                    qs_data_t ress[2];
-                    INTRIN_m256_to_host(res, ress);
-                    res_real += ress[0].real() + ress[1].real();
-                    res_imag += ress[0].imag() + ress[1].imag();
-                });
-#else
-        THRESHOLD_OMP(
-            MQ_DO_PRAGMA(omp parallel for reduction(+:res_real, res_imag) schedule(static)), dim, DimTh,
-                for (omp::idx_t l = 0; l < (dim / 2); l++) {
-                    auto i = ((l & mask.obj_high_mask) << 1) + (l & mask.obj_low_mask);
-                    auto j = i + mask.obj_mask;
-                    auto t1 = m[0][0] * ket[i] + m[0][1] * ket[j];
-                    auto t2 = m[1][0] * ket[i] + [1][1] * ket[j];
-                    auto this_res = std::conj(bra[i]) * t1 + std::conj(bra[j]) * t2;
-                    res_real += this_res.real();
-                    res_imag += this_res.imag();
-                });
-#endif
-        // clang-format on
-    } else {
-        if (mask.ctrl_qubits.size() == 1) {
-            index_t ctrl_low = 0UL;
-            for (qbit_t i = 0; i < mask.ctrl_qubits[0]; i++) {
-                ctrl_low = (ctrl_low << 1) + 1;
-            }
-            index_t first_low_mask = mask.obj_low_mask;
-            index_t second_low_mask = ctrl_low;
-            if (mask.obj_low_mask > ctrl_low) {
-                first_low_mask = ctrl_low;
-                second_low_mask = mask.obj_low_mask;
-            }
-            auto first_high_mask = ~first_low_mask;
-            auto second_high_mask = ~second_low_mask;
-            // clang-format off
+    // Masks to iterate over the indices that one single control qubit is set.
+    index_t first_low_mask = 0UL;
+    index_t second_low_mask = 0UL;
+    if (mask.ctrl_qubits.size() == 1) {
+        index_t ctrl_low = 0UL;
+        for (qbit_t i = 0; i < mask.ctrl_qubits[0]; i++) {
+            ctrl_low = (ctrl_low << 1) + 1;
+        }
+        first_low_mask = mask.obj_low_mask;
+        second_low_mask = ctrl_low;
+        if (mask.obj_low_mask > ctrl_low) {
+            first_low_mask = ctrl_low;
+            second_low_mask = mask.obj_low_mask;
+        }
+    }
+    auto first_high_mask = ~first_low_mask;
+    auto second_high_mask = ~second_low_mask;
 #ifdef INTRIN
+    // The avx kernels only support double precision.
+    if constexpr (std::is_same_v<calc_type, double>) {
+        gate_matrix_t gate = {{m[0][0], m[0][1]}, {m[1][0], m[1][1]}};
+        __m256d neg = _mm256_setr_pd(1.0, -1.0, 1.0, -1.0);
+        __m256d mm[2];
+        __m256d mmt[2];
+        INTRIN_gene_2d_mm_and_mmt(gate, mm, mmt, neg);
+        // clang-format off
+        if (!mask.ctrl_mask) {
             THRESHOLD_OMP(
                 MQ_DO_PRAGMA(omp parallel for reduction(+:res_real, res_imag) schedule(static)), dim, DimTh,
-                    for (omp::idx_t l = 0; l < (dim / 4); l++) {
-                        auto i = ((l & first_high_mask) << 1) + (l & first_low_mask);
-                        i = ((i & second_high_mask) << 1) + (i & second_low_mask) + mask.ctrl_mask;
+                    for (omp::idx_t l = 0; l < (dim / 2); l++) {
+                        auto i = ((l & mask.obj_high_mask) << 1) + (l & mask.obj_low_mask);
                         auto j = i + mask.obj_mask;
                         __m256d mul_res;
                         INTRIN_M2_dot_V2(ket, i, j, mm, mmt, mul_res);
@@ -161,24 +138,23 @@ auto CPUVectorPolicyBase::ExpectDiffSingleQubitMatrix(qs_data_p_t bra, qs_data_p
                         res_real += ress[0].real() + ress[1].real();
                         res_imag += ress[0].imag() + ress[1].imag();
                     });
-#else
+        } else if (mask.ctrl_qubits.size() == 1) {
             THRESHOLD_OMP(
                 MQ_DO_PRAGMA(omp parallel for reduction(+:res_real, res_imag) schedule(static)), dim, DimTh,
                     for (omp::idx_t l = 0; l < (dim / 4); l++) {
                         auto i = ((l & first_high_mask) << 1) + (l & first_low_mask);
                         i = ((i & second_high_mask) << 1) + (i & second_low_mask) + mask.ctrl_mask;
                         auto j = i + mask.obj_mask;
-                        auto t1 = m[0][0] * ket[i] + m[0][1] * ket[j];
-                        auto t2 = m[1][0] * ket[i] + m[1][1] * ket[j];
-                        auto this_res = std::conj(bra[i]) * t1 + std::conj(bra[j]) * t2;
-                        res_real += this_res.real();
-                        res_imag += this_res.imag();
+                        __m256d mul_res;
+                        INTRIN_M2_dot_V2(ket, i, j, mm, mmt, mul_res);
+                        __m256d res;
+                        INTRIN_Conj_V2_dot_V2(bra, mul_res, i, j, neg, res);
+                        qs_data_t ress[2];
+                        INTRIN_m256_to_host(res, ress);
+                        res_real += ress[0].real() + ress[1].real();
+                        res_imag += ress[0].imag() + ress[1].imag();
                     });
-#endif
-            // clang-format on
         } else {
-            // clang-format off
-#ifdef INTRIN
             THRESHOLD_OMP(
                 MQ_DO_PRAGMA(omp parallel for reduction(+:res_real, res_imag) schedule(static)), dim, DimTh,
                     for (omp::idx_t l = 0; l < (dim / 2); l++) {
@@ -195,30 +171,60 @@ auto CPUVectorPolicyBase::ExpectDiffSingleQubitMatrix(qs_data_p_t bra, qs_data_p
                             res_imag += ress[0].imag() + ress[1].imag();
                         }
                     });
-#else
-            THRESHOLD_OMP(
-                MQ_DO_PRAGMA(omp parallel for reduction(+:res_real, res_imag) schedule(static)), dim, DimTh,
-                    for (omp::idx_t l = 0; l < (dim / 2); l++) {
-                        auto i = ((l & mask.obj_high_mask) << 1) + (l & mask.obj_low_mask);
-                        if ((i & mask.ctrl_mask) == mask.ctrl_mask) {
-                            auto j = i + mask.obj_mask;
-                            auto t1 = m[0][0] * ket[i] + m[0][1] * ket[j];
-                            auto t2 = m[1][0] * ket[i] + m[1][1] * ket[j];
-                            auto this_res = std::conj(bra[i]) * t1 + std::conj(bra[j]) * t2;
-                            res_real += this_res.real();
-                            res_imag += this_res.imag();
-                        }
-                    });
-#endif
-            // clang-format on
         }
+        // clang-format on
+        return {res_real, res_imag};
+    }
+#endif
+    // clang-format off
+    if (!mask.ctrl_mask) {
+        THRESHOLD_OMP(
+            MQ_DO_PRAGMA(omp parallel for reduction(+:res_real, res_imag) schedule(static)), dim, DimTh,
+                for (omp::idx_t l = 0; l < (dim / 2); l++) {
+                    auto i = ((l & mask.obj_high_mask) << 1) + (l & mask.obj_low_mask);
+                    auto j = i + mask.obj_mask;
+                    auto t1 = m[0][0] * ket[i] + m[0][1] * ket[j];
+                    auto t2 = m[1][0] * ket[i] + m[1][1] * ket[j];
+                    auto this_res = std::conj(bra[i]) * t1 + std::conj(bra[j]) * t2;
+                    res_real += this_res.real();
+                    res_imag += this_res.imag();
+                });
+    } else if (mask.ctrl_qubits.size() == 1) {
+        THRESHOLD_OMP(
+            MQ_DO_PRAGMA(omp parallel for reduction(+:res_real, res_imag) schedule(static)), dim, DimTh,
+                for (omp::idx_t l = 0; l < (dim / 4); l++) {
+                    auto i = ((l & first_high_mask) << 1) + (l & first_low_mask);
+                    i = ((i & second_high_mask) << 1) + (i & second_low_mask) + mask.ctrl_mask;
+                    auto j = i + mask.obj_mask;
+                    auto t1 = m[0][0] * ket[i] + m[0][1] * ket[j];
+                    auto t2 = m[1][0] * ket[i] + m[1][1] * ket[j];
+                    auto this_res = std::conj(bra[i]) * t1 + std::conj(bra[j]) * t2;
+                    res_real += this_res.real();
+                    res_imag += this_res.imag();
+                });
+    } else {
+        THRESHOLD_OMP(
+            MQ_DO_PRAGMA(omp parallel for reduction(+:res_real, res_imag) schedule(static)), dim, DimTh,
+                for (omp::idx_t l = 0; l < (dim / 2); l++) {
+                    auto i = ((l & mask.obj_high_mask) << 1) + (l & mask.obj_low_mask);
+                    if ((i & mask.ctrl_mask) == mask.ctrl_mask) {
+                        auto j = i + mask.obj_mask;
+                        auto t1 = m[0][0] * ket[i] + m[0][1] * ket[j];
+                        auto t2 = m[1][0] * ket[i] + m[1][1] * ket[j];
+                        auto this_res = std::conj(bra[i]) * t1 + std::conj(bra[j]) * t2;
+                        res_real += this_res.real();
+                        res_imag += this_res.imag();
+                    }
+                });
     }
+    // clang-format on
     return {res_real, res_imag};
 };
 
-auto CPUVectorPolicyBase::ExpectDiffMatrixGate(qs_data_p_t bra, qs_data_p_t ket, const qbits_t& objs,
-                                               const qbits_t& ctrls, const std::vector<py_qs_datas_t>& m, index_t dim)
-    -> qs_data_t {
+template <typename calc_type_>
+auto CPUVectorPolicyBase<calc_type_>::ExpectDiffMatrixGate(qs_data_p_t bra, qs_data_p_t ket, const qbits_t& objs,
+                                                           const qbits_t& ctrls, const std::vector<py_qs_datas_t>& m,
+                                                           index_t dim) -> qs_data_t {
     if (objs.size() == 1) {
         return ExpectDiffSingleQubitMatrix(bra, ket, objs, ctrls, m, dim);
     }
@@ -228,36 +234,40 @@ auto CPUVectorPolicyBase::ExpectDiffMatrixGate(qs_data_p_t bra, qs_data_p_t ket,
     throw std::runtime_error("Expectation of " + std::to_string(objs.size()) + " not implement for cpu backend.");
 }
 
-auto CPUVectorPolicyBase::ExpectDiffRX(qs_data_p_t bra, qs_data_p_t ket, const qbits_t& objs, const qbits_t& ctrls,
-                                       calc_type val, index_t dim) -> qs_data_t {
-    auto c = -0.5 * std::sin(val / 2);
-    auto is = 0.5 * std::cos(val / 2) * IMAGE_MI;
+template <typename calc_type_>
+auto CPUVectorPolicyBase<calc_type_>::ExpectDiffRX(qs_data_p_t bra, qs_data_p_t ket, const qbits_t& objs,
+                                                   const qbits_t& ctrls, calc_type val, index_t dim) -> qs_data_t {
+    auto c = -std::sin(val / 2) / 2;
+    auto is = std::cos(val / 2) / 2 * IMAGE_MI;
     std::vector<py_qs_datas_t> gate = {{c, is}, {is, c}};
     return CPUVectorPolicyBase::ExpectDiffSingleQubitMatrix(bra, ket, objs, ctrls, gate, dim);
 };
 
-auto CPUVectorPolicyBase::ExpectDiffRY(qs_data_p_t bra, qs_data_p_t ket, const qbits_t& objs, const qbits_t& ctrls,
-                                       calc_type val, index_t dim) -> qs_data_t {
+template <typename calc_type_>
+auto CPUVectorPolicyBase<calc_type_>::ExpectDiffRY(qs_data_p_t bra, qs_data_p_t ket, const qbits_t& objs,
+                                                   const qbits_t& ctrls, calc_type val, index_t dim) -> qs_data_t {
     SingleQubitGateMask mask(objs, ctrls);
-    auto c = -0.5 * std::sin(val / 2);
-    auto s = 0.5 * std::cos(val / 2);
+    auto c = -std::sin(val / 2) / 2;
+    auto s = std::cos(val / 2) / 2;
     std::vector<py_qs_datas_t> gate = {{c, -s}, {s, c}};
     return CPUVectorPolicyBase::ExpectDiffSingleQubitMatrix(bra, ket, objs, ctrls, gate, dim);
 };
 
-auto CPUVectorPolicyBase::ExpectDiffRZ(qs_data_p_t bra, qs_data_p_t ket, const qbits_t& objs, const qbits_t& ctrls,
-                                       calc_type val, index_t dim) -> qs_data_t {
+template <typename calc_type_>
+auto CPUVectorPolicyBase<calc_type_>::ExpectDiffRZ(qs_data_p_t bra, qs_data_p_t ket, const qbits_t& objs,
+                                                   const qbits_t& ctrls, calc_type val, index_t dim) -> qs_data_t {
     SingleQubitGateMask mask(objs, ctrls);
-    auto c = -0.5 * std::sin(val / 2);
-    auto s = 0.5 * std::cos(val / 2);
+    auto c = -std::sin(val / 2) / 2;
+    auto s = std::cos(val / 2) / 2;
     auto e0 = c + IMAGE_MI * s;
     auto e1 = c + IMAGE_I * s;
     std::vector<py_qs_datas_t> gate = {{e0, 0}, {0, e1}};
     return CPUVectorPolicyBase::ExpectDiffSingleQubitMatrix(bra, ket, objs, ctrls, gate, dim);
 };
 
-auto CPUVectorPolicyBase::ExpectDiffGP(qs_data_p_t bra, qs_data_p_t ket, const qbits_t& objs, const qbits_t& ctrls,
-                                       calc_type val, index_t dim) -> qs_data_t {
+template <typename calc_type_>
+auto CPUVectorPolicyBase<calc_type_>::ExpectDiffGP(qs_data_p_t bra, qs_data_p_t ket, const qbits_t& objs,
+                                                   const qbits_t& ctrls, calc_type val, index_t dim) -> qs_data_t {
     SingleQubitGateMask mask(objs, ctrls);
     auto e = std::complex<calc_type>(0, -1);
     e *= std::exp(std::complex<calc_type>(0, -val));
@@ -265,8 +275,9 @@ auto CPUVectorPolicyBase::ExpectDiffGP(qs_data_p_t bra, qs_data_p_t ket, const q
     return CPUVectorPolicyBase::ExpectDiffSingleQubitMatrix(bra, ket, objs, ctrls, gate, dim);
 }
 
-auto CPUVectorPolicyBase::ExpectDiffPS(qs_data_p_t bra, qs_data_p_t ket, const qbits_t& objs, const qbits_t& ctrls,
-                                       calc_type val, index_t dim) -> qs_data_t {
+template <typename calc_type_>
+auto CPUVectorPolicyBase<calc_type_>::ExpectDiffPS(qs_data_p_t bra, qs_data_p_t ket, const qbits_t& objs,
+                                                   const qbits_t& ctrls, calc_type val, index_t dim) -> qs_data_t {
     SingleQubitGateMask mask(objs, ctrls);
     calc_type res_real = 0, res_imag = 0;
 
@@ -302,8 +313,9 @@ auto CPUVectorPolicyBase::ExpectDiffPS(qs_data_p_t bra, qs_data_p_t ket, const q
     return {res_real, res_imag};
 };
 
-auto CPUVectorPolicyBase::ExpectDiffXX(qs_data_p_t bra, qs_data_p_t ket, const qbits_t& objs, const qbits_t& ctrls,
-                                       calc_type val, index_t dim) -> qs_data_t {
+template <typename calc_type_>
+auto CPUVectorPolicyBase<calc_type_>::ExpectDiffXX(qs_data_p_t bra, qs_data_p_t ket, const qbits_t& objs,
+                                                   const qbits_t& ctrls, calc_type val, index_t dim) -> qs_data_t {
     DoubleQubitGateMask mask(objs, ctrls);
     auto c = -std::sin(val);
     auto s = std::cos(val) * IMAGE_MI;
@@ -357,8 +369,9 @@ auto CPUVectorPolicyBase::ExpectDiffXX(qs_data_p_t bra, qs_data_p_t ket, const q
     return {res_real, res_imag};
 };
 
-auto CPUVectorPolicyBase::ExpectDiffYY(qs_data_p_t bra, qs_data_p_t ket, const qbits_t& objs, const qbits_t& ctrls,
-                                       calc_type val, index_t dim) -> qs_data_t {
+template <typename calc_type_>
+auto CPUVectorPolicyBase<calc_type_>::ExpectDiffYY(qs_data_p_t bra, qs_data_p_t ket, const qbits_t& objs,
+                                                   const qbits_t& ctrls, calc_type val, index_t dim) -> qs_data_t {
     DoubleQubitGateMask mask(objs, ctrls);
     auto c = -std::sin(val);
     auto s = std::cos(val) * IMAGE_I;
@@ -412,8 +425,9 @@ auto CPUVectorPolicyBase::ExpectDiffYY(qs_data_p_t bra, qs_data_p_t ket, const q
     return {res_real, res_imag};
 };
 
-auto CPUVectorPolicyBase::ExpectDiffZZ(qs_data_p_t bra, qs_data_p_t ket, const qbits_t& objs, const qbits_t& ctrls,
-                                       calc_type val, index_t dim) -> qs_data_t {
+template <typename calc_type_>
+auto CPUVectorPolicyBase<calc_type_>::ExpectDiffZZ(qs_data_p_t bra, qs_data_p_t ket, const qbits_t& objs,
+                                                   const qbits_t& ctrls, calc_type val, index_t dim) -> qs_data_t {
     DoubleQubitGateMask mask(objs, ctrls);
 
     auto c = -std::sin(val);
@@ -461,4 +475,6 @@ auto CPUVectorPolicyBase::ExpectDiffZZ(qs_data_p_t bra, qs_data_p_t ket, const q
     }
     return {res_real, res_imag};
 };
+template struct CPUVectorPolicyBase<float>;
+template struct CPUVectorPolicyBase<double>;
 }  // namespace mindquantum::sim::vector::detail
@@ -22,6 +22,7 @@
 #include <ratio>
 #include <stdexcept>
 #include <string>
+#include <type_traits>
 #include <vector>
 
 #include "config/openmp.hpp"
@@ -38,9 +39,18 @@
 namespace mindquantum::sim::vector::detail {
 // Single qubit operator
 // ========================================================================================================
-void CPUVectorPolicyBase::ApplyTwoQubitsMatrix(qs_data_p_t src, qs_data_p_t des, const qbits_t& objs,
-                                               const qbits_t& ctrls, const std::vector<std::vector<py_qs_data_t>>& gate,
-                                               index_t dim) {
+template <typename calc_type_>
+void CPUVectorPolicyBase<calc_type_>::ApplyTwoQubitsMatrix(qs_data_p_t src, qs_data_p_t des, const qbits_t& objs,
+                                                           const qbits_t& ctrls,
+                                                           const std::vector<std::vector<py_qs_data_t>>& m,
+                                                           index_t dim) {
+    // Keep the matrix in local storage, so that it is not reloaded from the nested vector for every amplitude.
+    py_qs_data_t gate[4][4];
+    for (int r = 0; r < 4; r++) {
+        for (int c = 0; c < 4; c++) {
+            gate[r][c] = m[r][c];
+        }
+    }
     DoubleQubitGateMask mask(objs, ctrls);
     if (!mask.ctrl_mask) {
         // clang-format off
@@ -84,28 +94,45 @@ void CPUVectorPolicyBase::ApplyTwoQubitsMatrix(qs_data_p_t src, qs_data_p_t des,
             })
     }
 }
-void CPUVectorPolicyBase::ApplySingleQubitMatrix(qs_data_p_t src, qs_data_p_t des, qbit_t obj_qubit,
-                                                 const qbits_t& ctrls, const std::vector<std::vector<py_qs_data_t>>& m,
-                                                 index_t dim) {
+template <typename calc_type_>
+void CPUVectorPolicyBase<calc_type_>::ApplySingleQubitMatrix(qs_data_p_t src, qs_data_p_t des, qbit_t obj_qubit,
+                                                             const qbits_t& ctrls,
+                                                             const std::vector<std::vector<py_qs_data_t>>& m,
+                                                             index_t dim) {
     SingleQubitGateMask mask({obj_qubit}, ctrls);
 #ifdef INTRIN
-    gate_matrix_t gate = {{m[0][0], m[0][1]}, {m[1][0], m[1][1]}};
-    __m256d neg = _mm256_setr_pd(1.0, -1.0, 1.0, -1.0);
-    __m256d mm[2];
-    __m256d mmt[2];
-    INTRIN_gene_2d_mm_and_mmt(gate, mm, mmt, neg);
+    // The avx kernels only support double precision.
+    if constexpr (std::is_same_v<calc_type, double>) {
+        gate_matrix_t gate = {{m[0][0], m[0][1]}, {m[1][0], m[1][1]}};
+        __m256d neg = _mm256_setr_pd(1.0, -1.0, 1.0, -1.0);
+        __m256d mm[2];
+        __m256d mmt[2];
+        INTRIN_gene_2d_mm_and_mmt(gate, mm, mmt, neg);
+        if (!mask.ctrl_mask) {
+            THRESHOLD_OMP_FOR(
+                dim, DimTh, for (omp::idx_t l = 0; l < (dim / 2); l++) {
+                    auto i = ((l & mask.obj_high_mask) << 1) + (l & mask.obj_low_mask);
+                    auto j = i + mask.obj_mask;
+                    __m256d mul_res;
+                    INTRIN_M2_dot_V2(src, i, j, mm, mmt, mul_res);
+                    INTRIN_m256_to_host2(mul_res, des + i, des + j);
+                })
+        } else {
+            THRESHOLD_OMP_FOR(
+                dim, DimTh, for (omp::idx_t l = 0; l < (dim / 2); l++) {
+                    auto i = ((l & mask.obj_high_mask) << 1) + (l & mask.obj_low_mask);
+                    if ((i & mask.ctrl_mask) == mask.ctrl_mask) {
+                        auto j = i + mask.obj_mask;
+                        __m256d mul_res;
+                        INTRIN_M2_dot_V2(src, i, j, mm, mmt, mul_res);
+                        INTRIN_m256_to_host2(mul_res, des + i, des + j);
+                    }
+                });
+        }
+        return;
+    }
 #endif
     if (!mask.ctrl_mask) {
-#ifdef INTRIN
-        THRESHOLD_OMP_FOR(
-            dim, DimTh, for (omp::idx_t l = 0; l < (dim / 2); l++) {
-                auto i = ((l & mask.obj_high_mask) << 1) + (l & mask.obj_low_mask);
-                auto j = i + mask.obj_mask;
-                __m256d mul_res;
-                INTRIN_M2_dot_V2(src, i, j, mm, mmt, mul_res);
-                INTRIN_m256_to_host2(mul_res, des + i, des + j);
-            })
-#else
         THRESHOLD_OMP_FOR(
             dim, DimTh, for (omp::idx_t l = 0; l < (dim / 2); l++) {
                 auto i = ((l & mask.obj_high_mask) << 1) + (l & mask.obj_low_mask);
@@ -115,20 +142,7 @@ void CPUVectorPolicyBase::ApplySingleQubitMatrix(qs_data_p_t src, qs_data_p_t de
                 des[i] = t1;
                 des[j] = t2;
             })
-#endif
     } else {
-#ifdef INTRIN
-        THRESHOLD_OMP_FOR(
-            dim, DimTh, for (omp::idx_t l = 0; l < (dim / 2); l++) {
-                auto i = ((l & mask.obj_high_mask) << 1) + (l & mask.obj_low_mask);
-                if ((i & mask.ctrl_mask) == mask.ctrl_mask) {
-                    auto j = i + mask.obj_mask;
-                    __m256d mul_res;
-                    INTRIN_M2_dot_V2(src, i, j, mm, mmt, mul_res);
-                    INTRIN_m256_to_host2(mul_res, des + i, des + j);
-                }
-            });
-#else
         THRESHOLD_OMP_FOR(
             dim, DimTh, for (omp::idx_t l = 0; l < (dim / 2); l++) {
                 auto i = ((l & mask.obj_high_mask) << 1) + (l & mask.obj_low_mask);
@@ -140,12 +154,13 @@ void CPUVectorPolicyBase::ApplySingleQubitMatrix(qs_data_p_t src, qs_data_p_t de
                     des[j] = t2;
                 }
             });
-#endif
     }
 }
 
-void CPUVectorPolicyBase::ApplyMatrixGate(qs_data_p_t src, qs_data_p_t des, const qbits_t& objs, const qbits_t& ctrls,
-                                          const std::vector<std::vector<py_qs_data_t>>& m, index_t dim) {
+template <typename calc_type_>
+void CPUVectorPolicyBase<calc_type_>::ApplyMatrixGate(qs_data_p_t src, qs_data_p_t des, const qbits_t& objs,
+                                                      const qbits_t& ctrls,
+                                                      const std::vector<std::vector<py_qs_data_t>>& m, index_t dim) {
     if (objs.size() == 1) {
         ApplySingleQubitMatrix(src, des, objs[0], ctrls, m, dim);
     } else if (objs.size() == 2) {
@@ -155,20 +170,23 @@ void CPUVectorPolicyBase::ApplyMatrixGate(qs_data_p_t src, qs_data_p_t des, cons
     }
 }
 
-void CPUVectorPolicyBase::ApplyH(qs_data_p_t qs, const qbits_t& objs, const qbits_t& ctrls, index_t dim) {
+template <typename calc_type_>
+void CPUVectorPolicyBase<calc_type_>::ApplyH(qs_data_p_t qs, const qbits_t& objs, const qbits_t& ctrls, index_t dim) {
     std::vector<std::vector<py_qs_data_t>> m{{M_SQRT1_2, M_SQRT1_2}, {M_SQRT1_2, -M_SQRT1_2}};
     ApplySingleQubitMatrix(qs, qs, objs[0], ctrls, m, dim);
 }
 
-void CPUVectorPolicyBase::ApplyGP(qs_data_p_t qs, qbit_t obj_qubit, const qbits_t& ctrls, calc_type val, index_t dim,
-                                  bool diff) {
+template <typename calc_type_>
+void CPUVectorPolicyBase<calc_type_>::ApplyGP(qs_data_p_t qs, qbit_t obj_qubit, const qbits_t& ctrls, calc_type val,
+                                              index_t dim, bool diff) {
     auto c = std::exp(std::complex<calc_type>(0, -val));
     std::vector<std::vector<py_qs_data_t>> m = {{c, 0}, {0, c}};
     ApplySingleQubitMatrix(qs, qs, obj_qubit, ctrls, m, dim);
 }
 
-void CPUVectorPolicyBase::ApplyRX(qs_data_p_t qs, const qbits_t& objs, const qbits_t& ctrls, calc_type val, index_t dim,
-                                  bool diff) {
+template <typename calc_type_>
+void CPUVectorPolicyBase<calc_type_>::ApplyRX(qs_data_p_t qs, const qbits_t& objs, const qbits_t& ctrls, calc_type val,
+                                              index_t dim, bool diff) {
     SingleQubitGateMask mask(objs, ctrls);
     auto a = std::cos(val / 2);
     auto b = -std::sin(val / 2);
@@ -183,8 +201,9 @@ void CPUVectorPolicyBase::ApplyRX(qs_data_p_t qs, const qbits_t& objs, const qbi
     }
 }
 
-void CPUVectorPolicyBase::ApplyRY(qs_data_p_t qs, const qbits_t& objs, const qbits_t& ctrls, calc_type val, index_t dim,
-                                  bool diff) {
+template <typename calc_type_>
+void CPUVectorPolicyBase<calc_type_>::ApplyRY(qs_data_p_t qs, const qbits_t& objs, const qbits_t& ctrls, calc_type val,
+                                              index_t dim, bool diff) {
     SingleQubitGateMask mask(objs, ctrls);
     auto a = std::cos(val / 2);
     auto b = std::sin(val / 2);
@@ -199,8 +218,9 @@ void CPUVectorPolicyBase::ApplyRY(qs_data_p_t qs, const qbits_t& objs, const qbi
     }
 }
 
-void CPUVectorPolicyBase::ApplyRZ(qs_data_p_t qs, const qbits_t& objs, const qbits_t& ctrls, calc_type val, index_t dim,
-                                  bool diff) {
+template <typename calc_type_>
+void CPUVectorPolicyBase<calc_type_>::ApplyRZ(qs_data_p_t qs, const qbits_t& objs, const qbits_t& ctrls, calc_type val,
+                                              index_t dim, bool diff) {
     SingleQubitGateMask mask(objs, ctrls);
     auto a = std::cos(val / 2);
     auto b = std::sin(val / 2);
@@ -214,4 +234,6 @@ void CPUVectorPolicyBase::ApplyRZ(qs_data_p_t qs, const qbits_t& objs, const qbi
         SetToZeroExcept(qs, mask.ctrl_mask, dim);
     }
 }
+template struct CPUVectorPolicyBase<float>;
+template struct CPUVectorPolicyBase<double>;
 }  // namespace mindquantum::sim::vector::detail
@@ -34,8 +34,9 @@ namespace mindquantum::sim::vector::detail {
 // X like operator
 // ========================================================================================================
 
-void CPUVectorPolicyBase::ApplyXLike(qs_data_p_t qs, const qbits_t& objs, const qbits_t& ctrls, qs_data_t v1,
-                                     qs_data_t v2, index_t dim) {
+template <typename calc_type_>
+void CPUVectorPolicyBase<calc_type_>::ApplyXLike(qs_data_p_t qs, const qbits_t& objs, const qbits_t& ctrls,
+                                                 qs_data_t v1, qs_data_t v2, index_t dim) {
     SingleQubitGateMask mask(objs, ctrls);
     if (!mask.ctrl_mask) {
         THRESHOLD_OMP_FOR(
@@ -54,17 +55,21 @@ void CPUVectorPolicyBase::ApplyXLike(qs_data_p_t qs, const qbits_t& objs, const
                     auto j = i | mask.obj_mask;
                     auto tmp = qs[i];
                     qs[i] = qs[j] * v1;
-                    qs[j] = tmp * v1;
+                    qs[j] = tmp * v2;
                 }
             })
     }
 }
 
-void CPUVectorPolicyBase::ApplyX(qs_data_p_t qs, const qbits_t& objs, const qbits_t& ctrls, index_t dim) {
+template <typename calc_type_>
+void CPUVectorPolicyBase<calc_type_>::ApplyX(qs_data_p_t qs, const qbits_t& objs, const qbits_t& ctrls, index_t dim) {
     ApplyXLike(qs, objs, ctrls, 1, 1, dim);
 }
 
-void CPUVectorPolicyBase::ApplyY(qs_data_p_t qs, const qbits_t& objs, const qbits_t& ctrls, index_t dim) {
+template <typename calc_type_>
+void CPUVectorPolicyBase<calc_type_>::ApplyY(qs_data_p_t qs, const qbits_t& objs, const qbits_t& ctrls, index_t dim) {
     ApplyXLike(qs, objs, ctrls, IMAGE_MI, IMAGE_I, dim);
 }
+template struct CPUVectorPolicyBase<float>;
+template struct CPUVectorPolicyBase<double>;
 }  // namespace mindquantum::sim::vector::detail
@@ -34,8 +34,9 @@ namespace mindquantum::sim::vector::detail {
 // Z like operator
 // ========================================================================================================
 
-void CPUVectorPolicyBase::ApplyZLike(qs_data_p_t qs, const qbits_t& objs, const qbits_t& ctrls, qs_data_t val,
-                                     index_t dim) {
+template <typename calc_type_>
+void CPUVectorPolicyBase<calc_type_>::ApplyZLike(qs_data_p_t qs, const qbits_t& objs, const qbits_t& ctrls,
+                                                 qs_data_t val, index_t dim) {
     SingleQubitGateMask mask(objs, ctrls);
     if (!mask.ctrl_mask) {
         THRESHOLD_OMP_FOR(
@@ -54,28 +55,37 @@ void CPUVectorPolicyBase::ApplyZLike(qs_data_p_t qs, const qbits_t& objs, const
     }
 }
 
-void CPUVectorPolicyBase::ApplyZ(qs_data_p_t qs, const qbits_t& objs, const qbits_t& ctrls, index_t dim) {
+template <typename calc_type_>
+void CPUVectorPolicyBase<calc_type_>::ApplyZ(qs_data_p_t qs, const qbits_t& objs, const qbits_t& ctrls, index_t dim) {
     ApplyZLike(qs, objs, ctrls, -1, dim);
 }
 
-void CPUVectorPolicyBase::ApplySGate(qs_data_p_t qs, const qbits_t& objs, const qbits_t& ctrls, index_t dim) {
+template <typename calc_type_>
+void CPUVectorPolicyBase<calc_type_>::ApplySGate(qs_data_p_t qs, const qbits_t& objs, const qbits_t& ctrls,
+                                                 index_t dim) {
     ApplyZLike(qs, objs, ctrls, qs_data_t(0, 1), dim);
 }
 
-void CPUVectorPolicyBase::ApplySdag(qs_data_p_t qs, const qbits_t& objs, const qbits_t& ctrls, index_t dim) {
+template <typename calc_type_>
+void CPUVectorPolicyBase<calc_type_>::ApplySdag(qs_data_p_t qs, const qbits_t& objs, const qbits_t& ctrls,
+                                                index_t dim) {
     ApplyZLike(qs, objs, ctrls, qs_data_t(0, -1), dim);
 }
 
-void CPUVectorPolicyBase::ApplyT(qs_data_p_t qs, const qbits_t& objs, const qbits_t& ctrls, index_t dim) {
-    ApplyZLike(qs, objs, ctrls, qs_data_t(1, 1) / std::sqrt(2.0), dim);
+template <typename calc_type_>
+void CPUVectorPolicyBase<calc_type_>::ApplyT(qs_data_p_t qs, const qbits_t& objs, const qbits_t& ctrls, index_t dim) {
+    ApplyZLike(qs, objs, ctrls, qs_data_t(1, 1) / std::sqrt(static_cast<calc_type>(2.0)), dim);
 }
 
-void CPUVectorPolicyBase::ApplyTdag(qs_data_p_t qs, const qbits_t& objs, const qbits_t& ctrls, index_t dim) {
-    ApplyZLike(qs, objs, ctrls, qs_data_t(1, -1) / std::sqrt(2.0), dim);
+template <typename calc_type_>
+void CPUVectorPolicyBase<calc_type_>::ApplyTdag(qs_data_p_t qs, const qbits_t& objs, const qbits_t& ctrls,
+                                                index_t dim) {
+    ApplyZLike(qs, objs, ctrls, qs_data_t(1, -1) / std::sqrt(static_cast<calc_type>(2.0)), dim);
 }
 
-void CPUVectorPolicyBase::ApplyPS(qs_data_p_t qs, const qbits_t& objs, const qbits_t& ctrls, calc_type val, index_t dim,
-                                  bool diff) {
+template <typename calc_type_>
+void CPUVectorPolicyBase<calc_type_>::ApplyPS(qs_data_p_t qs, const qbits_t& objs, const qbits_t& ctrls, calc_type val,
+                                              index_t dim, bool diff) {
     if (!diff) {
         ApplyZLike(qs, objs, ctrls, qs_data_t(std::cos(val), std::sin(val)), dim);
     } else {
@@ -103,4 +113,6 @@ void CPUVectorPolicyBase::ApplyPS(qs_data_p_t qs, const qbits_t& objs, const qbi
         CPUVectorPolicyBase::SetToZeroExcept(qs, mask.ctrl_mask, dim);
     }
 }
+template struct CPUVectorPolicyBase<float>;
+template struct CPUVectorPolicyBase<double>;
 }  // namespace mindquantum::sim::vector::detail
@@ -17,6 +17,7 @@
 #include <complex>
 #include <cstdlib>
 #include <stdexcept>
+#include <string>
 
 #include <thrust/transform_reduce.h>
 
@@ -162,6 +163,50 @@ void GPUVectorPolicyBase::SetQS(qs_data_p_t qs, const py_qs_datas_t& qs_out, ind
     cudaMemcpy(qs, qs_out.data(), sizeof(qs_data_t) * dim, cudaMemcpyHostToDevice);
 }
 
+auto GPUVectorPolicyBase::GetMarginalProbs(qs_data_p_t qs, const qbits_t& qubits, index_t dim)
+    -> std::vector<calc_type> {
+    auto h_qs = GPUVectorPolicyBase::GetQS(qs, dim);
+    std::vector<calc_type> out(1UL << qubits.size(), 0);
+    for (index_t i = 0; i < dim; i++) {
+        index_t o = 0;
+        for (size_t b = 0; b < qubits.size(); b++) {
+            o |= ((i >> qubits[b]) & 1UL) << b;
+        }
+        out[o] += std::norm(h_qs[i]);
+    }
+    return out;
+}
+
+auto GPUVectorPolicyBase::GetAmplitudes(qs_data_p_t qs, const std::vector<index_t>& indices, index_t dim)
+    -> py_qs_datas_t {
+    py_qs_datas_t out(indices.size());
+    for (size_t k = 0; k < indices.size(); k++) {
+        if (indices[k] >= dim) {
+            throw std::out_of_range("Index " + std::to_string(indices[k]) + " out of range of quantum state.");
+        }
+        cudaMemcpy(out.data() + k, qs + indices[k], sizeof(qs_data_t), cudaMemcpyDeviceToHost);
+    }
+    return out;
+}
+
+auto GPUVectorPolicyBase::GetReducedDensityMatrix(qs_data_p_t qs, const qbits_t& qubits, index_t dim)
+    -> VVT<py_qs_data_t> {
+    auto h_qs = GPUVectorPolicyBase::GetQS(qs, dim);
+    index_t n_out = 1UL << qubits.size();
+    SubsystemMask mask(qubits);
+    VVT<py_qs_data_t> out(n_out, py_qs_datas_t(n_out, 0));
+    for (index_t r = 0; r < dim / n_out; r++) {
+        auto rest = mask.RestToFull(r);
+        for (index_t a = 0; a < n_out; a++) {
+            auto ket = h_qs[rest | mask.OutcomeToFull(a)];
+            for (index_t b = 0; b < n_out; b++) {
+                out[a][b] += ket * std::conj(h_qs[rest | mask.OutcomeToFull(b)]);
+            }
+        }
+    }
+    return out;
+}
+
 auto GPUVectorPolicyBase::ApplyTerms(qs_data_p_t qs, const std::vector<PauliTerm<calc_type>>& ham, index_t dim)
     -> qs_data_p_t {
     qs_data_p_t out = GPUVectorPolicyBase::InitState(dim, false);
@@ -200,6 +245,40 @@ auto GPUVectorPolicyBase::ApplyTerms(qs_data_p_t qs, const std::vector<PauliTerm
     }
     return out;
 };
+auto GPUVectorPolicyBase::ExpectationOfTerms(qs_data_p_t bra, qs_data_p_t ket,
+                                             const std::vector<PauliTerm<calc_type>>& ham, index_t dim)
+    -> py_qs_data_t {
+    py_qs_data_t out = 0;
+    for (const auto& [pauli_string, coeff] : ham) {
+        auto mask = GenPauliMask(pauli_string);
+        auto mask_f = mask.mask_x | mask.mask_y;
+        auto mask_z = mask.mask_z;
+        auto mask_y = mask.mask_y;
+        auto num_y = mask.num_y;
+        thrust::counting_iterator<index_t> l(0);
+        qs_data_t res = thrust::transform_reduce(
+            l, l + dim,
+            [=] __device__(index_t i) {
+                auto j = (i ^ mask_f);
+                auto axis2power = __popcll(i & mask_z);
+                auto axis3power = __popcll(i & mask_y);
+                auto idx = (num_y + 2 * axis3power + 2 * axis2power) & 3;
+                auto c = GPUVectorPolicyBase::qs_data_t(1, 0);
+                if (idx == 1) {
+                    c = GPUVectorPolicyBase::qs_data_t(0, 1);
+                } else if (idx == 2) {
+                    c = GPUVectorPolicyBase::qs_data_t(-1, 0);
+                } else if (idx == 3) {
+                    c = GPUVectorPolicyBase::qs_data_t(0, -1);
+                }
+                return thrust::conj(bra[j]) * ket[i] * c;
+            },
+            qs_data_t(0, 0), thrust::plus<qs_data_t>());
+        out += py_qs_data_t(res.real(), res.imag()) * coeff;
+    }
+    return out;
+}
+
 auto GPUVectorPolicyBase::Copy(qs_data_p_t qs, index_t dim) -> qs_data_p_t {
     qs_data_p_t out;
     cudaMalloc((void**) &out, sizeof(qs_data_t) * dim);  // NOLINT
@@ -534,4 +613,46 @@ auto GPUVectorPolicyBase::CsrDotVec(const std::shared_ptr<sparse::CsrHdMatrix<ca
     }
     return out;
 }
+
+auto GPUVectorPolicyBase::ExpectationOfCsr(const std::shared_ptr<sparse::CsrHdMatrix<calc_type>>& a, qs_data_p_t bra,
+                                           qs_data_p_t ket, index_t dim) -> py_qs_data_t {
+    if (dim != a->dim_) {
+        throw std::runtime_error("Sparse hamiltonian size not match with quantum state size.");
+    }
+    auto host_bra = reinterpret_cast<std::complex<calc_type>*>(malloc(dim * sizeof(std::complex<calc_type>)));
+    cudaMemcpy(host_bra, bra, sizeof(qs_data_t) * dim, cudaMemcpyDeviceToHost);
+    auto host_ket = host_bra;
+    if (ket != bra) {
+        host_ket = reinterpret_cast<std::complex<calc_type>*>(malloc(dim * sizeof(std::complex<calc_type>)));
+        cudaMemcpy(host_ket, ket, sizeof(qs_data_t) * dim, cudaMemcpyDeviceToHost);
+    }
+    auto res = sparse::Csr_Vdot_Vec<calc_type, calc_type>(a, reinterpret_cast<calc_type*>(host_bra),
+                                                          reinterpret_cast<calc_type*>(host_ket));
+    if (host_ket != host_bra) {
+        free(host_ket);
+    }
+    free(host_bra);
+    return res;
+}
+auto GPUVectorPolicyBase::ExpectationOfCsr(const std::shared_ptr<sparse::CsrHdMatrix<calc_type>>& a,
+                                           const std::shared_ptr<sparse::CsrHdMatrix<calc_type>>& b, qs_data_p_t bra,
+                                           qs_data_p_t ket, index_t dim) -> py_qs_data_t {
+    if ((dim != a->dim_) || (dim != b->dim_)) {
+        throw std::runtime_error("Sparse hamiltonian size not match with quantum state size.");
+    }
+    auto host_bra = reinterpret_cast<std::complex<calc_type>*>(malloc(dim * sizeof(std::complex<calc_type>)));
+    cudaMemcpy(host_bra, bra, sizeof(qs_data_t) * dim, cudaMemcpyDeviceToHost);
+    auto host_ket = host_bra;
+    if (ket != bra) {
+        host_ket = reinterpret_cast<std::complex<calc_type>*>(malloc(dim * sizeof(std::complex<calc_type>)));
+        cudaMemcpy(host_ket, ket, sizeof(qs_data_t) * dim, cudaMemcpyDeviceToHost);
+    }
+    auto res = sparse::Csr_Vdot_Vec<calc_type, calc_type>(a, b, reinterpret_cast<calc_type*>(host_bra),
+                                                          reinterpret_cast<calc_type*>(host_ket));
+    if (host_ket != host_bra) {
+        free(host_ket);
+    }
+    free(host_bra);
+    return res;
+}
 }  // namespace mindquantum::sim::vector::detail
@@ -13,7 +13,9 @@
  * See the License for the specific language governing permissions and
  * limitations under the License.
  */
+#include <cstdint>
 #include <memory>
+#include <stdexcept>
 
 #include <fmt/format.h>
 #include <pybind11/cast.h>
@@ -43,6 +45,7 @@
 #include "core/sparse/csrhdmatrix.hpp"
 #include "core/sparse/paulimat.hpp"
 #include "core/two_dim_matrix.hpp"
+#include "ops/compiled_circuit.hpp"
 #include "ops/gates.hpp"
 #include "ops/hamiltonian.hpp"
 
@@ -60,6 +63,23 @@ using mindquantum::sparse::PauliMatToCsrHdMatrix;
 using mindquantum::sparse::SparseHamiltonian;
 using mindquantum::sparse::TransposeCsrHdMatrix;
 
+using PackedIndex = py::array_t<mindquantum::Index, py::array::c_style | py::array::forcecast>;
+using PackedCode = py::array_t<uint8_t, py::array::c_style | py::array::forcecast>;
+template <typename T>
+using PackedCoeff = py::array_t<T, py::array::c_style | py::array::forcecast>;
+
+//! Pauli terms of hamiltonian from packed arrays of qubits, pauli codes, offsets and coefficients.
+template <typename T>
+auto UnpackTerms(const PackedIndex &qubits, const PackedCode &codes, const PackedIndex &offsets,
+                 const PackedCoeff<T> &coeffs) {
+    if (qubits.size() != codes.size() || offsets.size() != coeffs.size() + 1) {
+        throw std::invalid_argument("Sizes of packed pauli terms mismatch.");
+    }
+    py::gil_scoped_release release;
+    return mindquantum::UnpackPauliTerms<T>(qubits.data(), codes.data(), static_cast<size_t>(qubits.size()),
+                                            offsets.data(), coeffs.data(), static_cast<size_t>(coeffs.size()));
+}
+
 template <typename T>
 auto BindPR(py::module &module, const std::string &name) {  // NOLINT(runtime/references)
     using mindquantum::MST;
@@ -225,6 +245,12 @@ PYBIND11_MODULE(mqbackend, m) {
                       const VT<Index> &>());
     m.def("get_gate_by_name", &GetGateByName<MT>);
     m.def("get_measure_gate", &GetMeasureGate<MT>);
+    // compiled circuit
+    py::class_<mindquantum::CompiledCircuit<MT>, std::shared_ptr<mindquantum::CompiledCircuit<MT>>>(m,
+                                                                                                    "compiled_circuit")
+        .def(py::init<const VT<std::shared_ptr<mindquantum::BasicGate<MT>>> &>())
+        .def_readonly("params_name", &mindquantum::CompiledCircuit<MT>::params_name_)
+        .def("__len__", [](const mindquantum::CompiledCircuit<MT> &circ) { return circ.gates_.size(); });
 
     py::class_<BasicGate<MT>, mindquantum::BasicGate<MT>, std::shared_ptr<BasicGate<MT>>>(m, "basic_gate")
         .def(py::init<>())
@@ -316,8 +342,20 @@ PYBIND11_MODULE(mqbackend, m) {
     py::class_<Hamiltonian<MT>, std::shared_ptr<Hamiltonian<MT>>>(m, "hamiltonian")
         .def(py::init<>())
         .def(py::init<const VT<PauliTerm<MT>> &>())
-        .def(py::init<const VT<PauliTerm<MT>> &, Index>())
+        .def(py::init<const VT<PauliTerm<MT>> &, Index>(), py::call_guard<py::gil_scoped_release>())
         .def(py::init<std::shared_ptr<CsrHdMatrix<MT>>, Index>())
+        .def(py::init([](const PackedIndex &qubits, const PackedCode &codes, const PackedIndex &offsets,
+                         const PackedCoeff<MT> &coeffs) {
+                 return std::make_shared<Hamiltonian<MT>>(UnpackTerms<MT>(qubits, codes, offsets, coeffs));
+             }),
+             "qubits"_a, "codes"_a, "offsets"_a, "coeffs"_a)
+        .def(py::init([](const PackedIndex &qubits, const PackedCode &codes, const PackedIndex &offsets,
+                         const PackedCoeff<MT> &coeffs, Index n_qubits) {
+                 auto terms = UnpackTerms<MT>(qubits, codes, offsets, coeffs);
+                 py::gil_scoped_release release;
+                 return std::make_shared<Hamiltonian<MT>>(terms, n_qubits);
+             }),
+             "qubits"_a, "codes"_a, "offsets"_a, "coeffs"_a, "n_qubits"_a)
         .def_readwrite("how_to", &Hamiltonian<MT>::how_to_)
         .def_readwrite("n_qubits", &Hamiltonian<MT>::n_qubits_)
         .def_readwrite("ham", &Hamiltonian<MT>::ham_)
@@ -0,0 +1,34 @@
+//   Copyright 2022 <Huawei Technologies Co., Ltd>
+//
+//   Licensed under the Apache License, Version 2.0 (the "License");
+//   you may not use this file except in compliance with the License.
+//   You may obtain a copy of the License at
+//
+//       http://www.apache.org/licenses/LICENSE-2.0
+//
+//   Unless required by applicable law or agreed to in writing, software
+//   distributed under the License is distributed on an "AS IS" BASIS,
+//   WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+//   See the License for the specific language governing permissions and
+//   limitations under the License.
+#ifndef PYTHON_LIB_BIND_THREAD_POOL_HPP
+#define PYTHON_LIB_BIND_THREAD_POOL_HPP
+#include <pybind11/pybind11.h>
+
+#include "simulator/thread_pool.hpp"
+
+inline void BindThreadPool(pybind11::module& module) {  // NOLINT
+    using mindquantum::sim::ThreadPool;
+    using namespace pybind11::literals;  // NOLINT
+    module.def(
+        "set_threads_number", [](size_t number) { ThreadPool::GetInstance().SetThreadsNumber(number); }, "number"_a);
+    module.def("get_threads_number", []() { return ThreadPool::GetInstance().GetThreadsNumber(); });
+    module.def("get_thread_partition", []() {
+        auto partition = ThreadPool::GetInstance().GetLastPartition();
+        return pybind11::dict("batch_workers"_a = partition.batch_workers,
+                              "hamiltonian_workers"_a = partition.hamiltonian_workers,
+                              "omp_threads"_a = partition.omp_threads);
+    });
+}
+
+#endif
@@ -0,0 +1,71 @@
+//   Copyright 2022 <Huawei Technologies Co., Ltd>
+//
+//   Licensed under the Apache License, Version 2.0 (the "License");
+//   you may not use this file except in compliance with the License.
+//   You may obtain a copy of the License at
+//
+//       http://www.apache.org/licenses/LICENSE-2.0
+//
+//   Unless required by applicable law or agreed to in writing, software
+//   distributed under the License is distributed on an "AS IS" BASIS,
+//   WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+//   See the License for the specific language governing permissions and
+//   limitations under the License.
+#ifndef PYTHON_LIB_QUANTUMSTATE_BIND_MAT_STATE_HPP
+#define PYTHON_LIB_QUANTUMSTATE_BIND_MAT_STATE_HPP
+#include <memory>
+#include <string_view>
+
+#include <pybind11/complex.h>
+#include <pybind11/numpy.h>
+#include <pybind11/pybind11.h>
+#include <pybind11/stl.h>
+
+#include "core/parameter_resolver.hpp"
+#include "simulator/densitymatrix/density_matrix_state.hpp"
+#include "simulator/densitymatrix/detail/cpu_density_matrix_policy.hpp"
+#include "simulator/types.hpp"
+
+template <typename sim_t>
+auto BindSim(pybind11::module& module, const std::string_view& name) {  // NOLINT
+    using namespace pybind11::literals;                                 // NOLINT
+    using qbit_t = mindquantum::sim::qbit_t;
+    using calc_type = mindquantum::sim::calc_type;
+    using circuit_t = typename sim_t::circuit_t;
+    using compiled_circuit_t = typename sim_t::compiled_circuit_t;
+    using pr_t = mindquantum::ParameterResolver<calc_type>;
+    using hams_t = std::vector<std::shared_ptr<mindquantum::Hamiltonian<calc_type>>>;
+
+    auto sim_class = pybind11::class_<sim_t>(module, name.data());
+    using release_gil = pybind11::call_guard<pybind11::gil_scoped_release>;
+    sim_class.def(pybind11::init<qbit_t, unsigned>(), "n_qubits"_a, "seed"_a = 42)
+        .def("apply_gate", &sim_t::ApplyGate, "gate"_a, "pr"_a = pr_t(), "diff"_a = false, release_gil())
+        .def("apply_circuit", pybind11::overload_cast<const circuit_t&, const pr_t&>(&sim_t::ApplyCircuit), "gate"_a,
+             "pr"_a = pr_t(), release_gil())
+        .def("apply_circuit", pybind11::overload_cast<const compiled_circuit_t&, const pr_t&>(&sim_t::ApplyCircuit),
+             "gate"_a, "pr"_a = pr_t(), release_gil())
+        .def("reset", &sim_t::Reset)
+        .def("get_qs", &sim_t::GetQS)
+        .def("get_probabilities", &sim_t::GetProbabilities, "qubits"_a, release_gil())
+        .def("get_reduced_density_matrix", &sim_t::GetReducedDensityMatrix, "qubits"_a, release_gil())
+        .def("set_qs", &sim_t::SetQS)
+        .def("set_dm", &sim_t::SetDM)
+        .def("copy", [](const sim_t& sim) { return sim; })
+        .def("sampling", &sim_t::Sampling, release_gil())
+        .def("get_expectation", &sim_t::GetExpectation, release_gil())
+        .def("get_expectation_with_grad_multi_multi",
+             pybind11::overload_cast<const hams_t&, const circuit_t&, const circuit_t&,
+                                     const mindquantum::VVT<calc_type>&, const mindquantum::VT<calc_type>&,
+                                     const mindquantum::VS&, const mindquantum::VS&, size_t, size_t>(
+                 &sim_t::GetExpectationWithGradMultiMulti, pybind11::const_),
+             release_gil())
+        .def("get_expectation_with_grad_multi_multi",
+             pybind11::overload_cast<const hams_t&, const compiled_circuit_t&, const compiled_circuit_t&,
+                                     const mindquantum::VVT<calc_type>&, const mindquantum::VT<calc_type>&,
+                                     const mindquantum::VS&, const mindquantum::VS&, size_t, size_t>(
+                 &sim_t::GetExpectationWithGradMultiMulti, pybind11::const_),
+             release_gil())
+        .def("get_expectation_with_shift_grad_multi_multi", &sim_t::GetExpectationWithShiftGradMultiMulti,
+             release_gil());
+}
+#endif
@@ -13,10 +13,13 @@
 //   limitations under the License.
 #ifndef PYTHON_LIB_QUANTUMSTATE_BIND_VEC_STATE_HPP
 #define PYTHON_LIB_QUANTUMSTATE_BIND_VEC_STATE_HPP
+#include <cstring>
 #include <memory>
+#include <stdexcept>
 #include <string_view>
 
 #include <pybind11/complex.h>
+#include <pybind11/numpy.h>
 #include <pybind11/operators.h>
 #include <pybind11/pybind11.h>
 #include <pybind11/stl.h>
@@ -24,6 +27,8 @@
 #include "core/parameter_resolver.hpp"
 #include "simulator/types.hpp"
 
+#include "python/bind_thread_pool.h"
+
 #ifdef __CUDACC__
 #    include "simulator/vector/detail/gpu_vector_policy.cuh"
 #else
@@ -38,26 +43,96 @@ auto BindSim(pybind11::module& module, const std::string_view& name) {  // NOLIN
     using namespace pybind11::literals;                                 // NOLINT
     using qbit_t = mindquantum::sim::qbit_t;
     using calc_type = mindquantum::sim::calc_type;
+    using py_qs_data_t = typename sim_t::py_qs_data_t;
+    using circuit_t = typename sim_t::circuit_t;
+    using compiled_circuit_t = typename sim_t::compiled_circuit_t;
+    using pr_t = mindquantum::ParameterResolver<calc_type>;
+    using hams_t = std::vector<std::shared_ptr<mindquantum::Hamiltonian<calc_type>>>;
 
-    pybind11::class_<sim_t>(module, name.data())
-        .def(pybind11::init<qbit_t, unsigned>(), "n_qubits"_a, "seed"_a = 42)
+    auto sim_class = pybind11::class_<sim_t>(module, name.data());
+    // Long running methods release the GIL, so that different simulators can run in different python threads. A single
+    // simulator should not be used by multiple threads at the same time.
+    using release_gil = pybind11::call_guard<pybind11::gil_scoped_release>;
+    sim_class.def(pybind11::init<qbit_t, unsigned>(), "n_qubits"_a, "seed"_a = 42)
         .def("display", &sim_t::Display, "qubits_limit"_a = 10)
         .def("apply_gate", &sim_t::ApplyGate, "gate"_a, "pr"_a = mindquantum::ParameterResolver<calc_type>(),
-             "diff"_a = false)
-        .def("apply_circuit", &sim_t::ApplyCircuit, "gate"_a, "pr"_a = mindquantum::ParameterResolver<calc_type>())
+             "diff"_a = false, release_gil())
+        .def("apply_circuit", pybind11::overload_cast<const circuit_t&, const pr_t&, bool>(&sim_t::ApplyCircuit),
+             "gate"_a, "pr"_a = pr_t(), "fuse"_a = false, release_gil())
+        .def("apply_circuit", pybind11::overload_cast<const compiled_circuit_t&, const pr_t&>(&sim_t::ApplyCircuit),
+             "gate"_a, "pr"_a = pr_t(), release_gil())
         .def("reset", &sim_t::Reset)
         .def("get_qs", &sim_t::GetQS)
+        .def("get_probabilities", &sim_t::GetProbabilities, "qubits"_a, release_gil())
+        .def("get_amplitudes", &sim_t::GetAmplitudes, "indices"_a, release_gil())
+        .def("get_reduced_density_matrix", &sim_t::GetReducedDensityMatrix, "qubits"_a, release_gil())
         .def("set_qs", &sim_t::SetQS)
-        .def("apply_hamiltonian", &sim_t::ApplyHamiltonian)
+        .def("apply_hamiltonian", &sim_t::ApplyHamiltonian, release_gil())
         .def("copy", [](const sim_t& sim) { return sim; })
-        .def("sampling", &sim_t::Sampling)
-        .def("get_circuit_matrix", &sim_t::GetCircuitMatrix)
-        .def("get_expectation", &sim_t::GetExpectation)
-        .def("get_expectation_with_grad_one_one", &sim_t::GetExpectationWithGradOneOne)
-        .def("get_expectation_with_grad_one_multi", &sim_t::GetExpectationWithGradOneMulti)
-        .def("get_expectation_with_grad_multi_multi", &sim_t::GetExpectationWithGradMultiMulti)
+        .def("sampling", &sim_t::Sampling, release_gil())
+        .def("get_noisy_expectation", &sim_t::GetNoisyExpectation, "hams"_a, "circ"_a, "pr"_a, "n_traj"_a, "seed"_a,
+             "n_thread"_a, release_gil())
+        .def(
+            "get_circuit_matrix",
+            [](sim_t& sim, const typename sim_t::circuit_t& circ, const mindquantum::ParameterResolver<calc_type>& pr) {
+                auto dim = sim.GetDim();
+                pybind11::array_t<py_qs_data_t, pybind11::array::f_style> out({dim, dim});
+                auto data = out.mutable_data();
+                {
+                    pybind11::gil_scoped_release release;
+                    sim.GetCircuitMatrix(circ, pr, data);
+                }
+                return out;
+            },
+            "circ"_a, "pr"_a)
+        .def("get_expectation", &sim_t::GetExpectation, release_gil())
+        .def("get_expectation_with_grad_one_one", &sim_t::GetExpectationWithGradOneOne, release_gil())
+        .def("get_expectation_with_grad_one_multi",
+             pybind11::overload_cast<const hams_t&, const circuit_t&, const circuit_t&, const pr_t&,
+                                     const mindquantum::MST<size_t>&, int>(&sim_t::GetExpectationWithGradOneMulti),
+             release_gil())
+        .def("get_expectation_with_grad_multi_multi",
+             pybind11::overload_cast<const hams_t&, const circuit_t&, const circuit_t&,
+                                     const mindquantum::VVT<calc_type>&, const mindquantum::VT<calc_type>&,
+                                     const mindquantum::VS&, const mindquantum::VS&, size_t, size_t>(
+                 &sim_t::GetExpectationWithGradMultiMulti),
+             release_gil())
+        .def("get_expectation_with_grad_multi_multi",
+             pybind11::overload_cast<const hams_t&, const compiled_circuit_t&, const compiled_circuit_t&,
+                                     const mindquantum::VVT<calc_type>&, const mindquantum::VT<calc_type>&,
+                                     const mindquantum::VS&, const mindquantum::VS&, size_t, size_t, size_t, bool,
+                                     size_t>(&sim_t::GetExpectationWithGradMultiMulti),
+             release_gil())
+        .def("get_expectation_with_weighted_grad_multi_multi", &sim_t::GetExpectationWithWeightedGradMultiMulti,
+             release_gil())
+        .def("get_expectation_with_shift_grad_multi_multi", &sim_t::GetExpectationWithShiftGradMultiMulti,
+             release_gil())
+        .def("get_qfi", &sim_t::GetQFI, "circ"_a, "pr"_a, "params_name"_a, "approx"_a, "n_thread"_a, release_gil())
         .def("get_expectation_with_grad_non_hermitian_multi_multi",
-             &sim_t::GetExpectationNonHermitianWithGradMultiMulti);
+             &sim_t::GetExpectationNonHermitianWithGradMultiMulti, release_gil());
+#ifndef __CUDACC__
+    using qs_data_t = typename sim_t::qs_data_t;
+    using qs_array_t = pybind11::array_t<qs_data_t, pybind11::array::c_style | pybind11::array::forcecast>;
+    // The view shares memory with the simulator, it is invalid after applying hamiltonian or noise channel.
+    sim_class.def(
+        "get_qs_view",
+        [](const pybind11::object& self, bool writable) {
+            const auto& sim = self.cast<const sim_t&>();
+            auto view = pybind11::array_t<qs_data_t>({sim.GetDim()}, {sizeof(qs_data_t)}, sim.GetRawQS(), self);
+            if (!writable) {
+                view.attr("setflags")("write"_a = false);
+            }
+            return view;
+        },
+        "writable"_a = false);
+    sim_class.def("set_qs_array", [](sim_t& sim, const qs_array_t& qs_out) {
+        if (qs_out.ndim() != 1 || static_cast<mindquantum::sim::index_t>(qs_out.size()) != sim.GetDim()) {
+            throw std::invalid_argument("state size not match");
+        }
+        pybind11::gil_scoped_release release;
+        std::memcpy(sim.GetRawQS(), qs_out.data(), sim.GetDim() * sizeof(qs_data_t));
+    });
+#endif  // __CUDACC__
 }
 
 template <typename sim_t>
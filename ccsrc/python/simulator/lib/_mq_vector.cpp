@@ -20,7 +20,8 @@ PYBIND11_MODULE(_mq_vector, module) {
 #ifdef __CUDACC__
     using policy_t = mindquantum::sim::vector::detail::GPUVectorPolicyBase;
 #else
-    using policy_t = mindquantum::sim::vector::detail::CPUVectorPolicyBase;
+    using policy_t = mindquantum::sim::vector::detail::CPUVectorPolicyBase<double>;
+    using float_policy_t = mindquantum::sim::vector::detail::CPUVectorPolicyBase<float>;
 #endif  // __CUDACC__
 
     using vec_sim = mindquantum::sim::vector::detail::VectorState<policy_t>;
@@ -30,4 +31,11 @@ PYBIND11_MODULE(_mq_vector, module) {
 
     pybind11::module blas = module.def_submodule("blas", "MindQuantum simulator algebra module.");
     BindBlas<vec_sim>(blas);
+    BindThreadPool(module);
+
+#ifndef __CUDACC__
+    using float_vec_sim = mindquantum::sim::vector::detail::VectorState<float_policy_t>;
+    BindSim<float_vec_sim>(module, "mqvector_float");
+    BindBlas<float_vec_sim>(blas);
+#endif  // __CUDACC__
 }
@@ -21,7 +21,7 @@ from mindquantum.third_party.unitary_cc import (
 )
 
 from .hardware_efficient_ansatz import HardwareEfficientAnsatz
-from .qubit_hamiltonian import get_qubit_hamiltonian
+from .qubit_hamiltonian import get_hamiltonian, get_qubit_hamiltonian
 from .qubit_ucc_ansatz import QubitUCCAnsatz
 from .quccsd import quccsd_generator
 from .transform import Transform
@@ -31,6 +31,7 @@ from .unitary_cc import UCCAnsatz
 
 __all__ = [
     'Transform',
+    'get_hamiltonian',
     'get_qubit_hamiltonian',
     'uccsd_singlet_generator',
     'uccsd_singlet_get_packed_amplitudes',
@@ -14,9 +14,12 @@
 # ============================================================================
 """Get qubit hamiltonian."""
 
-from mindquantum.core.operators import FermionOperator, InteractionOperator
+from mindquantum.core.operators import Hamiltonian, InteractionOperator
+from mindquantum.core.operators._qubit_operator import QubitOperator as _PyQubitOperator
+from mindquantum.core.operators._qubit_operator import _symplectic_to_csr
+from mindquantum.core.operators.utils import QubitOperator
 
-from .transform import Transform
+from .transform import Transform, _interaction_jordan_wigner
 
 
 def get_qubit_hamiltonian(mol):
@@ -31,5 +34,45 @@ def get_qubit_hamiltonian(mol):
     """
     m_ham = mol.get_molecular_hamiltonian()
     int_ham = InteractionOperator(*(m_ham.n_body_tensors.values()))
-    f_ham = FermionOperator(int_ham)
-    return Transform(f_ham).jordan_wigner()
+    return Transform(int_ham).jordan_wigner()
+
+
+def get_hamiltonian(mol, csr=False, parallel_worker=None):
+    r"""
+    Get the Jordan-Wigner hamiltonian of a molecular data or an interaction operator.
+
+    The one-body and two-body tensors are transformed to pauli strings directly with the permutational symmetry of
+    interaction operator, without building the intermediate FermionOperator and QubitOperator.
+
+    Args:
+        mol (Union[MolecularData, InteractionOperator]): molecular data, or interaction operator of molecular
+            hamiltonian.
+        csr (bool): Whether to get a hamiltonian of csr_matrix. If ``False``, the hamiltonian is a list of pauli
+            terms. Default: ``False``.
+        parallel_worker (int): Number of processes that transform the terms in parallel. If ``None``, all terms are
+            transformed in current process. Default: ``None``.
+
+    Returns:
+        Hamiltonian, hamiltonian of this molecular.
+
+    Examples:
+        >>> import numpy as np
+        >>> from mindquantum.algorithm.nisq import get_hamiltonian
+        >>> from mindquantum.core.operators import InteractionOperator
+        >>> one_body = np.array([[1.0, 0.5], [0.5, -1.0]])
+        >>> ham = get_hamiltonian(InteractionOperator(0.5, one_body, np.zeros((2, 2, 2, 2))))
+        >>> ham.ham_termlist
+        [((), 0.5), (((0, 'Z'),), -0.5), (((0, 'X'), (1, 'X')), 0.25), (((0, 'Y'), (1, 'Y')), 0.25), (((1, 'Z'),), 0.5)]
+        >>> get_hamiltonian(InteractionOperator(0.5, one_body, np.zeros((2, 2, 2, 2))), csr=True).sparse_mat.shape
+        (4, 4)
+    """
+    if not isinstance(mol, InteractionOperator):
+        m_ham = mol.get_molecular_hamiltonian()
+        mol = InteractionOperator(*(m_ham.n_body_tensors.values()))
+    if QubitOperator is not _PyQubitOperator:
+        operator = Transform(mol).jordan_wigner()
+        return Hamiltonian(operator.matrix(mol.n_qubits).tocsr() if csr else operator)
+    symplectic = _interaction_jordan_wigner(mol, parallel_worker)
+    if csr:
+        return Hamiltonian(_symplectic_to_csr(symplectic, mol.n_qubits))
+    return Hamiltonian(_PyQubitOperator._from_symplectic_terms(symplectic))  # pylint: disable=protected-access
@@ -18,17 +18,28 @@ Thus can be simulated in quantum computer.
 """
 
 import os
+from concurrent.futures import ProcessPoolExecutor
 from math import floor, log
 
 import numpy as np
 
-from mindquantum.core.operators import TermValue
+from mindquantum.core.operators import InteractionOperator, TermValue
+from mindquantum.core.operators._qubit_operator import _PHASES, _PRODUCT_CHUNK, EQ_TOLERANCE
+from mindquantum.core.operators._qubit_operator import QubitOperator as _PyQubitOperator
+from mindquantum.core.operators._qubit_operator import (
+    _merge_terms,
+    _pad_words,
+    _pauli_product_phase,
+    _sorted_terms,
+    _terms_to_symplectic,
+)
 from mindquantum.core.operators.utils import (
     FermionOperator,
     QubitOperator,
     count_qubits,
     normal_ordered,
 )
+from mindquantum.utils.type_value_check import _check_int_type
 
 try:
     if int(os.environ.get('MQ_PY_TERMSOP', False)):
@@ -44,13 +55,13 @@ class Transform:
     Class for transforms of fermionic and qubit operators.
 
     `jordan_wigner`, `parity`, `bravyi_kitaev`, `bravyi_kitaev_tree`,
-    `bravyi_kitaev_superfast` will transform `FermionOperator` to
-    `QubitOperator`. `reversed_jordan_wigner` will transform `QubitOperator`
+    `bravyi_kitaev_superfast` will transform `FermionOperator` or
+    `InteractionOperator` to `QubitOperator`. `reversed_jordan_wigner` will transform `QubitOperator`
     to `FermionOperator`.
 
     Args:
-        operator (Union[FermionOperator, QubitOperator]): The input
-            FermionOperator or QubitOperator that need to do transform.
+        operator (Union[FermionOperator, InteractionOperator, QubitOperator]): The input
+            FermionOperator, InteractionOperator or QubitOperator that need to do transform.
         n_qubits (int): The total qubits of given operator. If None, then we will count it automatically.
             Default: None.
 
@@ -81,17 +92,26 @@ class Transform:
 
     def __init__(self, operator, n_qubits=None):
         """Initialize a Transform object."""
-        if not isinstance(operator, (FermionOperator, QubitOperator)):
-            raise TypeError("Operator must be a FermionOperator or QubitOperator")
+        if not isinstance(operator, (FermionOperator, QubitOperator, InteractionOperator)):
+            raise TypeError("Operator must be a FermionOperator, QubitOperator or InteractionOperator")
+        min_qubits = operator.n_qubits if isinstance(operator, InteractionOperator) else count_qubits(operator)
         if n_qubits is None:
-            n_qubits = count_qubits(operator)
-        if n_qubits < count_qubits(operator):
+            n_qubits = min_qubits
+        if n_qubits < min_qubits:
             raise ValueError('Invalid number of qubits specified.')
 
         self.n_qubits = n_qubits
         self.operator = operator
 
-    def jordan_wigner(self):
+    def _fermion_operator(self):
+        """Get the operator as FermionOperator, for transforms that are applied term by term."""
+        if isinstance(self.operator, InteractionOperator):
+            return FermionOperator(self.operator)
+        if not isinstance(self.operator, FermionOperator):
+            raise TypeError('This method can be only applied for FermionOperator.')
+        return self.operator
+
+    def jordan_wigner(self, parallel_worker=None):
         r"""
         Apply Jordan-Wigner transform.
 
@@ -107,14 +127,19 @@ class Transform:
         where the :math:`\sigma_{+}= \sigma^{X} + i \sigma^{Y}` and :math:`\sigma_{-} = \sigma^{X} - i\sigma^{Y}` is the
         Pauli spin raising and lowring operator.
 
+        Args:
+            parallel_worker (int): Number of processes that transform the terms in parallel. If ``None``, all terms
+                are transformed in current process. Default: ``None``.
+
         Returns:
             QubitOperator, qubit operator after jordan_wigner transformation.
         """
-        if not isinstance(self.operator, FermionOperator):
-            raise TypeError('This method can be only applied for FermionOperator.')
-        return QubitOperator(transform_.jordan_wigner(self.operator))
+        transf_op = _bulk_transform(self.operator, self.n_qubits, _jordan_wigner_sets, parallel_worker)
+        if transf_op is None:
+            return QubitOperator(transform_.jordan_wigner(self._fermion_operator()))
+        return transf_op
 
-    def parity(self):
+    def parity(self, parallel_worker=None):
         r"""
         Apply parity transform.
 
@@ -148,14 +173,19 @@ class Transform:
             a_{j}\rightarrow\frac{1}{2}\left(\prod_{i=j+1}^N
             \left(\sigma_i^X X\right)\right)\left( \sigma^{X}_{j}+i\sigma_j^Y\right) X \sigma^{Z}_{j-1}
 
+        Args:
+            parallel_worker (int): Number of processes that transform the terms in parallel. If ``None``, all terms
+                are transformed in current process. Default: ``None``.
+
         Returns:
             QubitOperator, qubits operator after parity transformation.
         """
-        if not isinstance(self.operator, FermionOperator):
-            raise TypeError('This method can be only applied for FermionOperator.')
-        return QubitOperator(transform_.parity(self.operator, self.n_qubits))
+        transf_op = _bulk_transform(self.operator, self.n_qubits, _parity_sets, parallel_worker)
+        if transf_op is None:
+            return QubitOperator(transform_.parity(self._fermion_operator(), self.n_qubits))
+        return transf_op
 
-    def bravyi_kitaev(self):  # pylint: disable=too-many-locals
+    def bravyi_kitaev(self, parallel_worker=None):
         r"""
         Apply Bravyi-Kitaev transform.
 
@@ -197,32 +227,16 @@ class Transform:
         `A New Data Structure for Cumulative Frequency Tables <https://doi.org/10.1002/spe.4380240306>`_
         by Peter M. Fenwick.
 
+        Args:
+            parallel_worker (int): Number of processes that transform the terms in parallel. If ``None``, all terms
+                are transformed in current process. Default: ``None``.
+
         Returns:
             QubitOperator, qubit operator after bravyi_kitaev transformation.
         """
-        if not isinstance(self.operator, FermionOperator):
-            raise TypeError('This method can be only applied for FermionOperator.')
-        transf_op = QubitOperator()
-        for term, value in self.operator.terms.items():
-            # Initialize identity matrix.
-            transformed_term = QubitOperator((), value)
-
-            # Loop through operators, transform and multiply.
-            for ladder_operator in term:
-                # Define lists of qubits to apply Pauli gates
-                index = ladder_operator[0]
-                update_set = _update_set(index, self.n_qubits)
-                occupation_set = _occupation_set(index)
-                parity_set = _parity_set(index - 1)
-                x1 = update_set
-                y1 = []
-                z1 = parity_set
-                x2 = update_set - {index}
-                y2 = {index}
-                z2 = (parity_set ^ occupation_set) - {index}
-                transformed_term *= _transform_ladder_operator(ladder_operator, x1, y1, z1, x2, y2, z2)
-            transf_op += transformed_term
-
+        transf_op = _bulk_transform(self.operator, self.n_qubits, _bravyi_kitaev_sets, parallel_worker)
+        if transf_op is None:
+            return _transform_terms(self._fermion_operator(), self.n_qubits, _bravyi_kitaev_sets)
         return transf_op
 
     def bravyi_kitaev_superfast(self):
@@ -244,10 +258,8 @@ class Transform:
         Returns:
             QubitOperator, qubit operator after bravyi_kitaev_superfast.
         """
-        if not isinstance(self.operator, FermionOperator):
-            raise TypeError('This method can be only applied for FermionOperator.')
         # Get operator in normal order
-        fermion_operator = normal_ordered(self.operator)
+        fermion_operator = normal_ordered(self._fermion_operator())
 
         # Get antisymmetric adjacency matrix for graph based on fermion
         # operator
@@ -336,67 +348,23 @@ class Transform:
 
         return transf_op
 
-    def ternary_tree(self):  # pylint: disable=too-many-locals
+    def ternary_tree(self, parallel_worker=None):
         """
         Apply Ternary tree transform.
 
         Implementation from `Optimal fermion-to-qubit mapping via ternary trees with
         applications to reduced quantum states learning <https://arxiv.org/abs/1910.10746>`_.
 
+        Args:
+            parallel_worker (int): Number of processes that transform the terms in parallel. If ``None``, all terms
+                are transformed in current process. Default: ``None``.
+
         Returns:
             QubitOperator, qubit operator after ternary_tree transformation.
         """
-        # pylint: disable=invalid-name
-        h = floor(log(2 * self.n_qubits + 1, 3))
-        d = self.n_qubits - (3**h - 1) // 2
-
-        if not isinstance(self.operator, FermionOperator):
-            raise TypeError('This method can be only applied for FermionOperator.')
-        transf_op = QubitOperator()
-        for term, value in self.operator.terms.items():
-            # Initialize identity matrix.
-            transformed_term = QubitOperator((), value)
-
-            # Loop through operators, transform and multiply.
-            for ladder_operator in term:
-                # Define lists of qubits to apply Pauli gates
-                index = ladder_operator[0]
-
-                p1 = (
-                    [2 * index // (3**k) % 3 for k in range(h, -1, -1)]
-                    if 2 * index < 3 * d
-                    else [(2 * index - 2 * d) // (3**k) % 3 for k in range(h - 1, -1, -1)]
-                )
-                x1 = []
-                y1 = []
-                z1 = []
-                for k, tmp in enumerate(p1):
-                    if tmp == 0:
-                        x1 += [_get_qubit_index(p1, k)]
-                    elif tmp == 1:
-                        y1 += [_get_qubit_index(p1, k)]
-                    else:
-                        z1 += [_get_qubit_index(p1, k)]
-
-                p2 = (
-                    [(2 * index + 1) // (3**k) % 3 for k in range(h, -1, -1)]
-                    if 2 * index < 3 * d
-                    else [(2 * index + 1 - 2 * d) // (3**k) % 3 for k in range(h - 1, -1, -1)]
-                )
-                x2 = []
-                y2 = []
-                z2 = []
-                for k, tmp in enumerate(p2):
-                    if tmp == 0:
-                        x2 += [_get_qubit_index(p2, k)]
-                    elif tmp == 1:
-                        y2 += [_get_qubit_index(p2, k)]
-                    else:
-                        z2 += [_get_qubit_index(p2, k)]
-
-                transformed_term *= _transform_ladder_operator(ladder_operator, x1, y1, z1, x2, y2, z2)
-            transf_op += transformed_term
-
+        transf_op = _bulk_transform(self.operator, self.n_qubits, _ternary_tree_sets, parallel_worker)
+        if transf_op is None:
+            return _transform_terms(self._fermion_operator(), self.n_qubits, _ternary_tree_sets)
         return transf_op
 
     def reversed_jordan_wigner(self):
@@ -518,6 +486,291 @@ def _parity_set(index):
     return indices
 
 
+def _jordan_wigner_sets(index, n_qubits):  # pylint: disable=unused-argument
+    """Qubits of pauli X, Y and Z of the two pauli strings of ladder operator in Jordan-Wigner transform."""
+    return [index], [], list(range(index)), [], [index], list(range(index))
+
+
+def _parity_sets(index, n_qubits):
+    """Qubits of pauli X, Y and Z of the two pauli strings of ladder operator in parity transform."""
+    z1 = [index - 1] if index > 0 else []
+    return list(range(index, n_qubits)), [], z1, list(range(index + 1, n_qubits)), [index], []
+
+
+def _bravyi_kitaev_sets(index, n_qubits):
+    """Qubits of pauli X, Y and Z of the two pauli strings of ladder operator in Bravyi-Kitaev transform."""
+    update_set = _update_set(index, n_qubits)
+    occupation_set = _occupation_set(index)
+    parity_set = _parity_set(index - 1)
+    return update_set, [], parity_set, update_set - {index}, {index}, (parity_set ^ occupation_set) - {index}
+
+
+def _ternary_tree_sets(index, n_qubits):
+    """Qubits of pauli X, Y and Z of the two pauli strings of ladder operator in ternary tree transform."""
+    # pylint: disable=invalid-name
+    h = floor(log(2 * n_qubits + 1, 3))
+    d = n_qubits - (3**h - 1) // 2
+    sets = []
+    for leaf in (2 * index, 2 * index + 1):
+        path = (
+            [leaf // (3**k) % 3 for k in range(h, -1, -1)]
+            if 2 * index < 3 * d
+            else [(leaf - 2 * d) // (3**k) % 3 for k in range(h - 1, -1, -1)]
+        )
+        qubits = ([], [], [])
+        for k, tmp in enumerate(path):
+            qubits[tmp].append(_get_qubit_index(path, k))
+        sets.extend(qubits)
+    return sets
+
+
+def _transform_terms(operator, n_qubits, ladder_sets):
+    """Transform fermion operator term by term, where ladder_sets gives the pauli strings of every ladder operator."""
+    transf_op = QubitOperator()
+    for term, value in operator.terms.items():
+        # Initialize identity matrix.
+        transformed_term = QubitOperator((), value)
+
+        # Loop through operators, transform and multiply.
+        for ladder_operator in term:
+            transformed_term *= _transform_ladder_operator(ladder_operator, *ladder_sets(ladder_operator[0], n_qubits))
+        transf_op += transformed_term
+
+    return transf_op
+
+
+def _ladder_terms(operator):
+    """
+    Get the terms of fermion operator as arrays, grouped by the number of ladder operators.
+
+    Returns:
+        Union[list, None], groups of term positions, modes, actions, coefficients and whether coefficients are
+        complex, or None if any coefficient is parameterized.
+    """
+    groups = []
+    if isinstance(operator, InteractionOperator):
+        position = 0
+        for key in sorted(operator.n_body_tensors, key=len):
+            tensor = np.asarray(operator.n_body_tensors[key])
+            index = np.nonzero(tensor) if key else ()
+            modes = np.stack(index, axis=1) if key else np.zeros((1, 0), dtype=np.int64)
+            n_terms = modes.shape[0]
+            groups.append(
+                (
+                    np.arange(position, position + n_terms),
+                    modes.astype(np.int64),
+                    np.broadcast_to(np.array(key, dtype=np.int64), modes.shape),
+                    tensor[index].astype(np.complex128).reshape(n_terms),
+                    np.full(n_terms, np.iscomplexobj(tensor)),
+                )
+            )
+            position += n_terms
+        return groups
+    if not all(coeff.is_const() for coeff in operator.terms.values()):
+        return None
+    by_length = {}
+    for position, (term, coeff) in enumerate(operator.terms.items()):
+        by_length.setdefault(len(term), []).append((position, term, coeff))
+    for length, items in by_length.items():
+        shape = (len(items), length)
+        groups.append(
+            (
+                np.array([position for position, _, _ in items], dtype=np.int64),
+                np.array([[idx for idx, _ in term] for _, term, _ in items], dtype=np.int64).reshape(shape),
+                np.array([[int(act) for _, act in term] for _, term, _ in items], dtype=np.int64).reshape(shape),
+                np.array([coeff.const for _, _, coeff in items], dtype=np.complex128),
+                np.array([coeff.is_complex for _, _, coeff in items], dtype=bool),
+            )
+        )
+    return groups
+
+
+def _ladder_tables(n_qubits, ladder_sets):
+    """Bit masks and coefficients of the two pauli strings of every ladder operator, indexed by mode and action."""
+    n_words = (max(n_qubits, 1) + 63) // 64
+    x_bits = np.zeros((n_qubits, 2, 2, n_words), dtype=np.uint64)
+    z_bits = np.zeros((n_qubits, 2, 2, n_words), dtype=np.uint64)
+    coeffs = np.zeros((n_qubits, 2, 2), dtype=np.complex128)
+    is_complex = np.zeros((n_qubits, 2, 2), dtype=bool)
+    for index in range(n_qubits):
+        for action in range(2):
+            ladder = _transform_ladder_operator((index, action), *ladder_sets(index, n_qubits))
+            sym = _pad_words(_terms_to_symplectic(ladder.terms), n_words)
+            x_bits[index, action], z_bits[index, action] = sym.x_bits, sym.z_bits
+            coeffs[index, action], is_complex[index, action] = sym.coeffs, sym.is_complex
+    return x_bits, z_bits, coeffs, is_complex
+
+
+def _transform_chunk(tables, first, modes, actions, coeffs, is_complex, conj_coeffs=None):
+    """
+    Transform terms with the same number of ladder operators, and merge the same pauli strings.
+
+    Every ladder operator is a sum of two pauli strings, so a term with k ladder operators gives 2^k products, which
+    are calculated for all terms at once. The product that chooses the second pauli string of the i-th ladder operator
+    when bit k - 1 - i of choice is set has the first appearance index first + choice. If conj_coeffs is given, the
+    hermitian conjugate of every term with coefficient conj_coeffs is added, which has the same pauli strings with
+    conjugated coefficients.
+    """
+    # pylint: disable=too-many-arguments,too-many-locals
+    x_table, z_table, c_table, complex_table = tables
+    n_terms, length = modes.shape
+    keys, firsts, values, complexes = [], [], [], []
+    for choice in range(1 << length):
+        x_bits = np.zeros((n_terms, x_table.shape[-1]), dtype=np.uint64)
+        z_bits = np.zeros_like(x_bits)
+        power = np.zeros(n_terms, dtype=np.int64)
+        value = np.ones(n_terms, dtype=np.complex128)
+        value_complex = is_complex.copy()
+        for i in range(length):
+            row = (modes[:, i], actions[:, i], (choice >> (length - 1 - i)) & 1)
+            step_power, has_phase = _pauli_product_phase(x_bits, z_bits, x_table[row], z_table[row])
+            power += step_power
+            value *= c_table[row]
+            value_complex |= complex_table[row] | has_phase
+            x_bits ^= x_table[row]
+            z_bits ^= z_table[row]
+        value *= _PHASES[power % 4]
+        keys.append(np.concatenate([x_bits, z_bits], axis=1))
+        firsts.append(first + choice)
+        values.append(coeffs * value if conj_coeffs is None else coeffs * value + conj_coeffs * value.conj())
+        complexes.append(value_complex)
+    return _merge_terms(
+        np.concatenate(keys),
+        np.concatenate(firsts),
+        np.concatenate(values),
+        np.concatenate(complexes),
+        np.zeros(n_terms << length, dtype=bool),
+    )[:4]
+
+
+def _transform_groups(groups, n_qubits, ladder_sets, parallel_worker=None):
+    """
+    Transform groups of terms given as arrays by _ladder_terms, optionally with coefficients of hermitian conjugates.
+
+    Returns:
+        _SymplecticTerms, the transformed pauli strings without zero terms.
+    """
+    if parallel_worker is not None:
+        _check_int_type('parallel_worker', parallel_worker)
+    tables = _ladder_tables(n_qubits, ladder_sets)
+    sizes = np.zeros(sum(group[0].shape[0] for group in groups), dtype=np.int64)
+    for position, modes, *_ in groups:
+        sizes[position] = 1 << modes.shape[1]
+    offsets = np.cumsum(sizes) - sizes
+
+    n_workers = parallel_worker or 1
+    tasks = []
+    for position, modes, *arrays in groups:
+        rows = max(1, min(_PRODUCT_CHUNK >> modes.shape[1], -(-position.shape[0] // n_workers)))
+        for start in range(0, position.shape[0], rows):
+            part = slice(start, start + rows)
+            tasks.append((tables, offsets[position[part]], modes[part], *(array[part] for array in arrays)))
+
+    n_words = tables[0].shape[-1]
+    keys = np.zeros((0, 2 * n_words), dtype=np.uint64)
+    first = np.zeros(0, dtype=np.int64)
+    coeffs = np.zeros(0, dtype=np.complex128)
+    is_complex = np.zeros(0, dtype=bool)
+
+    def merge(chunks):
+        nonlocal keys, first, coeffs, is_complex
+        for chunk in chunks:
+            keys, first, coeffs, is_complex, _ = _merge_terms(
+                *(np.concatenate([old, new]) for old, new in zip((keys, first, coeffs, is_complex), chunk)),
+                np.zeros(keys.shape[0] + chunk[0].shape[0], dtype=bool),
+            )
+
+    if n_workers > 1 and len(tasks) > 1:
+        with ProcessPoolExecutor(min(n_workers, len(tasks))) as executor:
+            merge(executor.map(_transform_chunk, *zip(*tasks)))
+    else:
+        merge(_transform_chunk(*task) for task in tasks)
+    return _sorted_terms(keys, first, coeffs, is_complex, np.abs(coeffs) >= EQ_TOLERANCE)
+
+
+def _bulk_transform(operator, n_qubits, ladder_sets, parallel_worker=None):
+    """
+    Transform all terms of fermion operator in vectorized passes over bit masks of pauli strings.
+
+    The result is the same as transforming term by term, and chunks of terms can be transformed in parallel processes.
+
+    Returns:
+        Union[QubitOperator, None], the transformed operator, or None if it can not be vectorized.
+    """
+    if QubitOperator is not _PyQubitOperator:
+        return None
+    groups = _ladder_terms(operator)
+    if groups is None:
+        return None
+    return _PyQubitOperator._from_symplectic_terms(  # pylint: disable=protected-access
+        _transform_groups(groups, n_qubits, ladder_sets, parallel_worker)
+    )
+
+
+def _hermitian_interaction_terms(inter_ops):
+    r"""
+    Get the terms of interaction operator reduced by permutational symmetry, as groups of _ladder_terms.
+
+    Two-body terms are antisymmetrized to :math:`p > q` and :math:`r > s`, since
+    :math:`a^\dagger_p a^\dagger_q a_r a_s = a^\dagger_q a^\dagger_p a_s a_r`, and only one term of every pair of
+    hermitian conjugates :math:`a^\dagger_p a^\dagger_q a_r a_s` and :math:`a^\dagger_r a^\dagger_s a_p a_q` is
+    kept, with the coefficient of its conjugate as an extra array. This is the symmetry of
+    `InteractionOperator.unique_iter`, applied on the whole tensors at once.
+    """
+    n_qubits = inter_ops.n_qubits
+    one_body = np.asarray(inter_ops.one_body_tensor, dtype=np.complex128)
+    two_body = np.asarray(inter_ops.two_body_tensor, dtype=np.complex128)
+    two_body = (
+        two_body
+        - two_body.transpose(1, 0, 2, 3)
+        - two_body.transpose(0, 1, 3, 2)
+        + two_body.transpose(1, 0, 3, 2)
+    )
+    creation, annihilation = np.tril_indices(n_qubits)
+    pair_p, pair_q = np.tril_indices(n_qubits, -1)
+    two_body = two_body[pair_p[:, None], pair_q[:, None], pair_p[None], pair_q[None]]
+    left, right = np.tril_indices(pair_p.shape[0])
+    candidates = [
+        (np.zeros((1, 0), dtype=np.int64), (), np.array([complex(inter_ops.constant)]), np.zeros(1)),
+        (
+            np.stack([creation, annihilation], axis=1),
+            (1, 0),
+            one_body[creation, annihilation],
+            np.where(creation == annihilation, 0, one_body[annihilation, creation]),
+        ),
+        (
+            np.stack([pair_p[left], pair_q[left], pair_p[right], pair_q[right]], axis=1),
+            (1, 1, 0, 0),
+            two_body[left, right],
+            np.where(left == right, 0, two_body[right, left]),
+        ),
+    ]
+    groups = []
+    position = 0
+    for modes, key, coeffs, conj_coeffs in candidates:
+        nonzero = (coeffs != 0) | (conj_coeffs != 0)
+        n_terms = int(nonzero.sum())
+        groups.append(
+            (
+                np.arange(position, position + n_terms),
+                modes[nonzero].astype(np.int64),
+                np.broadcast_to(np.array(key, dtype=np.int64), (n_terms, len(key))),
+                coeffs[nonzero],
+                np.ones(n_terms, dtype=bool),
+                conj_coeffs[nonzero].astype(np.complex128),
+            )
+        )
+        position += n_terms
+    return groups
+
+
+def _interaction_jordan_wigner(inter_ops, parallel_worker=None):
+    """Jordan-Wigner transform of interaction operator as symplectic representation, using permutational symmetry."""
+    return _transform_groups(
+        _hermitian_interaction_terms(inter_ops), inter_ops.n_qubits, _jordan_wigner_sets, parallel_worker
+    )
+
+
 def _get_edge_matrix(fermion_operator):
     """Return antisymmetric adjacency matrix (Edge matrix) for graph based on fermion operator for BKSF transform."""
     # pylint: disable=invalid-name
@@ -24,6 +24,7 @@ from typing import List
 import numpy as np
 from rich.console import Console
 
+from mindquantum import mqbackend as mb
 from mindquantum.io import bprint
 from mindquantum.io.display import brick_model
 from mindquantum.utils.type_value_check import (
@@ -287,6 +288,7 @@ class Circuit(list):  # pylint: disable=too-many-instance-attributes,too-many-pu
         self.has_cpp_obj = False
         self.cpp_obj = None
         self.herm_cpp_obj = None
+        self.compiled_cpp_obj = {}
 
     def _collect_parameterized_gate(self, gate: ParameterGate):
         """Collect parameterized gate information."""
@@ -765,7 +767,7 @@ class Circuit(list):  # pylint: disable=too-many-instance-attributes,too-many-pu
         from mindquantum.simulator import Simulator
 
         sim = Simulator(backend, self.n_qubits, seed=seed)
-        return np.array(sim.backend.get_circuit_matrix(circ, pr)).T
+        return np.array(sim.backend.get_circuit_matrix(circ, pr))
 
     def apply_value(self, pr):
         """
@@ -859,6 +861,7 @@ class Circuit(list):  # pylint: disable=too-many-instance-attributes,too-many-pu
             self.has_cpp_obj = True
             self.cpp_obj = [i.get_cpp_obj() for i in self if not isinstance(i, mq_gates.BarrierGate)]
             self.herm_cpp_obj = [i.get_cpp_obj() for i in self.hermitian() if not isinstance(i, mq_gates.BarrierGate)]
+            self.compiled_cpp_obj = {}
 
         if hasattr(self, 'cpp_obj') and hasattr(self, 'herm_cpp_obj'):
             if hermitian:
@@ -866,6 +869,21 @@ class Circuit(list):  # pylint: disable=too-many-instance-attributes,too-many-pu
             return self.cpp_obj
         raise ValueError("Circuit does not generate cpp obj yet.")
 
+    def get_compiled_cpp_obj(self, hermitian=False):
+        """
+        Get compiled cpp obj of circuit.
+
+        The compiled circuit is an execution plan with parameters located by integer slots, it is cached until the
+        circuit is modified.
+
+        Args:
+            hermitian (bool): Whether to get compiled cpp object of this circuit in hermitian version. Default: False.
+        """
+        cpp_obj = self.get_cpp_obj(hermitian)
+        if hermitian not in self.compiled_cpp_obj:
+            self.compiled_cpp_obj[hermitian] = mb.compiled_circuit(cpp_obj)
+        return self.compiled_cpp_obj[hermitian]
+
     def h(self, obj_qubits, ctrl_qubits=None):
         """
         Add a hadamard gate.
@@ -39,6 +39,19 @@ def apply_gate(sim, gate, g_cpp, pr_cpp, diff):
         sim.apply_gate(g_cpp)
 
 
+def _check_qfi_circuit(circuit: Circuit):
+    """Check circuit for calculating qfi similar value, return the circuit without barrier."""
+    _check_input_type('circuit', Circuit, circuit)
+    circuit = circuit.remove_barrier()
+    if circuit.has_measure_gate:
+        raise ValueError("circuit can not has measure gate for calculate qfi similar value.")
+    if circuit.is_noise_circuit:
+        raise ValueError("circuit can not be noise circuit for calculate qfi similar value.")
+    if not circuit.params_name:
+        raise ValueError("circuit need a parameterized quantum circuit, but get non-parameterized one.")
+    return circuit
+
+
 # pylint: disable=too-many-statements,too-many-locals
 def _qfi_matrix_base(circuit: Circuit, which_part='both', backend='mqvector'):
     """Calculate Quantum Fisher Information (QFI)."""
@@ -47,16 +60,9 @@ def _qfi_matrix_base(circuit: Circuit, which_part='both', backend='mqvector'):
         inner_product,
     )
 
-    _check_input_type('circuit', Circuit, circuit)
     if which_part not in ['A', 'B', 'both']:
         raise ValueError(f"which part shoude be 'A', 'B' or 'both', but get {which_part}.")
-    circuit = circuit.remove_barrier()
-    if circuit.has_measure_gate:
-        raise ValueError("circuit can not has measure gate for calculate qfi similar value.")
-    if circuit.is_noise_circuit:
-        raise ValueError("circuit can not be noise circuit for calculate qfi similar value.")
-    if not circuit.params_name:
-        raise ValueError("circuit need a parameterized quantum circuit, but get non-parameterized one.")
+    circuit = _check_qfi_circuit(circuit)
 
     pure_circ = Circuit()
     n_params = 0
@@ -185,6 +191,20 @@ def qfi(circuit: Circuit, backend='mqvector'):
                [ 0.        ,  0.29192658, -0.18920062],
                [-0.90929743, -0.18920062,  0.94944468]])
     """
+    if backend in ('mqvector', 'mqvector_gpu'):
+        from ...simulator import (  # pylint: disable=import-outside-toplevel,cyclic-import
+            Simulator,
+        )
+
+        # State vector backends calculate qfi in C++ with one circuit sweep per parameter.
+        circuit = _check_qfi_circuit(circuit)
+        sim = Simulator(backend, circuit.n_qubits)
+
+        def qfi_ops_cpp(pr):
+            return sim.get_qfi(circuit, pr)
+
+        return qfi_ops_cpp
+
     qfi_ops_tmp = _qfi_matrix_base(circuit, backend=backend)
 
     def qfi_ops(pr):
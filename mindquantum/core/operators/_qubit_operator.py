@@ -20,12 +20,13 @@
 """Original MindQuantum Qubit Operator class."""
 
 import json
+from typing import NamedTuple
 
 import numpy as np
 from scipy.sparse import csr_matrix, kron
 
 from ...utils.type_value_check import _check_input_type, _check_int_type
-from ..operators._base_operator import _Operator
+from ..operators._base_operator import _Operator, _validate_coeff_type_num
 from ..parameterresolver import ParameterResolver
 
 EQ_TOLERANCE = 1e-8
@@ -51,6 +52,285 @@ _PAULI_OPERATOR_PRODUCTS = {
     ('Z', 'Z'): (1.0, 'I'),
 }
 
+# Pauli operator of a qubit is stored as bit x and bit z, X is (1, 0), Z is (0, 1) and Y is (1, 1).
+_SYMPLECTIC_OPERATORS = ('', 'X', 'Z', 'Y')
+# Phase 1j ** power for power in 0, 1, 2 and 3.
+_PHASES = np.array([1, 1j, -1, -1j])
+# Maximum number of term pairs that are multiplied in one vectorized chunk.
+_PRODUCT_CHUNK = 1 << 20
+# Products and commutators with fewer term pairs are calculated term by term, which has less overhead.
+_VECTORIZE_PAIRS = 64
+
+
+class _SymplecticTerms(NamedTuple):
+    """Pauli strings as X and Z bit masks with shape (number of terms, words), and their constant coefficients."""
+
+    x_bits: np.ndarray
+    z_bits: np.ndarray
+    coeffs: np.ndarray
+    is_complex: np.ndarray
+
+
+def _popcount(arr):
+    """Number of one bits of every element of an uint64 array."""
+    if hasattr(np, 'bitwise_count'):
+        return np.bitwise_count(arr)
+    table = np.array([bin(i).count('1') for i in range(256)], dtype=np.uint8)
+    return table[arr[..., None].view(np.uint8)].sum(axis=-1, dtype=np.uint8)
+
+
+def _pauli_product_phase(l_x, l_z, r_x, r_z):
+    """
+    Phase of products of pauli strings given by broadcastable bit masks, whose last axis is words.
+
+    Returns:
+        Tuple[numpy.ndarray, numpy.ndarray], the power of phase 1j, and whether any qubit gives a phase.
+    """
+    op_x, op_y, op_z = l_x & ~l_z, l_x & l_z, ~l_x & l_z
+    r_op_x, r_op_y, r_op_z = r_x & ~r_z, r_x & r_z, ~r_x & r_z
+    # X Y = iZ, Y Z = iX and Z X = iY on every qubit, and the reversed products give -i.
+    plus = (op_x & r_op_y) | (op_y & r_op_z) | (op_z & r_op_x)
+    minus = (op_y & r_op_x) | (op_z & r_op_y) | (op_x & r_op_z)
+    power = (_popcount(plus).sum(axis=-1, dtype=np.int64) - _popcount(minus).sum(axis=-1, dtype=np.int64)) % 4
+    return power, np.any((plus | minus) != 0, axis=-1)
+
+
+def _terms_to_symplectic(terms):
+    """Symplectic representation of terms, or None if any coefficient is parameterized."""
+    if not all(coeff.is_const() for coeff in terms.values()):
+        return None
+    n_qubits = max((idx + 1 for term in terms for idx, _ in term), default=1)
+    n_words = (n_qubits + 63) // 64
+    x_bits = np.zeros((len(terms), n_words), dtype=np.uint64)
+    z_bits = np.zeros((len(terms), n_words), dtype=np.uint64)
+    for row, term in enumerate(terms):
+        for idx, operator in term:
+            bit = np.uint64(1 << (idx % 64))
+            if operator in 'XY':
+                x_bits[row, idx // 64] |= bit
+            if operator in 'ZY':
+                z_bits[row, idx // 64] |= bit
+    return _SymplecticTerms(
+        x_bits,
+        z_bits,
+        np.array([coeff.const for coeff in terms.values()], dtype=np.complex128).reshape(-1),
+        np.array([coeff.is_complex for coeff in terms.values()], dtype=bool).reshape(-1),
+    )
+
+
+def _packed_pauli_strings(x_bits, z_bits):
+    """
+    Pauli strings of bit masks as packed arrays.
+
+    Returns:
+        Tuple[numpy.ndarray, numpy.ndarray, numpy.ndarray], the qubits and codes x + 2z of all pauli operators in row
+        order, and the offsets of rows, where operators of row i are in range [offsets[i], offsets[i + 1]).
+    """
+    n_rows, n_words = x_bits.shape
+    if not n_rows:
+        return np.zeros(0, dtype=np.int64), np.zeros(0, dtype=np.uint8), np.zeros(1, dtype=np.int64)
+
+    def unpack(bits):
+        bytes_view = np.ascontiguousarray(bits, dtype='<u8').view(np.uint8).reshape(n_rows, 8 * n_words)
+        return np.unpackbits(bytes_view, axis=1, bitorder='little')
+
+    codes = unpack(x_bits) + 2 * unpack(z_bits)
+    rows, cols = np.nonzero(codes)
+    offsets = np.zeros(n_rows + 1, dtype=np.int64)
+    np.cumsum(np.bincount(rows, minlength=n_rows), out=offsets[1:])
+    return cols.astype(np.int64), codes[rows, cols], offsets
+
+
+def _unpack_pauli_strings(qubits, codes, offsets, operators=_SYMPLECTIC_OPERATORS):
+    """Pauli strings of packed arrays as tuples of (qubit, operator), where operators maps code to operator."""
+    factors = list(zip(qubits.tolist(), np.array(operators, dtype=object)[codes].tolist()))
+    ends = offsets.tolist()
+    return [tuple(factors[start:end]) for start, end in zip(ends[:-1], ends[1:])]
+
+
+def _pauli_strings(x_bits, z_bits, operators=_SYMPLECTIC_OPERATORS):
+    """Pauli strings of bit masks as tuples of (qubit, operator), where operators maps code x + 2z to operator."""
+    return _unpack_pauli_strings(*_packed_pauli_strings(x_bits, z_bits), operators)
+
+
+def _symplectic_to_terms(sym):
+    """Terms of symplectic representation, in the same order."""
+    terms = {}
+    strings = _pauli_strings(sym.x_bits, sym.z_bits)
+    for term, coeff, is_complex in zip(strings, sym.coeffs.tolist(), sym.is_complex.tolist()):
+        terms[term] = ParameterResolver(coeff if is_complex else coeff.real)
+    return terms
+
+
+def _symplectic_n_qubits(sym):
+    """Number of qubits of symplectic representation, which is at least one for non empty operator."""
+    used = np.bitwise_or.reduce(sym.x_bits | sym.z_bits, axis=0) if sym.coeffs.shape[0] else []
+    for word in range(len(used) - 1, -1, -1):
+        if used[word]:
+            return 64 * word + int(used[word]).bit_length()
+    return 1 if sym.coeffs.shape[0] else 0
+
+
+def _symplectic_to_csr(sym, n_qubits):
+    """
+    Sparse matrix of symplectic representation, where qubit 0 is the least significant bit of basis.
+
+    A pauli string with bit masks x and z is i^{|x & z|} X^x Z^z, which maps basis j to (-1)^{|j & z|} |j ^ x>, so the
+    terms with the same x mask fill the same sparse diagonal.
+    """
+    dim = 1 << n_qubits
+    basis = np.arange(dim, dtype=np.uint64)
+    x_mask, z_mask = (bits[:, 0] if bits.shape[1] else np.zeros(bits.shape[0], np.uint64) for bits in sym[:2])
+    coeffs = sym.coeffs * _PHASES[_popcount(sym.x_bits & sym.z_bits).sum(axis=1, dtype=np.int64) % 4]
+    unique_x, inverse = np.unique(x_mask, return_inverse=True)
+    rows, cols, data = [], [], []
+    for group, x_value in enumerate(unique_x):
+        members = np.flatnonzero(inverse.ravel() == group)
+        values = np.zeros(dim, dtype=np.complex128)
+        step = max(1, _PRODUCT_CHUNK // dim)
+        for start in range(0, members.shape[0], step):
+            part = members[start : start + step]
+            signs = 1 - 2 * (_popcount(basis[None] & z_mask[part, None]).astype(np.int64) & 1)
+            values += coeffs[part] @ signs
+        nonzero = np.flatnonzero(values)
+        rows.append(basis[nonzero] ^ x_value)
+        cols.append(basis[nonzero])
+        data.append(values[nonzero])
+    if not data:
+        return csr_matrix((dim, dim), dtype=np.complex128)
+    return csr_matrix(
+        (np.concatenate(data), (np.concatenate(rows).astype(np.int64), np.concatenate(cols).astype(np.int64))),
+        shape=(dim, dim),
+    )
+
+
+def _packed_hamiltonian(operator):
+    """
+    Packed pauli terms and number of qubits of an array-backed qubit operator, without building its terms dict.
+
+    Returns:
+        Union[Tuple[numpy.ndarray, numpy.ndarray, numpy.ndarray, numpy.ndarray, int], None], the packed qubits, codes
+        and offsets of pauli strings given by :func:`_packed_pauli_strings`, the real coefficients and the number of
+        qubits, or None if operator is not array-backed.
+    """
+    if not isinstance(operator, QubitOperator) or operator._terms is not None:  # pylint: disable=protected-access
+        return None
+    sym = operator._symplectic  # pylint: disable=protected-access
+    packed = _packed_pauli_strings(sym.x_bits, sym.z_bits)
+    return (*packed, np.ascontiguousarray(sym.coeffs.real), _symplectic_n_qubits(sym))
+
+
+def _pad_words(sym, n_words):
+    """Symplectic representation with n_words words of bit masks."""
+    pad = ((0, 0), (0, n_words - sym.x_bits.shape[1]))
+    return sym._replace(x_bits=np.pad(sym.x_bits, pad), z_bits=np.pad(sym.z_bits, pad))
+
+
+def _merge_terms(keys, first, coeffs, is_complex, touched):
+    """
+    Merge rows of same pauli string, where keys are the concatenated X and Z bit masks.
+
+    Coefficients are summed, and a merged row keeps the smallest first appearance index, and is complex or touched if
+    any of its rows is.
+    """
+    if not keys.shape[0]:
+        return keys, first, coeffs, is_complex, touched
+    void = np.ascontiguousarray(keys).view(np.dtype((np.void, keys.dtype.itemsize * keys.shape[1]))).ravel()
+    _, index, inverse = np.unique(void, return_index=True, return_inverse=True)
+    inverse = inverse.ravel()
+    n_unique = index.shape[0]
+    merged = np.bincount(inverse, weights=coeffs.real, minlength=n_unique) + 1j * np.bincount(
+        inverse, weights=coeffs.imag, minlength=n_unique
+    )
+    merged_first = np.full(n_unique, np.iinfo(np.int64).max, dtype=np.int64)
+    np.minimum.at(merged_first, inverse, first)
+    return (
+        keys[index],
+        merged_first,
+        merged,
+        np.bincount(inverse, weights=is_complex, minlength=n_unique) > 0,
+        np.bincount(inverse, weights=touched, minlength=n_unique) > 0,
+    )
+
+
+def _sorted_terms(keys, first, coeffs, is_complex, keep=None):
+    """Symplectic representation of merged rows in the order of first appearance."""
+    order = np.argsort(first, kind='stable')
+    if keep is not None:
+        order = order[keep[order]]
+    n_words = keys.shape[1] // 2
+    return _SymplecticTerms(keys[order, :n_words], keys[order, n_words:], coeffs[order], is_complex[order])
+
+
+def _multiply_symplectic(left, right, anticommuting=False):
+    """
+    Product of two operators in symplectic representation.
+
+    All pairs of pauli strings are multiplied by bitwise operations in chunks, and same pauli strings are merged in the
+    order of their first appearance in the left major loop of pairs, which is the same as multiplying term by term. If
+    anticommuting is True, only anticommuting pairs are kept with factor two and zero terms are removed, which gives
+    the commutator.
+    """
+    n_words = max(left.x_bits.shape[1], right.x_bits.shape[1])
+    left, right = _pad_words(left, n_words), _pad_words(right, n_words)
+    n_right = right.coeffs.shape[0]
+    keys = np.zeros((0, 2 * n_words), dtype=np.uint64)
+    first = np.zeros(0, dtype=np.int64)
+    coeffs = np.zeros(0, dtype=np.complex128)
+    is_complex = np.zeros(0, dtype=bool)
+    rows = max(1, _PRODUCT_CHUNK // max(n_right, 1))
+    for start in range(0, left.coeffs.shape[0] if n_right else 0, rows):
+        l_x, l_z = left.x_bits[start : start + rows, None], left.z_bits[start : start + rows, None]
+        power, has_phase = _pauli_product_phase(l_x, l_z, right.x_bits[None], right.z_bits[None])
+        chunk_coeffs = (left.coeffs[start : start + rows, None] * right.coeffs[None] * _PHASES[power]).ravel()
+        chunk_complex = (left.is_complex[start : start + rows, None] | right.is_complex[None] | has_phase).ravel()
+        chunk_keys = np.concatenate([l_x ^ right.x_bits[None], l_z ^ right.z_bits[None]], axis=-1)
+        chunk_keys = chunk_keys.reshape(-1, 2 * n_words)
+        chunk_first = start * n_right + np.arange(chunk_keys.shape[0], dtype=np.int64)
+        if anticommuting:
+            mask = power.ravel() % 2 == 1
+            chunk_keys, chunk_first = chunk_keys[mask], chunk_first[mask]
+            chunk_coeffs, chunk_complex = 2 * chunk_coeffs[mask], chunk_complex[mask]
+        keys, first, coeffs, is_complex, _ = _merge_terms(
+            np.concatenate([keys, chunk_keys]),
+            np.concatenate([first, chunk_first]),
+            np.concatenate([coeffs, chunk_coeffs]),
+            np.concatenate([is_complex, chunk_complex]),
+            np.zeros(keys.shape[0] + chunk_keys.shape[0], dtype=bool),
+        )
+    return _sorted_terms(keys, first, coeffs, is_complex, np.abs(coeffs) >= EQ_TOLERANCE if anticommuting else None)
+
+
+def _add_symplectic(left, right):
+    """Sum of two operators in symplectic representation, terms of right that sum to zero are removed."""
+    n_words = max(left.x_bits.shape[1], right.x_bits.shape[1])
+    left, right = _pad_words(left, n_words), _pad_words(right, n_words)
+    n_left, n_right = left.coeffs.shape[0], right.coeffs.shape[0]
+    keys = np.concatenate([np.concatenate([sym.x_bits, sym.z_bits], axis=1) for sym in (left, right)])
+    keys, first, coeffs, is_complex, touched = _merge_terms(
+        keys,
+        np.arange(n_left + n_right, dtype=np.int64),
+        np.concatenate([left.coeffs, right.coeffs]),
+        np.concatenate([left.is_complex, right.is_complex]),
+        np.concatenate([np.zeros(n_left, dtype=bool), np.ones(n_right, dtype=bool)]),
+    )
+    return _sorted_terms(keys, first, coeffs, is_complex, ~touched | (np.abs(coeffs) >= EQ_TOLERANCE))
+
+
+def _qubit_commutator(left_operator, right_operator):  # pylint: disable=protected-access
+    """
+    Commutator of two qubit operators, which is twice the product of all anticommuting pairs of pauli strings.
+
+    Returns:
+        Union[QubitOperator, None], the commutator, or None if it is not worth to be vectorized.
+    """
+    if len(left_operator) * len(right_operator) < _VECTORIZE_PAIRS:
+        return None
+    left, right = left_operator._symplectic_terms(), right_operator._symplectic_terms()
+    if left is None or right is None:
+        return None
+    return QubitOperator._from_symplectic_terms(_multiply_symplectic(left, right, anticommuting=True))
+
 
 def _check_valid_qubit_operator_term(qo_term):
     """Check valid qubit operator term."""
@@ -352,8 +632,129 @@ class QubitOperator(_Operator):
             reduced_terms.append((left_term[0], left_term[1].upper()))
         return coefficient, tuple(reduced_terms)
 
+    @property
+    def terms(self):
+        """Get the terms of this qubit operator, a dict from pauli strings to coefficients."""
+        if self._terms is None:
+            # The dict can be modified by caller, so the symplectic representation is dropped once materialized.
+            self._terms, self._symplectic = _symplectic_to_terms(self._symplectic), None
+        return self._terms
+
+    @terms.setter
+    def terms(self, terms):
+        """Set the terms of this qubit operator."""
+        self._terms, self._symplectic = terms, None
+
+    def _symplectic_terms(self):
+        """
+        Get the pauli strings as X and Z bit masks and their coefficients.
+
+        Returns:
+            Union[_SymplecticTerms, None], the symplectic representation, or None if any coefficient is parameterized.
+        """
+        if self._terms is None:
+            return self._symplectic
+        return _terms_to_symplectic(self._terms)
+
+    @staticmethod
+    def _from_symplectic_terms(symplectic):
+        """Construct a qubit operator from pauli strings as X and Z bit masks, the terms dict is built lazily."""
+        operator = QubitOperator()
+        operator._terms, operator._symplectic = None, symplectic  # pylint: disable=protected-access
+        return operator
+
+    def _vectorized_product(self, multiplier):
+        """Get symplectic representation of product with multiplier, or None if it is not worth to be vectorized."""
+        if isinstance(multiplier, QubitOperator):
+            if len(self) * len(multiplier) < _VECTORIZE_PAIRS:
+                return None
+            left, right = self._symplectic_terms(), multiplier._symplectic_terms()
+            if left is not None and right is not None:
+                return _multiply_symplectic(left, right)
+        elif self._terms is None and isinstance(multiplier, _validate_coeff_type_num):
+            return self._symplectic._replace(
+                coeffs=self._symplectic.coeffs * multiplier,
+                is_complex=self._symplectic.is_complex | isinstance(multiplier, (complex, np.complexfloating)),
+            )
+        return None
+
+    def _vectorized_sum(self, operator, sign):
+        """Get symplectic representation of sum with operator, which is only vectorized if both are not materialized."""
+        if isinstance(operator, QubitOperator) and self._terms is None and operator._terms is None:
+            right = operator._symplectic_terms()
+            return _add_symplectic(self._symplectic, right._replace(coeffs=sign * right.coeffs))
+        return None
+
+    def __imul__(self, multiplier):
+        """Multiply in place, the product of qubit operators with constant coefficients is vectorized."""
+        product = self._vectorized_product(multiplier)
+        if product is None:
+            return super().__imul__(multiplier)
+        self._terms, self._symplectic = None, product
+        return self
+
+    def __mul__(self, multiplier):
+        """Multiply a number or another qubit operator."""
+        product = self._vectorized_product(multiplier)
+        if product is None:
+            return super().__mul__(multiplier)
+        return QubitOperator._from_symplectic_terms(product)
+
+    def __iadd__(self, operator):
+        """Add in place, the sum of qubit operators that are not materialized is vectorized."""
+        result = self._vectorized_sum(operator, 1)
+        if result is None:
+            return super().__iadd__(operator)
+        self._terms, self._symplectic = None, result
+        return self
+
+    def __isub__(self, operator):
+        """Subtract in place, the difference of qubit operators that are not materialized is vectorized."""
+        result = self._vectorized_sum(operator, -1)
+        if result is None:
+            return super().__isub__(operator)
+        self._terms, self._symplectic = None, result
+        return self
+
+    def __len__(self):
+        """Return the number of terms."""
+        if self._terms is None:
+            return self._symplectic.coeffs.shape[0]
+        return len(self._terms)
+
+    @property
+    def size(self):
+        """Return the number of terms."""
+        return len(self)
+
+    def compress(self, abs_tol=EQ_TOLERANCE):
+        """
+        Eliminate the very small terms that close to zero.
+
+        Removes small imaginary and real parts.
+
+        Args:
+            abs_tol(float): Absolute tolerance, must be at least 0.0
+
+        Returns:
+            the compressed operator
+        """
+        if self._terms is not None:
+            return super().compress(abs_tol)
+        sym = self._symplectic
+        keep = np.abs(sym.coeffs) > abs_tol
+        real = np.abs(sym.coeffs.imag) <= abs_tol
+        imag = ~real & (np.abs(sym.coeffs.real) <= abs_tol)
+        coeffs = np.where(real, sym.coeffs.real, np.where(imag, 1j * sym.coeffs.imag, sym.coeffs))
+        self._symplectic = _SymplecticTerms(sym.x_bits[keep], sym.z_bits[keep], coeffs[keep], ~real[keep])
+        return self
+
     def hermitian(self):
         """Return Hermitian conjugate of QubitOperator."""
+        if self._terms is None:
+            return QubitOperator._from_symplectic_terms(
+                self._symplectic._replace(coeffs=self._symplectic.coeffs.conj())
+            )
         conjugate_operator = QubitOperator()
         for term, coefficient in self.terms.items():
             conjugate_operator.terms[term] = coefficient.conjugate()
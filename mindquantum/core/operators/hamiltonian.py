@@ -15,6 +15,7 @@
 
 """Hamiltonian module."""
 
+import logging
 from enum import Enum
 
 import numpy as np
@@ -22,8 +23,37 @@ import scipy.sparse as sp
 
 from mindquantum import mqbackend as mb
 
+from ._qubit_operator import _unpack_pauli_strings
 from ._term_value import TermValue
 
+_LOGGER = logging.getLogger(__name__)
+_CODES = {'X': 1, 'Z': 2, 'Y': 3}
+_TERM_VALUES = ('',) + tuple(TermValue[i] for i in 'XZY')
+
+
+def _pack_terms(terms):
+    """
+    Pack the terms dict of a qubit operator into arrays of qubits, pauli codes, offsets and real coefficients.
+
+    The pauli code is x + 2z of the symplectic bits of operator, and operators of the i-th term are in range
+    [offsets[i], offsets[i + 1]).
+    """
+    qubits, codes, offsets, coeffs = [], [], [0], []
+    for term, coeff in terms.items():
+        if not coeff.is_const():
+            raise ValueError("Hamiltonian cannot be parameterized.")
+        for qubit, pauli in term:
+            qubits.append(qubit)
+            codes.append(_CODES[pauli])
+        offsets.append(len(qubits))
+        coeffs.append(coeff.const.real)
+    return (
+        np.array(qubits, dtype=np.int64),
+        np.array(codes, dtype=np.uint8),
+        np.array(offsets, dtype=np.int64),
+        np.array(coeffs, dtype=np.float64),
+    )
+
 
 class HowTo(Enum):
     """Hamiltonian type."""  # Need to improve that...
@@ -53,6 +83,7 @@ class Hamiltonian:
         import openfermion.ops as of_ops
         import projectq.ops as pq_ops
 
+        from ._qubit_operator import _packed_hamiltonian
         from .qubit_operator import QubitOperator as HiQOperator
         from .utils import count_qubits
 
@@ -70,20 +101,38 @@ class Hamiltonian:
             self.sparse_mat = hamiltonian
             self.how_to = HowTo.FRONTEND
             self.n_qubits = int(np.log2(self.sparse_mat.shape[0]))
+            packed = None
         else:
             self.hamiltonian = hamiltonian
             self.sparse_mat = sp.csr_matrix(np.eye(2, dtype=np.complex64))
             self.how_to = HowTo.ORIGIN
-            self.n_qubits = count_qubits(hamiltonian)
-        self.ham_termlist = []
-        for i, j in self.hamiltonian.terms.items():
-            if not j.is_const():
-                raise ValueError("Hamiltonian cannot be parameterized.")
-            self.ham_termlist.append((tuple((k, TermValue[l]) for k, l in i), j.const.real))
+            # Array-backed qubit operator gives the packed terms without building its terms dict.
+            packed = _packed_hamiltonian(hamiltonian)
+            self.n_qubits = count_qubits(hamiltonian) if packed is None else packed[4]
+        if packed is None:
+            packed = _pack_terms(self.hamiltonian.terms)
+        self.packed_terms = packed[:4]
+        self._ham_termlist = None
 
         self.ham_cpp = None
         self.herm_ham_cpp = None
 
+    @property
+    def ham_termlist(self):
+        """
+        Get the term list of this hamiltonian.
+
+        The term list is built from the packed terms at the first access.
+
+        Returns:
+            list, the list of pauli terms, every term is a tuple of pauli string and real coefficient.
+        """
+        if self._ham_termlist is None:
+            qubits, codes, offsets, coeffs = self.packed_terms
+            strings = _unpack_pauli_strings(qubits, codes, offsets, _TERM_VALUES)
+            self._ham_termlist = list(zip(strings, coeffs.tolist()))
+        return self._ham_termlist
+
     def __str__(self):
         """Return a string representation of the object."""
         if self.how_to == HowTo.FRONTEND:
@@ -122,9 +171,12 @@ class Hamiltonian:
         if not hermitian:
             if self.ham_cpp is None:
                 if self.how_to == HowTo.ORIGIN:
-                    ham = mb.hamiltonian(self.ham_termlist)
+                    ham = mb.hamiltonian(*self.packed_terms)
                 elif self.how_to == HowTo.BACKEND:
-                    ham = mb.hamiltonian(self.ham_termlist, self.n_qubits)
+                    n_terms = len(self.packed_terms[3])
+                    _LOGGER.info("Sparsing hamiltonian of %d terms on %d qubits ...", n_terms, self.n_qubits)
+                    ham = mb.hamiltonian(*self.packed_terms, self.n_qubits)
+                    _LOGGER.info("Sparsing hamiltonian finished!")
                 else:
                     dim = self.sparse_mat.shape[0]
                     nnz = self.sparse_mat.nnz
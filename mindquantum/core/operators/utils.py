@@ -15,6 +15,8 @@
 
 """This module provide some useful function related to operators."""
 
+from ..operators._qubit_operator import QubitOperator as _PyQubitOperator
+from ..operators._qubit_operator import _qubit_commutator
 from ..operators.fermion_operator import FermionOperator
 from ..operators.polynomial_tensor import PolynomialTensor
 from ..operators.qubit_excitation_operator import QubitExcitationOperator
@@ -108,6 +110,10 @@ def commutator(left_operator, right_operator):
     if not isinstance(left_operator, valueable_type):
         raise TypeError("Operator should be QubitOperator, FermionOperator or QubitExcitationOperator.")
 
+    if isinstance(left_operator, _PyQubitOperator):
+        result = _qubit_commutator(left_operator, right_operator)
+        if result is not None:
+            return result
     result = left_operator * right_operator
     result -= right_operator * left_operator
     return result
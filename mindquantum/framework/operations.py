@@ -116,16 +116,27 @@ class MQOps(nn.Cell):
         """Construct an MQOps node."""
         check_enc_input_shape(enc_data, self.shape_ops(enc_data), len(self.expectation_with_grad.encoder_params_name))
         check_ans_input_shape(ans_data, self.shape_ops(ans_data), len(self.expectation_with_grad.ansatz_params_name))
-        fval, g_enc, g_ans = self.expectation_with_grad(enc_data.asnumpy(), ans_data.asnumpy())
-        self.g_enc = np.real(g_enc)
-        self.g_ans = np.real(g_ans)
+        enc_data, ans_data = enc_data.asnumpy(), ans_data.asnumpy()
+        if _use_weights(self.expectation_with_grad):
+            # Gradient is evaluated in bprop with one backward sweep for the weighted sum of all hamiltonians.
+            weights = np.zeros((enc_data.shape[0], len(self.expectation_with_grad.hams)))
+            fval, _, _ = self.expectation_with_grad(enc_data, ans_data, weights=weights)
+            self.g_enc, self.g_ans = None, None
+        else:
+            fval, g_enc, g_ans = self.expectation_with_grad(enc_data, ans_data)
+            self.g_enc = np.real(g_enc)
+            self.g_ans = np.real(g_ans)
         return ms.Tensor(np.real(fval), dtype=ms.float32)
 
     def bprop(self, enc_data, ans_data, out, dout):  # pylint: disable=unused-argument
         """Implement the bprop function."""
         dout = dout.asnumpy()
-        enc_grad = np.einsum('smp,sm->sp', self.g_enc, dout)
-        ans_grad = np.einsum('smp,sm->p', self.g_ans, dout)
+        if self.g_enc is None:
+            _, enc_grad, ans_grad = self.expectation_with_grad(enc_data.asnumpy(), ans_data.asnumpy(), weights=dout)
+            enc_grad, ans_grad = np.real(enc_grad), np.real(ans_grad).sum(axis=0)
+        else:
+            enc_grad = np.einsum('smp,sm->sp', self.g_enc, dout)
+            ans_grad = np.einsum('smp,sm->p', self.g_ans, dout)
         return ms.Tensor(enc_grad, dtype=ms.float32), ms.Tensor(ans_grad, dtype=ms.float32)
 
 
@@ -278,14 +289,23 @@ class MQAnsatzOnlyOps(nn.Cell):
     def construct(self, arg):
         """Construct a MQAnsatzOnlyOps node."""
         check_ans_input_shape(arg, self.shape_ops(arg), len(self.expectation_with_grad.ansatz_params_name))
-        fval, g_ans = self.expectation_with_grad(arg.asnumpy())
-        self.g = np.real(g_ans[0])
+        if _use_weights(self.expectation_with_grad):
+            weights = np.zeros((1, len(self.expectation_with_grad.hams)))
+            fval, _ = self.expectation_with_grad(arg.asnumpy(), weights=weights)
+            self.g = None
+        else:
+            fval, g_ans = self.expectation_with_grad(arg.asnumpy())
+            self.g = np.real(g_ans[0])
         return ms.Tensor(np.real(fval[0]), dtype=ms.float32)
 
     def bprop(self, arg, out, dout):  # pylint: disable=unused-argument
         """Implement the bprop function."""
         dout = dout.asnumpy()
-        grad = dout @ self.g
+        if self.g is None:
+            _, grad = self.expectation_with_grad(arg.asnumpy(), weights=dout[None, :])
+            grad = np.real(grad[0])
+        else:
+            grad = dout @ self.g
         return ms.Tensor(grad, dtype=ms.float32)
 
 
@@ -429,14 +449,23 @@ class MQEncoderOnlyOps(nn.Cell):
     def construct(self, arg):
         """Construct a MQEncoderOnlyOps node."""
         check_enc_input_shape(arg, self.shape_ops(arg), len(self.expectation_with_grad.encoder_params_name))
-        fval, g_enc = self.expectation_with_grad(arg.asnumpy())
-        self.g = np.real(g_enc)
+        if _use_weights(self.expectation_with_grad):
+            weights = np.zeros((arg.shape[0], len(self.expectation_with_grad.hams)))
+            fval, _ = self.expectation_with_grad(arg.asnumpy(), weights=weights)
+            self.g = None
+        else:
+            fval, g_enc = self.expectation_with_grad(arg.asnumpy())
+            self.g = np.real(g_enc)
         return ms.Tensor(np.real(fval), dtype=ms.float32)
 
     def bprop(self, arg, out, dout):  # pylint: disable=unused-argument
         """Implement the bprop function."""
         dout = dout.asnumpy()
-        grad = np.einsum('smp,sm->sp', self.g, dout)
+        if self.g is None:
+            _, grad = self.expectation_with_grad(arg.asnumpy(), weights=dout)
+            grad = np.real(grad)
+        else:
+            grad = np.einsum('smp,sm->sp', self.g, dout)
         return ms.Tensor(grad, dtype=ms.float32)
 
 
@@ -530,3 +559,8 @@ def _mode_check(self):
 def _check_grad_ops(expectation_with_grad):
     if not isinstance(expectation_with_grad, GradOpsWrapper):
         raise TypeError(f'expectation_with_grad requires a GradOpsWrapper, but get {type(expectation_with_grad)}')
+
+
+def _use_weights(expectation_with_grad):
+    """Whether to evaluate the gradient of weighted sum of hamiltonians in bprop."""
+    return expectation_with_grad.support_weights and len(expectation_with_grad.hams) > 1
@@ -37,6 +37,7 @@ class BackendBase:
         self,
         circuit: Circuit,
         pr: Union[Dict, ParameterResolver] = None,
+        fuse: bool = False,
     ):
         """Apply a quantum circuit."""
         raise NotImplementedError(f"apply_circuit not implemented for {self.device_name()}")
@@ -70,10 +71,26 @@ class BackendBase:
         """Get the matrix of given circuit."""
         raise NotImplementedError(f"get_circuit_matrix not implemented for {self.device_name()}")
 
+    def get_amplitudes(self, indices: List[int]) -> np.ndarray:
+        """Get amplitudes of given computational basis."""
+        raise NotImplementedError(f"get_amplitudes not implemented for {self.device_name()}")
+
     def get_expectation(self, hamiltonian: Hamiltonian) -> np.ndarray:
         """Get expectation of given hamiltonian."""
         raise NotImplementedError(f"get_expectation not implemented for {self.device_name()}")
 
+    def get_noisy_expectation(  # pylint: disable=too-many-arguments
+        self,
+        hamiltonian: Union[Hamiltonian, List[Hamiltonian]],
+        circuit: Circuit,
+        pr: Union[Dict, ParameterResolver] = None,
+        n_traj: int = 1000,
+        seed: int = None,
+        parallel_worker: int = None,
+    ):
+        """Get expectation of hamiltonian averaged over trajectories of a noisy circuit."""
+        raise NotImplementedError(f"get_noisy_expectation not implemented for {self.device_name()}")
+
     def get_expectation_with_grad(  # pylint: disable=too-many-arguments
         self,
         hams: List[Hamiltonian],
@@ -81,14 +98,37 @@ class BackendBase:
         circ_left: Circuit = None,
         simulator_left: "BackendBase" = None,
         parallel_worker: int = None,
+        max_memory: int = None,
+        checkpoint: bool = False,
+        method: str = 'adjoint',
+        shots: int = None,
+        seed: int = None,
     ):
         """Get expectation and the gradient w.r.t parameters."""
         raise NotImplementedError(f"get_qs not implemented for {self.device_name()}")
 
+    def get_probabilities(self, qubits: List[int] = None) -> np.ndarray:
+        """Get probability of every measurement outcome of given qubits."""
+        raise NotImplementedError(f"get_probabilities not implemented for {self.device_name()}")
+
+    def get_qfi(
+        self,
+        circuit: Circuit,
+        pr: Union[Dict, ParameterResolver] = None,
+        approx: str = 'full',
+        parallel_worker: int = None,
+    ) -> np.ndarray:
+        """Get quantum fisher information of given circuit."""
+        raise NotImplementedError(f"get_qfi not implemented for {self.device_name()}")
+
     def get_qs(self, ket=False) -> Union[str, np.ndarray]:
         """Get quantum state."""
         raise NotImplementedError(f"get_qs not implemented for {self.device_name()}")
 
+    def get_reduced_density_matrix(self, qubits: List[int]) -> np.ndarray:
+        """Get density matrix of given qubits with other qubits traced out."""
+        raise NotImplementedError(f"get_reduced_density_matrix not implemented for {self.device_name()}")
+
     def reset(self):
         """Reset backend to quantum zero state."""
         raise NotImplementedError(f"reset not implemented for {self.device_name()}")
@@ -0,0 +1,603 @@
+# Copyright 2022 Huawei Technologies Co., Ltd
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+# http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+# ============================================================================
+"""Matrix product state simulator."""
+# pylint: disable=invalid-name
+from concurrent.futures import ThreadPoolExecutor
+from typing import Dict, List, Union
+
+import numpy as np
+
+from mindquantum.core.circuit import Circuit
+from mindquantum.core.gates import (
+    RX,
+    RY,
+    RZ,
+    XX,
+    YY,
+    ZZ,
+    BarrierGate,
+    BasicGate,
+    GlobalPhase,
+    Measure,
+    MeasureResult,
+    NoiseGate,
+    PhaseShift,
+)
+from mindquantum.core.gates.basic import ParameterGate
+from mindquantum.core.operators import Hamiltonian
+from mindquantum.core.operators.hamiltonian import HowTo
+from mindquantum.core.parameterresolver import ParameterResolver
+from mindquantum.utils.type_value_check import (
+    _check_and_generate_pr_type,
+    _check_ansatz,
+    _check_encoder,
+    _check_hamiltonian_qubits_number,
+    _check_input_type,
+    _check_int_type,
+    _check_seed,
+    _check_value_should_not_less,
+)
+
+from ..utils.string_utils import ket_string
+from .backend_base import BackendBase
+from .utils import GradOpsWrapper
+
+_PAULI = {
+    'X': np.array([[0, 1], [1, 0]], dtype=np.complex128),
+    'Y': np.array([[0, -1j], [1j, 0]], dtype=np.complex128),
+    'Z': np.array([[1, 0], [0, -1]], dtype=np.complex128),
+}
+_SWAP = np.eye(4)[[0, 2, 1, 3]]
+
+
+def _gate_matrix(gate: BasicGate, pr: ParameterResolver) -> np.ndarray:
+    """Matrix of gate on its object qubits followed by its control qubits, in little endian."""
+    if isinstance(gate, ParameterGate) and gate.parameterized:
+        mat = gate.matrix(pr)
+    else:
+        mat = gate.matrix()
+    if not gate.ctrl_qubits:
+        return mat
+    dim = mat.shape[0]
+    out = np.eye(dim << len(gate.ctrl_qubits), dtype=np.complex128)
+    out[-dim:, -dim:] = mat
+    return out
+
+
+def _gate_qubits(gate: BasicGate) -> List[int]:
+    """Qubits of gate matrix from the lowest bit, the two object qubits of a gate are ordered as in mqvector."""
+    obj_qubits = sorted(gate.obj_qubits) if len(gate.obj_qubits) == 2 else gate.obj_qubits
+    return obj_qubits + gate.ctrl_qubits
+
+
+def _shift_rule(gate: BasicGate):
+    """
+    Parameter shift rule of a rotation gate.
+
+    Returns:
+        List[Tuple[float, float]], pairs of shift s and weight w, so that the derivative of expectation with respect
+        to the rotation angle is sum of w * (f(angle + s) - f(angle - s)).
+    """
+    if isinstance(gate, GlobalPhase) and not gate.ctrl_qubits:
+        return []
+    if isinstance(gate, (PhaseShift, GlobalPhase)):
+        return [(np.pi / 2, 0.5)]
+    if isinstance(gate, (RX, RY, RZ)):
+        omega = 1
+    elif isinstance(gate, (XX, YY, ZZ)):
+        omega = 2
+    else:
+        raise ValueError(f"Gradient of gate {gate} is not supported by mps simulator.")
+    if not gate.ctrl_qubits:
+        return [(np.pi / 2 / omega, omega / 2)]
+    # With control qubits, the generator has eigenvalues 0 and +-omega/2, which needs a four terms shift rule.
+    d_1 = (np.sqrt(2) + 1) / (4 * np.sqrt(2))
+    d_2 = (np.sqrt(2) - 1) / (4 * np.sqrt(2))
+    return [(np.pi / 2 / omega, omega * d_1), (3 * np.pi / 2 / omega, -omega * d_2)]
+
+
+class MPS(BackendBase):
+    """
+    A matrix product state backend.
+
+    The quantum state is stored as a chain of tensors with shape (left bond, 2, right bond), one for each qubit, and
+    the chain is kept in mixed canonical form around an orthogonality center. Two qubits gates on qubits that are
+    not neighbors are applied through SWAP gates, and every bond is truncated by singular value decomposition, so
+    that the memory and time cost grows with the entanglement instead of the number of qubits.
+
+    Args:
+        n_qubits (int): number of qubits.
+        seed (int): the random seed. Default: ``42``.
+        max_bond_dim (int): the maximum bond dimension kept after every two qubits gate. Default: ``64``.
+        cutoff (float): the maximum discarded weight, which is the sum of squared discarded singular values of a
+            normalized state, of every truncation. Default: ``1e-12``.
+    """
+
+    def __init__(self, n_qubits: int, seed=42, max_bond_dim: int = 64, cutoff: float = 1e-12):
+        """Initialize a mps backend."""
+        super().__init__('mps', n_qubits, seed)
+        _check_int_type('max_bond_dim', max_bond_dim)
+        _check_value_should_not_less('max_bond_dim', 1, max_bond_dim)
+        _check_input_type('cutoff', (int, float), cutoff)
+        _check_value_should_not_less('cutoff', 0, cutoff)
+        self.max_bond_dim = max_bond_dim
+        self.cutoff = cutoff
+        self.rnd_eng = np.random.default_rng(seed)
+        self.tensors = []
+        self.center = 0
+        self.reset()
+
+    def __str__(self):
+        """Return a string representation of the object."""
+        ret = f"{self.name} simulator with {self.n_qubits} qubit{'s' if self.n_qubits > 1 else ''} (little endian)."
+        ret += f"\nBond dimensions: {self.bond_dims()}"
+        if self.n_qubits < 4:
+            ret += "\nCurrent quantum state:\n"
+            ret += '\n'.join(ket_string(self.get_qs()))
+        return ret
+
+    def __repr__(self):
+        """Return a string representation of the object."""
+        return self.__str__()
+
+    def bond_dims(self) -> List[int]:
+        """Get the dimension of every bond between neighboring qubits."""
+        return [t.shape[2] for t in self.tensors[:-1]]
+
+    def _move_center(self, site: int):
+        """Move the orthogonality center to site by QR decomposition."""
+        while self.center < site:
+            k = self.center
+            left, _, right = self.tensors[k].shape
+            q, r = np.linalg.qr(self.tensors[k].reshape(left * 2, right))
+            self.tensors[k] = q.reshape(left, 2, -1)
+            self.tensors[k + 1] = np.tensordot(r, self.tensors[k + 1], axes=1)
+            self.center += 1
+        while self.center > site:
+            k = self.center
+            left, _, right = self.tensors[k].shape
+            q, r = np.linalg.qr(self.tensors[k].reshape(left, 2 * right).T)
+            self.tensors[k] = q.T.reshape(-1, 2, right)
+            self.tensors[k - 1] = np.tensordot(self.tensors[k - 1], r.T, axes=1)
+            self.center -= 1
+
+    def _apply_one(self, site: int, mat: np.ndarray):
+        """Apply single qubit matrix, which keeps the canonical form."""
+        self.tensors[site] = np.einsum('ab,lbr->lar', mat, self.tensors[site])
+
+    def _split(self, site: int, theta: np.ndarray):
+        """Split tensor of sites from site into canonical tensors by truncated singular value decomposition."""
+        n_sites = theta.ndim - 2
+        for k in range(site, site + n_sites - 1):
+            left = theta.shape[0]
+            rest = theta.shape[2:]
+            u, s, v = np.linalg.svd(theta.reshape(left * 2, -1), full_matrices=False)
+            weight = s**2 / np.sum(s**2)
+            # tail[k] is the discarded weight if only the first k singular values are kept.
+            tail = np.cumsum(weight[::-1])[::-1]
+            keep = max(1, min(self.max_bond_dim, int(np.count_nonzero(tail > self.cutoff))))
+            s = s[:keep] / np.linalg.norm(s[:keep])
+            self.tensors[k] = u[:, :keep].reshape(left, 2, keep)
+            theta = (s[:, None] * v[:keep]).reshape(keep, *rest)
+        self.tensors[site + n_sites - 1] = theta
+        self.center = site + n_sites - 1
+
+    def _apply_block(self, site: int, qubits_pos: List[int], mat: np.ndarray):
+        """
+        Apply matrix on neighboring sites from site.
+
+        Bit i of matrix index is the qubit at site + qubits_pos[i].
+        """
+        n_sites = len(qubits_pos)
+        self._move_center(site)
+        theta = self.tensors[site]
+        for k in range(site + 1, site + n_sites):
+            theta = np.tensordot(theta, self.tensors[k], axes=1)
+        mat = mat.reshape([2] * (2 * n_sites))
+        in_axes = [2 * n_sites - 1 - i for i in range(n_sites)]
+        theta = np.tensordot(mat, theta, axes=(in_axes, [1 + pos for pos in qubits_pos]))
+        # Output axis of bit i is n_sites - 1 - i, followed by left and right bond.
+        bit_of_pos = {pos: i for i, pos in enumerate(qubits_pos)}
+        perm = [n_sites] + [n_sites - 1 - bit_of_pos[pos] for pos in range(n_sites)] + [n_sites + 1]
+        self._split(site, theta.transpose(perm))
+
+    def _move_site(self, src: int, dst: int):
+        """Move the qubit at site src to site dst by SWAP gates on neighboring sites."""
+        step = 1 if dst > src else -1
+        for k in range(src, dst, step):
+            self._apply_block(min(k, k + step), [0, 1], _SWAP)
+
+    def _apply_matrix(self, qubits: List[int], mat: np.ndarray):
+        """Apply matrix on qubits, the first qubit is the lowest bit of matrix index."""
+        if len(qubits) == 1:
+            self._apply_one(qubits[0], mat)
+            return
+        order = sorted(qubits)
+        site = order[0]
+        # Move the qubits next to each other, apply the gate and move them back.
+        for j in range(1, len(order)):
+            self._move_site(order[j], site + j)
+        self._apply_block(site, [order.index(q) for q in qubits], mat)
+        for j in range(len(order) - 1, 0, -1):
+            self._move_site(site + j, order[j])
+
+    def _measure(self, qubit: int) -> int:
+        """Measure and collapse a qubit."""
+        self._move_center(qubit)
+        tensor = self.tensors[qubit]
+        prob_1 = np.vdot(tensor[:, 1], tensor[:, 1]).real / np.vdot(tensor, tensor).real
+        outcome = int(self.rnd_eng.random() < prob_1)
+        tensor = tensor.copy()
+        tensor[:, 1 - outcome] = 0
+        self.tensors[qubit] = tensor / np.linalg.norm(tensor)
+        return outcome
+
+    def _compile(self, circuit: Circuit, pr: ParameterResolver):
+        """Matrices of all gates of circuit, measurement gates are kept as it is."""
+        ops = []
+        for gate in circuit:
+            if isinstance(gate, BarrierGate):
+                continue
+            if isinstance(gate, NoiseGate):
+                raise ValueError(f"Noise channel {gate} is not supported by mps simulator.")
+            if isinstance(gate, Measure):
+                ops.append(gate)
+            else:
+                ops.append((_gate_qubits(gate), _gate_matrix(gate, pr)))
+        return ops
+
+    def _run(self, ops):
+        """Apply compiled gates, return the measurement result."""
+        res = {}
+        for op in ops:
+            if isinstance(op, Measure):
+                res[op.key] = self._measure(op.obj_qubits[0])
+            else:
+                self._apply_matrix(*op)
+        return res
+
+    def apply_circuit(
+        self,
+        circuit: Circuit,
+        pr: Union[Dict, ParameterResolver] = None,
+        fuse: bool = False,
+    ):
+        """Apply a quantum circuit."""
+        _check_input_type('circuit', Circuit, circuit)
+        if self.n_qubits < circuit.n_qubits:
+            raise ValueError(f"Circuit has {circuit.n_qubits} qubits, which is more than simulator qubits.")
+        if circuit.params_name:
+            if pr is None:
+                raise ValueError("Applying a parameterized circuit needs a parameter_resolver.")
+            pr = _check_and_generate_pr_type(pr, circuit.params_name)
+        else:
+            pr = ParameterResolver()
+        res = self._run(self._compile(circuit, pr))
+        if res:
+            out = MeasureResult()
+            out.add_measure(circuit.all_measures.keys())
+            out.collect_data([[res[i] for i in out.keys_map]])
+            return out
+        return None
+
+    def apply_gate(
+        self,
+        gate: BasicGate,
+        pr: Union[Dict, ParameterResolver] = None,
+        diff: bool = False,
+    ):
+        """Apply a quantum gate."""
+        _check_input_type("gate", BasicGate, gate)
+        if diff:
+            raise ValueError("Applying derivative of gate is not supported by mps simulator.")
+        if isinstance(gate, BarrierGate):
+            return None
+        gate_max = max(max(gate.obj_qubits, gate.ctrl_qubits))
+        if self.n_qubits <= gate_max:
+            raise ValueError(f"qubits of gate {gate} is higher than simulator qubits.")
+        if gate.parameterized:
+            if pr is None:
+                raise ValueError("apply a parameterized gate needs a parameter_resolver")
+            pr = _check_and_generate_pr_type(pr, gate.coeff.params_name)
+        else:
+            pr = ParameterResolver()
+        if isinstance(gate, Measure):
+            return self._measure(gate.obj_qubits[0])
+        self._run(self._compile(Circuit([gate]), pr))
+        return None
+
+    def copy(self) -> "BackendBase":
+        """Copy a mps simulator."""
+        sim = MPS(self.n_qubits, self.seed, self.max_bond_dim, self.cutoff)
+        sim.tensors = [t.copy() for t in self.tensors]
+        sim.center = self.center
+        sim.rnd_eng = np.random.default_rng(self.rnd_eng.integers(1 << 31))
+        return sim
+
+    def device_name(self) -> str:
+        """Return the device name."""
+        return f"{self.n_qubits} qubits {self.name} simulator."
+
+    def flush(self):
+        """Execute all command."""
+
+    def _expectation_term(self, term) -> complex:
+        """Expectation of a pauli string, given as pairs of qubit and pauli name."""
+        if not term:
+            return 1
+        paulis = dict(term)
+        # Sites on the left of center are left canonical and sites on the right are right canonical, so after moving the
+        # center into the pauli string only the sites of pauli string are contracted.
+        start, stop = min(paulis), max(paulis)
+        self._move_center(min(max(self.center, start), stop))
+        env = np.eye(self.tensors[start].shape[0], dtype=np.complex128)
+        for k in range(start, stop + 1):
+            ket = self.tensors[k]
+            if k in paulis:
+                ket = np.einsum('ab,lbr->lar', _PAULI[paulis[k]], ket)
+            env = np.einsum('ij,isk,jsl->kl', env, self.tensors[k].conj(), ket)
+        return np.trace(env)
+
+    def get_expectation(self, hamiltonian: Hamiltonian) -> np.ndarray:
+        """Get expectation of a pauli hamiltonian."""
+        if not isinstance(hamiltonian, Hamiltonian):
+            raise TypeError(f"hamiltonian requires a Hamiltonian, but got {type(hamiltonian)}")
+        if hamiltonian.how_to == HowTo.FRONTEND:
+            raise ValueError("mps simulator only supports hamiltonian of pauli operators.")
+        _check_hamiltonian_qubits_number(hamiltonian, self.n_qubits)
+        terms = sorted(hamiltonian.ham_termlist, key=lambda term: min((i for i, _ in term[0]), default=0))
+        return np.complex128(sum(coeff * self._expectation_term(term) for term, coeff in terms))
+
+    def get_expectation_with_grad(  # pylint: disable=too-many-arguments,too-many-locals
+        self,
+        hams: List[Hamiltonian],
+        circ_right: Circuit,
+        circ_left: Circuit = None,
+        simulator_left: "BackendBase" = None,
+        parallel_worker: int = None,
+        max_memory: int = None,
+        checkpoint: bool = False,
+        method: str = 'adjoint',
+        shots: int = None,
+        seed: int = None,
+    ):
+        """
+        Get expectation with grad.
+
+        The gradient is evaluated by the parameter shift rule, so every rotation gate that depends on parameters costs
+        two or four more evaluations of the circuit, which run in parallel_worker threads.
+        """
+        if isinstance(hams, Hamiltonian):
+            hams = [hams]
+        elif not isinstance(hams, list):
+            raise TypeError(f"hams requires a Hamiltonian or a list of Hamiltonian, but get {type(hams)}")
+        for h_tmp in hams:
+            _check_input_type("hams's element", Hamiltonian, h_tmp)
+            _check_hamiltonian_qubits_number(h_tmp, self.n_qubits)
+        _check_input_type("circ_right", Circuit, circ_right)
+        if circ_left is not None or simulator_left is not None:
+            raise NotImplementedError("circ_left and simulator_left are not supported by mps backend.")
+        if max_memory is not None or checkpoint:
+            raise NotImplementedError("max_memory and checkpoint are not supported by mps backend.")
+        if method not in ('adjoint', 'parameter_shift') or shots is not None:
+            raise NotImplementedError("mps backend only supports parameter shift gradient without shots.")
+        if circ_right.is_noise_circuit:
+            raise ValueError("noise circuit not support yet.")
+        if circ_right.has_measure_gate:
+            raise ValueError("circuit for variational algorithm cannot have measure gate")
+        if parallel_worker is not None:
+            _check_int_type("parallel_worker", parallel_worker)
+        if self.n_qubits < circ_right.n_qubits:
+            raise ValueError(f"Simulator has {self.n_qubits} qubits, but circuit has {circ_right.n_qubits} qubits.")
+        ansatz_params_name = circ_right.all_ansatz.keys()
+        encoder_params_name = circ_right.all_encoder.keys()
+        if set(ansatz_params_name) & set(encoder_params_name):
+            raise RuntimeError("Parameter cannot be both encoder and ansatz parameter.")
+        version = "both"
+        if not ansatz_params_name:
+            version = "encoder"
+        if not encoder_params_name:
+            version = "ansatz"
+        params_name = encoder_params_name + ansatz_params_name
+        # Every gate whose parameters require gradient, with its shift rule.
+        grad_gates = []
+        for idx, gate in enumerate(circ_right):
+            if not gate.parameterized:
+                continue
+            coeff = getattr(gate, 'coeff', None)
+            if coeff is None or coeff.requires_grad_parameters:
+                grad_gates.append((idx, gate, _shift_rule(gate)))
+
+        def run(task):
+            start, ops = task
+            sim = start.copy()
+            sim._run(ops)  # pylint: disable=protected-access
+            return [sim.get_expectation(ham) for ham in hams]
+
+        def one_batch(data):
+            pr = ParameterResolver(dict(zip(params_name, data)))
+            ops = self._compile(circ_right, pr)
+            tasks = [(self, ops)]
+            # The circuit before every shifted gate is only evolved once.
+            prefix = self.copy()
+            done = 0
+            for idx, gate, rule in grad_gates:
+                prefix._run(ops[done : idx + 1])  # pylint: disable=protected-access
+                done = idx + 1
+                start = prefix.copy()
+                qubits = _gate_qubits(gate)
+                for shift, _ in rule:
+                    for sign in (1, -1):
+                        shifted = type(gate)(sign * shift).on(gate.obj_qubits, gate.ctrl_qubits)
+                        tasks.append((start, [(qubits, _gate_matrix(shifted, pr))] + ops[idx + 1 :]))
+            if parallel_worker is not None and parallel_worker > 1:
+                with ThreadPoolExecutor(parallel_worker) as pool:
+                    results = np.array(list(pool.map(run, tasks)))
+            else:
+                results = np.array([run(task) for task in tasks])
+            f = results[0]
+            g = np.zeros((len(hams), len(params_name)), dtype=np.complex128)
+            pos = 1
+            for _, gate, rule in grad_gates:
+                diff = 0
+                for _, weight in rule:
+                    diff = diff + weight * (results[pos] - results[pos + 1])
+                    pos += 2
+                for name in gate.coeff.requires_grad_parameters:
+                    g[:, params_name.index(name)] += diff * np.real(gate.coeff[name])
+            return f, g
+
+        def grad_ops(*inputs):
+            if version == "both" and len(inputs) != 2:
+                raise ValueError("Need two inputs!")
+            if version in ("encoder", "ansatz") and len(inputs) != 1:
+                raise ValueError("Need one input!")
+            if version == "both":
+                _check_encoder(inputs[0], len(encoder_params_name))
+                _check_ansatz(inputs[1], len(ansatz_params_name))
+                data = np.hstack([inputs[0], np.tile(inputs[1], (inputs[0].shape[0], 1))])
+            if version == "encoder":
+                _check_encoder(inputs[0], len(encoder_params_name))
+                data = inputs[0]
+            if version == "ansatz":
+                _check_ansatz(inputs[0], len(ansatz_params_name))
+                data = np.array([inputs[0]])
+            f_g = [one_batch(i) for i in data]
+            f = np.array([i[0] for i in f_g])
+            g = np.array([i[1] for i in f_g])
+            if version == 'both':
+                return f, g[:, :, : len(encoder_params_name)], g[:, :, len(encoder_params_name) :]
+            return f, g
+
+        grad_wrapper = GradOpsWrapper(
+            grad_ops, hams, circ_right, circ_right, encoder_params_name, ansatz_params_name, parallel_worker
+        )
+        grad_str = f'{self.n_qubits} qubit' + ('' if self.n_qubits == 1 else 's')
+        grad_str += f' {self.name} VQA Operator'
+        grad_wrapper.set_str(grad_str)
+        return grad_wrapper
+
+    def get_qs(self, ket=False) -> Union[str, np.ndarray]:
+        """Get the quantum state as a vector, which requires memory of a state vector."""
+        state = np.ones((1, 1), dtype=np.complex128)
+        for tensor in self.tensors:
+            state = np.tensordot(state, tensor, axes=1)
+        # The first axis is qubit 0, which should be the lowest bit.
+        state = state.reshape([2] * self.n_qubits).transpose(list(range(self.n_qubits))[::-1]).reshape(-1)
+        if ket:
+            return '\n'.join(ket_string(state))
+        return state
+
+    def reset(self):
+        """Reset simulator to quantum zero state."""
+        zero = np.zeros((1, 2, 1), dtype=np.complex128)
+        zero[0, 0, 0] = 1
+        self.tensors = [zero.copy() for _ in range(self.n_qubits)]
+        self.center = 0
+
+    def sampling(
+        self,
+        circuit: Circuit,
+        pr: Union[Dict, ParameterResolver] = None,
+        shots: int = 1,
+        seed: int = None,
+    ):
+        """
+        Sample the quantum state.
+
+        If no gate acts on a qubit after it is measured, the circuit is simulated only once and all shots are drawn
+        together qubit by qubit from the right canonical form. Otherwise, the circuit is simulated for every shot.
+        """
+        if not circuit.all_measures.map:
+            raise ValueError("circuit must have at least one measurement gate.")
+        _check_input_type("circuit", Circuit, circuit)
+        if self.n_qubits < circuit.n_qubits:
+            raise ValueError(f"Circuit has {circuit.n_qubits} qubits, which is more than simulator qubits.")
+        _check_int_type("sampling shots", shots)
+        _check_value_should_not_less("sampling shots", 1, shots)
+        if circuit.parameterized:
+            if pr is None:
+                raise ValueError("Sampling a parameterized circuit need a ParameterResolver")
+            if not isinstance(pr, (dict, ParameterResolver)):
+                raise TypeError(f"pr requires a dict or a ParameterResolver, but get {type(pr)}!")
+            pr = ParameterResolver(pr)
+        else:
+            pr = ParameterResolver()
+        if seed is None:
+            seed = int(np.random.randint(1, 2 << 20))
+        else:
+            _check_seed(seed)
+        res = MeasureResult()
+        res.add_measure(circuit.all_measures.keys())
+        keys_map = res.keys_map
+        ops = self._compile(circuit, pr)
+        rnd_eng = np.random.default_rng(seed)
+        measured = set()
+        terminal = True
+        for op in ops:
+            if isinstance(op, Measure):
+                measured.add(op.obj_qubits[0])
+            elif measured & set(op[0]):
+                terminal = False
+        samples = np.zeros((shots, len(keys_map)), dtype=int)
+        if not terminal:
+            for shot in range(shots):
+                sim = self.copy()
+                sim.rnd_eng = np.random.default_rng(rnd_eng.integers(1 << 31))
+                for key, val in sim._run(ops).items():  # pylint: disable=protected-access
+                    samples[shot, keys_map[key]] = val
+            res.collect_data(samples)
+            return res
+        sim = self.copy()
+        sim._run([op for op in ops if not isinstance(op, Measure)])  # pylint: disable=protected-access
+        sim._move_center(0)  # pylint: disable=protected-access
+        bits = np.zeros((shots, self.n_qubits), dtype=int)
+        # env is the amplitude of sampled bits so far, contracted with left part of the chain. As the right part is
+        # right canonical, the conditional probability of next bit is the norm of env after the next site.
+        env = np.ones((shots, 1), dtype=np.complex128)
+        for k, tensor in enumerate(sim.tensors):
+            amp_0 = env @ tensor[:, 0]
+            amp_1 = env @ tensor[:, 1]
+            p_0 = np.sum(np.abs(amp_0) ** 2, axis=1)
+            p_1 = np.sum(np.abs(amp_1) ** 2, axis=1)
+            bits[:, k] = rnd_eng.random(shots) * (p_0 + p_1) < p_1
+            env = np.where(bits[:, k : k + 1] == 1, amp_1, amp_0)
+            env /= np.linalg.norm(env, axis=1, keepdims=True)
+        for op in ops:
+            if isinstance(op, Measure):
+                samples[:, keys_map[op.key]] = bits[:, op.obj_qubits[0]]
+        res.collect_data(samples)
+        return res
+
+    def set_qs(self, quantum_state: np.ndarray):
+        """Set quantum state, which is decomposed into matrix product state by singular value decomposition."""
+        if not isinstance(quantum_state, np.ndarray):
+            raise TypeError(f"quantum state must be a ndarray, but get {type(quantum_state)}")
+        if quantum_state.shape != (1 << self.n_qubits,):
+            raise ValueError(f"vec requires shape {(1 << self.n_qubits,)}, but get {quantum_state.shape}")
+        n = self.n_qubits
+        rest = quantum_state.astype(np.complex128) / np.linalg.norm(quantum_state)
+        # Qubit 0 is the lowest bit, which should be the first axis.
+        rest = rest.reshape([2] * n).transpose(list(range(n))[::-1]).reshape(1, -1)
+        tensors = []
+        for _ in range(n - 1):
+            left = rest.shape[0]
+            u, s, v = np.linalg.svd(rest.reshape(left * 2, -1), full_matrices=False)
+            keep = max(1, min(self.max_bond_dim, int(np.count_nonzero(s > 1e-14))))
+            tensors.append(u[:, :keep].reshape(left, 2, keep))
+            rest = s[:keep, None] * v[:keep]
+        tensors.append(rest.reshape(-1, 2, 1) / np.linalg.norm(rest))
+        self.tensors = tensors
+        self.center = n - 1
@@ -20,6 +20,7 @@ import numpy as np
 from mindquantum.core.circuit import Circuit
 from mindquantum.core.gates import BarrierGate, BasicGate, Measure, MeasureResult
 from mindquantum.core.operators import Hamiltonian
+from mindquantum.core.operators.hamiltonian import HowTo
 from mindquantum.core.parameterresolver import ParameterResolver
 from mindquantum.utils.type_value_check import (
     _check_and_generate_pr_type,
@@ -36,10 +37,16 @@ from mindquantum.utils.type_value_check import (
 from .. import mqbackend  # noqa: F401  # pylint: disable=unused-import
 from ..utils.string_utils import ket_string
 from .backend_base import BackendBase
-from .utils import GradOpsWrapper, _thread_balance
+from .utils import (
+    GradOpsWrapper,
+    _check_subsystem_qubits,
+    _memory_balance,
+    _thread_balance,
+)
 
 # isort: split
 
+from mindquantum import _mq_matrix  # pylint: disable=wrong-import-order
 from mindquantum import _mq_vector  # pylint: disable=wrong-import-order
 
 try:
@@ -54,14 +61,28 @@ except ImportError:
 class MQSim(BackendBase):
     """Mindquantum Backend."""
 
-    def __init__(self, name: str, n_qubits: int, seed=42):
+    def __init__(self, name: str, n_qubits: int, seed=42, dtype: str = 'float64'):
         """Initialize a mindquantum backend."""
         super().__init__(name, n_qubits, seed)
+        _check_input_type('dtype', str, dtype)
+        if dtype not in ('float32', 'float64'):
+            raise ValueError(f"dtype requires 'float32' or 'float64', but get {dtype}.")
+        self.dtype = dtype
         if name == 'mqvector':
-            self.sim = _mq_vector.mqvector(n_qubits, seed)
+            if dtype == 'float32':
+                self.sim = _mq_vector.mqvector_float(n_qubits, seed)
+            else:
+                self.sim = _mq_vector.mqvector(n_qubits, seed)
         elif name == 'mqvector_gpu':
+            if dtype == 'float32':
+                raise NotImplementedError("mqvector_gpu backend only support dtype 'float64'.")
             if MQ_SIM_GPU_SUPPORTED:
                 self.sim = _mq_vector_gpu.mqvector(n_qubits, seed)
+        elif name == 'mqmatrix':
+            if dtype == 'float32':
+                self.sim = _mq_matrix.mqmatrix_float(n_qubits, seed)
+            else:
+                self.sim = _mq_matrix.mqmatrix(n_qubits, seed)
         else:
             raise NotImplementedError(f"{name} backend not implemented.")
 
@@ -70,7 +91,7 @@ class MQSim(BackendBase):
         state = self.get_qs()
         ret = f"{self.name} simulator with {self.n_qubits} qubit{'s' if self.n_qubits > 1 else ''} (little endian)."
         ret += "\nCurrent quantum state:\n"
-        if self.n_qubits < 4:
+        if self.n_qubits < 4 and self.name != 'mqmatrix':
             ret += '\n'.join(ket_string(state))
         else:
             ret += state.__str__()
@@ -84,6 +105,7 @@ class MQSim(BackendBase):
         self,
         circuit: Circuit,
         pr: Union[Dict, ParameterResolver] = None,
+        fuse: bool = False,
     ):
         """Apply a quantum circuit."""
         _check_input_type('circuit', Circuit, circuit)
@@ -95,7 +117,10 @@ class MQSim(BackendBase):
             pr = _check_and_generate_pr_type(pr, circuit.params_name)
         else:
             pr = ParameterResolver()
-        res = self.sim.apply_circuit(circuit.get_cpp_obj(), pr.get_cpp_obj())
+        if fuse and self.name != 'mqmatrix':
+            res = self.sim.apply_circuit(circuit.get_cpp_obj(), pr.get_cpp_obj(), fuse)
+        else:
+            res = self.sim.apply_circuit(circuit.get_compiled_cpp_obj(), pr.get_cpp_obj())
         if res:
             out = MeasureResult()
             out.add_measure(circuit.all_measures.keys())
@@ -128,13 +153,15 @@ class MQSim(BackendBase):
 
     def apply_hamiltonian(self, hamiltonian: Hamiltonian):
         """Apply a hamiltonian."""
+        if self.name == 'mqmatrix':
+            raise NotImplementedError("apply_hamiltonian is not supported by mqmatrix backend.")
         _check_input_type('hamiltonian', Hamiltonian, hamiltonian)
         _check_hamiltonian_qubits_number(hamiltonian, self.n_qubits)
         self.sim.apply_hamiltonian(hamiltonian.get_cpp_obj())
 
     def copy(self) -> "BackendBase":
         """Copy a projectq simulator."""
-        sim = MQSim(self.name, self.n_qubits, self.seed)
+        sim = MQSim(self.name, self.n_qubits, self.seed, self.dtype)
         sim.sim = self.sim.copy()
         return sim
 
@@ -147,7 +174,22 @@ class MQSim(BackendBase):
 
     def get_circuit_matrix(self, circuit: Circuit, pr: ParameterResolver) -> np.ndarray:
         """Get the matrix of given circuit."""
-        return np.array(self.sim.get_circuit_matrix(circuit.get_cpp_obj(), pr.get_cpp_obj())).T
+        if self.name == 'mqmatrix':
+            raise NotImplementedError("get_circuit_matrix is not supported by mqmatrix backend.")
+        return self.sim.get_circuit_matrix(circuit.get_cpp_obj(), pr.get_cpp_obj())
+
+    def get_amplitudes(self, indices: List[int]) -> np.ndarray:
+        """Get amplitudes of given computational basis without copying the whole quantum state."""
+        if self.name == 'mqmatrix':
+            raise NotImplementedError("mqmatrix backend stores density matrix, use get_reduced_density_matrix instead.")
+        if isinstance(indices, (int, np.integer)):
+            indices = [indices]
+        indices = list(indices)
+        for idx in indices:
+            _check_int_type("index", idx)
+            if not 0 <= idx < 1 << self.n_qubits:
+                raise ValueError(f"index {idx} out of range of {self.n_qubits} qubits quantum state.")
+        return np.array(self.sim.get_amplitudes([int(idx) for idx in indices]), dtype=np.complex128)
 
     def get_expectation(self, hamiltonian: Hamiltonian) -> np.ndarray:
         """Get expectation of a hamiltonian."""
@@ -156,6 +198,57 @@ class MQSim(BackendBase):
         _check_hamiltonian_qubits_number(hamiltonian, self.n_qubits)
         return self.sim.get_expectation(hamiltonian.get_cpp_obj())
 
+    def get_noisy_expectation(  # pylint: disable=too-many-arguments
+        self,
+        hamiltonian: Union[Hamiltonian, List[Hamiltonian]],
+        circuit: Circuit,
+        pr: Union[Dict, ParameterResolver] = None,
+        n_traj: int = 1000,
+        seed: int = None,
+        parallel_worker: int = None,
+    ):
+        """Get expectation of hamiltonian averaged over trajectories of a noisy circuit."""
+        if self.name == 'mqmatrix':
+            raise NotImplementedError(
+                "mqmatrix backend simulates noise channels exactly, use apply_circuit and get_expectation instead."
+            )
+        hams = hamiltonian if isinstance(hamiltonian, list) else [hamiltonian]
+        for ham in hams:
+            if not isinstance(ham, Hamiltonian):
+                raise TypeError(f"hamiltonian requires a Hamiltonian, but got {type(ham)}")
+            _check_hamiltonian_qubits_number(ham, self.n_qubits)
+        _check_input_type("circuit", Circuit, circuit)
+        if self.n_qubits < circuit.n_qubits:
+            raise ValueError(f"Circuit has {circuit.n_qubits} qubits, which is more than simulator qubits.")
+        if circuit.params_name:
+            if pr is None:
+                raise ValueError("Applying a parameterized circuit needs a parameter_resolver.")
+            pr = _check_and_generate_pr_type(pr, circuit.params_name)
+        else:
+            pr = ParameterResolver()
+        _check_int_type("n_traj", n_traj)
+        _check_value_should_not_less("n_traj", 1, n_traj)
+        if seed is None:
+            seed = int(np.random.randint(1, 2 << 20))
+        else:
+            _check_seed(seed)
+        if parallel_worker is None:
+            parallel_worker = self._module().get_threads_number()
+        else:
+            _check_int_type("parallel_worker", parallel_worker)
+            _check_value_should_not_less("parallel_worker", 1, parallel_worker)
+        mean, std_err = self.sim.get_noisy_expectation(
+            [ham.get_cpp_obj() for ham in hams],
+            circuit.get_cpp_obj(),
+            pr.get_cpp_obj(),
+            n_traj,
+            seed,
+            parallel_worker,
+        )
+        if isinstance(hamiltonian, list):
+            return np.array(mean), np.array(std_err)
+        return mean[0], std_err[0]
+
     def get_expectation_with_grad(  # pylint: disable=R0912,R0913,R0914,R0915
         self,
         hams: List[Hamiltonian],
@@ -163,6 +256,11 @@ class MQSim(BackendBase):
         circ_left: Circuit = None,
         simulator_left: "BackendBase" = None,
         parallel_worker: int = None,
+        max_memory: int = None,
+        checkpoint: bool = False,
+        method: str = 'adjoint',
+        shots: int = None,
+        seed: int = None,
     ):
         """Get expectation with grad."""
         if isinstance(hams, Hamiltonian):
@@ -173,21 +271,30 @@ class MQSim(BackendBase):
             _check_input_type("hams's element", Hamiltonian, h_tmp)
             _check_hamiltonian_qubits_number(h_tmp, self.n_qubits)
         _check_input_type("circ_right", Circuit, circ_right)
-        if circ_right.is_noise_circuit:
+        if circ_right.is_noise_circuit and self.name != 'mqmatrix':
             raise ValueError("noise circuit not support yet.")
         non_hermitian = False
         if circ_left is not None:
+            if self.name == 'mqmatrix':
+                raise NotImplementedError("circ_left is not supported by mqmatrix backend.")
             _check_input_type("circ_left", Circuit, circ_left)
             if circ_left.is_noise_circuit:
                 raise ValueError("noise circuit not support yet.")
             non_hermitian = True
         if simulator_left is not None:
+            if self.name == 'mqmatrix':
+                raise NotImplementedError("simulator_left is not supported by mqmatrix backend.")
             _check_input_type("simulator_left", MQSim, simulator_left)
             if self.name != simulator_left.name:
                 raise ValueError(
                     "simulator_left should have the same backend as this simulator, ",
                     f"which is {self.name}, but get {simulator_left.name}",
                 )
+            if self.dtype != simulator_left.dtype:
+                raise ValueError(
+                    "simulator_left should have the same dtype as this simulator, ",
+                    f"which is {self.dtype}, but get {simulator_left.dtype}",
+                )
             if self.n_qubits != simulator_left.n_qubits:
                 raise ValueError(
                     "simulator_left should have the same n_qubits as this simulator, ",
@@ -202,6 +309,36 @@ class MQSim(BackendBase):
             raise ValueError("circuit for variational algorithm cannot have measure gate")
         if parallel_worker is not None:
             _check_int_type("parallel_worker", parallel_worker)
+        _check_input_type("checkpoint", bool, checkpoint)
+        if method not in ('adjoint', 'parameter_shift', 'finite_difference'):
+            raise ValueError(f"method should be 'adjoint', 'parameter_shift' or 'finite_difference', but get {method}.")
+        if method == 'adjoint':
+            if shots is not None:
+                raise ValueError("shots is only supported by parameter_shift and finite_difference method.")
+        elif non_hermitian or max_memory is not None or checkpoint:
+            raise NotImplementedError(
+                "circ_left, simulator_left, max_memory and checkpoint are only supported by adjoint method."
+            )
+        # Central finite difference step balancing the truncation error and the rounding error, or the shot noise,
+        # which is amplified by 1 / step.
+        step = 1e-3 if self.dtype == 'float32' else 1e-5
+        if shots is not None:
+            _check_int_type("shots", shots)
+            _check_value_should_not_less("shots", 1, shots)
+            step = max(step, shots ** (-1 / 6))
+        if seed is not None:
+            _check_seed(seed)
+        rng = np.random.default_rng(seed)
+        n_states = None
+        if max_memory is not None or checkpoint:
+            if self.name == 'mqmatrix' or non_hermitian:
+                raise NotImplementedError(
+                    "max_memory and checkpoint are only supported by hermitian gradient of state vector simulator."
+                )
+            if max_memory is not None:
+                _check_int_type("max_memory", max_memory)
+                itemsize = 8 if self.dtype == 'float32' else 16
+                n_states = max_memory // (itemsize << self.n_qubits)
 
         ansatz_params_name = circ_right.all_ansatz.keys()
         encoder_params_name = circ_right.all_encoder.keys()
@@ -223,8 +360,16 @@ class MQSim(BackendBase):
         circ_n_qubits = max(circ_left.n_qubits, circ_right.n_qubits)
         if self.n_qubits < circ_n_qubits:
             raise ValueError(f"Simulator has {self.n_qubits} qubits, but circuit has {circ_n_qubits} qubits.")
+        # Gradient of weighted sum of expectations with one backward sweep, other cases weight the full gradient.
+        weighted_sweep = (
+            method == 'adjoint'
+            and self.name != 'mqmatrix'
+            and not non_hermitian
+            and not checkpoint
+            and all(i.how_to != HowTo.FRONTEND for i in hams)
+        )
 
-        def grad_ops(*inputs):
+        def grad_ops(*inputs, weights=None):
             if version == "both" and len(inputs) != 2:
                 raise ValueError("Need two inputs!")
             if version in ("encoder", "ansatz") and len(inputs) != 1:
@@ -232,20 +377,64 @@ class MQSim(BackendBase):
             if version == "both":
                 _check_encoder(inputs[0], len(encoder_params_name))
                 _check_ansatz(inputs[1], len(ansatz_params_name))
-                batch_threads, mea_threads = _thread_balance(inputs[0].shape[0], len(hams), parallel_worker)
                 inputs0 = inputs[0]
                 inputs1 = inputs[1]
             if version == "encoder":
                 _check_encoder(inputs[0], len(encoder_params_name))
-                batch_threads, mea_threads = _thread_balance(inputs[0].shape[0], len(hams), parallel_worker)
                 inputs0 = inputs[0]
                 inputs1 = np.array([])
             if version == "ansatz":
                 _check_ansatz(inputs[0], len(ansatz_params_name))
-                batch_threads, mea_threads = _thread_balance(1, len(hams), parallel_worker)
                 inputs0 = np.array([[]])
                 inputs1 = inputs[0]
-            if non_hermitian:
+            group_size, n_checkpoints = 0, 0
+            if n_states is None:
+                batch_threads, mea_threads = _thread_balance(inputs0.shape[0], len(hams), parallel_worker)
+            else:
+                batch_threads, mea_threads, group_size, n_checkpoints = _memory_balance(
+                    inputs0.shape[0], len(hams), parallel_worker, n_states, checkpoint, len(circ_right)
+                )
+            if checkpoint and n_states is None:
+                n_checkpoints = int(np.ceil(np.sqrt(len(circ_right))))
+            if weights is not None:
+                weights = np.asarray(weights, dtype=np.float64)
+                if weights.shape != (inputs0.shape[0], len(hams)):
+                    raise ValueError(
+                        f"weights requires shape {(inputs0.shape[0], len(hams))}, but get {weights.shape}."
+                    )
+                if weighted_sweep:
+                    res = np.array(
+                        self.sim.get_expectation_with_weighted_grad_multi_multi(
+                            [i.get_cpp_obj() for i in hams],
+                            circ_right.get_compiled_cpp_obj(),
+                            circ_right.get_compiled_cpp_obj(hermitian=True),
+                            inputs0,
+                            inputs1,
+                            weights,
+                            encoder_params_name,
+                            ansatz_params_name,
+                            batch_threads,
+                        )
+                    )
+                    f, g = res[:, : len(hams)], res[:, len(hams) :]  # noqa:E203
+                    if version == 'both':
+                        return f, g[:, : len(encoder_params_name)], g[:, len(encoder_params_name) :]  # noqa:E203
+                    return f, g
+            if method != 'adjoint':
+                f_g1_g2 = self.sim.get_expectation_with_shift_grad_multi_multi(
+                    [i.get_cpp_obj() for i in hams],
+                    circ_right.get_compiled_cpp_obj(),
+                    inputs0,
+                    inputs1,
+                    encoder_params_name,
+                    ansatz_params_name,
+                    method == 'finite_difference',
+                    step,
+                    0 if shots is None else shots,
+                    int(rng.integers(1, 2 << 20)),
+                    self._module().get_threads_number() if parallel_worker is None else parallel_worker,
+                )
+            elif non_hermitian:
                 f_g1_g2 = self.sim.get_expectation_with_grad_non_hermitian_multi_multi(
                     [i.get_cpp_obj() for i in hams],
                     [i.get_cpp_obj(hermitian=True) for i in hams],
@@ -264,16 +453,22 @@ class MQSim(BackendBase):
             else:
                 f_g1_g2 = self.sim.get_expectation_with_grad_multi_multi(
                     [i.get_cpp_obj() for i in hams],
-                    circ_right.get_cpp_obj(),
-                    circ_right.get_cpp_obj(hermitian=True),
+                    circ_right.get_compiled_cpp_obj(),
+                    circ_right.get_compiled_cpp_obj(hermitian=True),
                     inputs0,
                     inputs1,
                     encoder_params_name,
                     ansatz_params_name,
                     batch_threads,
                     mea_threads,
+                    *(() if self.name == 'mqmatrix' else (group_size, checkpoint, n_checkpoints)),
                 )
             res = np.array(f_g1_g2)
+            if weights is not None:
+                f, g = res[:, :, 0], np.einsum('smp,sm->sp', res[:, :, 1:], weights)
+                if version == 'both':
+                    return f, g[:, : len(encoder_params_name)], g[:, len(encoder_params_name) :]  # noqa:E203
+                return f, g
             if version == 'both':
                 return (
                     res[:, :, 0],
@@ -288,17 +483,88 @@ class MQSim(BackendBase):
         grad_str = f'{self.n_qubits} qubit' + ('' if self.n_qubits == 1 else 's')
         grad_str += f' {self.name} VQA Operator'
         grad_wrapper.set_str(grad_str)
+        grad_wrapper.support_weights = weighted_sweep
         return grad_wrapper
 
+    def get_probabilities(self, qubits: List[int] = None) -> np.ndarray:
+        """Get probability of every measurement outcome of given qubits."""
+        return np.array(self.sim.get_probabilities(_check_subsystem_qubits(qubits, self.n_qubits)))
+
+    def get_qfi(
+        self,
+        circuit: Circuit,
+        pr: Union[Dict, ParameterResolver] = None,
+        approx: str = 'full',
+        parallel_worker: int = None,
+    ) -> np.ndarray:
+        """Get quantum fisher information of the state evolved from current state by given circuit."""
+        if self.name == 'mqmatrix':
+            raise NotImplementedError("quantum fisher information is only supported by state vector simulator.")
+        _check_input_type("circuit", Circuit, circuit)
+        if approx not in ('full', 'block_diag', 'diagonal'):
+            raise ValueError(f"approx should be 'full', 'block_diag' or 'diagonal', but get {approx}.")
+        circuit = circuit.remove_barrier()
+        if circuit.has_measure_gate or circuit.is_noise_circuit:
+            raise ValueError("circuit can not have measure gate or noise channel for quantum fisher information.")
+        if not circuit.params_name:
+            raise ValueError("circuit need a parameterized quantum circuit, but get non-parameterized one.")
+        if self.n_qubits < circuit.n_qubits:
+            raise ValueError(f"Circuit has {circuit.n_qubits} qubits, which is more than simulator qubits.")
+        if pr is None:
+            raise ValueError(
+                "Getting quantum fisher information of a parameterized circuit needs a parameter_resolver."
+            )
+        pr = _check_and_generate_pr_type(pr, circuit.params_name)
+        if parallel_worker is None:
+            parallel_worker = self._module().get_threads_number()
+        else:
+            _check_int_type("parallel_worker", parallel_worker)
+            _check_value_should_not_less("parallel_worker", 1, parallel_worker)
+        return np.array(
+            self.sim.get_qfi(
+                circuit.get_compiled_cpp_obj(), pr.get_cpp_obj(), circuit.params_name, approx, parallel_worker
+            )
+        )
+
+    def _module(self):
+        """Get the c++ module of this backend."""
+        if self.name == 'mqvector_gpu':
+            return _mq_vector_gpu
+        if self.name == 'mqmatrix':
+            return _mq_matrix
+        return _mq_vector
+
+    def set_threads_number(self, number):
+        """Set maximum number of threads shared by all mqvector simulators."""
+        _check_int_type("number", number)
+        _check_value_should_not_less("number", 1, number)
+        self._module().set_threads_number(number)
+
+    def get_thread_partition(self) -> Dict[str, int]:
+        """Get how the threads were split in the last gradient calculation."""
+        return self._module().get_thread_partition()
+
     def get_qs(self, ket=False) -> np.ndarray:
-        """Get quantum state of mqvector simulator."""
+        """Get quantum state of mqvector simulator, or density matrix of mqmatrix simulator."""
         if not isinstance(ket, bool):
             raise TypeError(f"ket requires a bool, but get {type(ket)}")
-        state = np.array(self.sim.get_qs())
+        if self.name == 'mqmatrix':
+            if ket:
+                raise ValueError("mqmatrix backend can not return quantum state in ket format.")
+            return np.array(self.sim.get_qs(), dtype=np.complex128)
+        if self.name == 'mqvector':
+            state = np.array(self.sim.get_qs_view())
+        else:
+            state = np.array(self.sim.get_qs(), dtype=np.complex128)
         if ket:
             return '\n'.join(ket_string(state))
         return state
 
+    def get_reduced_density_matrix(self, qubits: List[int]) -> np.ndarray:
+        """Get density matrix of given qubits with other qubits traced out."""
+        qubits = _check_subsystem_qubits(qubits, self.n_qubits)
+        return np.array(self.sim.get_reduced_density_matrix(qubits), dtype=np.complex128)
+
     def reset(self):
         """Reset mindquantum simulator to quantum zero state."""
         return self.sim.reset()
@@ -332,21 +598,26 @@ class MQSim(BackendBase):
             _check_seed(seed)
         res = MeasureResult()
         res.add_measure(circuit.all_measures.keys())
-        sim = self
-        if circuit.is_measure_end and not circuit.is_noise_circuit:
-            sim = self.copy()
-            sim.apply_circuit(circuit.remove_measure(), pr)
-            circuit = Circuit(circuit.all_measures.keys())
         samples = np.array(
-            sim.sim.sampling(circuit.get_cpp_obj(), pr.get_cpp_obj(), shots, res.keys_map, seed)
+            self.sim.sampling(circuit.get_cpp_obj(), pr.get_cpp_obj(), shots, res.keys_map, seed)
         ).reshape((shots, -1))
         res.collect_data(samples)
         return res
 
     def set_qs(self, quantum_state: np.ndarray):
-        """Set quantum state of mqvector simulator."""
+        """Set quantum state of mqvector simulator, or density matrix of mqmatrix simulator."""
         if not isinstance(quantum_state, np.ndarray):
             raise TypeError(f"quantum state must be a ndarray, but get {type(quantum_state)}")
+        if self.name == 'mqmatrix' and len(quantum_state.shape) == 2:
+            if quantum_state.shape != (1 << self.n_qubits, 1 << self.n_qubits):
+                raise ValueError(
+                    f"density matrix requires shape {(1 << self.n_qubits, 1 << self.n_qubits)}, "
+                    f"but get {quantum_state.shape}"
+                )
+            if not np.allclose(quantum_state, quantum_state.T.conj()):
+                raise ValueError("density matrix requires a hermitian matrix.")
+            self.sim.set_dm(quantum_state / np.trace(quantum_state).real)
+            return
         if len(quantum_state.shape) != 1:
             raise ValueError(f"vec requires a 1-dimensional array, but get {quantum_state.shape}")
         n_qubits = np.log2(quantum_state.shape[0])
@@ -355,4 +626,9 @@ class MQSim(BackendBase):
         n_qubits = int(n_qubits)
         if self.n_qubits != n_qubits:
             raise ValueError(f"{n_qubits} qubits vec does not match with simulation qubits ({self.n_qubits})")
-        self.sim.set_qs(quantum_state / np.sqrt(np.sum(np.abs(quantum_state) ** 2)))
+        if self.name == 'mqvector':
+            self.sim.set_qs_array(quantum_state)
+            state = self.sim.get_qs_view(writable=True)
+            state /= np.sqrt(np.vdot(state, state).real)
+        else:
+            self.sim.set_qs(quantum_state / np.sqrt(np.sum(np.abs(quantum_state) ** 2)))
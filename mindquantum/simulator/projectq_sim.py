@@ -70,6 +70,7 @@ class Projectq(BackendBase):
         self,
         circuit: Circuit,
         pr: Union[Dict, ParameterResolver] = None,
+        fuse: bool = False,
     ):
         """Apply a quantum circuit."""
         _check_input_type('circuit', Circuit, circuit)
@@ -169,6 +170,11 @@ class Projectq(BackendBase):
         circ_left: Circuit = None,
         simulator_left: "BackendBase" = None,
         parallel_worker: int = None,
+        max_memory: int = None,
+        checkpoint: bool = False,
+        method: str = 'adjoint',
+        shots: int = None,
+        seed: int = None,
     ):
         """Get expectation and gradient w.r.t parameters."""
         if isinstance(hams, Hamiltonian):
@@ -181,6 +187,10 @@ class Projectq(BackendBase):
         _check_input_type("circ_right", Circuit, circ_right)
         if circ_right.is_noise_circuit:
             raise ValueError("noise circuit not support yet.")
+        if max_memory is not None or checkpoint:
+            raise NotImplementedError("max_memory and checkpoint are not supported by projectq backend.")
+        if method != 'adjoint' or shots is not None:
+            raise NotImplementedError("Only adjoint gradient without shots is supported by projectq backend.")
         non_hermitian = False
         if circ_left is not None:
             _check_input_type("circ_left", Circuit, circ_left)
@@ -29,38 +29,77 @@ from ..utils.type_value_check import (
 )
 from .backend_base import BackendBase
 from .mq_blas import MQBlas
+from .mps import MPS
 from .mqsim import MQ_SIM_GPU_SUPPORTED, MQSim
 from .projectq_sim import Projectq
+from .stabilizer import Stabilizer
+from .utils import _shots_expectation
 
 SUPPORTED_SIMULATOR = {
     'projectq': Projectq,
     'mqvector': partial(MQSim, 'mqvector'),
+    'mqmatrix': partial(MQSim, 'mqmatrix'),
+    'stabilizer': Stabilizer,
+    'mps': MPS,
 }
 
 if MQ_SIM_GPU_SUPPORTED:
     SUPPORTED_SIMULATOR['mqvector_gpu'] = partial(MQSim, 'mqvector_gpu')
 
+# Backends that only support part of the simulator interface, for example `get_qs` does not return a state vector,
+# or noise channels and quantum fisher information are not supported.
+SPECIALIZED_SIMULATOR = ('mqmatrix', 'stabilizer', 'mps')
 
-def get_supported_simulator():
+
+def get_supported_simulator(specialized=False):
     """
     Get simulator name that supported by MindQuantum.
 
+    Args:
+        specialized (bool): Whether to also get the specialized backends ``'mqmatrix'``, ``'stabilizer'`` and
+            ``'mps'``, which only support part of the simulator interface. By default only the state vector
+            backends are returned, which support all methods of :class:`~.simulator.Simulator`. Default: ``False``.
+
     Returns:
         list, The supported simulator list.
     """
-    return list(SUPPORTED_SIMULATOR)
+    _check_input_type("specialized", bool, specialized)
+    return [name for name in SUPPORTED_SIMULATOR if specialized or name not in SPECIALIZED_SIMULATOR]
 
 
 class Simulator:
     """
     Quantum simulator that simulate quantum circuit.
 
+    Note:
+        For ``'mqvector'`` backend, long running methods such as `apply_circuit`, `sampling`, `get_expectation`
+        and the gradient operator release the Python GIL, so that different simulators can run in different
+        Python threads in parallel. A simulator instance is not thread safe, it should not be used by multiple
+        threads at the same time.
+
+        The ``'mqmatrix'`` backend stores the density matrix of the quantum system, so that noise channels are
+        simulated exactly instead of sampled. It costs the memory of a quantum state of twice the qubits, and
+        supports `get_expectation_with_grad` for noisy circuits. For this backend, `get_qs` returns the density
+        matrix, and `set_qs` accepts either a quantum state or a density matrix.
+
+        The ``'stabilizer'`` backend simulates Clifford circuits with a stabilizer tableau in polynomial time, so
+        that `sampling` and `get_expectation` of pauli hamiltonian work with thousands of qubits. Applying a non
+        Clifford gate on this backend raises a ValueError, and `get_qs` builds the state vector, which is only
+        feasible for few qubits.
+
+        The ``'mps'`` backend stores the quantum state as a matrix product state, whose cost grows with the
+        entanglement instead of the number of qubits. The keyword arguments `max_bond_dim` and `cutoff` control the
+        truncation of every bond, and the gradient of `get_expectation_with_grad` is evaluated by the parameter shift
+        rule of rotation gates.
+
     Args:
         backend (str): which backend you want. The supported backend can be found
             in SUPPORTED_SIMULATOR
         n_qubits (int): number of quantum simulator.
         seed (int): the random seed for this simulator, if None, seed will generate
             by `numpy.random.randint`. Default: None.
+        dtype (str): the precision of quantum state for `mqvector` and `mqmatrix` backend, ``'float32'`` will
+            store the quantum state in complex64, ``'float64'`` in complex128. Default: ``'float64'``.
 
     Raises:
         TypeError: if `backend` is not str.
@@ -205,7 +244,7 @@ class Simulator:
         """
         return self.backend.apply_gate(gate, pr, diff)
 
-    def apply_circuit(self, circuit, pr=None):
+    def apply_circuit(self, circuit, pr=None, fuse=False):
         """
         Apply a circuit on this simulator.
 
@@ -214,6 +253,10 @@ class Simulator:
             pr (Union[ParameterResolver, dict, numpy.ndarray, list, numbers.Number]): The
                 parameter resolver for this circuit. If the circuit is not parameterized,
                 this arg should be None. Default: None.
+            fuse (bool): Whether to fuse adjacent gates that act on the same one or two qubits
+                into one dense matrix before simulation. The fused circuit is cached for the
+                current circuit and parameters. Only supported by ``'mqvector'`` backend, and
+                ignored by other backends. Default: False.
 
         Returns:
             MeasureResult or None, if the circuit has measure gate, then return a MeasureResult,
@@ -242,7 +285,7 @@ class Simulator:
                        │
             {'11': 1}
         """
-        return self.backend.apply_circuit(circuit, pr)
+        return self.backend.apply_circuit(circuit, pr, fuse)
 
     def sampling(self, circuit, pr=None, shots=1, seed=None):
         """
@@ -272,17 +315,17 @@ class Simulator:
             >>> res = sim.sampling(circ, {'a': 1.1, 'b': 2.2}, shots=100, seed=42)
             >>> res
             shots: 100
-            Keys: q1 q0_1 q0_0│0.00   0.122       0.245       0.367        0.49       0.612
+            Keys: q1 q0_1 q0_0│0.00   0.147       0.295       0.443        0.59       0.737
             ──────────────────┼───────────┴───────────┴───────────┴───────────┴───────────┴
-                           000│▒▒▒▒▒▒▒▒▒▒▒▒▒▒▒▒▒▒
+                           000│▒▒▒▒▒▒▒▒▒▒▒▒▒▒
                               │
-                           011│▒▒▒▒▒▒▒▒▒
+                           011│▒▒▒▒▒
                               │
-                           100│▓▓▓▓▓▓▓▓▓▓▓▓▓▓▓▓▓▓▓▓▓▓▓▓▓▓▓▓▓▓▓▓▓▓▓▓▓▓▓▓▓▓▓▓▓▓▓▓
+                           100│▓▓▓▓▓▓▓▓▓▓▓▓▓▓▓▓▓▓▓▓▓▓▓▓▓▓▓▓▓▓▓▓▓▓▓▓▓▓▓▓▓▓▓▓▓▓▓▓▓
                               │
-                           111│▒▒▒▒▒▒▒▒▒▒▒▒▒▒▒▒▒▒▒▒▒▒▒▒
+                           111│▒▒▒▒▒▒▒▒▒▒▒▒▒▒▒▒
                               │
-            {'000': 18, '011': 9, '100': 49, '111': 24}
+            {'000': 16, '011': 6, '100': 59, '111': 19}
         """
         return self.backend.sampling(circuit, pr, shots, seed)
 
@@ -317,7 +360,7 @@ class Simulator:
         """
         self.backend.apply_hamiltonian(hamiltonian)
 
-    def get_expectation(self, hamiltonian):
+    def get_expectation(self, hamiltonian, shots=None, seed=None):
         r"""
         Get expectation of the given hamiltonian. The hamiltonian could be non hermitian.
 
@@ -325,11 +368,21 @@ class Simulator:
 
             E = \left<\psi\right|H\left|\psi\right>
 
+        If `shots` is given, the expectation is estimated from measurements as on a quantum hardware. The pauli
+        terms of hamiltonian are grouped into qubit-wise commuting sets, and every group is sampled once from the
+        current quantum state after the basis rotations. The shots are allocated to groups proportional to the sum
+        of absolute coefficients of every group, and every group gets at least two shots, so that `shots` should
+        be at least twice the number of groups. Only the real part of coefficients is used.
+
         Args:
             hamiltonian (Hamiltonian): The hamiltonian you want to get expectation.
+            shots (int): Total measurement shots for estimating the expectation. If None, the exact expectation is
+                calculated. Default: None.
+            seed (int): Random seed of measurements when `shots` is given. Default: None.
 
         Returns:
-            numbers.Number, the expectation value.
+            numbers.Number, the expectation value. If `shots` is given, a tuple of the estimated expectation and
+            the variance of the estimation.
 
         Examples:
             >>> from mindquantum.core.circuit import Circuit
@@ -340,9 +393,48 @@ class Simulator:
             >>> ham = Hamiltonian(QubitOperator('Z0'))
             >>> sim.get_expectation(ham)
             (0.36235775447667357+0j)
+            >>> mean, var = sim.get_expectation(ham, shots=1000, seed=42)
         """
+        if shots is not None:
+            return _shots_expectation(self, hamiltonian, shots, seed)
         return self.backend.get_expectation(hamiltonian)
 
+    def get_noisy_expectation(
+        self, hamiltonian, circuit, pr=None, n_traj=1000, seed=None, parallel_worker=None
+    ):  # pylint: disable=too-many-arguments
+        r"""
+        Get expectation of hamiltonian averaged over Monte-Carlo trajectories of a noisy circuit.
+
+        Every trajectory evolves the current quantum state with the given circuit, where every noise channel and
+        measurement is sampled randomly. Trajectories run in parallel in C++, and the result only depends on the random
+        seed. This method do not change the origin quantum state of this simulator.
+
+        Args:
+            hamiltonian (Union[Hamiltonian, List[Hamiltonian]]): The hamiltonian or a list of hamiltonians you want to
+                get expectation.
+            circuit (Circuit): The noisy circuit, for example a circuit generated by :func:`Circuit.with_noise`.
+            pr (Union[None, dict, ParameterResolver]): The parameter resolver for this circuit, if this circuit is a
+                parameterized circuit. Default: None.
+            n_traj (int): Number of trajectories. Default: 1000.
+            seed (int): Random seed of trajectories. If None, seed will be a random int number. Default: None.
+            parallel_worker (int): Maximum number of threads. If None, all threads of simulator are used.
+                Default: None.
+
+        Returns:
+            Tuple of the mean expectation and the standard error of its real part. If hamiltonian is a list, they are
+            numpy.ndarray with one value for every hamiltonian.
+
+        Examples:
+            >>> from mindquantum.core.circuit import Circuit
+            >>> from mindquantum.core.gates import DepolarizingChannel
+            >>> from mindquantum.core.operators import QubitOperator, Hamiltonian
+            >>> from mindquantum.simulator import Simulator
+            >>> circ = Circuit().ry(1.2, 0) + DepolarizingChannel(0.1).on(0)
+            >>> sim = Simulator('mqvector', 1)
+            >>> mean, std_err = sim.get_noisy_expectation(Hamiltonian(QubitOperator('Z0')), circ, seed=42)
+        """
+        return self.backend.get_noisy_expectation(hamiltonian, circuit, pr, n_traj, seed, parallel_worker)
+
     def set_threads_number(self, number):
         """Set maximum number of threads."""
         return self.backend.set_threads_number(number)
@@ -368,6 +460,72 @@ class Simulator:
         """
         return self.backend.get_qs(ket)
 
+    def get_amplitudes(self, indices):
+        """
+        Get amplitudes of the given computational basis without exporting the whole quantum state.
+
+        Args:
+            indices (Union[int, List[int]]): The index or indices of computational basis.
+
+        Returns:
+            numpy.ndarray, the amplitude of every given computational basis.
+
+        Examples:
+            >>> from mindquantum.algorithm.library import qft
+            >>> from mindquantum.simulator import Simulator
+            >>> sim = Simulator('mqvector', 2)
+            >>> sim.apply_circuit(qft(range(2)))
+            >>> sim.get_amplitudes([0, 3])
+            array([0.5+0.j, 0.5+0.j])
+        """
+        return self.backend.get_amplitudes(indices)
+
+    def get_probabilities(self, qubits=None):
+        """
+        Get the probability of every measurement outcome of the given qubits.
+
+        The i-th bit of the outcome index corresponds to the i-th given qubit, and all other qubits are traced out.
+
+        Args:
+            qubits (Union[None, int, List[int]]): The qubits to measure. If None, all qubits are measured.
+                Default: None.
+
+        Returns:
+            numpy.ndarray, the probability of every outcome.
+
+        Examples:
+            >>> from mindquantum.core.circuit import Circuit
+            >>> from mindquantum.simulator import Simulator
+            >>> sim = Simulator('mqvector', 3)
+            >>> sim.apply_circuit(Circuit().h(0).x(2, 0))
+            >>> sim.get_probabilities([2, 1])
+            array([0.5, 0. , 0.5, 0. ])
+        """
+        return self.backend.get_probabilities(qubits)
+
+    def get_reduced_density_matrix(self, qubits):
+        """
+        Get the density matrix of the given qubits with all other qubits traced out.
+
+        The i-th bit of the row and column index corresponds to the i-th given qubit.
+
+        Args:
+            qubits (Union[int, List[int]]): The qubits of the subsystem.
+
+        Returns:
+            numpy.ndarray, the reduced density matrix.
+
+        Examples:
+            >>> from mindquantum.core.circuit import Circuit
+            >>> from mindquantum.simulator import Simulator
+            >>> sim = Simulator('mqvector', 2)
+            >>> sim.apply_circuit(Circuit().h(0).x(1, 0))
+            >>> sim.get_reduced_density_matrix(0)
+            array([[0.5+0.j, 0. +0.j],
+                   [0. +0.j, 0.5+0.j]])
+        """
+        return self.backend.get_reduced_density_matrix(qubits)
+
     def set_qs(self, quantum_state):
         """
         Set quantum state for this simulation.
@@ -395,6 +553,11 @@ class Simulator:
         circ_left=None,
         simulator_left=None,
         parallel_worker=None,
+        max_memory=None,
+        checkpoint=False,
+        method='adjoint',
+        shots=None,
+        seed=None,
     ):
         r"""
         Get a function that return the forward value and gradient w.r.t circuit parameters.
@@ -425,6 +588,25 @@ class Simulator:
                 that will be trained during training. Default: None.
             parallel_worker (int): The parallel worker numbers. The parallel workers can handle
                 batch in parallel threads. Default: None.
+            max_memory (int): The maximum memory in bytes of quantum states held by the gradient calculation,
+                besides the state of this simulator. The number of batch and hamiltonian that are evaluated
+                concurrently is reduced to fit this limit. If None, the memory is not limited. This argument is only
+                supported by ``'mqvector'`` and ``'mqvector_gpu'`` backend. Default: None.
+            checkpoint (bool): Whether to recompute the quantum state before every gate from stored checkpoint
+                states, instead of uncomputing it with the hermitian conjugate of the gate. The recomputation is
+                slower, but it is correct for non unitary custom gates. This argument is only supported by
+                ``'mqvector'`` and ``'mqvector_gpu'`` backend. Default: False.
+            method (str): The method of gradient. ``'adjoint'`` is the adjoint differentiation, ``'parameter_shift'``
+                evaluates the circuit with shifted parameters by the parameter shift rule, and custom gates are
+                differentiated by central finite difference, and ``'finite_difference'`` uses central finite
+                difference for all gates. The shifted circuits of every parameter data are evaluated in parallel
+                threads. The last two methods are supported by ``'mqvector'``, ``'mqvector_gpu'`` and
+                ``'mqmatrix'`` backend, and ``'mps'`` backend always uses parameter shift rule. Default:
+                ``'adjoint'``.
+            shots (int): If not None, every expectation is estimated from this number of measurements of every pauli
+                term of hamiltonian, which is only supported by ``'parameter_shift'`` and ``'finite_difference'``
+                method. Default: None.
+            seed (int): The random seed of shots. Default: None.
 
         Returns:
             GradOpsWrapper, a grad ops wrapper than contains information to generate this grad ops.
@@ -457,8 +639,57 @@ class Simulator:
             circ_left,
             (simulator_left.backend if simulator_left is not None else None),
             parallel_worker,
+            max_memory,
+            checkpoint,
+            method,
+            shots,
+            seed,
         )
 
+    def get_qfi(self, circuit, pr=None, approx='full', parallel_worker=None):
+        r"""
+        Get the quantum fisher information of the quantum state :math:`U\left|\psi\right>`.
+
+        :math:`U` is the given circuit and :math:`\left|\psi\right>` is the current quantum state of this
+        simulator. The quantum fisher information is defined as
+
+        .. math::
+
+            \text{QFI}_{i,j} = 4\text{Re}\left(\frac{\partial \left<\psi\right|}{\partial x_i}
+            \frac{\partial \left|\psi\right>}{\partial x_j} - \frac{\partial \left<\psi\right|}{\partial x_i}
+            \left|\psi\right>\left<\psi\right|\frac{\partial \left|\psi\right>}{\partial x_j}\right)
+
+        which is four times of the Fubini-Study metric tensor. Every parameterized gate takes one sweep of the circuit,
+        and the sweeps run in parallel. This method do not change the origin quantum state of this simulator.
+
+        Args:
+            circuit (Circuit): A parameterized quantum circuit without measurement gate and noise channel.
+            pr (Union[dict, ParameterResolver, numpy.ndarray, list]): The parameter value of this circuit. Default:
+                None.
+            approx (str): The approximation of quantum fisher information. ``'full'`` calculates the full matrix,
+                ``'block_diag'`` only keeps the correlation of parameters in the same layer, where a new layer starts
+                when a parameterized gate acts on a qubit that is already used by a parameterized gate of the current
+                layer, and ``'diagonal'`` only keeps the correlation of every gate parameter with itself. Default:
+                ``'full'``.
+            parallel_worker (int): Maximum number of threads. If None, all threads of simulator are used.
+                Default: None.
+
+        Returns:
+            numpy.ndarray, the quantum fisher information, with rows and columns ordered as `circuit.params_name`.
+
+        Examples:
+            >>> import numpy as np
+            >>> from mindquantum.core.circuit import Circuit
+            >>> from mindquantum.simulator import Simulator
+            >>> circ = Circuit().rx('a', 0).ry('b', 0).rz('c', 0)
+            >>> sim = Simulator('mqvector', 1)
+            >>> sim.get_qfi(circ, np.array([1, 2, 3]))
+            array([[ 1.        ,  0.        , -0.90929743],
+                   [ 0.        ,  0.29192658, -0.18920062],
+                   [-0.90929743, -0.18920062,  0.94944468]])
+        """
+        return self.backend.get_qfi(circuit, pr, approx, parallel_worker)
+
 
 def inner_product(bra_simulator: Simulator, ket_simulator: Simulator):
     """
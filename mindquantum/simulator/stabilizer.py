@@ -0,0 +1,499 @@
+# Copyright 2022 Huawei Technologies Co., Ltd
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+# http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+# ============================================================================
+"""Stabilizer tableau simulator for Clifford circuits."""
+# pylint: disable=invalid-name
+from typing import Dict, Union
+
+import numpy as np
+
+from mindquantum.core.circuit import Circuit
+from mindquantum.core.gates import (
+    RX,
+    RY,
+    RZ,
+    BarrierGate,
+    BasicGate,
+    CNOTGate,
+    GlobalPhase,
+    HGate,
+    IGate,
+    Measure,
+    MeasureResult,
+    PhaseShift,
+    SGate,
+    SWAPGate,
+    XGate,
+    YGate,
+    ZGate,
+)
+from mindquantum.core.operators import Hamiltonian
+from mindquantum.core.operators.hamiltonian import HowTo
+from mindquantum.core.parameterresolver import ParameterResolver
+from mindquantum.utils.type_value_check import (
+    _check_and_generate_pr_type,
+    _check_hamiltonian_qubits_number,
+    _check_input_type,
+    _check_int_type,
+    _check_seed,
+    _check_value_should_not_less,
+)
+
+from ..utils.string_utils import ket_string
+from .backend_base import BackendBase
+
+
+def _popcount(data, axis=None):
+    """Number of one bits of packed bits."""
+    if axis is None:
+        return np.count_nonzero(np.unpackbits(data.view(np.uint8)))
+    return np.count_nonzero(np.unpackbits(data.view(np.uint8), axis=axis), axis=axis)
+
+
+def _product_phase(x, z, r, n_y):
+    """
+    Phase bits of the product of pauli rows of a tableau in order.
+
+    Every row is the hermitian pauli operator (-1)^r i^(x.z) X^x Z^z, and the product is known to be a hermitian
+    pauli operator with n_y pauli Y.
+    """
+    r_out = np.bitwise_xor.reduce(r, axis=0)
+    if x.shape[0] < 2:
+        return r_out
+    # Moving Z of row i through X of all rows j > i gives a sign of (-1)^(z_i.x_j), only the parity of the sum is
+    # needed, which is the parity of the xor of all words.
+    z_before = np.bitwise_xor.accumulate(z[:-1].view(np.uint64), axis=0)
+    sign = np.bitwise_xor.reduce((z_before & x[1:].view(np.uint64)).ravel(), keepdims=True)
+    power = _popcount(x & z) - n_y + 2 * _popcount(sign)
+    r_out[0] ^= bool(power % 4 // 2)
+    return r_out
+
+
+class _Tableau:
+    """
+    Aaronson-Gottesman tableau of a stabilizer state.
+
+    Row i < n is the i-th destabilizer and row n + i is the i-th stabilizer. The x and z parts of every row are packed
+    into bytes in little bit order and padded to 64 bits, so that multiplying rows costs n / 64 word operations. The
+    phase of every row is stored as a vector of bits: column 0 is a constant and column k > 0 is the k-th random
+    measurement outcome, so that all possible measurement records of a circuit can be evaluated at once.
+    """
+
+    def __init__(self, n_qubits, n_vars=0):
+        """Initialize the tableau of quantum zero state."""
+        self.n_qubits = n_qubits
+        eye = np.packbits(np.eye(n_qubits, dtype=bool), axis=1, bitorder='little')
+        n_bytes = (n_qubits + 63) // 64 * 8
+        self.x = np.zeros((2 * n_qubits, n_bytes), dtype=np.uint8)
+        self.z = np.zeros((2 * n_qubits, n_bytes), dtype=np.uint8)
+        self.r = np.zeros((2 * n_qubits, 1 + n_vars), dtype=bool)
+        self.x[:n_qubits, : eye.shape[1]] = eye
+        self.z[n_qubits:, : eye.shape[1]] = eye
+
+    def copy(self, n_vars=0):
+        """Copy this tableau, with extra n_vars symbolic phases."""
+        out = _Tableau.__new__(_Tableau)
+        out.n_qubits = self.n_qubits
+        out.x = self.x.copy()
+        out.z = self.z.copy()
+        out.r = np.zeros((2 * self.n_qubits, 1 + n_vars), dtype=bool)
+        out.r[:, 0] = self.r[:, 0]
+        return out
+
+    @staticmethod
+    def _col(data, a):
+        """Bits of qubit a of all rows."""
+        return (data[:, a >> 3] >> (a & 7)) & 1 == 1
+
+    @staticmethod
+    def _flip(data, a, bits):
+        """Flip bits of qubit a of the rows where bits is true."""
+        data[:, a >> 3] ^= bits.astype(np.uint8) << (a & 7)
+
+    def h(self, a):
+        """Apply hadamard gate."""
+        x_a, z_a = self._col(self.x, a), self._col(self.z, a)
+        self.r[:, 0] ^= x_a & z_a
+        self._flip(self.x, a, x_a ^ z_a)
+        self._flip(self.z, a, x_a ^ z_a)
+
+    def s(self, a):
+        """Apply S gate."""
+        x_a = self._col(self.x, a)
+        self.r[:, 0] ^= x_a & self._col(self.z, a)
+        self._flip(self.z, a, x_a)
+
+    def sdag(self, a):
+        """Apply S^dagger gate."""
+        self.pauli(a, 'Z')
+        self.s(a)
+
+    def pauli(self, a, pauli):
+        """Apply pauli gate."""
+        if pauli in 'XY':
+            self.r[:, 0] ^= self._col(self.z, a)
+        if pauli in 'ZY':
+            self.r[:, 0] ^= self._col(self.x, a)
+
+    def cnot(self, c, t):
+        """Apply CNOT gate with control qubit c and target qubit t."""
+        x_c, z_c = self._col(self.x, c), self._col(self.z, c)
+        x_t, z_t = self._col(self.x, t), self._col(self.z, t)
+        self.r[:, 0] ^= x_c & z_t & ~(x_t ^ z_c)
+        self._flip(self.x, t, x_c)
+        self._flip(self.z, c, z_t)
+
+    def swap(self, a, b):
+        """Apply SWAP gate."""
+        for data in (self.x, self.z):
+            diff = self._col(data, a) ^ self._col(data, b)
+            self._flip(data, a, diff)
+            self._flip(data, b, diff)
+
+    def measure(self, a):
+        """
+        Measure qubit a in computational basis.
+
+        Returns:
+            Tuple[int, numpy.ndarray], if the outcome is random, the row of the new stabilizer whose phase should be
+            set to the outcome, and None otherwise. If the outcome is determined, the phase bits of outcome, and None
+            otherwise.
+        """
+        n = self.n_qubits
+        x_a = self._col(self.x, a)
+        candidates = np.flatnonzero(x_a[n:])
+        if candidates.size:
+            p = n + candidates[0]
+            rows = np.flatnonzero(x_a)
+            rows = rows[rows != p]
+            x, z = self.x[rows], self.z[rows]
+            x_p, z_p = self.x[p], self.z[p]
+            x_out, z_out = x ^ x_p, z ^ z_p
+            power = (
+                _popcount(x & z, axis=1)
+                + _popcount(x_p & z_p)
+                + 2 * _popcount(z & x_p, axis=1)
+                - _popcount(x_out & z_out, axis=1)
+            )
+            self.r[rows] ^= self.r[p]
+            self.r[rows, 0] ^= (power % 4 // 2).astype(bool)
+            self.x[rows], self.z[rows] = x_out, z_out
+            self.x[p - n], self.z[p - n], self.r[p - n] = self.x[p], self.z[p], self.r[p]
+            self.x[p] = 0
+            self.z[p] = 0
+            self.z[p, a >> 3] = 1 << (a & 7)
+            self.r[p] = False
+            return p, None
+        rows = n + np.flatnonzero(x_a[:n])
+        return None, _product_phase(self.x[rows], self.z[rows], self.r[rows], 0)
+
+    def expectation(self, x_p, z_p):
+        """Expectation of pauli operator i^(x.z) X^x Z^z, where x_p and z_p are packed bits."""
+        n = self.n_qubits
+        anti = _popcount((self.x & z_p) ^ (self.z & x_p), axis=1) % 2 == 1
+        if np.any(anti[n:]):
+            return 0
+        rows = n + np.flatnonzero(anti[:n])
+        r_out = _product_phase(self.x[rows], self.z[rows], self.r[rows], _popcount(x_p & z_p))
+        return -1 if r_out[0] else 1
+
+    def row(self, i):
+        """Unpacked x and z part of row i."""
+        x = np.unpackbits(self.x[i], count=self.n_qubits, bitorder='little').astype(bool)
+        z = np.unpackbits(self.z[i], count=self.n_qubits, bitorder='little').astype(bool)
+        return x, z
+
+    def stabilizers(self):
+        """String of stabilizers, with the highest qubit on the left."""
+        out = []
+        n = self.n_qubits
+        for i in range(n, 2 * n):
+            x, z = self.row(i)
+            string = '-' if self.r[i, 0] else '+'
+            for j in range(n - 1, -1, -1):
+                string += 'IXZY'[int(x[j]) + 2 * int(z[j])]
+            out.append(string)
+        return out
+
+
+class Stabilizer(BackendBase):
+    """
+    A stabilizer tableau backend.
+
+    Clifford circuits are simulated with the tableau of stabilizers and destabilizers in polynomial time, so that
+    circuits with thousands of qubits can be sampled. Supported gates are H, S, X, Y, Z, I, CNOT, SWAP, X, Y or Z with
+    one control qubit, rotation and phase shift gates whose angles are multiple of :math:`\\pi/2`, and measurement.
+    """
+
+    def __init__(self, n_qubits: int, seed=42):
+        """Initialize a stabilizer backend."""
+        super().__init__('stabilizer', n_qubits, seed)
+        self.tableau = _Tableau(n_qubits)
+        self.rnd_eng = np.random.default_rng(seed)
+
+    def __str__(self):
+        """Return a string representation of the object."""
+        ret = f"{self.name} simulator with {self.n_qubits} qubit{'s' if self.n_qubits > 1 else ''} (little endian)."
+        ret += "\nCurrent stabilizers:\n"
+        ret += '\n'.join(self.tableau.stabilizers())
+        return ret
+
+    def __repr__(self):
+        """Return a string representation of the object."""
+        return self.__str__()
+
+    def _apply_clifford(self, tableau: _Tableau, gate: BasicGate, pr: ParameterResolver):
+        """Apply a clifford gate on tableau."""
+        # pylint: disable=too-many-branches
+        if isinstance(gate, (BarrierGate, IGate, GlobalPhase)):
+            return
+        if len(gate.ctrl_qubits) > 1 or (gate.ctrl_qubits and not isinstance(gate, (XGate, YGate, ZGate))):
+            raise ValueError(f"{gate} is not a clifford gate supported by stabilizer simulator.")
+        a = gate.obj_qubits[0]
+        if gate.ctrl_qubits:
+            c = gate.ctrl_qubits[0]
+            if isinstance(gate, YGate):
+                tableau.sdag(a)
+            elif isinstance(gate, ZGate):
+                tableau.h(a)
+            tableau.cnot(c, a)
+            if isinstance(gate, YGate):
+                tableau.s(a)
+            elif isinstance(gate, ZGate):
+                tableau.h(a)
+        elif isinstance(gate, (XGate, YGate, ZGate)):
+            tableau.pauli(a, gate.name)
+        elif isinstance(gate, HGate):
+            tableau.h(a)
+        elif isinstance(gate, SGate):
+            if gate.hermitianed:
+                tableau.sdag(a)
+            else:
+                tableau.s(a)
+        elif isinstance(gate, CNOTGate):
+            tableau.cnot(gate.obj_qubits[1], a)
+        elif isinstance(gate, SWAPGate):
+            tableau.swap(a, gate.obj_qubits[1])
+        elif isinstance(gate, (RX, RY, RZ, PhaseShift)):
+            coeff = gate.coeff.combination(pr).const if gate.parameterized else gate.coeff.const
+            quarter = np.real(coeff) / (np.pi / 2)
+            if abs(quarter - np.round(quarter)) > 1e-8 or abs(np.imag(coeff)) > 1e-8:
+                raise ValueError(f"{gate} with angle {coeff} is not a clifford gate.")
+            # Up to a global phase, all these gates are S^k in their own basis.
+            k = int(np.round(quarter)) % 4
+            if isinstance(gate, RX):
+                tableau.h(a)
+            elif isinstance(gate, RY):
+                tableau.sdag(a)
+                tableau.h(a)
+            for _ in range(k):
+                tableau.s(a)
+            if isinstance(gate, RX):
+                tableau.h(a)
+            elif isinstance(gate, RY):
+                tableau.h(a)
+                tableau.s(a)
+        else:
+            raise ValueError(f"{gate} is not a clifford gate supported by stabilizer simulator.")
+
+    def _measure(self, gate: Measure) -> int:
+        """Measure and collapse the stabilizer state."""
+        p, phase = self.tableau.measure(gate.obj_qubits[0])
+        if p is None:
+            return int(phase[0])
+        outcome = int(self.rnd_eng.integers(2))
+        self.tableau.r[p, 0] = bool(outcome)
+        return outcome
+
+    def apply_circuit(
+        self,
+        circuit: Circuit,
+        pr: Union[Dict, ParameterResolver] = None,
+        fuse: bool = False,
+    ):
+        """Apply a quantum circuit."""
+        _check_input_type('circuit', Circuit, circuit)
+        if self.n_qubits < circuit.n_qubits:
+            raise ValueError(f"Circuit has {circuit.n_qubits} qubits, which is more than simulator qubits.")
+        if circuit.params_name:
+            if pr is None:
+                raise ValueError("Applying a parameterized circuit needs a parameter_resolver.")
+            pr = _check_and_generate_pr_type(pr, circuit.params_name)
+        else:
+            pr = ParameterResolver()
+        res = {}
+        for gate in circuit:
+            if isinstance(gate, Measure):
+                res[gate.key] = self._measure(gate)
+            else:
+                self._apply_clifford(self.tableau, gate, pr)
+        if res:
+            out = MeasureResult()
+            out.add_measure(circuit.all_measures.keys())
+            out.collect_data([[res[i] for i in out.keys_map]])
+            return out
+        return None
+
+    def apply_gate(
+        self,
+        gate: BasicGate,
+        pr: Union[Dict, ParameterResolver] = None,
+        diff: bool = False,
+    ):
+        """Apply a quantum gate."""
+        _check_input_type("gate", BasicGate, gate)
+        if diff:
+            raise ValueError("Applying derivative of gate is not supported by stabilizer simulator.")
+        if isinstance(gate, BarrierGate):
+            return None
+        gate_max = max(max(gate.obj_qubits, gate.ctrl_qubits))
+        if self.n_qubits <= gate_max:
+            raise ValueError(f"qubits of gate {gate} is higher than simulator qubits.")
+        if gate.parameterized:
+            if pr is None:
+                raise ValueError("apply a parameterized gate needs a parameter_resolver")
+            pr = _check_and_generate_pr_type(pr, gate.coeff.params_name)
+        else:
+            pr = ParameterResolver()
+        if isinstance(gate, Measure):
+            return self._measure(gate)
+        self._apply_clifford(self.tableau, gate, pr)
+        return None
+
+    def copy(self) -> "BackendBase":
+        """Copy a stabilizer simulator."""
+        sim = Stabilizer(self.n_qubits, self.seed)
+        sim.tableau = self.tableau.copy()
+        sim.rnd_eng = np.random.default_rng(self.rnd_eng.integers(1 << 31))
+        return sim
+
+    def device_name(self) -> str:
+        """Return the device name."""
+        return f"{self.n_qubits} qubits {self.name} simulator."
+
+    def flush(self):
+        """Execute all command."""
+
+    def get_expectation(self, hamiltonian: Hamiltonian) -> np.ndarray:
+        """Get expectation of a pauli hamiltonian."""
+        if not isinstance(hamiltonian, Hamiltonian):
+            raise TypeError(f"hamiltonian requires a Hamiltonian, but got {type(hamiltonian)}")
+        if hamiltonian.how_to == HowTo.FRONTEND:
+            raise ValueError("stabilizer simulator only supports hamiltonian of pauli operators.")
+        _check_hamiltonian_qubits_number(hamiltonian, self.n_qubits)
+        out = 0
+        for term, coeff in hamiltonian.ham_termlist:
+            x_p = np.zeros(self.n_qubits, dtype=bool)
+            z_p = np.zeros(self.n_qubits, dtype=bool)
+            for idx, pauli in term:
+                x_p[idx] = pauli in 'XY'
+                z_p[idx] = pauli in 'ZY'
+            x_p = np.packbits(x_p, bitorder='little')
+            z_p = np.packbits(z_p, bitorder='little')
+            x_p = np.pad(x_p, (0, self.tableau.x.shape[1] - x_p.size))
+            z_p = np.pad(z_p, (0, self.tableau.z.shape[1] - z_p.size))
+            out += coeff * self.tableau.expectation(x_p, z_p)
+        return np.complex128(out)
+
+    def get_qs(self, ket=False) -> Union[str, np.ndarray]:
+        """
+        Get the quantum state as a vector, which requires memory of a state vector.
+
+        The global phase is chosen so that the first non zero amplitude is positive.
+        """
+        n = self.n_qubits
+        # A computational basis with non zero amplitude, obtained by choosing 0 for every random measurement.
+        tableau = self.tableau.copy()
+        basis = 0
+        for a in range(n):
+            p, phase = tableau.measure(a)
+            if p is None and phase[0]:
+                basis |= 1 << a
+        index = np.arange(1 << n)
+        state = np.zeros(1 << n, dtype=np.complex128)
+        state[basis] = 1
+        for i in range(n, 2 * n):
+            x, z = self.tableau.row(i)
+            x_mask = sum(1 << int(j) for j in np.flatnonzero(x))
+            z_parity = np.zeros(1 << n, dtype=np.int64)
+            for j in np.flatnonzero(z):
+                z_parity ^= (index >> j) & 1
+            coeff = (-1) ** int(self.tableau.r[i, 0]) * 1j ** np.count_nonzero(x & z)
+            state = (state + coeff * ((1 - 2 * z_parity) * state)[index ^ x_mask]) / 2
+        state /= np.linalg.norm(state)
+        first = np.flatnonzero(np.abs(state) > 1e-12)[0]
+        state *= np.abs(state[first]) / state[first]
+        if ket:
+            return '\n'.join(ket_string(state))
+        return state
+
+    def reset(self):
+        """Reset simulator to quantum zero state."""
+        self.tableau = _Tableau(self.n_qubits)
+
+    def sampling(
+        self,
+        circuit: Circuit,
+        pr: Union[Dict, ParameterResolver] = None,
+        shots: int = 1,
+        seed: int = None,
+    ):
+        """
+        Sample the quantum state.
+
+        The circuit is simulated only once with the outcome of every random measurement kept as a symbolic bit, and
+        every other outcome as a linear function of them, so that shots are drawn by a single matrix product.
+        """
+        if not circuit.all_measures.map:
+            raise ValueError("circuit must have at least one measurement gate.")
+        _check_input_type("circuit", Circuit, circuit)
+        if self.n_qubits < circuit.n_qubits:
+            raise ValueError(f"Circuit has {circuit.n_qubits} qubits, which is more than simulator qubits.")
+        _check_int_type("sampling shots", shots)
+        _check_value_should_not_less("sampling shots", 1, shots)
+        if circuit.parameterized:
+            if pr is None:
+                raise ValueError("Sampling a parameterized circuit need a ParameterResolver")
+            if not isinstance(pr, (dict, ParameterResolver)):
+                raise TypeError(f"pr requires a dict or a ParameterResolver, but get {type(pr)}!")
+            pr = ParameterResolver(pr)
+        else:
+            pr = ParameterResolver()
+        if seed is None:
+            seed = int(np.random.randint(1, 2 << 20))
+        else:
+            _check_seed(seed)
+        res = MeasureResult()
+        res.add_measure(circuit.all_measures.keys())
+        keys_map = res.keys_map
+        measures = [gate for gate in circuit if isinstance(gate, Measure)]
+        tableau = self.tableau.copy(len(measures))
+        records = np.zeros((len(keys_map), 1 + len(measures)), dtype=bool)
+        n_vars = 0
+        for gate in circuit:
+            if not isinstance(gate, Measure):
+                self._apply_clifford(tableau, gate, pr)
+                continue
+            p, phase = tableau.measure(gate.obj_qubits[0])
+            if p is not None:
+                n_vars += 1
+                tableau.r[p] = False
+                tableau.r[p, n_vars] = True
+                phase = tableau.r[p]
+            records[keys_map[gate.key]] = phase
+        rnd_eng = np.random.default_rng(seed)
+        outcomes = rnd_eng.integers(2, size=(shots, n_vars), dtype=np.int64)
+        samples = (outcomes @ records[:, 1 : n_vars + 1].T.astype(np.int64) + records[:, 0]) % 2
+        res.collect_data(samples)
+        return res
@@ -14,6 +14,19 @@
 # ============================================================================
 """Simulator utils."""
 
+import numpy as np
+
+from mindquantum.core.circuit import Circuit
+from mindquantum.core.gates import H, Measure, S
+from mindquantum.core.operators import Hamiltonian
+from mindquantum.core.operators.hamiltonian import HowTo
+from mindquantum.utils.type_value_check import (
+    _check_input_type,
+    _check_int_type,
+    _check_seed,
+    _check_value_should_not_less,
+)
+
 
 def _thread_balance(n_prs, n_meas, parallel_worker):
     """Thread balance."""
@@ -32,8 +45,162 @@ def _thread_balance(n_prs, n_meas, parallel_worker):
     return batch_threads, mea_threads
 
 
-class GradOpsWrapper:  # pylint: disable=too-many-instance-attributes
+def _memory_balance(n_prs, n_meas, parallel_worker, n_states, checkpoint, n_gates):
+    """
+    Thread balance of gradient calculation that holds at most n_states quantum states.
+
+    Every parameter data of batch holds the evolved state, or the checkpoints in checkpoint mode, and every group of
+    hamiltonians that evolves concurrently holds group size + 2 states. The concurrency is reduced until the states
+    fit into n_states, and then the number of checkpoints is reduced, which costs more recomputation of states.
+
+    Returns:
+        Tuple[int, int, int, int], the batch threads, measurement threads, hamiltonian group size and number of
+        checkpoints.
+    """
+    batch_threads, mea_threads = _thread_balance(n_prs, n_meas, parallel_worker)
+    # Same as the default group size of backend, at most 15 hamiltonians are evolved together.
+    group_size = max(1, min(-(-n_meas // mea_threads), 15))
+    n_checkpoints = int(np.ceil(np.sqrt(n_gates))) if checkpoint else 0
+
+    def n_needed():
+        return batch_threads * ((n_checkpoints if checkpoint else 1) + mea_threads * (group_size + 2))
+
+    while n_needed() > n_states:
+        if batch_threads > 1:
+            batch_threads -= 1
+        elif mea_threads > 1:
+            mea_threads -= 1
+        elif group_size > 1:
+            group_size -= 1
+        elif n_checkpoints > 0:
+            n_checkpoints -= 1
+        else:
+            raise ValueError(
+                f"Memory limit is too small for the gradient, which needs at least {n_needed()} quantum states."
+            )
+    return batch_threads, mea_threads, group_size, n_checkpoints
+
+
+def _check_subsystem_qubits(qubits, n_qubits):
+    """Check qubits of a subsystem and convert them to a list, None means all qubits."""
+    if qubits is None:
+        return list(range(n_qubits))
+    if isinstance(qubits, (int, np.integer)):
+        qubits = [qubits]
+    qubits = list(qubits)
+    for qubit in qubits:
+        _check_int_type("qubit", qubit)
+        if not 0 <= qubit < n_qubits:
+            raise ValueError(f"qubit {qubit} out of range of {n_qubits} qubits simulator.")
+    if len(set(qubits)) != len(qubits):
+        raise ValueError(f"qubits should be different, but get {qubits}.")
+    return [int(qubit) for qubit in qubits]
+
+
+def _qubit_wise_commuting_groups(terms):
+    """
+    Group pauli terms into qubit-wise commuting sets.
+
+    Terms are visited in descending order of coefficient magnitude, and every term joins the first group whose
+    measurement basis agrees with it on all shared qubits, otherwise it starts a new group.
+
+    Args:
+        terms (List[Tuple[Tuple[Tuple[int, str]], float]]): Non identity pauli terms in the format of
+            `Hamiltonian.ham_termlist`.
+
+    Returns:
+        List[Tuple[Dict[int, str], List[int]]], the measurement basis and the indices of terms of every group.
+    """
+    groups = []
+    for idx in sorted(range(len(terms)), key=lambda i: -abs(terms[i][1])):
+        paulis = dict(terms[idx][0])
+        for basis, members in groups:
+            if all(basis.get(qubit, pauli) == pauli for qubit, pauli in paulis.items()):
+                basis.update(paulis)
+                members.append(idx)
+                break
+        else:
+            groups.append((paulis, [idx]))
+    return groups
+
+
+def _allocate_shots(weights, shots):
+    """
+    Split shots over groups proportional to weights by largest remainder.
+
+    Every group gets at least two shots, so that the sample variance of every group is defined.
+    """
+    weights = np.asarray(weights, dtype=float)
+    n_groups = len(weights)
+    if shots < 2 * n_groups:
+        raise ValueError(
+            f"shots should be at least twice the number of measurement groups ({n_groups}), but get {shots}."
+        )
+    extra = shots - 2 * n_groups
+    total = np.sum(weights)
+    ideal = weights / total * extra if total > 0 else np.full(n_groups, extra / n_groups)
+    alloc = np.floor(ideal).astype(int)
+    alloc[np.argsort(alloc - ideal, kind='stable')[: extra - np.sum(alloc)]] += 1
+    return alloc + 2
+
+
+def _shots_expectation(sim, hamiltonian, shots, seed):
     """
+    Estimate expectation of a pauli hamiltonian from measurements of the current state of simulator.
+
+    Terms are grouped into qubit-wise commuting sets, and every group is sampled once with its basis rotations, with
+    shots allocated proportional to the sum of absolute coefficients of the group. The variance of estimation is the
+    sum of sample variance of every group divided by its shots.
+
+    Returns:
+        Tuple[float, float], the estimated expectation and its variance.
+    """
+    _check_input_type("hamiltonian", Hamiltonian, hamiltonian)
+    if hamiltonian.how_to == HowTo.FRONTEND:
+        raise ValueError("Expectation with shots requires hamiltonian of pauli operators.")
+    if hamiltonian.n_qubits > sim.n_qubits:
+        raise ValueError(
+            f"Hamiltonian qubits is {hamiltonian.n_qubits}, not match with simulator qubits number {sim.n_qubits}"
+        )
+    _check_int_type("shots", shots)
+    _check_value_should_not_less("shots", 1, shots)
+    if seed is not None:
+        _check_seed(seed)
+    rng = np.random.default_rng(seed)
+    mean = 0.0
+    terms = []
+    for term, coeff in hamiltonian.ham_termlist:
+        if term:
+            terms.append((term, coeff))
+        else:
+            mean += coeff
+    groups = _qubit_wise_commuting_groups(terms)
+    if not groups:
+        return mean, 0.0
+    allocation = _allocate_shots([sum(abs(terms[i][1]) for i in members) for _, members in groups], shots)
+    variance = 0.0
+    for (basis, members), n_shots in zip(groups, allocation):
+        circ = Circuit()
+        for qubit, pauli in sorted(basis.items()):
+            if pauli == 'Y':
+                circ += S.hermitian().on(qubit)
+            if pauli in 'XY':
+                circ += H.on(qubit)
+            circ += Measure(f'q{qubit}').on(qubit)
+        res = sim.sampling(circ, shots=int(n_shots), seed=int(rng.integers(1, 2**23)))
+        column = {key: i for i, key in enumerate(res.keys)}
+        values = np.zeros(n_shots)
+        for idx in members:
+            term, coeff = terms[idx]
+            parity = np.sum(res.samples[:, [column[f'q{qubit}'] for qubit, _ in term]], axis=1) % 2
+            values += coeff * (1 - 2 * parity)
+        mean += np.mean(values)
+        variance += np.var(values, ddof=1) / n_shots
+    return float(mean), float(variance)
+
+
+class GradOpsWrapper:  # pylint: disable=too-many-instance-attributes
+    r"""
     Wrapper the gradient operator that with the information that generate this gradient operator.
 
     Args:
@@ -45,6 +212,11 @@ class GradOpsWrapper:  # pylint: disable=too-many-instance-attributes
         encoder_params_name (list[str]): The encoder parameters name.
         ansatz_params_name (list[str]): The ansatz parameters name.
         parallel_worker (int): The number of parallel worker to run the batch.
+
+    If `support_weights` is True, the gradient operator also accepts a keyword argument `weights` with shape
+    :math:`(N, M)`, where :math:`N` is the batch size and :math:`M` is the number of hamiltonians, and returns the
+    gradient of :math:`\sum_m w_{nm} E_{nm}` for every data :math:`n` of batch instead of the gradient of every
+    expectation.
     """
 
     def __init__(
@@ -58,11 +230,12 @@ class GradOpsWrapper:  # pylint: disable=too-many-instance-attributes
         self.encoder_params_name = encoder_params_name
         self.ansatz_params_name = ansatz_params_name
         self.parallel_worker = parallel_worker
+        self.support_weights = False
         self.str = ''
 
-    def __call__(self, *args):
+    def __call__(self, *args, **kwargs):
         """Definition of a function call operator."""
-        return self.grad_ops(*args)
+        return self.grad_ops(*args, **kwargs)
 
     def set_str(self, grad_str):
         """
@@ -500,6 +500,7 @@ class GenerateRequirementFile(setuptools.Command):
 ext_modules = [
     CMakeExtension(pymod='mindquantum.mqbackend'),
     CMakeExtension(pymod='mindquantum._mq_vector'),
+    CMakeExtension(pymod='mindquantum._mq_matrix'),
     CMakeExtension(pymod='mindquantum._mq_vector_gpu', optional=True),
     CMakeExtension(pymod='mindquantum.experimental._mindquantum_cxx', optional=True),
 ]
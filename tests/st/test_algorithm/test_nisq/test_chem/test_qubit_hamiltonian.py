@@ -0,0 +1,40 @@
+#   Copyright 2022 <Huawei Technologies Co., Ltd>
+#
+#   Licensed under the Apache License, Version 2.0 (the "License");
+#   you may not use this file except in compliance with the License.
+#   You may obtain a copy of the License at
+#
+#       http://www.apache.org/licenses/LICENSE-2.0
+#
+#   Unless required by applicable law or agreed to in writing, software
+#   distributed under the License is distributed on an "AS IS" BASIS,
+#   WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+#   See the License for the specific language governing permissions and
+#   limitations under the License.
+
+"""Test hamiltonian of interaction operator."""
+
+import numpy as np
+
+from mindquantum.algorithm.nisq import Transform, get_hamiltonian
+from mindquantum.core.operators import FermionOperator, InteractionOperator
+
+
+def test_get_hamiltonian():
+    """
+    Description: Test hamiltonian built from tensors of interaction operator directly.
+    Expectation: same as jordan wigner transform of fermion operator.
+    """
+    rng = np.random.default_rng(42)
+    n_qubits = 5
+    one_body = rng.normal(size=(n_qubits,) * 2)
+    two_body = rng.normal(size=(n_qubits,) * 4) * (rng.random((n_qubits,) * 4) < 0.3)
+    inter_ops = InteractionOperator(0.5, one_body + one_body.T, two_body + two_body.transpose(3, 2, 1, 0))
+    expect = Transform(FermionOperator(inter_ops)).jordan_wigner()
+    ham = get_hamiltonian(inter_ops)
+    assert ham.n_qubits == n_qubits
+    terms = dict(ham.ham_termlist)
+    assert set(terms) == set(expect.terms)
+    assert np.allclose([terms[term] for term in expect.terms], [coeff.const.real for coeff in expect.terms.values()])
+    ham = get_hamiltonian(inter_ops, csr=True)
+    assert np.allclose(ham.sparse_mat.toarray(), expect.matrix().toarray())
@@ -41,3 +41,29 @@ def test_transform():
 
     op1_ternary_tree = op_transform.ternary_tree()
     assert _get_terms_as_set(op1_ternary_tree) == {'1/2 [X0 Z1]', '(-1/2j) [Y0 X2]'}
+
+
+def test_vectorized_transform():
+    """
+    Description: Test vectorized transforms of fermion operator and interaction operator.
+    Expectation: same as transforming term by term.
+    """
+    # pylint: disable=import-outside-toplevel,protected-access
+    import numpy as np
+
+    from mindquantum.algorithm.nisq.chem import transform
+    from mindquantum.core.operators import InteractionOperator
+
+    rng = np.random.default_rng(42)
+    n_qubits = 5
+    one_body = rng.normal(size=(n_qubits,) * 2)
+    two_body = rng.normal(size=(n_qubits,) * 4) * (rng.random((n_qubits,) * 4) < 0.2)
+    inter_ops = InteractionOperator(0.5, one_body + one_body.T, two_body)
+    fermion_ops = FermionOperator(inter_ops) + FermionOperator('3 1^ 4^', 0.3j)
+    for name in ('jordan_wigner', 'parity', 'bravyi_kitaev', 'ternary_tree'):
+        ladder_sets = getattr(transform, f'_{name}_sets')
+        expect = transform._transform_terms(FermionOperator(inter_ops), n_qubits, ladder_sets)
+        assert getattr(Transform(inter_ops), name)() == expect
+        expect = transform._transform_terms(fermion_ops, n_qubits, ladder_sets)
+        assert getattr(Transform(fermion_ops), name)() == expect
+        assert getattr(Transform(fermion_ops), name)(parallel_worker=2) == expect
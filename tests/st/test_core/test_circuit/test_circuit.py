@@ -57,6 +57,25 @@ def test_get_matrix():
     assert np.allclose(matrix[0, 0], 0.70743435 - 1.06959724e-04j)
 
 
+@pytest.mark.parametrize('backend', ['mqvector', 'projectq'])
+def test_get_matrix_of_multi_qubits_circuit(backend):
+    """
+    Description: Test circuit matrix against evolution of every computational basis state.
+    Expectation: success.
+    """
+    circ = Circuit().h(0).rx(0.3, 1).ry(0.5, 2, 0).zz(0.4, [0, 2]).swap([0, 1], 2).x(1, [0, 2])
+    circ += G.U3(0.1, 0.2, 0.3).on(2)
+    matrix = circ.matrix(backend=backend)
+    columns = []
+    for i in range(8):
+        sim = Simulator('mqvector', 3)
+        sim.set_qs(np.eye(8)[i])
+        sim.apply_circuit(circ)
+        columns.append(sim.get_qs())
+    assert np.allclose(matrix, np.array(columns).T)
+    assert np.allclose(Circuit().rx(1.0, 0).h(0).matrix(), G.H.matrix() @ G.RX(1.0).matrix())
+
+
 def test_circuit_apply():
     """
     Description: Test apply value to parameterized circuit
@@ -24,3 +24,70 @@ def test_hamiltonian():
     """
     ham = Hamiltonian(QubitOperator('Z0 Y1', 0.3))
     assert ham.ham_termlist == [(((0, 'Z'), (1, 'Y')), 0.3)]
+
+
+def test_hamiltonian_packed_terms():
+    """
+    Description: Test hamiltonian of dict and array backed qubit operators, which are transferred as packed arrays.
+    Expectation: same term list and expectation.
+    """
+    # pylint: disable=import-outside-toplevel,protected-access
+    import numpy as np
+
+    from mindquantum.core.circuit import Circuit
+    from mindquantum.core.gates import RX, RY
+    from mindquantum.simulator import Simulator
+
+    rng = np.random.default_rng(42)
+    left = QubitOperator('')
+    right = QubitOperator('')
+    for i in range(3):
+        for j in 'XYZ':
+            left += QubitOperator(f'{j}{i}', rng.normal())
+            right += QubitOperator(f'{j}{i} Z{(i + 1) % 3}', rng.normal())
+    qubit_op, dict_op = left * right, left * right
+    qubit_op += right * left
+    dict_op += right * left
+    assert dict_op.terms
+    assert qubit_op._terms is None and dict_op._terms is not None
+    hams = [Hamiltonian(qubit_op), Hamiltonian(dict_op)]
+    assert hams[0].ham_termlist == hams[1].ham_termlist
+    circ = Circuit([RX(f'a{i}').on(i) for i in range(3)] + [RY(f'b{i}').on(i) for i in range(3)])
+    pr = dict(zip(circ.params_name, rng.normal(size=len(circ.params_name))))
+    sim = Simulator('mqvector', 3)
+    sim.apply_circuit(circ, pr)
+    expect = sim.get_expectation(hams[1])
+    assert np.allclose(sim.get_expectation(hams[0]), expect)
+    assert np.allclose(sim.get_expectation(Hamiltonian(qubit_op).sparse(3)), expect)
+    assert np.allclose(sim.get_expectation(Hamiltonian(QubitOperator(''))), 1)
+
+
+def test_hamiltonian_sparse_backend(caplog):
+    """
+    Description: Test sparse hamiltonian assembled in backend, whose elements may cancel out.
+    Expectation: same expectation and applied state as the matrix of qubit operator.
+    """
+    # pylint: disable=import-outside-toplevel
+    import logging
+
+    import numpy as np
+
+    from mindquantum.simulator import Simulator
+
+    rng = np.random.default_rng(7)
+    n_qubits = 4
+    qubit_op = QubitOperator('', 0.5) + QubitOperator('Z0') - QubitOperator('Z1') + QubitOperator('Y0 Y1', 0.3)
+    for _ in range(20):
+        qubits = rng.choice(n_qubits, 2, replace=False)
+        qubit_op += QubitOperator(' '.join(f'{"XYZ"[rng.integers(3)]}{q}' for q in qubits), rng.normal())
+    matrix = qubit_op.matrix(n_qubits).toarray()
+    state = rng.normal(size=2**n_qubits) + 1j * rng.normal(size=2**n_qubits)
+    state /= np.linalg.norm(state)
+    sim = Simulator('mqvector', n_qubits)
+    sim.set_qs(state)
+    with caplog.at_level(logging.INFO, logger='mindquantum.core.operators.hamiltonian'):
+        ham = Hamiltonian(qubit_op).sparse(n_qubits)
+        assert np.allclose(sim.get_expectation(ham), state.conj() @ matrix @ state)
+    assert 'Sparsing hamiltonian' in caplog.text
+    sim.apply_hamiltonian(ham)
+    assert np.allclose(sim.get_qs(), matrix @ state)
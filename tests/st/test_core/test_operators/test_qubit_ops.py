@@ -193,3 +193,31 @@ def test_qubit_ops_trans():
 
     assert mq_ops.to_openfermion() == ofo_ops
     assert mq_ops == QubitOperator.from_openfermion(ofo_ops, dtype=complex)
+
+
+def test_qubit_ops_vectorized_product():
+    """
+    Description: Test product and commutator of qubit operators with many terms, which are vectorized.
+    Expectation: same as term by term product.
+    """
+    # pylint: disable=import-outside-toplevel
+    import numpy as np
+
+    from mindquantum.core.operators import commutator
+
+    rng = np.random.default_rng(42)
+    ops = []
+    for n_qubits in (5, 70):
+        ops.append(QubitOperator())
+        for _ in range(12):
+            qubits = rng.choice(n_qubits, 3, replace=False)
+            term = ' '.join(f'{"XYZ"[rng.integers(3)]}{q}' for q in qubits)
+            ops[-1] += QubitOperator(term, complex(rng.normal(), rng.normal()))
+    left, right = ops
+    product = QubitOperator()
+    for left_term in left.split():
+        for right_term in right.split():
+            product += left_term[1] * right_term[1] * left_term[0] * right_term[0]
+    assert left * right == product
+    assert commutator(left, right) == left * right - right * left
+    assert (left * right + right * left).hermitian() == (product + right * left).hermitian()
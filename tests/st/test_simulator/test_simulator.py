@@ -16,11 +16,14 @@
 # pylint: disable=invalid-name
 """Test simulator."""
 
+from concurrent.futures import ThreadPoolExecutor
+
 import numpy as np
 import pytest
 from scipy.sparse import csr_matrix
 
 import mindquantum.core.operators as ops
+from mindquantum import _mq_vector
 from mindquantum.algorithm.library import qft
 from mindquantum.core import gates as G
 from mindquantum.core.circuit import UN, Circuit
@@ -51,6 +54,30 @@ try:
 except ImportError:
     _HAS_NUMBA = False
 
+# Backends that store the quantum state, and the ones that store it as a state vector.
+STATE_SIMULATORS = [i for i in get_supported_simulator(specialized=True) if i != 'stabilizer']
+VECTOR_SIMULATORS = get_supported_simulator()
+
+
+def _backend_state(virtual_qc, state):
+    """Quantum state in the representation of backend, which is a density matrix for mqmatrix."""
+    if virtual_qc == 'mqmatrix':
+        return np.outer(state, np.conj(state))
+    return state
+
+
+@pytest.mark.level0
+@pytest.mark.platform_x86_gpu_training
+@pytest.mark.platform_x86_cpu
+@pytest.mark.env_onecard
+def test_get_supported_simulator():
+    """
+    Description: test that specialized backends are only listed on request.
+    Expectation: success.
+    """
+    assert not set(get_supported_simulator()) & {'mqmatrix', 'stabilizer', 'mps'}
+    assert {'mqvector', 'mqmatrix', 'stabilizer', 'mps'} <= set(get_supported_simulator(specialized=True))
+
 
 @pytest.mark.level0
 @pytest.mark.platform_x86_gpu_training
@@ -74,7 +101,7 @@ def test_init_reset(virtual_qc):
     assert np.allclose(v1, v3)
 
 
-@pytest.mark.parametrize("virtual_qc", get_supported_simulator())
+@pytest.mark.parametrize("virtual_qc", STATE_SIMULATORS)
 def test_apply_circuit_and_hermitian(virtual_qc):
     """
     test
@@ -99,7 +126,7 @@ def test_apply_circuit_and_hermitian(virtual_qc):
     matrix = np.kron(G.RY(3).matrix(), G.RX(1).matrix()) @ matrix
     matrix = G.ZZ(5).matrix() @ matrix
     matrix = (np.kron(G.I.matrix(), sv0) + np.kron(G.Z.matrix(), sv1)) @ matrix
-    v = matrix[:, 0]
+    v = _backend_state(virtual_qc, matrix[:, 0])
     assert np.allclose(v, v1)
 
     circ2 = circ.hermitian()
@@ -107,11 +134,11 @@ def test_apply_circuit_and_hermitian(virtual_qc):
     s1.apply_circuit(circ2, pr)
     matrix = np.conj(matrix.T)
     v1 = s1.get_qs()
-    v = matrix[:, 0]
+    v = _backend_state(virtual_qc, matrix[:, 0])
     assert np.allclose(v, v1)
 
 
-@pytest.mark.parametrize("virtual_qc", get_supported_simulator())
+@pytest.mark.parametrize("virtual_qc", STATE_SIMULATORS)
 def test_set_and_get(virtual_qc):
     """
     test
@@ -120,13 +147,13 @@ def test_set_and_get(virtual_qc):
     """
     sim = Simulator(virtual_qc, 1)
     qs1 = sim.get_qs()
-    assert np.allclose(qs1, np.array([1, 0]))
+    assert np.allclose(qs1, _backend_state(virtual_qc, np.array([1, 0])))
     sim.set_qs(np.array([1, 1]))
     qs2 = sim.get_qs()
-    assert np.allclose(qs2, np.array([1, 1]) / np.sqrt(2))
+    assert np.allclose(qs2, _backend_state(virtual_qc, np.array([1, 1]) / np.sqrt(2)))
 
 
-@pytest.mark.parametrize("virtual_qc", get_supported_simulator())
+@pytest.mark.parametrize("virtual_qc", VECTOR_SIMULATORS)
 def test_non_hermitian_grad_ops1(virtual_qc):
     """
     test
@@ -184,7 +211,7 @@ def generate_test_circuit():
     return circuit
 
 
-@pytest.mark.parametrize("virtual_qc", get_supported_simulator())
+@pytest.mark.parametrize("virtual_qc", [i for i in STATE_SIMULATORS if i != 'mps'])
 @pytest.mark.skipif(not _HAS_NUMBA, reason='Numba is not installed')
 def test_all_gate_with_simulator(virtual_qc):  # pylint: disable=too-many-locals
     """
@@ -205,7 +232,7 @@ def test_all_gate_with_simulator(virtual_qc):  # pylint: disable=too-many-locals
             -0.17429908 + 0.27887826j,
         ]
     )
-    assert np.allclose(qs, qs_exp)
+    assert np.allclose(qs, _backend_state(virtual_qc, qs_exp))
     sim = Simulator(virtual_qc, c.n_qubits)
     ham = ops.Hamiltonian(ops.QubitOperator('Z0'))
     grad_ops = sim.get_expectation_with_grad(ham, c)
@@ -222,7 +249,7 @@ def test_all_gate_with_simulator(virtual_qc):  # pylint: disable=too-many-locals
     assert np.allclose(g_a_1, g_a_2, atol=1e-4)
 
 
-@pytest.mark.parametrize("virtual_qc", get_supported_simulator())
+@pytest.mark.parametrize("virtual_qc", STATE_SIMULATORS)
 @pytest.mark.skipif(not _HAS_MINDSPORE, reason='MindSpore is not installed')
 @pytest.mark.skipif(not _HAS_NUMBA, reason='Numba is not installed')
 def test_optimization_with_custom_gate(virtual_qc):  # pylint: disable=too-many-locals
@@ -265,7 +292,7 @@ def test_optimization_with_custom_gate(virtual_qc):  # pylint: disable=too-many-
     assert np.allclose(train1().asnumpy(), train2().asnumpy())
 
 
-@pytest.mark.parametrize("virtual_qc", get_supported_simulator())
+@pytest.mark.parametrize("virtual_qc", VECTOR_SIMULATORS)
 def test_fid(virtual_qc):
     """
     Description:
@@ -282,7 +309,7 @@ def test_fid(virtual_qc):
     assert np.allclose(np.abs(f), np.array([1]))
 
 
-@pytest.mark.parametrize("virtual_qc", get_supported_simulator())
+@pytest.mark.parametrize("virtual_qc", VECTOR_SIMULATORS)
 def test_non_hermitian_grad_ops2(virtual_qc):
     """
     Description: test non hermitian grad ops
@@ -299,7 +326,7 @@ def test_non_hermitian_grad_ops2(virtual_qc):
     assert np.allclose(f, f_exp)
 
 
-@pytest.mark.parametrize("virtual_qc", get_supported_simulator())
+@pytest.mark.parametrize("virtual_qc", VECTOR_SIMULATORS)
 def test_inner_product(virtual_qc):
     """
     Description: test inner product of two simulator
@@ -314,7 +341,7 @@ def test_inner_product(virtual_qc):
     assert np.allclose(val_exp, val)
 
 
-@pytest.mark.parametrize("virtual_qc", get_supported_simulator())
+@pytest.mark.parametrize("virtual_qc", STATE_SIMULATORS)
 def test_copy(virtual_qc):
     """
     Description: test copy a simulator
@@ -331,7 +358,7 @@ def test_copy(virtual_qc):
     assert np.allclose(qs1, qs2)
 
 
-@pytest.mark.parametrize("virtual_qc", [i for i in get_supported_simulator() if i != 'projectq'])
+@pytest.mark.parametrize("virtual_qc", [i for i in STATE_SIMULATORS if i not in ('projectq', 'mps')])
 def test_multi_params_gate(virtual_qc):
     """
     Description: test multi params gate
@@ -343,7 +370,7 @@ def test_multi_params_gate(virtual_qc):
     p0 = np.array([1.0, 2.0, 3.0, 4.0, 5.0])
     sim.apply_circuit(circ, pr=dict(zip(circ.params_name, p0)))
     qs_exp = np.array([0.06207773 + 0.0j, 0.12413139 + 0.44906334j, 0.10068061 - 0.05143708j, 0.65995413 + 0.57511569j])
-    assert np.allclose(qs_exp, sim.get_qs())
+    assert np.allclose(_backend_state(virtual_qc, qs_exp), sim.get_qs())
     sim.reset()
     ham = Hamiltonian(QubitOperator("X0 Y1"))
     grad_ops = sim.get_expectation_with_grad(ham, circ)
@@ -366,7 +393,7 @@ def test_multi_params_gate(virtual_qc):
     assert np.allclose(g, g_exp)
 
 
-@pytest.mark.parametrize("virtual_qc", [i for i in get_supported_simulator() if i != 'projectq'])
+@pytest.mark.parametrize("virtual_qc", [i for i in STATE_SIMULATORS if i not in ('projectq', 'mps')])
 @pytest.mark.skipif(not _HAS_NUMBA, reason='Numba is not installed')
 def test_custom_gate_in_parallel(virtual_qc):
     """
@@ -385,3 +412,690 @@ def test_custom_gate_in_parallel(virtual_qc):
     g_sum_exp = 0.06041889360878677
     assert np.allclose(np.sum(f), f_sum_exp)
     assert np.allclose(np.sum(g), g_sum_exp)
+
+
+@pytest.mark.parametrize("virtual_qc", [i for i in STATE_SIMULATORS if i != 'projectq'])
+def test_sampling_with_mid_measure(virtual_qc):
+    """
+    Features: sampling circuit with mid-circuit and terminal measurement.
+    Description: test sampling distribution and correlation between measurement keys.
+    Expectation: success.
+    """
+    circ = Circuit().h(0).measure('m0', 0).x(1, 0).ry(1.2, 2).measure('m1', 1).measure('m2', 2).measure('m3', 0)
+    sim = Simulator(virtual_qc, circ.n_qubits)
+    res = sim.sampling(circ, shots=4000, seed=42)
+    samples = res.samples
+    assert samples.shape == (4000, 4)
+    keys = res.keys
+    m0, m1, m2, m3 = (samples[:, keys.index(k)] for k in ['m0', 'm1', 'm2', 'm3'])
+    assert np.all(m0 == m1)
+    assert np.all(m0 == m3)
+    assert abs(np.mean(m0) - 0.5) < 0.05
+    assert abs(np.mean(m2) - np.sin(0.6) ** 2) < 0.05
+    assert np.allclose(sim.get_qs(), _backend_state(virtual_qc, np.eye(8)[0]))
+    circ = Circuit()
+    for qubit in range(3):
+        circ += Circuit().ry(2.4, qubit).measure(f'a{qubit}', qubit).x(qubit)
+    circ += Circuit([G.Measure(f'b{qubit}').on(qubit) for qubit in range(3)])
+    res = sim.sampling(circ, shots=2000, seed=42)
+    samples = {key: res.samples[:, i] for i, key in enumerate(res.keys)}
+    for qubit in range(3):
+        assert abs(np.mean(samples[f'a{qubit}']) - np.sin(1.2) ** 2) < 0.05
+        assert np.all(samples[f'a{qubit}'] != samples[f'b{qubit}'])
+    assert np.any(np.diff(samples['a0']) > 0) and np.any(np.diff(samples['a0']) < 0)
+
+
+def test_mqvector_float32():
+    """
+    Features: single precision mqvector simulator.
+    Description: test evolution, gradient and sampling of float32 mqvector against float64 mqvector.
+    Expectation: success.
+    """
+    circ = Circuit().h(0).rx('a', 1).ry('b', 2, 0).zz('c', [0, 2]).x(0, 1)
+    circ += G.U3('d', 'e', 'f').on(1)
+    ham = [Hamiltonian(QubitOperator('X0 Y1') + QubitOperator('Z2', 0.3)), Hamiltonian(QubitOperator('Y2'))]
+    p0 = np.array([1.2, 2.3, 3.4, 0.3, 0.5, 0.7])
+    sim64 = Simulator('mqvector', 3)
+    sim32 = Simulator('mqvector', 3, dtype='float32')
+    sim64.apply_circuit(circ, p0)
+    sim32.apply_circuit(circ, p0)
+    assert sim32.get_qs().dtype == np.complex64
+    assert np.allclose(sim32.get_qs(), sim64.get_qs(), atol=1e-6)
+    f64, g64 = Simulator('mqvector', 3).get_expectation_with_grad(ham, circ)(p0)
+    f32, g32 = Simulator('mqvector', 3, dtype='float32').get_expectation_with_grad(ham, circ)(p0)
+    assert np.allclose(f32, f64, atol=1e-5)
+    assert np.allclose(g32, g64, atol=1e-5)
+    circ = circ.measure_all()
+    pr = dict(zip(circ.params_name, p0))
+    res32 = sim32.sampling(circ, pr, shots=100, seed=42)
+    res64 = sim64.sampling(circ, pr, shots=100, seed=42)
+    assert res32.data == res64.data
+    with pytest.raises(ValueError):
+        Simulator('mqvector', 3, dtype='float16')
+
+
+def test_mqvector_qs_view():
+    """
+    Features: zero copy quantum state access of mqvector simulator.
+    Description: test state view, in place setting and independence of get_qs result.
+    Expectation: success.
+    """
+    sim = Simulator('mqvector', 2)
+    view = sim.backend.sim.get_qs_view()
+    assert not view.flags.writeable
+    with pytest.raises(ValueError):
+        view[0] = 0
+    sim.apply_circuit(Circuit().h(0).x(1, 0))
+    assert np.allclose(view, np.array([1, 0, 0, 1]) / np.sqrt(2))
+    state = sim.get_qs()
+    state[0] = 0
+    assert np.allclose(sim.get_qs(), view)
+    sim.set_qs(np.array([1, 1j, 0, 1]))
+    assert np.allclose(view, np.array([1, 1j, 0, 1]) / np.sqrt(3))
+    sim32 = Simulator('mqvector', 2, dtype='float32')
+    sim32.set_qs(np.array([0, 2, 0, 0]))
+    assert np.allclose(sim32.get_qs(), np.array([0, 1, 0, 0]))
+    with pytest.raises(ValueError):
+        sim.set_qs(np.ones(8))
+
+
+@pytest.mark.parametrize("virtual_qc", STATE_SIMULATORS)
+def test_get_expectation_sparse(virtual_qc):
+    """
+    Features: expectation of pauli and sparse hamiltonian.
+    Description: test get_expectation against the matrix representation of hamiltonian.
+    Expectation: success.
+    """
+    ham_op = QubitOperator('X0 Y1', 0.3) + QubitOperator('Z1 Z2', 1.2) + QubitOperator('Y0 X2', -0.7)
+    sim = Simulator(virtual_qc, 3)
+    sim.apply_circuit(Circuit().h(0).rx(0.4, 1).ry(1.1, 2, 0).rz(0.3, 0))
+    state = sim.get_qs()
+    exp = np.vdot(state, ham_op.matrix(3).toarray() @ state)
+    assert np.allclose(sim.get_expectation(Hamiltonian(ham_op)), exp)
+    sparse_ham = Hamiltonian(ham_op)
+    sparse_ham.sparse(3)
+    assert np.allclose(sim.get_expectation(sparse_ham), exp)
+
+
+@pytest.mark.parametrize("virtual_qc", VECTOR_SIMULATORS)
+def test_apply_hamiltonian_shared_flip_mask(virtual_qc):
+    """
+    Features: apply hamiltonian whose terms share flip masks.
+    Description: test apply_hamiltonian and get_expectation against the matrix representation of hamiltonian.
+    Expectation: success.
+    """
+    ham_op = (
+        QubitOperator('X0 Y1', 0.3)
+        + QubitOperator('Y0 X1 Z2', -0.4)
+        + QubitOperator('X0 X1', 0.2)
+        + QubitOperator('Z0', 0.5)
+        + QubitOperator('Z1 Z2', 1.2)
+        + QubitOperator('', 0.1)
+        + QubitOperator('Y0 Z1 Y2', -0.7)
+    )
+    sim = Simulator(virtual_qc, 3)
+    sim.apply_circuit(Circuit().h(0).rx(0.4, 1).ry(1.1, 2, 0).rz(0.3, 0))
+    state = sim.get_qs()
+    mat = ham_op.matrix(3).toarray()
+    assert np.allclose(sim.get_expectation(Hamiltonian(ham_op)), np.vdot(state, mat @ state))
+    sim.apply_hamiltonian(Hamiltonian(ham_op))
+    assert np.allclose(sim.get_qs(), mat @ state)
+
+
+def test_mqvector_thread_pool():
+    """
+    Features: thread pool of mqvector simulator.
+    Description: test gradient with different threads number and the thread partition.
+    Expectation: success.
+    """
+    circ = Circuit().rx('a', 0).ry('b', 1).zz('c', [0, 1]).rx('d', 2).x(2, 0).as_encoder()
+    hams = [Hamiltonian(QubitOperator(f'Z{i % 3} X{(i + 1) % 3}')) for i in range(6)]
+    sim = Simulator('mqvector', 3)
+    grad_ops = sim.get_expectation_with_grad(hams, circ)
+    data = np.random.rand(8, 4)
+    f_1, g_1 = grad_ops(data)
+    origin = _mq_vector.get_threads_number()
+    try:
+        sim.set_threads_number(4)
+        f_4, g_4 = grad_ops(data)
+        assert sim.backend.get_thread_partition() == {'batch_workers': 4, 'hamiltonian_workers': 1, 'omp_threads': 1}
+    finally:
+        sim.set_threads_number(origin)
+    assert np.allclose(f_1, f_4)
+    assert np.allclose(g_1, g_4)
+    with pytest.raises(ValueError):
+        sim.set_threads_number(0)
+
+
+def test_mqvector_multi_thread():
+    """
+    Features: run independent mqvector simulators in different python threads.
+    Description: test that results are the same as running in serial.
+    Expectation: success.
+    """
+    circ = qft(range(4)) + Circuit().rx('a', 0).ry('b', 2).zz('c', [1, 3])
+    ham = Hamiltonian(QubitOperator('Z0 X1') + QubitOperator('Y3', 0.5))
+    params = np.random.rand(4, 3)
+
+    def run(p):
+        sim = Simulator('mqvector', 4)
+        sim.apply_circuit(circ, p)
+        f, g = sim.get_expectation_with_grad(ham, circ)(p)
+        return sim.get_qs(), f, g
+
+    serial = [run(p) for p in params]
+    with ThreadPoolExecutor(max_workers=4) as executor:
+        parallel = list(executor.map(run, params))
+    for res_s, res_p in zip(serial, parallel):
+        for i, j in zip(res_s, res_p):
+            assert np.allclose(i, j)
+
+
+@pytest.mark.parametrize("dtype", ['float32', 'float64'])
+def test_mqvector_apply_circuit_fuse(dtype):
+    """
+    Features: apply circuit with gate fusion.
+    Description: test that fused circuit gives the same quantum state and measure result.
+    Expectation: success.
+    """
+    circ = Circuit().h(0).x(1, 0).rx('a', 1).ry('b', 1, 0) + G.S.on(0) + G.T.on(0).hermitian()
+    circ += G.SWAP.on([0, 2])
+    circ += G.ISWAP.on([1, 2]).hermitian()
+    circ += G.U3('a', 'b', 1.2).on(3)
+    circ += G.FSim('a', 0.3).on([3, 1])
+    circ += G.CNOT.on(0, 3)
+    circ += G.XX('b').on([0, 1])
+    circ += G.PhaseShift('a').on(3, 2)
+    circ += G.GlobalPhase('b').on(1)
+    circ += G.X.on(0, [1, 2])
+    circ += qft(range(4))
+    circ += Circuit().measure(2)
+    circ += Circuit().rz('a', 2).ry('b', 3).x(3, 2).zz('a', [2, 3])
+    pr = {'a': 0.3, 'b': -1.7}
+    sim = Simulator('mqvector', 4, seed=1, dtype=dtype)
+    sim_fuse = Simulator('mqvector', 4, seed=1, dtype=dtype)
+    for _ in range(2):
+        res = sim.apply_circuit(circ, pr)
+        res_fuse = sim_fuse.apply_circuit(circ, pr, fuse=True)
+        assert res.data == res_fuse.data
+        assert np.allclose(sim.get_qs(), sim_fuse.get_qs(), atol=1e-6)
+    pr = {'a': 1.1, 'b': 0.2}
+    sim.apply_circuit(circ, pr)
+    sim_fuse.apply_circuit(circ, pr, fuse=True)
+    assert np.allclose(sim.get_qs(), sim_fuse.get_qs(), atol=1e-6)
+
+
+@pytest.mark.skipif(not _HAS_NUMBA, reason='Numba is not installed')
+@pytest.mark.parametrize("dtype", ['float32', 'float64'])
+def test_mqvector_compiled_circuit(dtype):
+    """
+    Features: apply circuit and get gradient with compiled circuit.
+    Description: test that compiled circuit matches circuit matrix and finite difference gradient, and that the
+        compiled circuit is rebuilt after the circuit is modified.
+    Expectation: success.
+    """
+
+    def rx_matrix(x):
+        return np.array([[np.cos(x / 2), -1j * np.sin(x / 2)], [-1j * np.sin(x / 2), np.cos(x / 2)]])
+
+    def rx_diff_matrix(x):
+        return np.array([[np.sin(x / 2), 1j * np.cos(x / 2)], [1j * np.cos(x / 2), np.sin(x / 2)]]) / -2
+
+    circ = Circuit().h(0).h(1).rx('a', 1).ry({'a': 2, 'b': -1}, 2, 0) + G.S.on(0).hermitian()
+    circ += G.U3('a', 'b', 1.2).on(2)
+    circ += G.FSim('b', 'c').on([0, 2])
+    circ += G.CNOT.on(1, 0)
+    circ += G.XX('c').on([1, 2])
+    circ += G.PhaseShift('a').on(2, 1)
+    circ += G.gene_univ_parameterized_gate('fake_rx', rx_matrix, rx_diff_matrix)('c').on(1)
+    circ += Circuit().rz('d', 0).no_grad()
+    pr = {'a': 0.3, 'b': -1.7, 'c': 0.8, 'd': 1.1}
+    sim = Simulator('mqvector', 3, dtype=dtype)
+    sim.apply_circuit(circ, pr)
+    assert np.allclose(sim.get_qs(), circ.matrix(pr)[:, 0], atol=1e-6)
+
+    ham = Hamiltonian(QubitOperator('Z0 X1 Y2'))
+    grad_ops = Simulator('mqvector', 3, dtype=dtype).get_expectation_with_grad(ham, circ)
+    data = np.array([pr[name] for name in circ.params_name])
+    _, grad = grad_ops(data)
+    eps = 1e-3
+    for i, name in enumerate(circ.params_name):
+        shift = np.eye(len(data))[i] * eps
+        f_p, _ = grad_ops(data + shift)
+        f_m, _ = grad_ops(data - shift)
+        expect = 0 if name == 'd' else np.real(f_p - f_m)[0, 0] / 2 / eps
+        assert np.allclose(np.real(grad[0, 0, i]), expect, atol=1e-3)
+
+    circ.rx('e', 0)
+    pr['e'] = 0.5
+    assert len(circ.get_compiled_cpp_obj()) == len(circ)
+    sim.reset()
+    sim.apply_circuit(circ, pr)
+    assert np.allclose(sim.get_qs(), circ.matrix(pr)[:, 0], atol=1e-6)
+
+
+def test_mqvector_noisy_expectation():
+    """
+    Features: noisy expectation with trajectories.
+    Description: test averaged expectation of noisy circuit against analytic value, and that the result does not depend
+        on the number of threads.
+    Expectation: success.
+    """
+    circ = Circuit().ry(1.2, 0).ry(0.4, 1) + G.DepolarizingChannel(0.1).on(0)
+    circ += G.KrausChannel('amplitude_damping', [[[1, 0], [0, np.sqrt(0.7)]], [[0, np.sqrt(0.3)], [0, 0]]]).on(1)
+    hams = [Hamiltonian(QubitOperator('Z0')), Hamiltonian(QubitOperator('Z1'))]
+    sim = Simulator('mqvector', 2)
+    mean, std_err = sim.get_noisy_expectation(hams, circ, n_traj=4000, seed=42)
+    mean_serial, std_err_serial = sim.get_noisy_expectation(hams, circ, n_traj=4000, seed=42, parallel_worker=1)
+    assert np.allclose(mean, mean_serial)
+    assert np.allclose(std_err, std_err_serial)
+    expect = [np.cos(1.2) * (1 - 0.4 / 3), 1 - 2 * 0.7 * np.sin(0.2) ** 2]
+    assert np.all(np.abs(mean.real - expect) < 5 * std_err)
+    assert np.allclose(sim.get_qs(), [1, 0, 0, 0])
+
+    mean, std_err = sim.get_noisy_expectation(hams[0], Circuit().ry(1.2, 0), n_traj=10)
+    assert np.allclose(mean, np.cos(1.2))
+    assert std_err == 0
+
+
+def test_mqvector_grad_with_memory_limit():
+    """
+    Features: memory limit and checkpoint of gradient.
+    Description: test gradient with limited memory against default gradient, and checkpoint with non unitary gate.
+    Expectation: success.
+    """
+    rng = np.random.default_rng(42)
+    circ = Circuit([G.RY('a').on(0), G.RX('b').on(1), G.X.on(1, 0), G.RZ('c').on(0), G.RY('d').on(1)])
+    circ += G.RX('e').on(0, 1)
+    enc = Circuit([G.RY('x0').on(0), G.RY('x1').on(1)]).as_encoder()
+    hams = [Hamiltonian(QubitOperator('Z0')), Hamiltonian(QubitOperator('X0 Y1')), Hamiltonian(QubitOperator('Z1'))]
+    x = rng.uniform(size=(7, 2))
+    p = rng.uniform(size=5)
+    sim = Simulator('mqvector', 2)
+    f_exp, g1_exp, g2_exp = sim.get_expectation_with_grad(hams, enc + circ)(x, p)
+    state_size = 16 * 4
+    for kwargs in [{'max_memory': 5 * state_size}, {'max_memory': 20 * state_size, 'checkpoint': True}]:
+        f, g1, g2 = sim.get_expectation_with_grad(hams, enc + circ, parallel_worker=4, **kwargs)(x, p)
+        assert np.allclose(f, f_exp)
+        assert np.allclose(g1, g1_exp)
+        assert np.allclose(g2, g2_exp)
+    with pytest.raises(ValueError):
+        sim.get_expectation_with_grad(hams, circ, max_memory=3 * state_size)(p)
+
+    # The state before a non unitary gate can not be uncomputed by its hermitian conjugate.
+    circ.insert(3, G.UnivMathGate('m', np.array([[1, 0.3], [0.2, 0.5]])).on(0))
+    _, g = sim.get_expectation_with_grad(hams, circ, max_memory=3 * state_size, checkpoint=True)(p)
+    g_exp = np.zeros((3, 5))
+    for i in range(5):
+        for sign in (1, -1):
+            shifted = p.copy()
+            shifted[i] += sign * 1e-6
+            sim.reset()
+            sim.apply_circuit(circ, shifted)
+            g_exp[:, i] += sign * np.array([sim.get_expectation(ham).real for ham in hams]) / 2e-6
+    assert np.allclose(g[0], g_exp, atol=1e-5)
+
+
+def test_mqvector_weighted_grad():
+    """
+    Features: gradient of weighted sum of expectations.
+    Description: test weighted gradient against the weighted sum of full gradient.
+    Expectation: success.
+    """
+    rng = np.random.default_rng(42)
+    enc = Circuit([G.RY(f'x{i}').on(i) for i in range(3)]).as_encoder()
+    ans = Circuit([G.RX('a').on(0), G.X.on(1, 0), G.RY('b').on(1), G.ZZ('c').on([1, 2]), G.RZ('d').on(2, 0)])
+    hams = [Hamiltonian(QubitOperator(f'Z{i}')) for i in range(3)] + [Hamiltonian(QubitOperator('X0 Y2', 0.5))]
+    x = rng.uniform(size=(5, 3))
+    p = rng.uniform(size=4)
+    weights = rng.normal(size=(5, 4))
+    grad_ops = Simulator('mqvector', 3).get_expectation_with_grad(hams, enc + ans)
+    assert grad_ops.support_weights
+    f_exp, g1_exp, g2_exp = grad_ops(x, p)
+    f, g1, g2 = grad_ops(x, p, weights=weights)
+    assert np.allclose(f, f_exp)
+    assert np.allclose(g1, np.einsum('smp,sm->sp', g1_exp, weights))
+    assert np.allclose(g2, np.einsum('smp,sm->sp', g2_exp, weights))
+    f, g1, g2 = grad_ops(x, p, weights=np.zeros((5, 4)))
+    assert np.allclose(f, f_exp)
+    assert np.allclose(g1, 0) and np.allclose(g2, 0)
+    with pytest.raises(ValueError):
+        grad_ops(x, p, weights=weights[:, :3])
+
+
+@pytest.mark.parametrize('backend', ['mqvector', 'mqmatrix'])
+def test_parameter_shift_grad(backend):
+    """
+    Features: parameter shift and finite difference gradient.
+    Description: test shifted gradient against adjoint gradient, and gradient with shots.
+    Expectation: success.
+    """
+    rng = np.random.default_rng(42)
+    enc = Circuit([G.RY('x0').on(0), G.RY('x1').on(1)]).as_encoder()
+    ans = Circuit(
+        [
+            G.RX({'a': 1.3, 'b': 0.5}).on(0),
+            G.RY('b').on(1, 0),
+            G.XX('c').on([1, 2], 0),
+            G.PhaseShift('a').on(2, 1),
+            G.GlobalPhase('d').on(0, 2),
+            G.U3('e', 'f', 'g').on(2, 0),
+            G.FSim('h', 'e').on([0, 2], 1),
+            G.RZ('i').on(2),
+        ]
+    )
+    hams = [Hamiltonian(QubitOperator('Z0 X1', 0.7) + QubitOperator('Y2') + QubitOperator('', 0.3))]
+    hams.append(Hamiltonian(QubitOperator('X0 X2')))
+    x = rng.uniform(-2, 2, (3, 2))
+    p = rng.uniform(-2, 2, len(ans.params_name))
+    f_exp, g1_exp, g2_exp = Simulator('mqvector', 3).get_expectation_with_grad(hams, enc + ans)(x, p)
+    sim = Simulator(backend, 3)
+    for method in ['parameter_shift', 'finite_difference']:
+        f, g1, g2 = sim.get_expectation_with_grad(hams, enc + ans, method=method, parallel_worker=4)(x, p)
+        assert np.allclose(f, f_exp)
+        assert np.allclose(g1, g1_exp, atol=1e-6)
+        assert np.allclose(g2, g2_exp, atol=1e-6)
+    grad_ops = sim.get_expectation_with_grad(hams, enc + ans, method='parameter_shift', shots=100000, seed=42)
+    f, g1, g2 = grad_ops(x, p)
+    assert np.allclose(f, f_exp, atol=0.05)
+    assert np.allclose(g2, g2_exp, atol=0.05)
+    with pytest.raises(ValueError):
+        sim.get_expectation_with_grad(hams, enc + ans, shots=100)
+
+
+def test_mqvector_qfi():
+    """
+    Features: quantum fisher information in C++.
+    Description: test qfi and its approximation against finite difference of quantum state.
+    Expectation: success.
+    """
+    rng = np.random.default_rng(42)
+    circ = UN(G.H, 3) + Circuit(
+        [
+            G.RX({'a': 1.3, 'b': 0.5}).on(0),
+            G.RY('b').on(1, 0),
+            G.ZZ('c').on([0, 2]),
+            G.PhaseShift('a').on(2, 1),
+            G.GlobalPhase('d').on(0, 2),
+            G.U3('e', 'f', 1.0).on(1),
+            G.FSim('g', 'e').on([0, 2], 1),
+            G.RY('h').on(2),
+        ]
+    )
+    p = rng.uniform(-2, 2, len(circ.params_name))
+
+    def state(val):
+        sim = Simulator('mqvector', 3)
+        sim.apply_circuit(circ, val)
+        return sim.get_qs()
+
+    eps = 1e-6
+    diff = np.array([(state(p + eps * i) - state(p - eps * i)) / 2 / eps for i in np.eye(len(p))])
+    part_b = diff.conj() @ state(p)
+    qfi_exp = 4 * np.real(diff.conj() @ diff.T - np.outer(part_b, part_b.conj()))
+    sim = Simulator('mqvector', 3)
+    assert np.allclose(sim.get_qfi(circ, p), qfi_exp, atol=1e-6)
+    assert np.allclose(sim.get_qs(), np.eye(8)[0])
+    diag = sim.get_qfi(circ, p, approx='diagonal', parallel_worker=2)
+    assert np.allclose(diag, np.diag(np.diag(diag)))
+    single = [2, 3, 5, 6, 7]
+    assert np.allclose(np.diag(diag)[single], np.diag(qfi_exp)[single], atol=1e-6)
+    block = sim.get_qfi(circ, p, approx='block_diag')
+    assert np.allclose(block[3, 5], qfi_exp[3, 5], atol=1e-6)
+    assert np.allclose(block[2, 7], 0)
+    with pytest.raises(ValueError):
+        sim.get_qfi(circ, p, approx='blocks')
+
+
+@pytest.mark.parametrize("virtual_qc", STATE_SIMULATORS)
+def test_get_expectation_with_shots(virtual_qc):
+    """
+    Features: shot based expectation.
+    Description: test expectation estimated from qubit-wise commuting measurement groups.
+    Expectation: success.
+    """
+    ham = Hamiltonian(
+        QubitOperator('X0 X1', 0.5)
+        + QubitOperator('Y0 Z2', -0.7)
+        + QubitOperator('Z0 Z1', 0.3)
+        + QubitOperator('Z1', 0.2)
+        + QubitOperator('Y1 X2', 0.4)
+        + QubitOperator('', 1.5)
+    )
+    circ = Circuit().rx(0.3, 0).ry(1.1, 1).rx(0.7, 2).x(1, 0).ry(0.5, 0).x(2, 1).rz(0.4, 2).h(1)
+    sim = Simulator(virtual_qc, 3)
+    sim.apply_circuit(circ)
+    qs = sim.get_qs()
+    exact = sim.get_expectation(ham).real
+    mean, var = sim.get_expectation(ham, shots=100000, seed=42)
+    assert 0 < var < 1e-4
+    assert abs(mean - exact) < 5 * np.sqrt(var)
+    assert sim.get_expectation(ham, shots=100, seed=1) == sim.get_expectation(ham, shots=100, seed=1)
+    assert np.allclose(sim.get_qs(), qs)
+    assert sim.get_expectation(Hamiltonian(QubitOperator('', 2.0)), shots=10) == (2.0, 0.0)
+    with pytest.raises(ValueError):
+        sim.get_expectation(ham, shots=2)
+
+
+def test_get_expectation_with_few_shots():
+    """
+    Features: shot based expectation with many measurement groups.
+    Description: test that every group gets enough shots for its sample variance.
+    Expectation: success.
+    """
+    # pylint: disable=import-outside-toplevel
+    from mindquantum.simulator.utils import _allocate_shots, _qubit_wise_commuting_groups
+
+    ham = Hamiltonian(
+        QubitOperator('Z0', 100.0)
+        + QubitOperator('X0 X1', 0.1)
+        + QubitOperator('Y0 Y1', 0.1)
+        + QubitOperator('X0 Y1', 0.1)
+        + QubitOperator('Y0 X1', 0.1)
+        + QubitOperator('Z0 X1', 0.1)
+    )
+    n_groups = len(_qubit_wise_commuting_groups([term for term in ham.ham_termlist if term[0]]))
+    assert n_groups == 5
+    allocation = _allocate_shots([100.5, 0.1, 0.1, 0.1, 0.1], 2 * n_groups + 1)
+    assert np.sum(allocation) == 2 * n_groups + 1 and np.min(allocation) == 2
+    sim = Simulator('mqvector', 2)
+    sim.apply_circuit(Circuit().h(0).rx(0.5, 1))
+    mean, var = sim.get_expectation(ham, shots=2 * n_groups, seed=42)
+    assert np.isfinite(mean) and var > 0
+    with pytest.raises(ValueError):
+        sim.get_expectation(ham, shots=2 * n_groups - 1)
+
+
+@pytest.mark.parametrize("virtual_qc", ['mqvector', 'mqmatrix'])
+@pytest.mark.parametrize("dtype", ['float32', 'float64'])
+def test_mqsim_partial_state_queries(virtual_qc, dtype):
+    """
+    Features: marginal probability, amplitudes and reduced density matrix.
+    Description: test partial queries of quantum state against the full quantum state.
+    Expectation: success.
+    """
+    n_qubits = 4
+    circ = Circuit().rx(0.3, 0).ry(1.1, 1).rx(0.7, 2).ry(0.2, 3).x(1, 0).ry(0.5, 0).x(2, 1).rz(0.4, 2).h(3).x(0, 3)
+    sim = Simulator(virtual_qc, n_qubits, dtype=dtype)
+    sim.apply_circuit(circ)
+    vec = Simulator('mqvector', n_qubits)
+    vec.apply_circuit(circ)
+    psi = vec.get_qs().reshape([2] * n_qubits)
+    qubits = [2, 0]
+    axes = [n_qubits - 1 - q for q in qubits]
+    rest = [i for i in range(n_qubits) if i not in axes]
+    sub = np.transpose(psi, axes[::-1] + rest).reshape(1 << len(qubits), -1)
+    atol = 1e-6 if dtype == 'float32' else 1e-12
+    assert np.allclose(sim.get_probabilities(qubits), np.sum(np.abs(sub) ** 2, axis=1), atol=atol)
+    assert np.allclose(sim.get_probabilities(), np.abs(vec.get_qs()) ** 2, atol=atol)
+    assert np.allclose(sim.get_reduced_density_matrix(qubits), sub @ sub.conj().T, atol=atol)
+    if virtual_qc == 'mqvector':
+        assert np.allclose(sim.get_amplitudes([3, 0, 9]), vec.get_qs()[[3, 0, 9]], atol=atol)
+        with pytest.raises(ValueError):
+            sim.get_amplitudes(16)
+    with pytest.raises(ValueError):
+        sim.get_probabilities([1, 1])
+    with pytest.raises(ValueError):
+        sim.get_reduced_density_matrix([4])
+
+
+def test_mqmatrix_noisy_circuit():
+    """
+    Features: density matrix simulator.
+    Description: test exact expectation, gradient and sampling of noisy circuit with mqmatrix backend.
+    Expectation: success.
+    """
+    circ = Circuit().ry('a', 0).rx('b', 1).x(1, 0) + G.DepolarizingChannel(0.1).on(0)
+    circ += G.AmplitudeDampingChannel(0.3).on(1)
+    kraus = [[[np.sqrt(0.8), 0], [0, np.sqrt(0.8)]], [[np.sqrt(0.2), 0], [0, -np.sqrt(0.2)]]]
+    circ += G.KrausChannel('phase_flip', kraus).on(0)
+    circ.rz('c', 0)
+    circ += G.U3('d', 0.3, 'e').on(1)
+    circ += G.PhaseShift(0.7).on(0)
+    circ += G.S.on(1)
+    circ += G.T.on(0)
+    circ.y(1)
+    hams = [Hamiltonian(QubitOperator('X0 Z1', 0.5) + QubitOperator('Y1')), Hamiltonian(QubitOperator('Z0 Z1'))]
+    pr = {'a': 0.3, 'b': 1.1, 'c': -0.6, 'd': 0.8, 'e': 2.1}
+    sim = Simulator('mqmatrix', 2)
+
+    # Noiseless circuit gives the same state and expectation as the vector simulator.
+    noiseless = circ.remove_noise()
+    sim.apply_circuit(noiseless, pr)
+    state = noiseless.get_qs(pr=pr)
+    assert np.allclose(sim.get_qs(), np.outer(state, state.conj()))
+    assert np.allclose(sim.get_expectation(hams[0]), np.vdot(state, hams[0].hamiltonian.matrix(2) @ state))
+
+    # Noisy expectation against the average of Kraus operators.
+    sim.reset()
+    sim.apply_circuit(Circuit().ry(1.2, 0).ry(0.4, 1) + G.DepolarizingChannel(0.1).on(0))
+    sim.apply_gate(G.AmplitudeDampingChannel(0.3).on(1))
+    assert np.allclose(sim.get_expectation(Hamiltonian(QubitOperator('Z0'))), np.cos(1.2) * (1 - 0.4 / 3))
+    assert np.allclose(sim.get_expectation(Hamiltonian(QubitOperator('Z1'))), 1 - 2 * 0.7 * np.sin(0.2) ** 2)
+    assert np.allclose(np.trace(sim.get_qs()), 1)
+
+    # Gradient of noisy circuit against finite difference.
+    sim.reset()
+    grad_ops = sim.get_expectation_with_grad(hams, circ)
+    data = np.array([pr[name] for name in circ.params_name])
+    f, g = grad_ops(data)
+    for j, ham in enumerate(hams):
+        sim.reset()
+        sim.apply_circuit(circ, pr)
+        assert np.allclose(f[0, j], sim.get_expectation(ham))
+    sim.reset()
+    eps = 1e-4
+    for i in range(len(data)):
+        shift = np.eye(len(data))[i] * eps
+        f_p, _ = grad_ops(data + shift)
+        f_m, _ = grad_ops(data - shift)
+        assert np.allclose(g[0, :, i], (f_p - f_m)[0] / 2 / eps, atol=1e-6)
+
+    # Sampling with terminal measurements draws from the diagonal of density matrix.
+    sim.reset()
+    samp_circ = Circuit().x(0) + G.AmplitudeDampingChannel(0.3).on(0)
+    res = sim.sampling(samp_circ + G.Measure('m0').on(0), shots=4000, seed=42)
+    assert abs(np.mean(res.samples[:, 0]) - 0.7) < 0.05
+    res = sim.sampling(samp_circ + G.Measure('m0').on(0) + G.X.on(1, 0) + G.Measure('m1').on(1), shots=500, seed=42)
+    assert np.all(res.samples[:, 0] == res.samples[:, 1])
+
+
+def test_stabilizer_clifford_circuit():
+    """
+    Features: stabilizer simulator.
+    Description: test stabilizer simulator on random clifford circuits against mqvector and on large GHZ state.
+    Expectation: success.
+    """
+    rng = np.random.default_rng(42)
+    n_qubits = 4
+    for _ in range(20):
+        circ = Circuit()
+        for _ in range(30):
+            obj, ctrl = rng.choice(n_qubits, 2, replace=False).tolist()
+            circ += [
+                G.H.on(obj),
+                G.S.on(obj),
+                G.S.on(obj).hermitian(),
+                G.X.on(obj, ctrl),
+                G.Y.on(obj, ctrl),
+                G.Z.on(obj, ctrl),
+                G.Y.on(obj),
+                G.SWAP.on([obj, ctrl]),
+                G.RX(np.pi / 2 * rng.integers(4)).on(obj),
+                G.RY(np.pi / 2 * rng.integers(4)).on(obj),
+                G.PhaseShift(np.pi / 2 * rng.integers(4)).on(obj),
+            ][rng.integers(11)]
+        sim = Simulator('stabilizer', n_qubits)
+        sim.apply_circuit(circ)
+        state = circ.get_qs()
+        assert np.allclose(np.abs(np.vdot(sim.get_qs(), state)), 1)
+        for term in ['X0', 'Z1 Y2', 'X0 X1 Y2 Z3', 'Y0 Y1']:
+            ham = Hamiltonian(QubitOperator(term, 0.5))
+            assert np.allclose(sim.get_expectation(ham), np.vdot(state, ham.hamiltonian.matrix(n_qubits) @ state))
+        meas_circ = circ + Circuit([G.Measure(f'q{i}').on(i) for i in range(n_qubits)])
+        res = Simulator('stabilizer', n_qubits).sampling(meas_circ + G.Measure('m').on(0), shots=1000, seed=42)
+        assert np.all(res.samples[:, 0] == res.samples[:, -1])
+        idx = res.samples[:, :n_qubits] @ (1 << np.arange(n_qubits))
+        probs = np.abs(state) ** 2
+        assert np.all(probs[idx] > 1e-8)
+        assert np.all(np.abs(np.bincount(idx, minlength=1 << n_qubits) / 1000 - probs) < 0.08)
+
+    n_qubits = 500
+    circ = Circuit().h(0)
+    for i in range(1, n_qubits):
+        circ.x(i, i - 1)
+    sim = Simulator('stabilizer', n_qubits)
+    res = sim.sampling(circ + Circuit([G.Measure(f'q{i}').on(i) for i in range(n_qubits)]), shots=100, seed=42)
+    assert set(res.samples.sum(axis=1)) == {0, n_qubits}
+    sim.apply_circuit(circ)
+    assert sim.get_expectation(Hamiltonian(QubitOperator('Z0 Z499'))) == 1
+    assert sim.get_expectation(Hamiltonian(QubitOperator('Z0'))) == 0
+    with pytest.raises(ValueError):
+        sim.apply_gate(G.T.on(0))
+
+
+def test_mps_circuit():
+    """
+    Features: mps simulator.
+    Description: test mps simulator against mqvector and on a large chain of qubits.
+    Expectation: success.
+    """
+    rng = np.random.default_rng(42)
+    u = G.UnivMathGate('u', np.linalg.qr(rng.normal(size=(4, 4)) + 1j * rng.normal(size=(4, 4)))[0])
+    circ = Circuit([G.RY(f'a{i}').on(i) for i in range(5)])
+    circ += Circuit([G.X.on(3, 0), G.ZZ('b').on([0, 4]), G.RX('c').on(2, 4)])
+    circ += Circuit([G.XX({'a0': 0.5, 'd': 1.2}).on([3, 1])])
+    circ += Circuit([G.PhaseShift('e').on(1, 2), G.RZ('f').on(4), u.on([4, 1]), G.SWAP.on([0, 3])])
+    circ += Circuit([G.YY('g').on([2, 0], 1), G.GlobalPhase('h').on(1, 3), G.H.on(2)])
+    pr = dict(zip(circ.params_name, rng.uniform(-2, 2, len(circ.params_name))))
+    sim = Simulator('mps', 5)
+    ref = Simulator('mqvector', 5)
+    sim.apply_circuit(circ, pr)
+    ref.apply_circuit(circ, pr)
+    assert np.allclose(sim.get_qs(), ref.get_qs())
+    hams = [Hamiltonian(QubitOperator('X0 Z4', 0.3) + QubitOperator('Y1 Y2')), Hamiltonian(QubitOperator('Z3'))]
+    for ham in hams:
+        assert np.allclose(sim.get_expectation(ham), ref.get_expectation(ham))
+    probs = np.abs(ref.get_qs()) ** 2
+    sim.reset()
+    ref.reset()
+    data = np.array(list(pr.values()))
+    f, g = sim.get_expectation_with_grad(hams, circ, parallel_worker=2)(data)
+    f_exp, g_exp = ref.get_expectation_with_grad(hams, circ)(data)
+    assert np.allclose(f, f_exp)
+    assert np.allclose(g, g_exp)
+    res = sim.sampling(circ + Circuit([G.Measure(f'q{i}').on(i) for i in range(5)]), pr, shots=2000, seed=42)
+    idx = res.samples @ (1 << np.arange(5))
+    assert np.all(np.abs(np.bincount(idx, minlength=32) / 2000 - probs) < 0.05)
+
+    n_qubits = 100
+    circ = Circuit().h(0)
+    for i in range(1, n_qubits):
+        circ.x(i, i - 1)
+    sim = Simulator('mps', n_qubits, max_bond_dim=4)
+    res = sim.sampling(circ + Circuit([G.Measure(f'q{i}').on(i) for i in range(n_qubits)]), shots=100, seed=42)
+    assert set(res.samples.sum(axis=1)) == {0, n_qubits}
+    sim.apply_circuit(circ)
+    assert max(sim.backend.bond_dims()) == 2
+    assert np.allclose(sim.get_expectation(Hamiltonian(QubitOperator('Z0 Z99'))), 1)
+    assert np.allclose(sim.get_expectation(Hamiltonian(QubitOperator('X0'))), 0)
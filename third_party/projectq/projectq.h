@@ -347,7 +347,7 @@ class Projectq : public ::projectq::Simulator {
         Projectq::run();
         if (ham.how_to_ == ORIGIN) {
             Projectq::apply_qubit_operator(HCast<T>(ham.ham_), Projectq::ordering_);
-        } else if (ham.how_to_ == BACKEND) {
+        } else if (ham.ham_sparse_second_) {
             auto out = sparse::Csr_Dot_Vec<T, double>(ham.ham_sparse_main_, ham.ham_sparse_second_, Projectq::vec_);
             if (Projectq::vec_ != nullptr) {
                 free(Projectq::vec_);
@@ -0,0 +1,27 @@
+# Copyright 2022 Huawei Technologies Co., Ltd
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+# http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+# ============================================================================
+
+# pylint: disable=duplicate-code
+
+"""Parse argument."""
+
+import argparse
+
+parser = argparse.ArgumentParser()
+parser.add_argument(
+    '-s', '--spin-orbitals', help='numbers of spin orbitals', type=int, nargs='+', default=[8, 12, 16, 20]
+)
+parser.add_argument('-t', '--transform', help='name of transform', type=str, default='jordan_wigner')
+parser.add_argument('-p', '--parallel-worker', help='parallel worker', type=int, default=1)
@@ -0,0 +1,60 @@
+# Copyright 2022 Huawei Technologies Co., Ltd
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+# http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+# ============================================================================
+
+# pylint: disable=protected-access
+
+"""Benchmark for fermion to qubit transforms of molecular hamiltonians with MindQuantum."""
+
+import time
+
+import numpy as np
+from _parse_args import parser
+
+from mindquantum.algorithm.nisq import Transform
+from mindquantum.algorithm.nisq.chem import transform
+from mindquantum.core.operators import FermionOperator, InteractionOperator
+
+args = parser.parse_args()
+ladder_sets = {
+    'jordan_wigner': transform._jordan_wigner_sets,
+    'parity': transform._parity_sets,
+    'bravyi_kitaev': transform._bravyi_kitaev_sets,
+    'ternary_tree': transform._ternary_tree_sets,
+}[args.transform]
+
+
+def random_molecular_hamiltonian(n_orbitals, seed=42):
+    """Random interaction operator with the symmetry of a molecular hamiltonian."""
+    rng = np.random.default_rng(seed)
+    one_body = rng.normal(size=(n_orbitals, n_orbitals))
+    two_body = rng.normal(size=(n_orbitals,) * 4)
+    two_body = two_body + two_body.transpose(1, 0, 3, 2)
+    two_body = two_body + two_body.transpose(3, 2, 1, 0)
+    return InteractionOperator(1.0, one_body + one_body.T, two_body)
+
+
+for n_orbitals in args.spin_orbitals:
+    ham = random_molecular_hamiltonian(n_orbitals)
+    t0 = time.time()
+    vectorized = getattr(Transform(ham), args.transform)(parallel_worker=args.parallel_worker)
+    n_terms = len(vectorized)
+    t1 = time.time()
+    term_by_term = transform._transform_terms(FermionOperator(ham), n_orbitals, ladder_sets)
+    t2 = time.time()
+    assert vectorized == term_by_term
+    print(
+        f'{n_orbitals} spin orbitals, {n_terms} pauli terms: vectorized {t1 - t0:.3f}s, '
+        f'term by term {t2 - t1:.3f}s, speedup {(t2 - t1) / (t1 - t0):.1f}x'
+    )